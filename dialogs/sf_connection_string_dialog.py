@@ -204,7 +204,7 @@ class SFConnectionStringDialog(QDialog, Ui_QgsPgNewConnectionBase):
                     remove_connection(self.settings, self.connection_name)
 
             if self.txtName.text() in self._sf_connection_manager.opened_connections:
-                del self._sf_connection_manager.opened_connections[self.txtName.text()]
+                self._sf_connection_manager.close_connection(self.txtName.text())
             self.update_connections_signal.emit()
             super().accept()
         except Exception as e:
@@ -2,10 +2,10 @@ from ..managers.sf_connection_manager import SFConnectionManager
 from ..helpers.data_base import (
     check_table_exceeds_size,
     limit_size_for_table,
-    get_column_iterator,
+    get_catalog_snapshot,
     get_features_iterator,
-    get_table_geo_columns,
-    get_table_iterator,
+    get_schema_geo_columns,
+    is_catalog_cached,
 )
 from ..helpers.messages import (
     LargeDatasetChoice,
@@ -20,14 +20,19 @@ from ..helpers.utils import (
     get_path_nodes,
     prompt_and_get_primary_key,
     get_qsettings,
+    is_layer_disk_cache_enabled,
     on_handle_error,
     on_handle_warning,
     remove_connection,
+    set_layer_disk_cache_enabled,
 )
+from ..helpers.disk_cache import clear_layer_cache
+from ..helpers.metadata_cache import get_metadata_cache
 from ..helpers.sql import quote_literal
 from ..tasks.sf_convert_column_to_layer_task import SFConvertColumnToLayerTask
+from ..tasks.sf_populate_children_task import SFPopulateChildrenTask
 from ..dialogs.sf_connection_string_dialog import SFConnectionStringDialog
-from qgis.PyQt.QtCore import pyqtSignal, Qt
+from qgis.PyQt.QtCore import pyqtSignal, Qt, QCoreApplication, QThread
 from qgis.core import (
     QgsDataItem,
     Qgis,
@@ -38,11 +43,16 @@ from qgis.core import (
 )
 from qgis.PyQt.QtGui import QIcon
 from qgis.PyQt.QtWidgets import QMessageBox, QAction, QWidget, QTabWidget, QComboBox, QDialog
+import functools
 import os
 import typing
 
 _IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ui", "images")
 
+# Item types whose children need Snowflake queries; they are fetched on a
+# SFPopulateChildrenTask while the node shows a "Loading..." placeholder.
+_BACKGROUND_ITEM_TYPES = ("connection", "schema")
+
 
 class SFDataItem(QgsDataItem):
     message_handler = pyqtSignal(str, str)
@@ -84,6 +94,14 @@ class SFDataItem(QgsDataItem):
         self.geom_column = geom_column
         self.geom_type = geom_type
         self._running_tasks = {}
+        self._children_prefetched = False
+        self._prefetch_error = ""
+        if item_type in _BACKGROUND_ITEM_TYPES:
+            # createChildren() only returns a placeholder while the queries
+            # run on a task, so QGIS may call it on the main thread.
+            self.setCapabilitiesV2(
+                self.capabilities2() | Qgis.BrowserItemCapability.Fast
+            )
 
     def createChildren(self) -> typing.List["QgsDataItem"]:
         """
@@ -99,6 +117,8 @@ class SFDataItem(QgsDataItem):
         try:
             if self.item_type in ("field", "table_no_geom"):
                 pass
+            elif self._populate_in_background(children):
+                pass
             elif self.item_type == "root":
                 self.create_root_item(children)
             elif self.item_type == "schema":
@@ -126,11 +146,125 @@ class SFDataItem(QgsDataItem):
             children.append(error_item)
         return children
 
+    def _populate_in_background(self, children: typing.List["QgsDataItem"]) -> bool:
+        """
+        Starts fetching the children's metadata on a task and adds a
+        "Loading..." placeholder to the provided children list.
+
+        When the task finishes, on_children_prefetched() refreshes the item and
+        the children are built from the metadata cache. A request for a path
+        whose task is still running only adds the placeholder.
+
+        Args:
+            children (typing.List["QgsDataItem"]): A list to which the placeholder
+                                                   will be appended.
+
+        Returns:
+            bool: True if the children are being fetched in the background,
+                  False if they should be created now.
+
+        Raises:
+            Exception: If the background fetch failed.
+        """
+        if self.item_type not in _BACKGROUND_ITEM_TYPES:
+            return False
+        if self._children_prefetched:
+            self._children_prefetched = False
+            error, self._prefetch_error = self._prefetch_error, ""
+            if error:
+                raise Exception(error)
+            return False
+        # Off the main thread (QGIS populating the item itself) or with the
+        # metadata already cached, blocking is harmless.
+        if QThread.currentThread() != QCoreApplication.instance().thread():
+            return False
+        schema_name = self.clean_name if self.item_type == "schema" else None
+        if self.path() not in self._running_tasks and is_catalog_cached(
+            self.connection_name, schema_name
+        ):
+            return False
+
+        if self.path() not in self._running_tasks:
+            if self.item_type == "connection":
+                load = functools.partial(get_catalog_snapshot, self.connection_name)
+            else:
+                load = functools.partial(
+                    get_schema_geo_columns, self.connection_name, self.clean_name
+                )
+            populate_task = SFPopulateChildrenTask(
+                path=self.path(),
+                description=f"Snowflake Load {self.name()}",
+                load=load,
+            )
+            populate_task.on_handle_finished.connect(self.on_children_prefetched)
+            self._running_tasks[self.path()] = populate_task
+            QgsApplication.taskManager().addTask(populate_task)
+            if self.item_type == "connection":
+                self._notify_sso_authorization()
+
+        loading_item = QgsDataItem(
+            Qgis.BrowserItemType.Custom,
+            self,
+            "Loading...",
+            f"{self.path()}/loading",
+            self.providerKey(),
+        )
+        loading_item.setState(Qgis.BrowserItemState.Populated)
+        children.append(loading_item)
+        return True
+
+    def on_children_prefetched(self, path: str, error: str) -> None:
+        """
+        Handles the completion of a SFPopulateChildrenTask.
+
+        Parameters:
+        - path (str): The path of the populated item.
+        - error (str): The error message, empty if the metadata was fetched.
+
+        Returns:
+        - None
+        """
+        if self._running_tasks.pop(path, None) is None:
+            return
+        self._children_prefetched = True
+        self._prefetch_error = error
+        self.refresh()
+
+    def setState(self, state: Qgis.BrowserItemState) -> None:
+        """
+        Sets the populated state of the item.
+
+        Depopulating the item (connection removed, model reset) drops the
+        "Loading..." placeholder, so the fetch that would replace it is
+        cancelled.
+        """
+        if state == Qgis.BrowserItemState.NotPopulated:
+            populate_task = self._running_tasks.pop(self.path(), None)
+            if populate_task is not None:
+                populate_task.cancel()
+        super().setState(state)
+
+    def _notify_sso_authorization(self) -> None:
+        """
+        Emits a message asking to authorize the connection when it uses
+        Single sign-on (SSO).
+        """
+        auth_information = get_authentification_information(
+            self.settings, self.connection_name
+        )
+        if auth_information["connection_type"] == "Single sign-on (SSO)":
+            self.parent().message_handler.emit(
+                "Single Sign-On (SSO) Authorization Required",
+                "Please check your third-party authentication application to authorize the connection. Ensure that any required permissions or approvals are granted to complete the Single Sign-On (SSO) process..",
+            )
+
     def create_default_item(self, children: typing.List["SFDataItem"]) -> None:
         """
         Creates default items and appends them to the provided children list.
 
-        This method retrieves query metadata and uses it to fetch features from a data source.
+        For a connection, the schemas are read from the catalog snapshot of its
+        database; otherwise this method retrieves query metadata and uses it to fetch
+        features from a data source.
         If the item type is "connection" and the connection type is "Single sign-on (SSO)",
         it emits a message indicating that SSO authorization is required.
 
@@ -143,14 +277,21 @@ class SFDataItem(QgsDataItem):
         auth_information, column_name, children_item_type, query = (
             self._get_query_metadata()
         )
-        if (
-            self.item_type == "connection"
-            and auth_information["connection_type"] == "Single sign-on (SSO)"
-        ):
-            self.parent().message_handler.emit(
-                "Single Sign-On (SSO) Authorization Required",
-                "Please check your third-party authentication application to authorize the connection. Ensure that any required permissions or approvals are granted to complete the Single Sign-On (SSO) process..",
-            )
+        if self.item_type == "connection":
+            if not is_catalog_cached(self.connection_name):
+                self._notify_sso_authorization()
+            # The schema, table and field nodes below the connection are all
+            # served from one snapshot of the database's catalog.
+            snapshot = get_catalog_snapshot(self.connection_name)
+            for schema_name in snapshot.schema_names():
+                item = self._create_data_item(
+                    name=schema_name,
+                    type=children_item_type,
+                    connection_name=self.connection_name,
+                    clean_name=schema_name,
+                )
+                children.append(item)
+            return
 
         feature_iterator = get_features_iterator(
             auth_information, query, self.connection_name
@@ -193,8 +334,8 @@ class SFDataItem(QgsDataItem):
         """
         Creates schema items and appends them to the provided children list.
 
-        This method iterates over features obtained from a schema iterator and creates
-        data items based on the feature attributes. It handles naming conflicts by
+        This method iterates over the schema's geo columns, read from the catalog
+        snapshot, and creates data items for them. It handles naming conflicts by
         appending column names to the item names if necessary.
 
         Args:
@@ -203,51 +344,50 @@ class SFDataItem(QgsDataItem):
         Returns:
             None
         """
-        columns = get_table_geo_columns(self.connection_name, self.clean_name)
-        columns.sort(key=lambda x: x.attribute(0))
+        columns = get_schema_geo_columns(self.connection_name, self.clean_name)
 
         children_item_type = "table"
 
         items_metadata = []
         geo_table_names = set()
 
-        for feat in columns:
-            item_name = feat.attribute(0)
-            geo_table_names.add(feat.attribute(0))
+        for column in columns:
+            item_name = column.table_name
+            geo_table_names.add(column.table_name)
             if len(items_metadata) > 0:
                 last_child = children[-1]
                 last_item_metadata = items_metadata[-1]
 
-                if last_child.name() == feat.attribute(0):
+                if last_child.name() == column.table_name:
                     last_child.setName(
                         f"{last_child.name()}.{last_item_metadata['column_name']}"
                     )
-                    item_name = f"{feat.attribute(0)}.{feat.attribute(1)}"
+                    item_name = f"{column.table_name}.{column.column_name}"
 
             item = self._create_data_item(
                 name=item_name,
                 type=children_item_type,
                 connection_name=self.connection_name,
-                clean_name=feat.attribute(0),
-                geom_type=feat.attribute(2),
+                clean_name=column.table_name,
+                geom_type=column.data_type,
             )
-            item.geom_column = feat.attribute(1)
+            item.geom_column = column.column_name
             children.append(item)
             items_metadata.append(
                 {
-                    "table_name": feat.attribute(0),
-                    "column_name": feat.attribute(1),
+                    "table_name": column.table_name,
+                    "column_name": column.column_name,
                 }
             )
 
         # Add non-geometry tables under a separate group
-        all_tables = get_table_iterator(self.settings, self.connection_name, self.clean_name)
-        non_geo_tables = []
-        for feat in all_tables:
-            table_name = feat.attribute(0)
-            if table_name not in geo_table_names:
-                non_geo_tables.append(table_name)
-        
+        snapshot = get_catalog_snapshot(self.connection_name)
+        non_geo_tables = [
+            table_name
+            for table_name in snapshot.table_names(self.clean_name)
+            if table_name not in geo_table_names
+        ]
+
         if non_geo_tables:
             # Create a group item for non-geometry tables
             group_item = self._create_data_item(
@@ -329,8 +469,8 @@ class SFDataItem(QgsDataItem):
         """
         Creates field items and appends them to the provided children list.
 
-        This method iterates over features obtained from a column iterator and creates
-        data items for each feature. It filters out geometry and geography columns that
+        This method iterates over the table's columns in the catalog snapshot and creates
+        data items for each column. It filters out geometry and geography columns that
         do not match the table's geometry column. Each created data item is appended to
         the provided children list.
 
@@ -342,14 +482,15 @@ class SFDataItem(QgsDataItem):
             None
         """
         table_data_item = self.parent()
-        feature_iterator = get_column_iterator(
-            self.settings, self.connection_name, table_data_item
+        schema_data_item = table_data_item.parent()
+        columns = get_catalog_snapshot(self.connection_name).columns(
+            schema_data_item.clean_name, table_data_item.clean_name
         )
 
-        for feat in feature_iterator:
-            is_geo_column = table_data_item.geom_column == feat.attribute(0)
+        for column in columns:
+            is_geo_column = table_data_item.geom_column == column.column_name
             if (
-                feat.attribute(1)
+                column.data_type
                 in [
                     "GEOMETRY",
                     "GEOGRAPHY",
@@ -358,14 +499,13 @@ class SFDataItem(QgsDataItem):
             ):
                 continue
             item = self._create_data_item(
-                name=feat.attribute(0),
+                name=column.column_name,
                 type="field",
                 connection_name=self.connection_name,
-                clean_name=feat.attribute(0),
-                icon_path=os.path.join(_IMAGES_DIR, "fields", f"{self.get_field_type_svg_name(feat.attribute(1), feat.attribute(2), is_geo_column)}.svg"),
+                clean_name=column.column_name,
+                icon_path=os.path.join(_IMAGES_DIR, "fields", f"{self.get_field_type_svg_name(column.data_type, column.numeric_scale, is_geo_column)}.svg"),
             )
             children.append(item)
-        feature_iterator.close()
 
     def get_field_type_svg_name(
         self, field_type: str, field_pression: int, is_geo_column: bool
@@ -656,6 +796,12 @@ ORDER BY {column_name}"""  # nosec B608 - column_name is a fixed literal; values
                 )
                 action_list.append(self.new_connection_action)
 
+                self.layer_disk_cache_action = QAction("Cache Loaded Layers on Disk", None)
+                self.layer_disk_cache_action.setCheckable(True)
+                self.layer_disk_cache_action.setChecked(is_layer_disk_cache_enabled())
+                self.layer_disk_cache_action.toggled.connect(set_layer_disk_cache_enabled)
+                action_list.append(self.layer_disk_cache_action)
+
             return action_list
         except Exception as e:
             QMessageBox.information(
@@ -834,6 +980,16 @@ ORDER BY {column_name}"""  # nosec B608 - column_name is a fixed literal; values
         """
         Refreshes the data item.
         """
+        connection_name, schema_name, table_name = get_path_nodes(self.path())
+        # Refresh is how users pick up DDL made outside QGIS, so cached
+        # INFORMATION_SCHEMA lookups under this node must be read again.
+        get_metadata_cache().invalidate(
+            connection_name, schema_name=schema_name, table_name=table_name
+        )
+        # The same goes for layers kept in the on-disk layer cache.
+        clear_layer_cache(
+            connection_name, schema_name=schema_name, table_name=table_name
+        )
         self.refresh_internal()
         layers = QgsProject.instance().mapLayers().values()
         for layer in layers:
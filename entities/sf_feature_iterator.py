@@ -1,6 +1,8 @@
 from qgis.core import QgsFeature, QgsFeatureIterator, QgsFields
 import snowflake.connector
 
+from ..helpers.batch_reader import BatchReader
+
 
 class SFFeatureIterator(QgsFeatureIterator):
     def __init__(
@@ -19,7 +21,7 @@ class SFFeatureIterator(QgsFeatureIterator):
         super().__init__()
         self.cursor = cursor
         self.fields = fields
-        self.cursor_batch_rows = []
+        self.rows = BatchReader.from_cursor(cursor, 5000)
 
     def __iter__(self) -> "QgsFeatureIterator":
         """
@@ -41,10 +43,7 @@ class SFFeatureIterator(QgsFeatureIterator):
             StopIteration: If there are no more features to retrieve.
         """
 
-        if not self.cursor_batch_rows:
-            self.cursor_batch_rows = self.cursor.fetchmany(5000)
-
-        row = self.cursor_batch_rows.pop(0) if self.cursor_batch_rows else None
+        row = self.rows.next_row()
         if row is None:
             raise StopIteration
         feature = QgsFeature(self.fields)
@@ -0,0 +1,178 @@
+"""Index-based reader over batched query results.
+
+Both feature iterators pull rows from Snowflake in batches (``fetchmany()`` or
+decoded Arrow batches) and hand them out one at a time. Popping from the front
+of a Python list shifts every remaining element, which makes draining a
+5,000-50,000 row batch quadratic; ``BatchReader`` walks each batch by position
+instead and only asks for the next batch once the current one is used up.
+
+``BatchPrefetcher`` optionally moves the batch fetch onto a background thread
+so the next network round-trip overlaps with turning the current batch into
+features. The thread is only started once the first batch has been consumed,
+so a result that fits in one batch never starts one.
+"""
+
+import queue
+import threading
+import typing
+
+
+class BatchReader:
+    """Hand out rows one at a time from successive batches.
+
+    ``fetch_batch`` is called whenever the current batch is exhausted and must
+    return the next batch as a sequence; an empty (or ``None``) batch marks the
+    end of the result set, after which ``fetch_batch`` is never called again.
+    """
+
+    def __init__(self, fetch_batch: typing.Callable[[], typing.Optional[typing.Sequence]]):
+        self._fetch_batch = fetch_batch
+        self._batch: typing.Sequence = ()
+        self._position = 0
+        self._exhausted = False
+
+    @classmethod
+    def from_cursor(cls, cursor, batch_size: int) -> "BatchReader":
+        """Build a reader over ``cursor.fetchmany(batch_size)`` batches."""
+        return cls(lambda: cursor.fetchmany(batch_size))
+
+    def next_row(self) -> typing.Optional[typing.Any]:
+        """Return the next row, or ``None`` once every batch has been read."""
+        if self._position >= len(self._batch):
+            if self._exhausted:
+                return None
+            batch = self._fetch_batch()
+            if not batch:
+                self._exhausted = True
+                self._batch = ()
+                self._position = 0
+                return None
+            self._batch = batch
+            self._position = 0
+        row = self._batch[self._position]
+        self._position += 1
+        return row
+
+
+class _FetchError:
+    """Carries an exception raised on the prefetch thread to the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class BatchPrefetcher:
+    """Fetch batches on a background thread, ``depth`` batches ahead.
+
+    With the default depth of 1 this is double buffering: while the consumer
+    works through one batch, the producer thread fetches the next one and then
+    waits until it is taken. ``next_batch`` is meant to be passed to
+    ``BatchReader``; it returns an empty batch at the end of the result set or
+    once ``stop()`` has been called, and re-raises any error the fetch raised.
+
+    The first batch is fetched on the consumer's thread; the producer thread
+    is started when the second one is asked for. From then on only the
+    producer calls ``fetch_batch``, so the underlying cursor is never used
+    from two threads at once.
+    """
+
+    _POLL_SECONDS = 0.1
+    _STOP_TIMEOUT_SECONDS = 5.0
+
+    def __init__(
+        self,
+        fetch_batch: typing.Callable[[], typing.Optional[typing.Sequence]],
+        depth: int = 1,
+    ):
+        self._fetch_batch = fetch_batch
+        self._queue: queue.Queue = queue.Queue(maxsize=depth)
+        self._stop_event = threading.Event()
+        self._finished = False
+        self._first_batch_taken = False
+        self._thread = threading.Thread(
+            target=self._run, name="sf-batch-prefetch", daemon=True
+        )
+
+    def _run(self) -> None:
+        try:
+            while not self._stop_event.is_set():
+                batch = self._fetch_batch()
+                if not self._put(batch) or not batch:
+                    return
+        except Exception as e:
+            self._put(_FetchError(e))
+
+    def _put(self, item) -> bool:
+        """Block until ``item`` is queued; give up (False) once stopped."""
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=self._POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def next_batch(self) -> typing.Sequence:
+        """Return the next prefetched batch (empty at the end)."""
+        if self._stop_event.is_set():
+            self._finished = True
+        if not self._first_batch_taken and not self._finished:
+            self._first_batch_taken = True
+            try:
+                batch = self._fetch_batch()
+            except Exception:
+                self._finished = True
+                raise
+            if not batch:
+                self._finished = True
+                return ()
+            return batch
+        if self._thread.ident is None and not self._finished:
+            self._thread.start()
+        while not self._finished:
+            if self._stop_event.is_set():
+                self._finished = True
+                break
+            try:
+                item = self._queue.get(timeout=self._POLL_SECONDS)
+            except queue.Empty:
+                if self._stop_event.is_set() or (
+                    not self._thread.is_alive() and self._queue.empty()
+                ):
+                    self._finished = True
+                continue
+            if isinstance(item, _FetchError):
+                self._finished = True
+                raise item.error
+            if not item:
+                self._finished = True
+                return ()
+            return item
+        return ()
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop the producer thread and drop any prefetched batch.
+
+        Safe to call more than once and from any thread. A fetch already in
+        flight is allowed to finish (bounded by ``_STOP_TIMEOUT_SECONDS``);
+        its batch is discarded. With ``wait=False`` the thread is only told to
+        stop: it exits after that fetch without anyone joining it.
+        """
+        self._stop_event.set()
+        # Draining frees a producer blocked in put(); drain again after the
+        # join in case that put() landed before it saw the stop flag.
+        self._drain()
+        if (
+            wait
+            and self._thread.ident is not None
+            and self._thread is not threading.current_thread()
+        ):
+            self._thread.join(self._STOP_TIMEOUT_SECONDS)
+            self._drain()
+
+    def _drain(self) -> None:
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
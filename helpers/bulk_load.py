@@ -0,0 +1,130 @@
+"""Bulk export through a temporary stage.
+
+The export algorithm's default path sends features as
+``INSERT ... SELECT ... FROM VALUES`` statements of 5,000 rows, each one a
+multi-megabyte SQL string that Snowflake has to compile. For large layers
+``StageFileWriter`` streams the rows into gzip-compressed CSV files instead,
+and ``load_staged_files`` uploads them with one ``PUT`` to a temporary stage
+and loads them with a single ``COPY INTO`` whose SELECT applies the same
+geometry / PARSE_JSON conversions as the VALUES path (``$1`` .. ``$n`` take the
+place of ``v.c1`` .. ``v.cn``).
+"""
+
+import csv
+import gzip
+import os
+import pathlib
+import typing
+import uuid
+
+from .sql import qualified_table_name, quote_literal
+
+# Rows per CSV part. Several parts let PUT upload and COPY load in parallel.
+ROWS_PER_FILE = 250_000
+
+# Written for NULL values; matched by the COPY file format's NULL_IF so that
+# empty strings stay empty strings.
+NULL_MARKER = "\\N"
+
+_PUT_PARALLEL = 8
+
+
+class StageFileWriter:
+    """Write rows to ``part_NNNNN.csv.gz`` files in ``directory``."""
+
+    def __init__(self, directory: str, rows_per_file: int = ROWS_PER_FILE):
+        self._directory = directory
+        self._rows_per_file = rows_per_file
+        self._file = None
+        self._writer = None
+        self._rows_in_file = 0
+        self.files: typing.List[str] = []
+        self.row_count = 0
+
+    def __enter__(self) -> "StageFileWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write_row(self, values: typing.Sequence) -> None:
+        """Append one row; ``None`` values are written as ``NULL_MARKER``."""
+        if self._writer is None or self._rows_in_file >= self._rows_per_file:
+            self._open_next_file()
+        self._writer.writerow([NULL_MARKER if v is None else v for v in values])
+        self._rows_in_file += 1
+        self.row_count += 1
+
+    def _open_next_file(self) -> None:
+        self.close()
+        path = os.path.join(self._directory, f"part_{len(self.files):05d}.csv.gz")
+        self._file = gzip.open(path, "wt", encoding="utf-8", newline="", compresslevel=6)
+        self._writer = csv.writer(self._file)
+        self._rows_in_file = 0
+        self.files.append(path)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
+
+
+def copy_into_query(
+    fq_table: str, query_columns: str, select_projection: typing.Sequence[str], stage: str
+) -> str:
+    """``COPY INTO`` loading every staged CSV part into ``fq_table``."""
+    return (
+        f"COPY INTO {fq_table} ({query_columns}) "  # nosec B608 - fq_table/stage built via qualified_table_name; query_columns via quote_identifier; projection uses positional $n references
+        f"FROM (SELECT {','.join(select_projection)} FROM @{stage}) "
+        "FILE_FORMAT = (TYPE = CSV COMPRESSION = GZIP "
+        "FIELD_OPTIONALLY_ENCLOSED_BY = '\"' ESCAPE_UNENCLOSED_FIELD = NONE "
+        "NULL_IF = ('\\\\N') EMPTY_FIELD_AS_NULL = FALSE) "
+        "ON_ERROR = ABORT_STATEMENT PURGE = TRUE"
+    )
+
+
+def load_staged_files(
+    connection_manager,
+    connection_name: str,
+    database_name: str,
+    schema_name: str,
+    directory: str,
+    fq_table: str,
+    query_columns: str,
+    select_projection: typing.Sequence[str],
+) -> int:
+    """Upload the CSV parts in ``directory`` and COPY them into ``fq_table``.
+
+    A temporary stage only exists in the session that created it, so the
+    CREATE STAGE / PUT / COPY sequence runs on one session checked out of the
+    connection's pool, through a cursor the connection manager can cancel.
+    Returns the number of rows loaded.
+    """
+    stage = qualified_table_name(
+        database_name, schema_name, f"QGIS_EXPORT_{uuid.uuid4().hex.upper()}"
+    )
+    source = pathlib.Path(directory).as_posix().rstrip("/")
+    with connection_manager.session_cursor(connection_name) as cursor:
+        try:
+            cursor.execute(f"CREATE TEMPORARY STAGE {stage}")
+            cursor.execute(
+                f"PUT {quote_literal(f'file://{source}/part_*.csv.gz')} @{stage} "
+                "AUTO_COMPRESS = FALSE SOURCE_COMPRESSION = GZIP "
+                f"PARALLEL = {_PUT_PARALLEL}"
+            )
+            cursor.execute(
+                copy_into_query(fq_table, query_columns, select_projection, stage)
+            )
+            columns = [column[0].lower() for column in cursor.description or ()]
+            if "rows_loaded" not in columns:
+                return 0
+            position = columns.index("rows_loaded")
+            return sum(int(row[position] or 0) for row in cursor.fetchall())
+        finally:
+            try:
+                cursor.execute(f"DROP STAGE IF EXISTS {stage}")
+            except Exception:
+                # The stage is temporary and goes away with its session; a
+                # failed DROP must not hide the error that got us here.
+                pass
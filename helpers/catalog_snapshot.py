@@ -0,0 +1,96 @@
+"""In-memory snapshot of a database's catalog for the browser tree.
+
+Expanding a connection, a schema and a table's fields used to cost one
+``INFORMATION_SCHEMA`` query per node (plus a table listing per schema), so
+browsing a database with hundreds of schemas meant hundreds of round trips.
+``CatalogSnapshot`` holds the result of a single ``TABLES`` / ``COLUMNS``
+join over the whole database (``catalog_query``); every schema, table and
+field node is then built from it without another query.
+"""
+
+import typing
+
+from .sql import quote_literal
+
+GEO_DATA_TYPES = ("GEOMETRY", "GEOGRAPHY")
+
+# Columns of these types whose comment mentions "h3" may hold H3 cell ids.
+H3_CANDIDATE_DATA_TYPES = ("NUMBER", "TEXT")
+
+
+class CatalogColumn(typing.NamedTuple):
+    table_name: str
+    column_name: str
+    data_type: str
+    numeric_scale: typing.Optional[int]
+    comment: typing.Optional[str]
+
+
+def catalog_query(database_name: str) -> str:
+    """One row per column of every table and view of ``database_name``.
+
+    The LEFT JOIN keeps tables without visible columns, so they are still
+    listed in the tree.
+    """
+    return f"""SELECT t.TABLE_SCHEMA, t.TABLE_NAME, c.COLUMN_NAME, c.DATA_TYPE, c.NUMERIC_SCALE, c.COMMENT
+FROM INFORMATION_SCHEMA.TABLES t
+LEFT JOIN INFORMATION_SCHEMA.COLUMNS c
+ON c.TABLE_CATALOG = t.TABLE_CATALOG
+AND c.TABLE_SCHEMA = t.TABLE_SCHEMA
+AND c.TABLE_NAME = t.TABLE_NAME
+WHERE t.TABLE_CATALOG ILIKE {quote_literal(database_name)}
+ORDER BY t.TABLE_SCHEMA, t.TABLE_NAME, c.COLUMN_NAME"""  # nosec B608 - value escaped via quote_literal
+
+
+class CatalogSnapshot:
+    """Schemas, tables and columns of one database.
+
+    ``rows`` are ``(schema, table, column, data_type, numeric_scale,
+    comment)`` tuples as returned by ``catalog_query``; ``column`` is
+    ``None`` for a table without columns.
+    """
+
+    def __init__(self, database_name: str, rows: typing.Iterable[typing.Sequence]):
+        self.database_name = database_name
+        self._schemas: typing.Dict[str, typing.Dict[str, typing.List[CatalogColumn]]] = {}
+        for schema_name, table_name, column_name, data_type, scale, comment in rows:
+            columns = self._schemas.setdefault(schema_name, {}).setdefault(
+                table_name, []
+            )
+            if column_name is not None:
+                columns.append(
+                    CatalogColumn(table_name, column_name, data_type, scale, comment)
+                )
+        for tables in self._schemas.values():
+            for columns in tables.values():
+                columns.sort(key=lambda column: column.column_name)
+
+    def schema_names(self) -> typing.List[str]:
+        return sorted(self._schemas)
+
+    def table_names(self, schema_name: str) -> typing.List[str]:
+        return sorted(self._schemas.get(schema_name, {}))
+
+    def columns(self, schema_name: str, table_name: str) -> typing.List[CatalogColumn]:
+        """The columns of a table, ordered by name."""
+        return self._schemas.get(schema_name, {}).get(table_name, [])
+
+    def geo_columns(
+        self, schema_name: str
+    ) -> typing.Tuple[typing.List[CatalogColumn], typing.List[CatalogColumn]]:
+        """Return the GEOMETRY / GEOGRAPHY columns of a schema and the columns
+        that may hold H3 cells, which the caller still has to check with
+        ``H3_IS_VALID_CELL``."""
+        geo_columns = []
+        h3_candidates = []
+        for table_name in self.table_names(schema_name):
+            for column in self.columns(schema_name, table_name):
+                if column.data_type in GEO_DATA_TYPES:
+                    geo_columns.append(column)
+                elif (
+                    column.data_type in H3_CANDIDATE_DATA_TYPES
+                    and column.comment
+                    and "h3" in column.comment.lower()
+                ):
+                    h3_candidates.append(column)
+        return geo_columns, h3_candidates
@@ -5,6 +5,14 @@ from ..enums.snowflake_metadata_type import SnowflakeMetadataType
 from ..managers.sf_connection_manager import SFConnectionManager
 from ..helpers.utils import get_authentification_information, get_qsettings
 from ..helpers.sql import quote_identifier, quote_literal, qualified_table_name
+from ..helpers.metadata_cache import get_metadata_cache, metadata_key
+from ..helpers.catalog_snapshot import (
+    GEO_DATA_TYPES,
+    H3_CANDIDATE_DATA_TYPES,
+    CatalogColumn,
+    CatalogSnapshot,
+    catalog_query,
+)
 from qgis.PyQt.QtCore import QSettings
 from qgis.core import QgsFeature, QgsMessageLog, Qgis
 from ..providers.sf_data_source_provider import SFDataProvider
@@ -17,6 +25,31 @@ from ..helpers.mappings import (
 )
 
 
+def _table_metadata_key(
+    kind: str, context_information: dict, table_name: str, *extra
+) -> tuple:
+    """Metadata cache key of a table lookup made with ``context_information``."""
+    return metadata_key(
+        kind,
+        context_information["connection_name"],
+        context_information.get("database_name"),
+        context_information.get("schema_name"),
+        table_name,
+        *extra,
+    )
+
+
+def invalidate_table_metadata(context_information: dict) -> None:
+    """Forget the cached metadata of the table in ``context_information``
+    (after DDL on it)."""
+    get_metadata_cache().invalidate(
+        context_information["connection_name"],
+        context_information.get("database_name"),
+        context_information.get("schema_name"),
+        context_information.get("table_name"),
+    )
+
+
 def get_schema_iterator(settings: QSettings, connection_name: str) -> SFFeatureIterator:
     """
     Retrieves an iterator over the schema names in the specified database.
@@ -40,6 +73,31 @@ ORDER BY SCHEMA_NAME"""  # nosec B608 - value escaped via quote_literal
     return sf_data_provider.get_feature_iterator()
 
 
+def _valid_h3_columns(
+    sf_data_provider: SFDataProvider,
+    connection_name: str,
+    columns: typing.Sequence[typing.Tuple[str, str, str, str]],
+) -> typing.List[bool]:
+    """
+    Check in one query whether each ``(database, schema, table, column)`` holds
+    H3 cells, sampling its first non-NULL value with ``H3_IS_VALID_CELL``.
+    """
+    number_queries = []
+    for database_name, schema_name, table_name, column_name in columns:
+        table = qualified_table_name(database_name, schema_name, table_name)
+        column = f"{table}.{quote_identifier(column_name)}"
+        number_queries.append(f"""
+                (SELECT H3_IS_VALID_CELL({column})
+                FROM {table}
+                WHERE {column} IS NOT NULL
+                LIMIT 1)""")  # nosec B608 - table/column sanitized via qualified_table_name/quote_identifier
+    if not number_queries:
+        return []
+    query = f"SELECT {','.join(number_queries)}"  # nosec B608 - subqueries pre-sanitized above
+    result = sf_data_provider.execute_query(query, connection_name).fetchall()[0]
+    return [bool(value) for value in result]
+
+
 def filter_geo_columns(
     sf_data_provider: SFDataProvider,
     connection_name: str,
@@ -60,65 +118,132 @@ def filter_geo_columns(
         typing.List[QgsFeature]: The `columns` that are geo
     """
     geo_columns = []
-    number_queries = []
     h3_columns = []
     for feat in columns:
-        if feat.attribute("DATA_TYPE") in ["GEOMETRY", "GEOGRAPHY"]:
+        if feat.attribute("DATA_TYPE") in GEO_DATA_TYPES:
             geo_columns.append(feat)
 
         if (
-            feat.attribute("DATA_TYPE") in ["NUMBER", "TEXT"]
+            feat.attribute("DATA_TYPE") in H3_CANDIDATE_DATA_TYPES
             and feat.attribute("COMMENT")
             and "h3" in feat.attribute("COMMENT").lower()
         ):
             h3_columns.append(feat)
-            table = qualified_table_name(feat.attribute("TABLE_CATALOG"), feat.attribute("TABLE_SCHEMA"), feat.attribute("TABLE_NAME"))
-            column = f'{table}.{quote_identifier(feat.attribute("COLUMN_NAME"))}'
-            number_queries.append(f"""
-                (SELECT H3_IS_VALID_CELL({column})
-                FROM {table}
-                WHERE {column} IS NOT NULL
-                LIMIT 1)""")  # nosec B608 - table/column sanitized via qualified_table_name/quote_identifier
-    if len(number_queries) > 0:
-        query = f"SELECT {','.join(number_queries)}"  # nosec B608 - subqueries pre-sanitized above
-        result = sf_data_provider.execute_query(query, connection_name).fetchall()[0]
-        for i in range(len(result)):
-            if result[i]:
-                geo_columns.append(h3_columns[i])
+    is_h3 = _valid_h3_columns(
+        sf_data_provider,
+        connection_name,
+        [
+            (
+                feat.attribute("TABLE_CATALOG"),
+                feat.attribute("TABLE_SCHEMA"),
+                feat.attribute("TABLE_NAME"),
+                feat.attribute("COLUMN_NAME"),
+            )
+            for feat in h3_columns
+        ],
+    )
+    geo_columns.extend(feat for feat, valid in zip(h3_columns, is_h3) if valid)
     return geo_columns
 
 
-def get_table_geo_columns(
-    connection_name: str, table_name: str
-) -> typing.List[QgsFeature]:
+def get_catalog_snapshot(connection_name: str) -> CatalogSnapshot:
     """
-    Retrieves a list of the geo columns of a specified table in a database.
+    Retrieves the schemas, tables and columns of the connection's database,
+    read with a single query and shared through the metadata cache.
 
     Args:
         connection_name (str): The name of the database connection.
-        table_name (str): The name of the table to retrieve columns from.
 
     Returns:
-        List[QgsFeature]: A list of the features (geo columns) of the specified table.
-
-    Raises:
-        Any exceptions raised by the underlying data provider or database query execution.
+        CatalogSnapshot: The catalog of the connection's database.
     """
     settings = get_qsettings()
     auth_information = get_authentification_information(settings, connection_name)
     sf_data_provider = SFDataProvider(auth_information)
-    schema_selected_query = f"""SELECT DISTINCT TABLE_NAME, COLUMN_NAME, DATA_TYPE, TABLE_CATALOG, TABLE_SCHEMA, COMMENT
-FROM INFORMATION_SCHEMA.COLUMNS
-WHERE TABLE_CATALOG ILIKE {quote_literal(sf_data_provider.connection_params["database"])}
-AND TABLE_SCHEMA ILIKE {quote_literal(table_name)}
-ORDER BY TABLE_NAME, COLUMN_NAME"""  # nosec B608 - values escaped via quote_literal
+    database_name = auth_information["database"]
 
-    sf_data_provider.load_data(schema_selected_query, connection_name)
-    columns = sf_data_provider.get_feature_iterator()
-    return filter_geo_columns(
-        sf_data_provider=sf_data_provider,
-        connection_name=connection_name,
-        columns=columns,
+    def load_catalog():
+        cursor = sf_data_provider.execute_query(
+            catalog_query(database_name), connection_name
+        )
+        try:
+            return CatalogSnapshot(database_name, cursor.fetchall())
+        finally:
+            cursor.close()
+
+    return get_metadata_cache().get_or_load(
+        metadata_key("catalog", connection_name, database_name), load_catalog
+    )
+
+
+def is_catalog_cached(
+    connection_name: str, schema_name: typing.Optional[str] = None
+) -> bool:
+    """
+    Whether get_catalog_snapshot, and get_schema_geo_columns for
+    ``schema_name`` when given, would be answered from the metadata cache.
+
+    Args:
+        connection_name (str): The name of the database connection.
+        schema_name (str, optional): The name of the schema.
+
+    Returns:
+        bool: True if no query is needed.
+    """
+    settings = get_qsettings()
+    database_name = get_authentification_information(settings, connection_name)[
+        "database"
+    ]
+    cache = get_metadata_cache()
+    if not cache.contains(metadata_key("catalog", connection_name, database_name)):
+        return False
+    return schema_name is None or cache.contains(
+        metadata_key("geo_columns", connection_name, database_name, schema_name)
+    )
+
+
+def get_schema_geo_columns(
+    connection_name: str, schema_name: str
+) -> typing.List[CatalogColumn]:
+    """
+    Retrieves the geo columns of the tables of a schema from the catalog
+    snapshot. Commented NUMBER / TEXT columns are only kept when they hold H3
+    cells, checked with one query for the whole schema.
+
+    Args:
+        connection_name (str): The name of the database connection.
+        schema_name (str): The name of the schema.
+
+    Returns:
+        List[CatalogColumn]: The geo columns, ordered by table and column name.
+    """
+    snapshot = get_catalog_snapshot(connection_name)
+    database_name = snapshot.database_name
+
+    def load_geo_columns():
+        geo_columns, h3_candidates = snapshot.geo_columns(schema_name)
+        if h3_candidates:
+            settings = get_qsettings()
+            auth_information = get_authentification_information(
+                settings, connection_name
+            )
+            is_h3 = _valid_h3_columns(
+                SFDataProvider(auth_information),
+                connection_name,
+                [
+                    (database_name, schema_name, column.table_name, column.column_name)
+                    for column in h3_candidates
+                ],
+            )
+            geo_columns.extend(
+                column for column, valid in zip(h3_candidates, is_h3) if valid
+            )
+        geo_columns.sort(key=lambda column: (column.table_name, column.column_name))
+        return geo_columns
+
+    return get_metadata_cache().get_or_load(
+        metadata_key("geo_columns", connection_name, database_name, schema_name),
+        load_geo_columns,
     )
 
 
@@ -153,36 +278,6 @@ ORDER BY TABLE_NAME, COLUMN_NAME"""  # nosec B608 - value escaped via quote_lite
     )
 
 
-def get_column_iterator(
-    settings: QSettings, connection_name: str, table_data_item
-) -> SFFeatureIterator:
-    """
-    Retrieves an iterator over the columns of a specified table in a database.
-
-    Args:
-        settings (QSettings): The settings object containing configuration details.
-        connection_name (str): The name of the database connection.
-        table_data_item (SFDataItem): The data item representing the table whose columns are to be retrieved.
-
-    Returns:
-        SFFeatureIterator: An iterator over the features (columns) of the specified table.
-    """
-    auth_information = get_authentification_information(settings, connection_name)
-    sf_data_provider = SFDataProvider(auth_information)
-
-    schema_data_item = table_data_item.parent()
-
-    query = f"""SELECT DISTINCT COLUMN_NAME, DATA_TYPE, NUMERIC_SCALE
-FROM INFORMATION_SCHEMA.COLUMNS
-WHERE TABLE_CATALOG ILIKE {quote_literal(auth_information["database"])}
-AND TABLE_SCHEMA ILIKE {quote_literal(schema_data_item.clean_name)}
-AND TABLE_NAME ILIKE {quote_literal(table_data_item.clean_name)}
-ORDER BY COLUMN_NAME"""  # nosec B608 - values escaped via quote_literal
-
-    sf_data_provider.load_data(query, connection_name)
-    return sf_data_provider.get_feature_iterator()
-
-
 def get_table_iterator(settings: QSettings, connection_name: str, schema_name: str):
     """
     Retrieves an iterator over the table names in a specified schema within a database.
@@ -444,14 +539,21 @@ def get_srid_from_table_geo_column(
         f'SELECT ANY_VALUE(ST_SRID({quote_identifier(geo_column_name)})) '  # nosec B608 - identifiers escaped via quote_identifier
         f'FROM {quote_identifier(table_name)} WHERE {quote_identifier(geo_column_name)} IS NOT NULL'
     )
-    cur = connection_manager.execute_query(
-        connection_name=context_information["connection_name"],
-        query=query_srid,
-        context_information=context_information,
+
+    def load_srid():
+        cur = connection_manager.execute_query(
+            connection_name=context_information["connection_name"],
+            query=query_srid,
+            context_information=context_information,
+        )
+        srid = cur.fetchone()[0]
+        cur.close()
+        return srid
+
+    return get_metadata_cache().get_or_load(
+        _table_metadata_key("srid", context_information, table_name, geo_column_name),
+        load_srid,
     )
-    srid = cur.fetchone()[0]
-    cur.close()
-    return srid
 
 
 def get_type_from_table_geo_column(
@@ -470,10 +572,15 @@ def get_type_from_table_geo_column(
     Returns:
         list: A list of distinct geographic types found in the specified column, converted to uppercase.
     """
-    return get_geo_types_from_geo_json_column(
-        column=geo_column_name,
-        from_clause=quote_identifier(table_name),
-        context_information=context_information,
+    return get_metadata_cache().get_or_load(
+        _table_metadata_key(
+            "geometry_types", context_information, table_name, geo_column_name
+        ),
+        lambda: get_geo_types_from_geo_json_column(
+            column=geo_column_name,
+            from_clause=quote_identifier(table_name),
+            context_information=context_information,
+        ),
     )
 
 
@@ -506,14 +613,26 @@ def get_geo_column_type(
         f"AND TABLE_NAME ILIKE {quote_literal(context_information['table_name'])} "
         f"AND COLUMN_NAME ILIKE {quote_literal(geo_column_name)} "
     )
-    cur = connection_manager.execute_query(
-        connection_name=context_information["connection_name"],
-        query=query_geo_column_type,
-        context_information=context_information,
+
+    def load_geo_column_type():
+        cur = connection_manager.execute_query(
+            connection_name=context_information["connection_name"],
+            query=query_geo_column_type,
+            context_information=context_information,
+        )
+        result_row = cur.fetchone()
+        cur.close()
+        return result_row[0] if result_row else None
+
+    return get_metadata_cache().get_or_load(
+        _table_metadata_key(
+            "geo_column_type",
+            context_information,
+            context_information["table_name"],
+            geo_column_name,
+        ),
+        load_geo_column_type,
     )
-    result_row = cur.fetchone()
-    cur.close()
-    return result_row[0] if result_row else None
 
 
 from .limits import limit_size_for_type, limit_size_for_table
@@ -567,6 +686,50 @@ def get_cheap_row_count(
         return None
 
 
+def get_table_last_altered(
+    context_information: dict,
+) -> typing.Optional[str]:
+    """``INFORMATION_SCHEMA.TABLES.LAST_ALTERED`` of a base table, as a string.
+
+    Used as a cheap freshness stamp for the on-disk layer cache: Snowflake
+    bumps it on every DML/DDL change to the table. Returns ``None`` when it
+    cannot be determined (views, missing catalog/schema info, lookup errors),
+    in which case the caller must not trust any cached copy.
+    """
+    database_name = context_information.get("database_name")
+    schema_name = context_information.get("schema_name")
+    table_name = context_information.get("table_name")
+    if not database_name or not schema_name or not table_name:
+        return None
+    connection_manager: SFConnectionManager = SFConnectionManager.get_instance()
+    query = (
+        "SELECT TO_VARCHAR(LAST_ALTERED, 'YYYY-MM-DD\"T\"HH24:MI:SS.FF9TZH:TZM') "  # nosec B608 - values escaped via quote_literal
+        "FROM INFORMATION_SCHEMA.TABLES "
+        f"WHERE TABLE_CATALOG ILIKE {quote_literal(database_name)} "
+        f"AND TABLE_SCHEMA ILIKE {quote_literal(schema_name)} "
+        f"AND TABLE_NAME ILIKE {quote_literal(table_name)} "
+        "AND TABLE_TYPE = 'BASE TABLE'"
+    )
+    try:
+        cur = connection_manager.execute_query(
+            connection_name=context_information["connection_name"],
+            query=query,
+            context_information=context_information,
+        )
+        row = cur.fetchone()
+        cur.close()
+    except Exception as e:
+        QgsMessageLog.logMessage(
+            f"get_table_last_altered lookup failed: {e}",
+            "Snowflake Plugin",
+            Qgis.MessageLevel.Info,
+        )
+        return None
+    if not row or row[0] is None:
+        return None
+    return str(row[0])
+
+
 def check_table_exceeds_size(
     context_information: dict,
 ) -> bool:
@@ -778,14 +941,19 @@ def get_limit_sql_query(
     query: str,
     context_information: dict,
     limit: int = 50000,
+    is_canceled: typing.Optional[typing.Callable[[], bool]] = None,
 ) -> typing.Tuple[typing.List[snowflake.connector.cursor.ResultMetadata], list, list]:
     """
     Executes a SQL query with a specified limit on the number of rows returned.
 
+    The query itself is submitted asynchronously (execute_query_async), so it
+    can be cancelled while it runs and survives a dropped session.
+
     Args:
         query (str): The SQL query to be executed.
         context_information (dict): A dictionary containing context information, including the connection name.
         limit (int, optional): The maximum number of rows to return. Defaults to 50000.
+        is_canceled (Callable[[], bool], optional): Polled while the query runs; cancels it when it returns True.
 
     Returns:
         typing.Tuple[typing.List[snowflake.connector.cursor.ResultMetadata], list, list]:
@@ -834,10 +1002,11 @@ def get_limit_sql_query(
         h3_query_any_value_columns.append(h3_query_any_value_column_value)
 
     sub_query = f"SELECT {query_columns} FROM ({query}) LIMIT {limit}"  # nosec B608 - query_columns built from quoted identifiers; limit is an int; query wrapped in subquery
-    cur = connection_manager.execute_query(
+    cur = connection_manager.execute_query_async(
         connection_name=context_information["connection_name"],
         query=sub_query,
         context_information=context_information,
+        is_canceled=is_canceled,
     )
 
     resultset = cur.fetchall()
@@ -939,7 +1108,8 @@ def get_declared_primary_key(
         f"{quote_identifier(table_name)}"
     )
     query = f"SHOW PRIMARY KEYS IN TABLE {fq_table}"
-    try:
+
+    def load_primary_key_rows():
         cur = connection_manager.execute_query(
             connection_name=context_information["connection_name"],
             query=query,
@@ -954,6 +1124,13 @@ def get_declared_primary_key(
                 break
         rows = cur.fetchall()
         cur.close()
+        return column_name_idx, rows
+
+    try:
+        column_name_idx, rows = get_metadata_cache().get_or_load(
+            _table_metadata_key("primary_key", context_information, table_name),
+            load_primary_key_rows,
+        )
     except Exception as e:
         QgsMessageLog.logMessage(
             f"get_declared_primary_key lookup failed: {e}",
@@ -1059,108 +1236,120 @@ def _edit_op_tag(context_information: dict) -> str:
     )
 
 
-def update_table_feature(
-    context_information: dict,
-) -> bool:
-    """Updates a specific feature's geometry in a Snowflake table.
+# Rows per MERGE / INSERT of an edit commit. The pyformat parameters are
+# interpolated into the statement text by the connector, so this bounds the
+# size of one statement; a commit of 5,000 features is still five of them.
+_EDIT_BATCH_ROWS = 1000
 
-    Args:
-        context_information: Dict with keys: table_name, column_geom,
-            primary_key_name, geometry_wkt, primary_key_value, connection_name.
 
-    Returns:
-        True on success, False on error.
-    """
-    try:
-        connection_manager: SFConnectionManager = SFConnectionManager.get_instance()
-        update_sql = (
-            f"UPDATE {quote_identifier(context_information['table_name'])} "  # nosec B608 - identifiers escaped via quote_identifier; values bound as params
-            f"SET {quote_identifier(context_information['column_geom'])} = %s "
-            f"WHERE {quote_identifier(context_information['primary_key_name'])} = %s"
-        )
+def _values_rows_sql(row_count: int, column_count: int) -> str:
+    """``(%s, ...), (%s, ...)`` placeholders for a multi-row VALUES list."""
+    row = "(" + ", ".join(["%s"] * column_count) + ")"
+    return ", ".join([row] * row_count)
 
-        params = (
-            context_information["geometry_wkt"],
-            context_information["primary_key_value"],
-        )
 
+def _execute_edit_transaction(
+    context_information: dict,
+    statements: typing.List[typing.Tuple[str, tuple]],
+) -> None:
+    """Run ``(sql, params)`` statements in one transaction on one session.
+
+    Either every statement of an edit commit lands or, on the first error,
+    none does; the error is re-raised after the ROLLBACK.
+    """
+    connection_manager: SFConnectionManager = SFConnectionManager.get_instance()
+    connection_name = context_information["connection_name"]
+    op_tag = _edit_op_tag(context_information)
+
+    def run(sql: str, params: typing.Optional[tuple] = None) -> None:
         cur = connection_manager.execute_query_with_params(
-            connection_name=context_information["connection_name"],
-            query=update_sql,
+            connection_name=connection_name,
+            query=sql,
             params=params,
             context_information=context_information,
-            op_tag=_edit_op_tag(context_information),
+            op_tag=op_tag,
         )
-
         cur.close()
-        return True
-    except Exception as e:
-        QgsMessageLog.logMessage(
-            f"update_table_feature failed: {e}",
-            "Snowflake Plugin",
-            Qgis.MessageLevel.Warning,
-        )
-        return False
-
 
-def update_table_attributes(
+    with connection_manager.pinned_session(connection_name):
+        run("BEGIN")
+        try:
+            for sql, params in statements:
+                run(sql, params)
+            run("COMMIT")
+        except Exception:
+            try:
+                run("ROLLBACK")
+            except Exception as rollback_error:
+                QgsMessageLog.logMessage(
+                    f"ROLLBACK failed: {rollback_error}",
+                    "Snowflake Plugin",
+                    Qgis.MessageLevel.Warning,
+                )
+            raise
+
+
+def update_table_rows(
     context_information: dict,
-    set_clauses: typing.List[str],
-    params: tuple,
+    rows_by_columns: typing.Dict[typing.Tuple[str, ...], typing.List[tuple]],
 ) -> typing.Optional[str]:
-    """Updates attribute columns for a single row identified by primary key.
+    """Updates rows identified by primary key with set-based MERGE statements.
+
+    ``rows_by_columns`` maps a tuple of changed column names to the
+    ``(primary_key_value, *new_values)`` rows that change exactly those
+    columns. Each group is sent as ``MERGE ... USING (VALUES ...)`` in chunks
+    of ``_EDIT_BATCH_ROWS`` rows, all in one transaction.
 
     Returns None on success, or an error message string on failure.
     """
-    try:
-        connection_manager: SFConnectionManager = SFConnectionManager.get_instance()
-        sql = (
-            f"UPDATE {quote_identifier(context_information['table_name'])} "  # nosec B608 - identifiers escaped via quote_identifier; set_clauses built from quoted identifiers; values bound as params
-            f"SET {', '.join(set_clauses)} "
-            f"WHERE {quote_identifier(context_information['primary_key_name'])} = %s"
+    table = quote_identifier(context_information["table_name"])
+    primary_key = quote_identifier(context_information["primary_key_name"])
+    statements = []
+    for column_names, rows in rows_by_columns.items():
+        assignments = ", ".join(
+            f"{quote_identifier(name)} = s.COLUMN{i + 2}"
+            for i, name in enumerate(column_names)
         )
-
-        cur = connection_manager.execute_query_with_params(
-            connection_name=context_information["connection_name"],
-            query=sql,
-            params=params,
-            context_information=context_information,
-            op_tag=_edit_op_tag(context_information),
-        )
-        cur.close()
+        for start in range(0, len(rows), _EDIT_BATCH_ROWS):
+            batch = rows[start : start + _EDIT_BATCH_ROWS]
+            sql = (
+                f"MERGE INTO {table} t "  # nosec B608 - identifiers escaped via quote_identifier; placeholders are literal '%s'; values bound as params
+                f"USING (SELECT * FROM VALUES {_values_rows_sql(len(batch), len(column_names) + 1)}) s "
+                f"ON t.{primary_key} = s.COLUMN1 "
+                f"WHEN MATCHED THEN UPDATE SET {assignments}"
+            )
+            statements.append((sql, tuple(value for row in batch for value in row)))
+    try:
+        _execute_edit_transaction(context_information, statements)
         return None
     except Exception as e:
-        msg = f"UPDATE failed: {e}"
+        msg = f"MERGE failed: {e}"
         QgsMessageLog.logMessage(msg, "Snowflake Plugin", Qgis.MessageLevel.Warning)
         return msg
 
 
-def insert_table_feature(
+def insert_table_rows(
     context_information: dict,
     column_names: typing.List[str],
-    params: tuple,
+    rows: typing.List[tuple],
 ) -> typing.Optional[str]:
-    """Inserts a single row into a Snowflake table.
+    """Inserts rows into a Snowflake table with multi-row INSERT statements of
+    ``_EDIT_BATCH_ROWS`` rows each, all in one transaction.
 
     Returns None on success, or an error message string on failure.
     """
-    try:
-        connection_manager: SFConnectionManager = SFConnectionManager.get_instance()
-        cols = ", ".join(quote_identifier(c) for c in column_names)
-        placeholders = ", ".join(["%s"] * len(column_names))
+    table = quote_identifier(context_information["table_name"])
+    cols = ", ".join(quote_identifier(c) for c in column_names)
+    statements = []
+    for start in range(0, len(rows), _EDIT_BATCH_ROWS):
+        batch = rows[start : start + _EDIT_BATCH_ROWS]
         sql = (
-            f"INSERT INTO {quote_identifier(context_information['table_name'])} "  # nosec B608 - identifiers escaped via quote_identifier; placeholders are literal '%s'; values bound as params
-            f"({cols}) VALUES ({placeholders})"
+            f"INSERT INTO {table} "  # nosec B608 - identifiers escaped via quote_identifier; placeholders are literal '%s'; values bound as params
+            f"({cols}) VALUES {_values_rows_sql(len(batch), len(column_names))}"
         )
-
-        cur = connection_manager.execute_query_with_params(
-            connection_name=context_information["connection_name"],
-            query=sql,
-            params=params,
-            context_information=context_information,
-            op_tag=_edit_op_tag(context_information),
-        )
-        cur.close()
+        statements.append((sql, tuple(value for row in batch for value in row)))
+    try:
+        _execute_edit_transaction(context_information, statements)
         return None
     except Exception as e:
         msg = f"INSERT failed: {e}"
@@ -1226,6 +1415,8 @@ def alter_table_add_columns(
         msg = f"ADD COLUMN failed: {e}"
         QgsMessageLog.logMessage(msg, "Snowflake Plugin", Qgis.MessageLevel.Warning)
         return msg
+    finally:
+        invalidate_table_metadata(context_information)
 
 
 def alter_table_drop_columns(
@@ -1254,6 +1445,8 @@ def alter_table_drop_columns(
         msg = f"DROP COLUMN failed: {e}"
         QgsMessageLog.logMessage(msg, "Snowflake Plugin", Qgis.MessageLevel.Warning)
         return msg
+    finally:
+        invalidate_table_metadata(context_information)
 
 
 def get_next_primary_key_value(
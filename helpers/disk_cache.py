@@ -0,0 +1,273 @@
+"""Opt-in on-disk cache of fully loaded layers.
+
+When enabled (see ``is_layer_disk_cache_enabled``), a layer whose features
+were fully loaded is written to a SQLite file under the QGIS profile. The next
+time the layer is opened - typically when a project is reopened - the
+provider restores its feature cache from that file instead of reading the
+table from Snowflake, provided the table's
+``INFORMATION_SCHEMA.TABLES.LAST_ALTERED`` still matches the value recorded
+when the file was written.
+
+Each file holds one ``FeatureStore``: a ``meta`` table (cache key, last
+altered stamp) and a ``features`` table with the fid, WKB geometry, bounding
+box and JSON-encoded attributes of every row.
+
+Files are named ``<table digest>-<key digest>.sqlite``. Saving a layer removes
+the other files of the same table (an older subset, column list or URI), and
+the least recently used files are evicted once the directory grows past
+``_MAX_CACHE_BYTES``. The browser's Refresh action drops the files under the
+refreshed node through ``clear_layer_cache``.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import sqlite3
+import typing
+from decimal import Decimal
+
+from qgis.core import QgsApplication, QgsFields, QgsMessageLog, Qgis
+from qgis.PyQt.QtCore import QDate, QDateTime, QTime, Qt
+
+from .feature_store import FeatureStore
+
+_FORMAT_VERSION = "1"
+_MAX_CACHE_BYTES = 2 * 1024**3
+
+
+def layer_cache_dir() -> str:
+    return os.path.join(
+        QgsApplication.qgisSettingsDirPath(), "snowflake_connector", "layer_cache"
+    )
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(
+        json.dumps(value, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def _table_prefix(cache_key: dict) -> str:
+    return _digest([cache_key.get("connection"), cache_key.get("table")])[:16]
+
+
+def layer_cache_path(cache_key: dict) -> str:
+    """File holding the layer identified by ``cache_key`` (a JSON-able dict)."""
+    return os.path.join(
+        layer_cache_dir(), f"{_table_prefix(cache_key)}-{_digest(cache_key)}.sqlite"
+    )
+
+
+def _cache_files() -> typing.List[str]:
+    directory = layer_cache_dir()
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return []
+    return [os.path.join(directory, n) for n in names if n.endswith(".sqlite")]
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _prune_layer_cache(path: str, cache_key: dict) -> None:
+    """Drop the other files of ``cache_key``'s table, then evict the least
+    recently used files until the directory fits in ``_MAX_CACHE_BYTES``."""
+    prefix = f"{_table_prefix(cache_key)}-"
+    entries = []
+    for other in _cache_files():
+        if other == path:
+            continue
+        if os.path.basename(other).startswith(prefix):
+            _remove(other)
+            continue
+        try:
+            stat = os.stat(other)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, other))
+    try:
+        total = os.path.getsize(path)
+    except OSError:
+        total = 0
+    total += sum(size for _, size, _ in entries)
+    for _, size, other in sorted(entries):
+        if total <= _MAX_CACHE_BYTES:
+            break
+        _remove(other)
+        total -= size
+
+
+def clear_layer_cache(
+    connection_name: typing.Optional[str] = None,
+    schema_name: typing.Optional[str] = None,
+    table_name: typing.Optional[str] = None,
+) -> None:
+    """Delete the cached layers under a browser node (all of them for the
+    root, where every argument is None)."""
+    for path in _cache_files():
+        if connection_name is not None:
+            try:
+                connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+                try:
+                    row = connection.execute(
+                        "SELECT value FROM meta WHERE key = 'cache_key'"
+                    ).fetchone()
+                finally:
+                    connection.close()
+                cache_key = json.loads(row[0]) if row else {}
+            except Exception:
+                cache_key = {}
+            table = cache_key.get("table") or [None, None, None]
+            if cache_key and (
+                cache_key.get("connection") != connection_name
+                or (schema_name is not None and table[1] != schema_name)
+                or (table_name is not None and table[2] != table_name)
+            ):
+                continue
+        _remove(path)
+
+
+def _encode_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, QDateTime):
+        return {"$dt": value.toString(Qt.DateFormat.ISODateWithMs)}
+    if isinstance(value, QDate):
+        return {"$d": value.toString(Qt.DateFormat.ISODate)}
+    if isinstance(value, QTime):
+        return {"$t": value.toString(Qt.DateFormat.ISODateWithMs)}
+    if isinstance(value, (bytes, bytearray)):
+        return {"$b": base64.b64encode(bytes(value)).decode("ascii")}
+    if isinstance(value, Decimal):
+        return {"$n": str(value)}
+    if hasattr(value, "isNull") and value.isNull():
+        return None
+    return str(value)
+
+
+def _decode_value(value):
+    if not isinstance(value, dict):
+        return value
+    if "$dt" in value:
+        return QDateTime.fromString(value["$dt"], Qt.DateFormat.ISODateWithMs)
+    if "$d" in value:
+        return QDate.fromString(value["$d"], Qt.DateFormat.ISODate)
+    if "$t" in value:
+        return QTime.fromString(value["$t"], Qt.DateFormat.ISODateWithMs)
+    if "$b" in value:
+        return base64.b64decode(value["$b"])
+    if "$n" in value:
+        return Decimal(value["$n"])
+    return value
+
+
+def save_feature_store(
+    path: str, cache_key: dict, last_altered: str, store: FeatureStore
+) -> bool:
+    """Write ``store`` to ``path`` (atomically replacing any older file)."""
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        connection = sqlite3.connect(tmp_path)
+        try:
+            connection.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            connection.execute(
+                "CREATE TABLE features (fid INTEGER, wkb BLOB, "
+                "xmin REAL, ymin REAL, xmax REAL, ymax REAL, attributes TEXT)"
+            )
+            connection.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [
+                    ("format", _FORMAT_VERSION),
+                    ("cache_key", json.dumps(cache_key, sort_keys=True)),
+                    ("last_altered", last_altered),
+                ],
+            )
+            connection.executemany(
+                "INSERT INTO features VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (fid, wkb, *(bounds or (None, None, None, None)),
+                     json.dumps([_encode_value(v) for v in attributes]))
+                    for fid, wkb, bounds, attributes in store.rows()
+                ),
+            )
+            connection.commit()
+        finally:
+            connection.close()
+        os.replace(tmp_path, path)
+        _prune_layer_cache(path, cache_key)
+        return True
+    except Exception as e:
+        QgsMessageLog.logMessage(
+            f"Could not write the layer disk cache {path}: {e}",
+            "Snowflake Plugin",
+            Qgis.MessageLevel.Warning,
+        )
+        try:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+def load_feature_store(
+    path: str, last_altered: typing.Optional[str], fields: QgsFields
+) -> typing.Optional[FeatureStore]:
+    """Read the store at ``path`` if it was written at ``last_altered``.
+
+    A stale or unreadable file is deleted and None is returned.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        connection = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            meta = dict(connection.execute("SELECT key, value FROM meta"))
+            if (
+                last_altered is None
+                or meta.get("format") != _FORMAT_VERSION
+                or meta.get("last_altered") != last_altered
+            ):
+                stale = True
+            else:
+                stale = False
+                store = FeatureStore()
+                store.set_fields(fields)
+                for fid, wkb, xmin, ymin, xmax, ymax, attributes in connection.execute(
+                    "SELECT fid, wkb, xmin, ymin, xmax, ymax, attributes "
+                    "FROM features ORDER BY rowid"
+                ):
+                    store.append_row(
+                        fid,
+                        wkb,
+                        None if xmin is None else (xmin, ymin, xmax, ymax),
+                        [_decode_value(v) for v in json.loads(attributes)],
+                    )
+        finally:
+            connection.close()
+        if not stale:
+            # Marks the file as recently used for the size-cap eviction.
+            os.utime(path)
+    except Exception as e:
+        QgsMessageLog.logMessage(
+            f"Could not read the layer disk cache {path}: {e}",
+            "Snowflake Plugin",
+            Qgis.MessageLevel.Warning,
+        )
+        stale = True
+    if stale:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    return store
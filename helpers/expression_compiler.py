@@ -7,29 +7,46 @@ project files. Concatenating that text straight into SQL is a SQL-injection sink
 
 Instead of trusting the text, we parse it with ``QgsExpression`` and walk the
 resulting AST ourselves, emitting Snowflake SQL only for a small whitelist of
-node types and operators and routing every identifier and literal through our
-quoting helpers. Anything outside that whitelist makes the whole compilation
-fail (returns ``None``), so raw predicate text is never pushed down to
-Snowflake; the caller falls back to client-side filtering (or rejects the
+node types, operators and functions and routing every identifier and literal
+through our quoting helpers. Anything outside that whitelist makes the whole
+compilation fail (returns ``None``), so raw predicate text is never pushed down
+to Snowflake; the caller falls back to client-side filtering (or rejects the
 subset string).
 
+A compiled filter is not re-checked by QGIS, so it must select exactly the
+rows QGIS' own evaluation would. The compiler therefore tracks the kind of
+value (number, text, date/time, ...) each node produces and only emits an
+operator or function where Snowflake computes the same result for those
+kinds: ``+`` adds numbers but concatenates strings, ``/`` by zero is NULL in
+QGIS but an error in Snowflake, and geometry functions are only pushed down
+for planar GEOMETRY columns (QGIS measures and compares lon/lat planimetrically
+while Snowflake's GEOGRAPHY functions are geodesic). ``$area`` / ``$length``
+depend on the project's ellipsoid and unit settings and stay client-side.
+
 Note: QGIS' own C++ SQL expression compiler is deliberately *not* exposed in
 the Python bindings, so we cannot subclass it; the ``QgsExpression`` AST node
 API used here is the supported PyQGIS surface.
 """
 
-from typing import Optional
+import re
+from typing import NamedTuple, Optional, Tuple
 
 from qgis.core import (
     QgsExpression,
     QgsExpressionNodeBinaryOperator,
     QgsExpressionNodeColumnRef,
+    QgsExpressionNodeFunction,
     QgsExpressionNodeInOperator,
     QgsExpressionNodeLiteral,
     QgsExpressionNodeUnaryOperator,
     QgsFields,
 )
 
+try:
+    from qgis.core import QgsExpressionNodeBetweenOperator
+except ImportError:  # BETWEEN was added in QGIS 3.26
+    QgsExpressionNodeBetweenOperator = None
+
 from .sql import quote_identifier, quote_literal
 
 
@@ -44,9 +61,39 @@ def _resolve_enum(owner, nested_name: str, member: str):
     return None
 
 
-# Map the safe subset of QGIS binary operators to their Snowflake SQL spelling.
-# Arithmetic / concat / regexp / power / integer-div are intentionally omitted
-# so only boolean predicates ever compile.
+# Kinds of value a compiled node produces.
+_NUMBER = "number"
+_TEXT = "text"
+_DATETIME = "datetime"
+_INTERVAL = "interval"
+_GEOMETRY = "geometry"
+_BOOL = "bool"
+_NULL = "null"
+_OTHER = "other"
+
+# Kind of a layer column, by the Snowflake type name the provider gives its
+# fields (INFORMATION_SCHEMA data types, or result metadata type names for
+# query layers).
+_COLUMN_KINDS = {
+    "NUMBER": _NUMBER,
+    "FIXED": _NUMBER,
+    "FLOAT": _NUMBER,
+    "REAL": _NUMBER,
+    "TEXT": _TEXT,
+    "DATE": _DATETIME,
+    "TIMESTAMP": _DATETIME,
+    "TIMESTAMP_LTZ": _DATETIME,
+    "TIMESTAMP_NTZ": _DATETIME,
+    "TIMESTAMP_TZ": _DATETIME,
+    "BOOLEAN": _BOOL,
+}
+
+# A compiled node: its SQL and the kind of value it produces.
+_Compiled = Tuple[str, str]
+
+# Map the safe subset of QGIS comparison / boolean operators to their
+# Snowflake SQL spelling. Regexp is intentionally omitted: QGIS' "~" finds a
+# match anywhere while REGEXP_LIKE must match the whole string.
 _BINARY_SQL = {}
 for _member, _sql in (
     ("boEQ", "="),
@@ -68,57 +115,243 @@ for _member, _sql in (
     if _key is not None:
         _BINARY_SQL[_key] = _sql
 
+# Arithmetic / concatenation operators, compiled by _compile_arithmetic.
+_ARITHMETIC = {}
+for _member in (
+    "boPlus",
+    "boMinus",
+    "boMul",
+    "boDiv",
+    "boIntDiv",
+    "boMod",
+    "boPow",
+    "boConcat",
+):
+    _key = _resolve_enum(QgsExpressionNodeBinaryOperator, "BinaryOperator", _member)
+    if _key is not None:
+        _ARITHMETIC[_key] = _member
+
 _UO_NOT = _resolve_enum(QgsExpressionNodeUnaryOperator, "UnaryOperator", "uoNot")
+_UO_MINUS = _resolve_enum(
+    QgsExpressionNodeUnaryOperator, "UnaryOperator", "uoMinus"
+)
+
+
+class _Function(NamedTuple):
+    """One Snowflake spelling of a QGIS function.
 
+    ``template`` is formatted with the compiled arguments, the layer's
+    ``geom`` column and its ``srid``; ``layer_geometry`` marks spellings that
+    need the planar layer geometry.
+    """
+
+    args: Tuple[str, ...]
+    template: str
+    result: str
+    layer_geometry: bool = False
+
+
+def _same(sql_name: str, kind: str, arity: int = 1) -> _Function:
+    """A function Snowflake spells (and evaluates) like QGIS."""
+    placeholders = ", ".join(f"{{{i}}}" for i in range(arity))
+    return _Function((kind,) * arity, f"{sql_name}({placeholders})", kind)
+
+
+# QGIS function name -> the spellings tried in order; the first whose argument
+# kinds match is emitted. Functions not listed here are refused.
+_FUNCTIONS = {
+    # String
+    "upper": (_same("UPPER", _TEXT),),
+    "lower": (_same("LOWER", _TEXT),),
+    # QGIS trims all whitespace, TRIM only spaces by default.
+    "trim": (_Function((_TEXT,), "TRIM({0}, ' \\t\\n\\r\\f\\x0b')", _TEXT),),
+    "length": (
+        _Function((_TEXT,), "LENGTH({0})", _NUMBER),
+        _Function((_GEOMETRY,), "ST_LENGTH({0})", _NUMBER),
+    ),
+    "left": (_Function((_TEXT, _NUMBER), "LEFT({0}, {1})", _TEXT),),
+    "right": (_Function((_TEXT, _NUMBER), "RIGHT({0}, {1})", _TEXT),),
+    "substr": (
+        _Function((_TEXT, _NUMBER), "SUBSTR({0}, {1})", _TEXT),
+        _Function((_TEXT, _NUMBER, _NUMBER), "SUBSTR({0}, {1}, {2})", _TEXT),
+    ),
+    "replace": (_same("REPLACE", _TEXT, 3),),
+    "strpos": (_Function((_TEXT, _TEXT), "POSITION({1}, {0})", _NUMBER),),
+    # Math
+    "abs": (_same("ABS", _NUMBER),),
+    "ceil": (_same("CEIL", _NUMBER),),
+    "floor": (_same("FLOOR", _NUMBER),),
+    "round": (_same("ROUND", _NUMBER), _same("ROUND", _NUMBER, 2)),
+    "sqrt": (_same("SQRT", _NUMBER),),
+    "exp": (_same("EXP", _NUMBER),),
+    "sin": (_same("SIN", _NUMBER),),
+    "cos": (_same("COS", _NUMBER),),
+    "tan": (_same("TAN", _NUMBER),),
+    "atan": (_same("ATAN", _NUMBER),),
+    "degrees": (_same("DEGREES", _NUMBER),),
+    "radians": (_same("RADIANS", _NUMBER),),
+    "pi": (_Function((), "PI()", _NUMBER),),
+    # Date / time. now() is left out: QGIS returns the local wall-clock time,
+    # CURRENT_TIMESTAMP() the session's time zone.
+    "year": (_Function((_DATETIME,), "YEAR({0})", _NUMBER),),
+    "month": (_Function((_DATETIME,), "MONTH({0})", _NUMBER),),
+    "day": (_Function((_DATETIME,), "DAY({0})", _NUMBER),),
+    "hour": (_Function((_DATETIME,), "HOUR({0})", _NUMBER),),
+    "minute": (_Function((_DATETIME,), "MINUTE({0})", _NUMBER),),
+    # Geometry (planar GEOMETRY layers only)
+    "$geometry": (_Function((), "{geom}", _GEOMETRY, True),),
+    "geom_from_wkt": (
+        _Function((_TEXT,), "ST_GEOMETRYFROMWKT({0}, {srid})", _GEOMETRY, True),
+    ),
+    "area": (_Function((_GEOMETRY,), "ST_AREA({0})", _NUMBER),),
+    "perimeter": (_Function((_GEOMETRY,), "ST_PERIMETER({0})", _NUMBER),),
+    "distance": (
+        _Function((_GEOMETRY, _GEOMETRY), "ST_DISTANCE({0}, {1})", _NUMBER),
+    ),
+    "intersects": (
+        _Function((_GEOMETRY, _GEOMETRY), "ST_INTERSECTS({0}, {1})", _BOOL),
+    ),
+    "contains": (
+        _Function((_GEOMETRY, _GEOMETRY), "ST_CONTAINS({0}, {1})", _BOOL),
+    ),
+    "within": (_Function((_GEOMETRY, _GEOMETRY), "ST_WITHIN({0}, {1})", _BOOL),),
+    "disjoint": (
+        _Function((_GEOMETRY, _GEOMETRY), "ST_DISJOINT({0}, {1})", _BOOL),
+    ),
+}
+
+# Interval strings QGIS and Snowflake read the same way. Months and years are
+# left out: QGIS counts them as 30 and 365.25 days, Snowflake as calendar units.
+_INTERVAL_TEXT = re.compile(
+    r"\s*(?:\d+\s*(?:week|day|hour|minute|second)s?\s*,?\s*)+", re.IGNORECASE
+)
+_INTERVAL_PART = re.compile(
+    r"(\d+)\s*(week|day|hour|minute|second)", re.IGNORECASE
+)
+
+
+def _interval_sql(value) -> Optional[str]:
+    """``INTERVAL '...'`` for a QGIS interval string such as ``'2 days'``."""
+    if not isinstance(value, str) or not _INTERVAL_TEXT.fullmatch(value):
+        return None
+    parts = []
+    for count, unit in _INTERVAL_PART.findall(value):
+        count, unit = int(count), unit.lower()
+        if unit == "week":
+            count, unit = count * 7, "day"
+        parts.append(f"{count} {unit}")
+    return f"INTERVAL {quote_literal(', '.join(parts))}"
 
-def _compile_column(node, fields: QgsFields) -> Optional[str]:
+
+def _compile_column(node, fields: QgsFields) -> Optional[_Compiled]:
     if fields is None:
         return None
     idx = fields.lookupField(node.name())
     if idx < 0:
         return None
+    field = fields.at(idx)
+    kind = _COLUMN_KINDS.get((field.typeName() or "").upper(), _OTHER)
     # Emit the canonical field name from the layer, not the raw reference.
-    return quote_identifier(fields.at(idx).name())
+    return quote_identifier(field.name()), kind
 
 
-def _compile_literal(node) -> Optional[str]:
+def _compile_literal(node) -> Optional[_Compiled]:
     value = node.value()
     if value is None:
-        return "NULL"
+        return "NULL", _NULL
     # bool must be checked before int (bool is a subclass of int).
     if isinstance(value, bool):
-        return "TRUE" if value else "FALSE"
+        return ("TRUE" if value else "FALSE"), _BOOL
     if isinstance(value, int):
-        return str(value)
+        return str(value), _NUMBER
     if isinstance(value, float):
-        return str(value)
+        return str(value), _NUMBER
     if isinstance(value, str):
-        return quote_literal(value)
+        return quote_literal(value), _TEXT
     return None
 
 
-def _compile_unary(node, fields: QgsFields) -> Optional[str]:
-    if _UO_NOT is None or node.op() != _UO_NOT:
-        return None
-    operand = _compile_node(node.operand(), fields)
+def _compile_unary(node, fields: QgsFields, geometry) -> Optional[_Compiled]:
+    operand = _compile_typed(node.operand(), fields, geometry)
     if operand is None:
         return None
-    return f"(NOT {operand})"
+    sql, kind = operand
+    if _UO_NOT is not None and node.op() == _UO_NOT:
+        return f"(NOT {sql})", _BOOL
+    if _UO_MINUS is not None and node.op() == _UO_MINUS and kind in (
+        _NUMBER,
+        _NULL,
+    ):
+        return f"(- {sql})", kind
+    return None
+
+
+def _compile_arithmetic(
+    op: str, left: _Compiled, right: _Compiled
+) -> Optional[_Compiled]:
+    (left_sql, left_kind), (right_sql, right_kind) = left, right
+    numbers = left_kind in (_NUMBER, _NULL) and right_kind in (_NUMBER, _NULL)
+    texts = _TEXT in (left_kind, right_kind) and {left_kind, right_kind} <= {
+        _TEXT,
+        _NULL,
+    }
+    if op in ("boPlus", "boMinus"):
+        symbol = "+" if op == "boPlus" else "-"
+        if numbers:
+            return f"({left_sql} {symbol} {right_sql})", _NUMBER
+        if left_kind == _DATETIME and right_kind == _INTERVAL:
+            return f"({left_sql} {symbol} {right_sql})", _DATETIME
+        if op == "boPlus" and left_kind == _INTERVAL and right_kind == _DATETIME:
+            return f"({left_sql} + {right_sql})", _DATETIME
+        # QGIS' "+" concatenates two strings.
+        if op == "boPlus" and texts:
+            return f"({left_sql} || {right_sql})", _TEXT
+        return None
+    if op == "boConcat":
+        return (f"({left_sql} || {right_sql})", _TEXT) if texts else None
+    if not numbers:
+        return None
+    if op == "boMul":
+        return f"({left_sql} * {right_sql})", _NUMBER
+    # QGIS yields NULL for a division by zero, where Snowflake raises an error.
+    if op == "boDiv":
+        return f"({left_sql} / NULLIF({right_sql}, 0))", _NUMBER
+    if op == "boIntDiv":
+        return f"FLOOR({left_sql} / NULLIF({right_sql}, 0))", _NUMBER
+    if op == "boMod":
+        return f"MOD({left_sql}, NULLIF({right_sql}, 0))", _NUMBER
+    if op == "boPow":
+        return f"POWER({left_sql}, {right_sql})", _NUMBER
+    return None
 
 
-def _compile_binary(node, fields: QgsFields) -> Optional[str]:
+def _compile_binary(node, fields: QgsFields, geometry) -> Optional[_Compiled]:
     sql_op = _BINARY_SQL.get(node.op())
-    if sql_op is None:
+    arithmetic = _ARITHMETIC.get(node.op())
+    if sql_op is None and arithmetic is None:
         return None
-    left = _compile_node(node.opLeft(), fields)
-    right = _compile_node(node.opRight(), fields)
+    left = _compile_typed(node.opLeft(), fields, geometry)
+    right = _compile_typed(node.opRight(), fields, geometry)
     if left is None or right is None:
         return None
-    return f"({left} {sql_op} {right})"
+    if sql_op is not None:
+        return f"({left[0]} {sql_op} {right[0]})", _BOOL
+    if (
+        arithmetic in ("boPlus", "boMinus")
+        and left[1] == _DATETIME
+        and right[1] == _TEXT
+        and isinstance(node.opRight(), QgsExpressionNodeLiteral)
+    ):
+        # "ts" - '2 days': QGIS reads the string as an interval.
+        interval = _interval_sql(node.opRight().value())
+        if interval is None:
+            return None
+        right = (interval, _INTERVAL)
+    return _compile_arithmetic(arithmetic, left, right)
 
 
-def _compile_in(node, fields: QgsFields) -> Optional[str]:
-    left = _compile_node(node.node(), fields)
+def _compile_in(node, fields: QgsFields, geometry) -> Optional[_Compiled]:
+    left = _compile_typed(node.node(), fields, geometry)
     if left is None:
         return None
     node_list = node.list()
@@ -129,15 +362,75 @@ def _compile_in(node, fields: QgsFields) -> Optional[str]:
         return None
     compiled_members = []
     for member in members:
-        compiled = _compile_node(member, fields)
+        compiled = _compile_typed(member, fields, geometry)
         if compiled is None:
             return None
-        compiled_members.append(compiled)
+        compiled_members.append(compiled[0])
     keyword = "NOT IN" if node.isNotIn() else "IN"
-    return f"({left} {keyword} ({', '.join(compiled_members)}))"
+    return f"({left[0]} {keyword} ({', '.join(compiled_members)}))", _BOOL
+
+
+def _compile_between(node, fields: QgsFields, geometry) -> Optional[_Compiled]:
+    compiled = [
+        _compile_typed(part, fields, geometry)
+        for part in (node.node(), node.lowerBound(), node.higherBound())
+    ]
+    if any(part is None for part in compiled):
+        return None
+    value, lower, higher = (part[0] for part in compiled)
+    keyword = "NOT BETWEEN" if node.isNotBetween() else "BETWEEN"
+    return f"({value} {keyword} {lower} AND {higher})", _BOOL
 
 
-def _compile_node(node, fields: QgsFields) -> Optional[str]:
+def _compile_function(node, fields: QgsFields, geometry) -> Optional[_Compiled]:
+    name = QgsExpression.Functions()[node.fnIndex()].name().lower()
+    arg_list = node.args()
+    arg_nodes = list(arg_list.list()) if arg_list is not None else []
+    # QGIS fills omitted optional parameters with their default, usually a
+    # NULL literal (e.g. substr's length); drop those so the shorter
+    # spelling applies.
+    while (
+        arg_nodes
+        and isinstance(arg_nodes[-1], QgsExpressionNodeLiteral)
+        and arg_nodes[-1].value() is None
+    ):
+        arg_nodes.pop()
+    if name == "to_interval":
+        # Only a literal interval string has a known Snowflake spelling.
+        if len(arg_nodes) != 1 or not isinstance(
+            arg_nodes[0], QgsExpressionNodeLiteral
+        ):
+            return None
+        interval = _interval_sql(arg_nodes[0].value())
+        return (interval, _INTERVAL) if interval is not None else None
+    spellings = _FUNCTIONS.get(name)
+    if spellings is None:
+        return None
+    args = []
+    for arg_node in arg_nodes:
+        compiled = _compile_typed(arg_node, fields, geometry)
+        if compiled is None:
+            return None
+        args.append(compiled)
+    for spelling in spellings:
+        if len(spelling.args) != len(args):
+            continue
+        if spelling.layer_geometry and geometry is None:
+            continue
+        if any(
+            kind not in (expected, _NULL)
+            for (_, kind), expected in zip(args, spelling.args)
+        ):
+            continue
+        geom, srid = geometry if geometry is not None else ("", 0)
+        sql = spelling.template.format(
+            *(sql for sql, _ in args), geom=geom, srid=int(srid or 0)
+        )
+        return sql, spelling.result
+    return None
+
+
+def _compile_typed(node, fields: QgsFields, geometry) -> Optional[_Compiled]:
     if node is None:
         return None
     if isinstance(node, QgsExpressionNodeColumnRef):
@@ -145,21 +438,40 @@ def _compile_node(node, fields: QgsFields) -> Optional[str]:
     if isinstance(node, QgsExpressionNodeLiteral):
         return _compile_literal(node)
     if isinstance(node, QgsExpressionNodeUnaryOperator):
-        return _compile_unary(node, fields)
+        return _compile_unary(node, fields, geometry)
     if isinstance(node, QgsExpressionNodeBinaryOperator):
-        return _compile_binary(node, fields)
+        return _compile_binary(node, fields, geometry)
     if isinstance(node, QgsExpressionNodeInOperator):
-        return _compile_in(node, fields)
-    # Functions, CASE/condition, BETWEEN, index operators, etc. are refused.
+        return _compile_in(node, fields, geometry)
+    if QgsExpressionNodeBetweenOperator is not None and isinstance(
+        node, QgsExpressionNodeBetweenOperator
+    ):
+        return _compile_between(node, fields, geometry)
+    if isinstance(node, QgsExpressionNodeFunction):
+        return _compile_function(node, fields, geometry)
+    # CASE/condition, index operators, etc. are refused.
     return None
 
 
+def _compile_node(
+    node, fields: QgsFields, geometry: Optional[Tuple[str, int]] = None
+) -> Optional[str]:
+    compiled = _compile_typed(node, fields, geometry)
+    return compiled[0] if compiled is not None else None
+
+
 def compile_expression_to_sql(
-    expression_text: str, fields: QgsFields
+    expression_text: str,
+    fields: QgsFields,
+    geometry: Optional[Tuple[str, int]] = None,
 ) -> Optional[str]:
     """Return safe Snowflake SQL for ``expression_text``, or ``None`` if it
     cannot be fully and safely compiled.
 
+    ``geometry`` is the ``(quoted column, srid)`` of the layer's planar
+    GEOMETRY column; without it ``$geometry`` and the spatial functions do
+    not compile.
+
     ``None`` means the caller MUST NOT push the predicate down (filter
     client-side or reject it); it must never fall back to using the raw text.
     """
@@ -172,6 +484,6 @@ def compile_expression_to_sql(
         root = expression.rootNode()
         if root is None:
             return None
-        return _compile_node(root, fields) or None
+        return _compile_node(root, fields, geometry) or None
     except Exception:
         return None
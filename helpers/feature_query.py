@@ -0,0 +1,59 @@
+"""SQL of the feature iterator's layer query.
+
+``SFFeatureIterator`` selects only the attributes a request asks for
+(``projected_field_names``) and combines the layer's filters (geometry type
+split, viewport, feature ids) with the request's row filters (compiled filter
+expression, subset string) in ``layer_query``.
+
+Every predicate is applied in the inner query, against the columns of the
+layer's FROM clause, so a subset string or filter expression may reference
+columns the request did not ask for: narrowing the select list never has to
+wait for the filters to go away.
+"""
+
+import typing
+
+from .sql import quote_identifier
+
+
+def projected_field_names(
+    field_names: typing.Sequence[str],
+    subset_of_attributes: typing.Optional[typing.Sequence[int]],
+    primary_key: str,
+) -> typing.List[str]:
+    """Return the field columns to select, in result order.
+
+    With a requested attribute subset those are the requested fields followed
+    by the primary key when it is not one of them (feature ids and tile
+    de-duplication need it), and every field otherwise.
+    """
+    if not subset_of_attributes:
+        return list(field_names)
+    names = [field_names[idx] for idx in subset_of_attributes]
+    if primary_key and primary_key not in names:
+        names.append(primary_key)
+    return names
+
+
+def select_list(field_names: typing.Sequence[str], trailing: str) -> str:
+    """The quoted ``field_names`` followed by ``trailing`` (geometry and index
+    expressions)."""
+    return ", ".join([*(quote_identifier(name) for name in field_names), trailing])
+
+
+def layer_query(
+    select: str,
+    from_clause: str,
+    predicates: typing.Iterable[str],
+    sample_rows: typing.Optional[int] = None,
+) -> str:
+    """``SELECT select FROM from_clause`` restricted by every non-empty
+    predicate, each parenthesised so an ``OR`` in one cannot absorb the
+    others. ``sample_rows`` draws a random sample of the filtered rows.
+    """
+    conditions = [f"({predicate})" for predicate in predicates if predicate]
+    where = f" where {' and '.join(conditions)}" if conditions else ""
+    query = f"select * from (select {select} from {from_clause}{where})"  # nosec B608 - select list and predicates built by the iterator from quoted identifiers / compiler-validated fragments; from_clause pre-quoted
+    if sample_rows is not None:
+        query = f"select * from ({query}) SAMPLE ({int(sample_rows)} ROWS)"  # nosec B608 - query built above; sample size is an int
+    return query
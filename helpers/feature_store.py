@@ -0,0 +1,353 @@
+"""Compact columnar cache for a layer's fully loaded features.
+
+``SFVectorDataProvider`` keeps every feature of a fully loaded layer so that
+later renders, fid lookups and the edit methods do not go back to Snowflake.
+Holding one ``QgsFeature`` copy per row costs a C++ feature, a geometry and a
+Python wrapper each; at 500k H3 rows that runs into gigabytes.
+
+``FeatureStore`` keeps the same data column by column instead:
+
+* geometries as one WKB blob plus an offsets array,
+* integer and float attributes in typed ``array`` columns (falling back to a
+  plain list as soon as a column holds anything else),
+* the feature ids in a typed array, with a fid -> row dict only when the ids
+  are not simply the 0-based row numbers.
+
+``QgsFeature`` objects are only built on demand (``feature_at`` /
+``__getitem__``), for the rows a caller actually asks for. Each row's bounding
+box is kept as well, so rect-filtered reads can go through a
+``QgsSpatialIndex`` (``candidate_rows``) instead of testing every geometry.
+
+Committed edits are applied in place (``set_attribute``, ``set_geometries``,
+``delete_rows``, ``append``) so the provider does not have to download the
+layer again after every save.
+"""
+
+import bisect
+import typing
+from array import array
+
+from qgis.core import QgsFeature, QgsFields, QgsGeometry, QgsRectangle, QgsSpatialIndex
+from qgis.PyQt.QtCore import QVariant
+
+
+_TYPECODES = {int: "q", float: "d"}
+
+
+def _is_null(value) -> bool:
+    return value is None or (isinstance(value, QVariant) and value.isNull())
+
+
+class FeatureStore:
+    """Columnar store of features, addressed by row or by fid."""
+
+    def __init__(self):
+        self._fields: typing.Optional[QgsFields] = None
+        self._fids = array("q")
+        self._row_by_fid: typing.Optional[typing.Dict[int, int]] = None
+        self._wkb = bytearray()
+        self._wkb_offsets = array("q", [0])
+        # xmin, ymin, xmax, ymax per row with a geometry (see _indexed_rows).
+        self._bounds = array("d")
+        self._indexed_rows = array("q")
+        self._spatial_index: typing.Optional[QgsSpatialIndex] = None
+        self._columns: typing.List[typing.Union[array, list]] = []
+        # Rows holding NULL in a typed column (lists store None directly).
+        self._nulls: typing.List[typing.Set[int]] = []
+
+    def __len__(self) -> int:
+        return len(self._fids)
+
+    def __contains__(self, fid: int) -> bool:
+        return self.row_of(fid) is not None
+
+    def __iter__(self) -> typing.Iterator[QgsFeature]:
+        for row in range(len(self._fids)):
+            yield self.feature_at(row)
+
+    def __getitem__(self, fid: int) -> QgsFeature:
+        row = self.row_of(fid)
+        if row is None:
+            raise KeyError(fid)
+        return self.feature_at(row)
+
+    def row_of(self, fid: int) -> typing.Optional[int]:
+        """Return the row holding ``fid``, or None if it is not cached."""
+        if self._row_by_fid is not None:
+            return self._row_by_fid.get(fid)
+        if 0 <= fid < len(self._fids):
+            return fid
+        return None
+
+    def append(self, feature: QgsFeature) -> None:
+        """Copy ``feature``'s id, geometry and attributes into the store."""
+        if self._fields is None:
+            self._fields = feature.fields()
+        wkb = bounds = None
+        if feature.hasGeometry():
+            geometry = feature.geometry()
+            wkb = bytes(geometry.asWkb())
+            box = geometry.boundingBox()
+            bounds = (box.xMinimum(), box.yMinimum(), box.xMaximum(), box.yMaximum())
+        self.append_row(feature.id(), wkb, bounds, feature.attributes())
+
+    def append_row(
+        self,
+        fid: int,
+        wkb: typing.Optional[bytes],
+        bounds: typing.Optional[typing.Sequence[float]],
+        attributes: typing.Sequence,
+    ) -> None:
+        """Append one row from its raw parts (see ``rows()``)."""
+        row = len(self._fids)
+        if self._row_by_fid is None and fid != row:
+            # Ids stopped matching row numbers: index them explicitly.
+            self._row_by_fid = {existing: i for i, existing in enumerate(self._fids)}
+        if self._row_by_fid is not None:
+            self._row_by_fid[fid] = row
+        self._fids.append(fid)
+
+        if wkb:
+            self._wkb.extend(wkb)
+            self._bounds.extend(bounds)
+            self._indexed_rows.append(row)
+        self._wkb_offsets.append(len(self._wkb))
+        self._spatial_index = None
+
+        if row == 0 and not self._columns:
+            for value in attributes:
+                typecode = None if _is_null(value) else _TYPECODES.get(type(value))
+                self._columns.append(array(typecode) if typecode else [])
+                self._nulls.append(set())
+        for col_idx, column in enumerate(self._columns):
+            value = attributes[col_idx] if col_idx < len(attributes) else None
+            self._append_value(col_idx, column, row, value)
+
+    def _append_value(self, col_idx: int, column, row: int, value) -> None:
+        if _is_null(value):
+            if isinstance(column, array):
+                self._nulls[col_idx].add(row)
+                column.append(0)
+            else:
+                column.append(None)
+            return
+        if isinstance(column, array):
+            if _TYPECODES.get(type(value)) == column.typecode:
+                try:
+                    column.append(value)
+                    return
+                except OverflowError:
+                    pass
+            column = self._demote_column(col_idx)
+        column.append(value)
+
+    def _demote_column(self, col_idx: int) -> list:
+        """Turn a typed column into a plain list (mixed types / overflow)."""
+        nulls = self._nulls[col_idx]
+        column = [
+            None if row in nulls else value
+            for row, value in enumerate(self._columns[col_idx])
+        ]
+        self._columns[col_idx] = column
+        self._nulls[col_idx] = set()
+        return column
+
+    def set_attribute(self, row: int, attr_idx: int, value) -> None:
+        """Overwrite one attribute of ``row`` in place."""
+        column = self._columns[attr_idx]
+        if _is_null(value):
+            if isinstance(column, array):
+                self._nulls[attr_idx].add(row)
+            else:
+                column[row] = None
+            return
+        if isinstance(column, array):
+            if _TYPECODES.get(type(value)) == column.typecode:
+                try:
+                    column[row] = value
+                    self._nulls[attr_idx].discard(row)
+                    return
+                except OverflowError:
+                    pass
+            column = self._demote_column(attr_idx)
+        column[row] = value
+
+    def set_geometries(
+        self,
+        geometries: typing.Dict[
+            int, typing.Tuple[typing.Optional[bytes], typing.Optional[typing.Sequence[float]]]
+        ],
+    ) -> None:
+        """Replace the geometry of several rows, given as ``{row: (wkb,
+        bounds)}`` (``wkb`` None clears it).
+
+        The WKB blob is rewritten once from the first changed row on, however
+        many rows change.
+        """
+        if not geometries:
+            return
+        first = min(geometries)
+        position = bisect.bisect_left(self._indexed_rows, first)
+        bounds_by_row = {
+            row: tuple(self._bounds[i * 4:i * 4 + 4])
+            for i, row in enumerate(self._indexed_rows[position:], position)
+        }
+        tail = []
+        for row in range(first, len(self._fids)):
+            if row in geometries:
+                tail.append(geometries[row])
+            else:
+                start, end = self._wkb_offsets[row], self._wkb_offsets[row + 1]
+                tail.append((bytes(self._wkb[start:end]), bounds_by_row.get(row)))
+        del self._wkb[self._wkb_offsets[first]:]
+        del self._wkb_offsets[first + 1:]
+        del self._bounds[position * 4:]
+        del self._indexed_rows[position:]
+        for row, (wkb, bounds) in enumerate(tail, first):
+            if wkb:
+                self._wkb.extend(wkb)
+                self._bounds.extend(bounds)
+                self._indexed_rows.append(row)
+            self._wkb_offsets.append(len(self._wkb))
+        self._spatial_index = None
+
+    def delete_rows(self, rows: typing.Iterable[int]) -> None:
+        """Drop the given rows. The remaining rows keep their fids."""
+        deleted = set(rows)
+        keep = [row for row in range(len(self._fids)) if row not in deleted]
+        if len(keep) == len(self._fids):
+            return
+        new_row = {old: new for new, old in enumerate(keep)}
+
+        wkb = bytearray()
+        offsets = array("q", [0])
+        for row in keep:
+            wkb.extend(self._wkb[self._wkb_offsets[row]:self._wkb_offsets[row + 1]])
+            offsets.append(len(wkb))
+        bounds = array("d")
+        indexed_rows = array("q")
+        for i, row in enumerate(self._indexed_rows):
+            if row in new_row:
+                bounds.extend(self._bounds[i * 4:i * 4 + 4])
+                indexed_rows.append(new_row[row])
+        self._wkb, self._wkb_offsets = wkb, offsets
+        self._bounds, self._indexed_rows = bounds, indexed_rows
+        self._spatial_index = None
+
+        for col_idx, column in enumerate(self._columns):
+            if isinstance(column, array):
+                self._columns[col_idx] = array(column.typecode, (column[row] for row in keep))
+            else:
+                self._columns[col_idx] = [column[row] for row in keep]
+            self._nulls[col_idx] = {
+                new_row[row] for row in self._nulls[col_idx] if row in new_row
+            }
+
+        self._fids = array("q", (self._fids[row] for row in keep))
+        if any(fid != row for row, fid in enumerate(self._fids)):
+            self._row_by_fid = {fid: row for row, fid in enumerate(self._fids)}
+        else:
+            self._row_by_fid = None
+
+    def max_fid(self) -> int:
+        """The largest cached fid, -1 when the store is empty."""
+        return max(self._fids, default=-1)
+
+    def rows(
+        self,
+    ) -> typing.Iterator[
+        typing.Tuple[int, typing.Optional[bytes], typing.Optional[tuple], list]
+    ]:
+        """Yield ``(fid, wkb, bounds, attributes)`` per row, for ``append_row``."""
+        bounds_by_row = {row: i * 4 for i, row in enumerate(self._indexed_rows)}
+        for row in range(len(self._fids)):
+            start, end = self._wkb_offsets[row], self._wkb_offsets[row + 1]
+            offset = bounds_by_row.get(row)
+            yield (
+                self._fids[row],
+                bytes(self._wkb[start:end]) if end > start else None,
+                None if offset is None else tuple(self._bounds[offset:offset + 4]),
+                self.attributes_at(row),
+            )
+
+    def set_fields(self, fields: QgsFields) -> None:
+        self._fields = fields
+
+    @property
+    def has_spatial_index(self) -> bool:
+        return self._spatial_index is not None
+
+    def build_spatial_index(self) -> None:
+        """Index every row's bounding box (rows, not fids, are the index ids)."""
+        index = QgsSpatialIndex()
+        bounds = self._bounds
+        for i, row in enumerate(self._indexed_rows):
+            offset = i * 4
+            index.addFeature(
+                row,
+                QgsRectangle(
+                    bounds[offset], bounds[offset + 1],
+                    bounds[offset + 2], bounds[offset + 3],
+                ),
+            )
+        self._spatial_index = index
+
+    def candidate_rows(self, rect: QgsRectangle) -> typing.List[int]:
+        """Rows whose bounding box intersects ``rect``, in row order.
+
+        The index is built on first use and dropped whenever a row is
+        appended. Candidates still need an exact ``intersects`` test.
+        """
+        if self._spatial_index is None:
+            self.build_spatial_index()
+        return sorted(self._spatial_index.intersects(rect))
+
+    def geometry_at(self, row: int) -> QgsGeometry:
+        """Return the geometry of ``row`` (an empty geometry if it has none)."""
+        geometry = QgsGeometry()
+        start, end = self._wkb_offsets[row], self._wkb_offsets[row + 1]
+        if end > start:
+            geometry.fromWkb(bytes(self._wkb[start:end]))
+        return geometry
+
+    def attributes_at(self, row: int) -> list:
+        return [
+            None if row in nulls else column[row]
+            for column, nulls in zip(self._columns, self._nulls)
+        ]
+
+    def attribute_at(self, row: int, attr_idx: int):
+        if row in self._nulls[attr_idx]:
+            return None
+        return self._columns[attr_idx][row]
+
+    def fid_at(self, row: int) -> int:
+        return self._fids[row]
+
+    def feature_at(self, row: int) -> QgsFeature:
+        """Build a standalone ``QgsFeature`` for ``row``."""
+        feature = QgsFeature()
+        if self._fields is not None:
+            feature.setFields(self._fields)
+        feature.setId(self._fids[row])
+        start, end = self._wkb_offsets[row], self._wkb_offsets[row + 1]
+        if end > start:
+            feature.setGeometry(self.geometry_at(row))
+        feature.setAttributes(self.attributes_at(row))
+        feature.setValid(True)
+        return feature
+
+    def add_attributes(self, count: int, fields: QgsFields) -> None:
+        """Append ``count`` all-NULL attribute columns (``addAttributes``)."""
+        self._fields = fields
+        for _ in range(count):
+            self._columns.append([None] * len(self._fids))
+            self._nulls.append(set())
+
+    def delete_attributes(self, attr_indexes: typing.Iterable[int], fields: QgsFields) -> None:
+        """Drop the given attribute columns (``deleteAttributes``)."""
+        self._fields = fields
+        for idx in sorted(set(attr_indexes), reverse=True):
+            if 0 <= idx < len(self._columns):
+                del self._columns[idx]
+                del self._nulls[idx]
@@ -0,0 +1,118 @@
+"""Process-wide cache of table metadata lookups.
+
+Column lists, geometry column detection, SRIDs, geometry types, declared
+primary keys and view lists are read from ``INFORMATION_SCHEMA`` (or sampled
+from the table) by the providers, the browser, the locator and the temporal
+support, often several times for the same table while a project opens.
+``MetadataCache`` keeps each answer for ``DEFAULT_TTL_SECONDS`` under a key of
+``(connection, database, schema, table, kind, ...)``.
+
+``invalidate`` drops every entry under a connection / database / schema /
+table scope; the browser's Refresh action and the provider's DDL
+(add/delete attributes) call it so changes show up before the TTL runs out.
+"""
+
+import threading
+import time
+import typing
+
+# How long a lookup is reused before it is read again.
+DEFAULT_TTL_SECONDS = 300.0
+
+_T = typing.TypeVar("_T")
+
+
+def _normalize(name: typing.Optional[str]) -> typing.Optional[str]:
+    # The lookups match names with ILIKE, so keys are case-insensitive too.
+    return name.upper() if isinstance(name, str) else name
+
+
+def metadata_key(
+    kind: str,
+    connection_name: str,
+    database_name: typing.Optional[str] = None,
+    schema_name: typing.Optional[str] = None,
+    table_name: typing.Optional[str] = None,
+    *extra: typing.Hashable,
+) -> tuple:
+    """Build a cache key; ``None`` marks a scope level the lookup spans."""
+    return (
+        connection_name,
+        _normalize(database_name),
+        _normalize(schema_name),
+        _normalize(table_name),
+        kind,
+        *extra,
+    )
+
+
+class MetadataCache:
+    """Thread-safe TTL cache of metadata lookups.
+
+    Only successful loads are stored: an exception raised by the loader
+    propagates and the next call tries again.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        clock: typing.Callable[[], float] = time.monotonic,
+    ):
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: typing.Dict[tuple, typing.Tuple[float, typing.Any]] = {}
+
+    def get_or_load(self, key: tuple, loader: typing.Callable[[], _T]) -> _T:
+        """Return the cached value for ``key``, calling ``loader`` when it is
+        missing or expired. The value is shared: callers must not mutate it."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+        value = loader()
+        with self._lock:
+            self._entries[key] = (self._clock() + self._ttl_seconds, value)
+        return value
+
+    def contains(self, key: tuple) -> bool:
+        """Whether ``key`` holds a value that has not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry[0] > self._clock()
+
+    def invalidate(
+        self,
+        connection_name: typing.Optional[str] = None,
+        database_name: typing.Optional[str] = None,
+        schema_name: typing.Optional[str] = None,
+        table_name: typing.Optional[str] = None,
+    ) -> None:
+        """Drop the entries in a scope. ``None`` arguments match anything, and
+        so do the ``None`` levels of a key (a lookup that spans them)."""
+        scope = (
+            connection_name,
+            _normalize(database_name),
+            _normalize(schema_name),
+            _normalize(table_name),
+        )
+        with self._lock:
+            for key in list(self._entries):
+                if all(
+                    wanted is None or actual is None or wanted == actual
+                    for wanted, actual in zip(scope, key)
+                ):
+                    del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_metadata_cache = MetadataCache()
+
+
+def get_metadata_cache() -> MetadataCache:
+    """The cache shared by the whole plugin."""
+    return _metadata_cache
@@ -0,0 +1,150 @@
+"""Parallel fetch of a result split into hash partitions.
+
+One cursor streams its result over a single connection, which caps large
+imports well below what the warehouse and the network can deliver.
+``partition_queries`` splits a SELECT into ``N`` disjoint slices with
+``MOD(ABS(HASH(key)), N) = i``. ``PartitionedFetcher`` runs every slice
+through the connection manager on its own worker thread, so each one executes
+on a session of the connection's pool, and hands the fetched batches to a
+single consumer in arrival order (rows of different slices interleave). The
+slices are submitted asynchronously, so ``stop()`` also aborts the ones still
+running on the warehouse.
+
+The queue between the workers and the consumer is bounded, so a slow
+consumer (e.g. a feature sink writing to disk) throttles the workers instead
+of letting fetched rows pile up in memory.
+"""
+
+import queue
+import threading
+import typing
+
+
+class _FetchError:
+    """Carries an exception raised on a worker thread to the consumer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+_WORKER_DONE = object()
+
+
+def partition_queries(
+    query: str, partition_key: str, partitions: int
+) -> typing.List[str]:
+    """Return ``partitions`` copies of ``query`` restricted to one hash slice
+    each.
+
+    ``query`` is wrapped as a subquery so its own WHERE / OR precedence is
+    left untouched; ``partition_key`` is the SQL expression hashed and must
+    reference ``query``'s output columns (already quoted).
+    """
+    return [
+        f"SELECT * FROM ({query}) WHERE MOD(ABS(HASH({partition_key})), {partitions}) = {i}"  # nosec B608 - query and partition_key built by the caller from quote_identifier; bounds are ints
+        for i in range(partitions)
+    ]
+
+
+class PartitionedFetcher:
+    """Execute ``queries`` in parallel and iterate over their batches.
+
+    ``convert_batch`` runs on the worker thread for each fetched batch
+    (e.g. to build features), so conversion overlaps as well. ``batches()``
+    yields the converted batches until every query is drained and re-raises
+    the first error a worker hit. ``stop()`` ends the fetch early and
+    cancels the queries that are still executing.
+    """
+
+    _POLL_SECONDS = 0.1
+
+    def __init__(
+        self,
+        connection_manager,
+        connection_name: str,
+        queries: typing.Sequence[str],
+        batch_size: int,
+        context_information: typing.Optional[dict] = None,
+        convert_batch: typing.Optional[typing.Callable[[list], typing.Any]] = None,
+    ):
+        self._connection_manager = connection_manager
+        self._connection_name = connection_name
+        self._queries = list(queries)
+        self._batch_size = batch_size
+        self._context_information = context_information
+        self._convert_batch = convert_batch or (lambda rows: rows)
+        self._queue: queue.Queue = queue.Queue(maxsize=2 * len(self._queries))
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        # Sum of the rowcounts of the queries executed so far.
+        self.row_count = 0
+        self._threads = [
+            threading.Thread(
+                target=self._run, args=(query,), name=f"sf-partition-{i}", daemon=True
+            )
+            for i, query in enumerate(self._queries)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _run(self, query: str) -> None:
+        try:
+            cursor = self._connection_manager.execute_query_async(
+                self._connection_name,
+                query,
+                self._context_information,
+                is_canceled=self._stop_event.is_set,
+            )
+            try:
+                with self._lock:
+                    self.row_count += cursor.rowcount or 0
+                while not self._stop_event.is_set():
+                    rows = cursor.fetchmany(self._batch_size)
+                    if not rows:
+                        break
+                    if not self._put(self._convert_batch(rows)):
+                        return
+            finally:
+                cursor.close()
+        except Exception as e:
+            self._put(_FetchError(e))
+        finally:
+            self._put(_WORKER_DONE)
+
+    def _put(self, item) -> bool:
+        """Block until ``item`` is queued; give up (False) once stopped."""
+        while not self._stop_event.is_set():
+            try:
+                self._queue.put(item, timeout=self._POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def batches(self) -> typing.Iterator[typing.Any]:
+        """Yield converted batches as the workers deliver them."""
+        running = len(self._threads)
+        while running and not self._stop_event.is_set():
+            try:
+                item = self._queue.get(timeout=self._POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if item is _WORKER_DONE:
+                running -= 1
+            elif isinstance(item, _FetchError):
+                self.stop()
+                raise item.error
+            else:
+                yield item
+
+    def stop(self) -> None:
+        """Stop the workers and drop any batch not yet consumed."""
+        self._stop_event.set()
+        try:
+            while True:
+                self._queue.get_nowait()
+        except queue.Empty:
+            pass
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(self._POLL_SECONDS * 10)
@@ -0,0 +1,169 @@
+"""Tile cache for rect-filtered layer renders.
+
+Every pan or zoom of a layer that is not fully cached sends a new
+``ST_INTERSECTS(geom, <viewport rect>)`` query. ``TileCache`` lets the feature
+iterator reuse rows between overlapping viewports instead: the viewport is
+snapped to a grid of square tiles, tiles already cached are served from
+memory, and only the missing ones are fetched (in a single query).
+
+Tiles live on a power-of-two grid in the layer's own CRS units. A tile is
+identified by ``(level, x, y)``: its side is ``2 ** level`` and it covers
+``[x * side, (x + 1) * side) x [y * side, (y + 1) * side)``. The level is chosen
+from the viewport size so that a viewport spans at most 3 x 3 tiles; panning
+at the same scale keeps hitting the same tiles.
+
+Cache entries are keyed by ``(layer key, subset string, query shape, tile)``
+and evicted least-recently-used once the total (approximate) size exceeds
+``max_bytes``.
+"""
+
+import collections
+import math
+import sys
+import threading
+import typing
+
+TILE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# A viewport never spans more than 3 x 3 tiles; anything larger (e.g. a
+# degenerate rect) is not worth caching.
+MAX_TILES_PER_REQUEST = 9
+
+Tile = typing.Tuple[int, int, int]
+
+
+def tile_level(width: float, height: float) -> typing.Optional[int]:
+    """Grid level for a viewport of the given size (None for empty rects)."""
+    span = max(width, height)
+    if not math.isfinite(span) or span <= 0:
+        return None
+    return math.ceil(math.log2(span / 2))
+
+
+def tiles_for_rect(
+    xmin: float, ymin: float, xmax: float, ymax: float, clamp_lonlat: bool = False
+) -> typing.Optional[typing.List[Tile]]:
+    """Tiles covering the rect, or None if it should not be tiled.
+
+    With ``clamp_lonlat`` tiles entirely outside WGS84 lon/lat are left out.
+    """
+    level = tile_level(xmax - xmin, ymax - ymin)
+    if level is None:
+        return None
+    side = 2.0 ** level
+    x_range = range(math.floor(xmin / side), math.floor(xmax / side) + 1)
+    y_range = range(math.floor(ymin / side), math.floor(ymax / side) + 1)
+    if len(x_range) * len(y_range) > MAX_TILES_PER_REQUEST:
+        return None
+    tiles = [(level, x, y) for y in y_range for x in x_range]
+    if clamp_lonlat:
+        tiles = [tile for tile in tiles if tile_bounds(tile, True) is not None]
+    return tiles
+
+
+def tile_bounds(
+    tile: Tile, clamp_lonlat: bool = False
+) -> typing.Optional[typing.Tuple[float, float, float, float]]:
+    """``(xmin, ymin, xmax, ymax)`` of the tile.
+
+    With ``clamp_lonlat`` the bounds are cut to WGS84 lon/lat, and None is
+    returned when nothing of the tile is left.
+    """
+    level, x, y = tile
+    side = 2.0 ** level
+    xmin, ymin, xmax, ymax = x * side, y * side, (x + 1) * side, (y + 1) * side
+    if clamp_lonlat:
+        xmin, xmax = max(xmin, -180.0), min(xmax, 180.0)
+        ymin, ymax = max(ymin, -90.0), min(ymax, 90.0)
+        if xmin >= xmax or ymin >= ymax:
+            return None
+    return xmin, ymin, xmax, ymax
+
+
+def tile_wkt(tile: Tile, clamp_lonlat: bool = False) -> str:
+    """WKT polygon of the tile; optionally clamped to WGS84 lon/lat."""
+    xmin, ymin, xmax, ymax = tile_bounds(tile, clamp_lonlat)
+    return (
+        f"POLYGON(({xmin!r} {ymin!r}, {xmax!r} {ymin!r}, {xmax!r} {ymax!r}, "
+        f"{xmin!r} {ymax!r}, {xmin!r} {ymin!r}))"
+    )
+
+
+def tile_id(tile: Tile) -> str:
+    return "/".join(str(part) for part in tile)
+
+
+def _rows_size(rows: typing.Sequence[tuple]) -> int:
+    """Rough memory footprint of cached result rows."""
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += sys.getsizeof(row)
+        for value in row:
+            size += sys.getsizeof(value)
+    return size
+
+
+class TileEntry(typing.NamedTuple):
+    columns: typing.Tuple[str, ...]
+    rows: typing.List[tuple]
+    size: int
+
+
+class TileCache:
+    """Process-wide LRU cache of per-tile result rows."""
+
+    _instance = None
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(TileCache, cls).__new__(cls)
+            cls._instance._entries = collections.OrderedDict()
+            cls._instance._size = 0
+            cls._instance.max_bytes = TILE_CACHE_MAX_BYTES
+            cls._instance._lock = threading.Lock()
+        return cls._instance
+
+    def get(self, key: tuple) -> typing.Optional[TileEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(
+        self, key: tuple, columns: typing.Sequence[str], rows: typing.List[tuple]
+    ) -> TileEntry:
+        """Cache ``rows`` for ``key`` and return the entry.
+
+        A single tile larger than ``max_bytes`` is returned but not kept.
+        """
+        entry = TileEntry(tuple(columns), rows, _rows_size(rows))
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+            if entry.size > self.max_bytes:
+                return entry
+            self._entries[key] = entry
+            self._size += entry.size
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= evicted.size
+        return entry
+
+    def invalidate(self, layer_key: tuple) -> None:
+        """Drop every tile of one layer (after edits or a refresh)."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == layer_key]:
+                self._size -= self._entries.pop(key).size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def __len__(self) -> int:
+        return len(self._entries)
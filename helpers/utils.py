@@ -150,6 +150,20 @@ def get_qsettings() -> QSettings:
     )
 
 
+def is_layer_disk_cache_enabled() -> bool:
+    """Whether fully loaded layers are cached on disk (opt-in, off by default)."""
+    value = get_qsettings().value("options/layer_disk_cache", defaultValue=False)
+    if type(value) is str:
+        return value.lower() == "true"
+    return bool(value)
+
+
+def set_layer_disk_cache_enabled(enabled: bool) -> None:
+    settings = get_qsettings()
+    settings.setValue("options/layer_disk_cache", bool(enabled))
+    settings.sync()
+
+
 def write_to_log(string_to_write: str) -> None:
     """
     Writes the given string to a log file.
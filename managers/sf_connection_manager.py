@@ -1,14 +1,16 @@
 from collections import defaultdict
 from typing import Dict, List, Optional
+import contextlib
 import json
 import threading
+import time
 import typing
 import snowflake.connector
 
-from qgis.core import Qgis, QgsMessageLog
+from qgis.core import Qgis, QgsFeedback, QgsMessageLog
 
 from ..helpers.utils import get_auth_information
-from ..helpers.sql import quote_identifier
+from ..helpers.sql import quote_identifier, quote_literal
 
 
 _BASE_QUERY_TAG = "qgis-snowflake-connector"
@@ -20,6 +22,30 @@ _BASE_QUERY_TAG = "qgis-snowflake-connector"
 # normal loads/exports.
 _STATEMENT_TIMEOUT_SECONDS = 900
 
+# Upper bound on concurrent Snowflake sessions per connection name. Layers,
+# the browser, the locator and processing algorithms each check a session out
+# for the duration of a statement, so up to this many statements run in
+# parallel instead of queueing behind one shared session. Results are fetched
+# after the session is checked back in, so eight layers still stream their
+# rows concurrently.
+_MAX_SESSIONS_PER_CONNECTION = 4
+
+# Authentication types that can open extra sessions without user interaction.
+# SSO ("externalbrowser") would pop a browser window per session, so it keeps
+# a single one.
+_POOLED_CONNECTION_TYPES = ("Default Authentication", "Key Pair")
+
+# Delay between two status checks of a query submitted with execute_async. It
+# doubles from the first bound to the second while the query keeps running.
+_ASYNC_POLL_MIN_SECONDS = 0.2
+_ASYNC_POLL_MAX_SECONDS = 2.0
+
+# Consecutive status checks that may fail (dropped session, network error)
+# before an asynchronous query is given up on. The query keeps running
+# server-side, so each retry waits (with the polling backoff), reconnects and
+# asks again by its query id. A pinned session is never dropped.
+_ASYNC_STATUS_RETRIES = 3
+
 
 def build_op_tag(
     op: str,
@@ -43,6 +69,56 @@ def build_op_tag(
     return json.dumps(payload, separators=(",", ":"))
 
 
+def _opens_unattended(conn_params: dict) -> bool:
+    """Whether more sessions can be opened with ``conn_params`` without user
+    interaction (SSO pops a browser window per session)."""
+    return conn_params.get("authenticator") != "externalbrowser"
+
+
+class _SessionPool:
+    """Snowflake sessions opened for one connection name.
+
+    ``sessions`` holds every open session (the primary one, also exposed as
+    ``SFConnectionManager.opened_connections[name]``, comes first) and
+    ``idle`` the ones not currently checked out. ``opening`` counts sessions
+    being created outside the manager's lock, so the pool never grows past
+    ``max_size``. A closed pool (after ``connect``/``close_connection``) closes
+    its sessions as they are checked back in.
+    """
+
+    def __init__(self, conn_params: dict, max_size: int):
+        self.conn_params = conn_params
+        self.max_size = max_size
+        self.sessions: List[snowflake.connector.SnowflakeConnection] = []
+        self.idle: List[snowflake.connector.SnowflakeConnection] = []
+        self.opening = 0
+        self.closed = False
+
+
+def _feedback_progress(feedback: QgsFeedback) -> typing.Callable[[str, float], None]:
+    """``on_progress`` callback showing an asynchronous query's status as the
+    progress text of a processing ``feedback``."""
+    return lambda status, elapsed: feedback.setProgressText(
+        f"Snowflake query {status.lower()} ({elapsed:.0f} s)"
+    )
+
+
+class _AsyncQuery:
+    """Handle of a query submitted with ``execute_async``.
+
+    It is registered with the submitting thread's active cursors, so
+    ``cancel_pending_on_thread`` (a task's cancel) calls ``cancel`` and wakes
+    the polling loop, which then aborts the query server-side.
+    """
+
+    def __init__(self, sfqid: str):
+        self.sfqid = sfqid
+        self.cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+
 class SFConnectionManager:
     _instance = None
 
@@ -62,17 +138,31 @@ class SFConnectionManager:
         Initializes the SFConnectionManager object.
         """
         self.opened_connections: Dict[str, snowflake.connector.SnowflakeConnection] = {}
-        # A6: track the most recently-set active schema per connection so we
+        # Bounded pool of sessions per connection name (see _SessionPool);
+        # _pool_condition guards every pool and is notified on check-in.
+        self._pools: Dict[str, _SessionPool] = {}
+        # Sessions opened with paramstyle="qmark" for execute_many (server-side
+        # array binding); created on first use from the connection's pool.
+        self._bound_pools: Dict[str, _SessionPool] = {}
+        self._pool_condition = threading.Condition()
+        # A6: track the most recently-set active schema per session so we
         # can skip redundant `USE SCHEMA` round-trips on every execute_query.
-        self._active_schemas: Dict[str, str] = {}
-        # E3: track the most recently-set QUERY_TAG per connection so we only
+        self._active_schemas: Dict[snowflake.connector.SnowflakeConnection, str] = {}
+        # E3: track the most recently-set QUERY_TAG per session so we only
         # issue `ALTER SESSION SET QUERY_TAG` when the requested tag changes.
-        self._active_query_tags: Dict[str, str] = {}
+        self._active_query_tags: Dict[snowflake.connector.SnowflakeConnection, str] = {}
         # A9: track cursors currently executing, keyed by the thread that
         # owns them, so tasks can cancel their own queries on task.cancel()
         # without touching cursors running on other threads (e.g. the main
         # thread's feature iterator).
         self._active_cursors: Dict[int, List[snowflake.connector.cursor.SnowflakeCursor]] = defaultdict(list)
+        # Background batch prefetchers (helpers.batch_reader.BatchPrefetcher)
+        # keyed by the thread that owns the iterator, so cancelling that
+        # thread also stops its prefetch threads before they touch a
+        # cancelled cursor.
+        self._active_prefetchers: Dict[int, List[typing.Any]] = defaultdict(list)
+        # Sessions pinned by pinned_session(), per thread and connection name.
+        self._pinned = threading.local()
         self._lock = threading.Lock()
 
     def create_snowflake_connection(
@@ -98,9 +188,8 @@ class SFConnectionManager:
             None
         """
         try:
-            if connection_name in self.opened_connections:
-                self.opened_connections[connection_name].close()
-                self.opened_connections[connection_name] = None
+            self._close_pool(connection_name)
+            self.opened_connections.pop(connection_name, None)
 
             conn_params = {
                 "user": connection_params["username"],
@@ -134,18 +223,24 @@ class SFConnectionManager:
             if "role" in connection_params:
                 conn_params["role"] = connection_params["role"]
 
-            self.opened_connections[connection_name] = self.create_snowflake_connection(
-                conn_params
+            connection = self.create_snowflake_connection(conn_params)
+            pool = _SessionPool(
+                conn_params,
+                _MAX_SESSIONS_PER_CONNECTION
+                if connection_params["connection_type"] in _POOLED_CONNECTION_TYPES
+                else 1,
             )
-            # Fresh session: forget whatever schema / query tag we thought was
-            # active on the previous socket.
-            self._active_schemas.pop(connection_name, None)
-            self._active_query_tags[connection_name] = _BASE_QUERY_TAG
+            pool.sessions.append(connection)
+            pool.idle.append(connection)
+            # Fresh session: it starts with the base tag and no schema.
+            self._active_query_tags[connection] = _BASE_QUERY_TAG
+            with self._pool_condition:
+                self._pools[connection_name] = pool
+                self._pool_condition.notify_all()
+            self.opened_connections[connection_name] = connection
         except Exception as e:
             if connection_name in self.opened_connections:
                 del self.opened_connections[connection_name]
-            self._active_schemas.pop(connection_name, None)
-            self._active_query_tags.pop(connection_name, None)
             raise e
 
     def get_connection(
@@ -178,15 +273,206 @@ class SFConnectionManager:
         - None
         """
         try:
-            if connection_name in self.opened_connections:
-                connection = self.opened_connections[connection_name]
-                connection.close()
-                del connection
-            self._active_schemas.pop(connection_name, None)
-            self._active_query_tags.pop(connection_name, None)
+            self._close_pool(connection_name)
+            self.opened_connections.pop(connection_name, None)
         except Exception as e:
             raise e
 
+    def _close_pool(self, connection_name: str) -> None:
+        """Close the idle sessions of ``connection_name``'s pool; sessions
+        still checked out are closed when they are checked back in.
+        """
+        idle = []
+        with self._pool_condition:
+            for pools in (self._pools, self._bound_pools):
+                pool = pools.pop(connection_name, None)
+                if pool is None:
+                    continue
+                pool.closed = True
+                idle.extend(pool.idle)
+                pool.idle = []
+            # Wake threads waiting on these pools so they pick up new ones.
+            self._pool_condition.notify_all()
+        for session in idle:
+            self._close_session(session)
+
+    def _close_session(self, session: snowflake.connector.SnowflakeConnection) -> None:
+        self._active_schemas.pop(session, None)
+        self._active_query_tags.pop(session, None)
+        try:
+            session.close()
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"Closing a pooled Snowflake session failed: {e}",
+                "Snowflake Plugin",
+                Qgis.MessageLevel.Warning,
+            )
+
+    def checkout_session(
+        self, connection_name: str, qmark: bool = False
+    ) -> typing.Tuple[_SessionPool, snowflake.connector.SnowflakeConnection]:
+        """Take a session of ``connection_name`` for exclusive use.
+
+        Reuses an idle session, opens a new one while the pool is below its
+        size limit, and otherwise waits for one to be checked back in.
+        Connects (or reconnects) first if the connection has no pool or its
+        sessions expired. With ``qmark`` the session binds ``?`` parameters
+        server-side instead of the default client-side ``%s`` interpolation.
+        Pass the result to ``checkin_session`` when done. Inside
+        ``pinned_session`` the pinned session is returned.
+        """
+        pinned = self._pinned_sessions().get(connection_name)
+        if pinned is not None and not qmark:
+            return pinned
+        while True:
+            expired = None
+            with self._pool_condition:
+                pool = (self._bound_pools if qmark else self._pools).get(
+                    connection_name
+                )
+                if pool is None and qmark and connection_name in self._pools:
+                    base = self._pools[connection_name]
+                    if not _opens_unattended(base.conn_params):
+                        raise RuntimeError(
+                            "Parameter binding needs a session of its own, "
+                            "which an SSO connection cannot open without "
+                            "another browser login."
+                        )
+                    pool = _SessionPool(
+                        {**base.conn_params, "paramstyle": "qmark"}, base.max_size
+                    )
+                    self._bound_pools[connection_name] = pool
+                if pool is None:
+                    pass
+                elif pool.idle:
+                    session = pool.idle.pop()
+                    if not session.expired:
+                        return pool, session
+                    pool.sessions.remove(session)
+                    expired = session
+                elif len(pool.sessions) + pool.opening < pool.max_size:
+                    pool.opening += 1
+                else:
+                    self._pool_condition.wait()
+                    continue
+            if pool is None:
+                self.reconnect(connection_name)
+                continue
+            if expired is not None:
+                self._close_session(expired)
+                if expired is self.opened_connections.get(connection_name):
+                    # The primary session timed out: start over with fresh
+                    # credentials, as a single-session connection would.
+                    self.reconnect(connection_name)
+                continue
+            return pool, self._open_pooled_session(pool)
+
+    def _open_pooled_session(
+        self, pool: _SessionPool
+    ) -> snowflake.connector.SnowflakeConnection:
+        """Open one more session for ``pool`` (a slot is already reserved)."""
+        try:
+            session = self.create_snowflake_connection(pool.conn_params)
+        except Exception:
+            with self._pool_condition:
+                pool.opening -= 1
+                self._pool_condition.notify()
+            raise
+        self._active_query_tags[session] = _BASE_QUERY_TAG
+        with self._pool_condition:
+            pool.opening -= 1
+            pool.sessions.append(session)
+        return session
+
+    def checkin_session(
+        self,
+        pool: _SessionPool,
+        session: snowflake.connector.SnowflakeConnection,
+    ) -> None:
+        """Return a session taken with ``checkout_session`` to its pool."""
+        if self._is_pinned(session):
+            return
+        with self._pool_condition:
+            # A discarded session is no longer part of its pool.
+            if not pool.closed and session in pool.sessions:
+                pool.idle.append(session)
+                self._pool_condition.notify()
+                return
+        self._close_session(session)
+
+    def _is_pinned(self, session: snowflake.connector.SnowflakeConnection) -> bool:
+        """Whether ``session`` is pinned by the calling thread."""
+        return any(
+            pinned_session is session
+            for _, pinned_session in self._pinned_sessions().values()
+        )
+
+    def _pinned_sessions(self) -> Dict[str, tuple]:
+        pinned = getattr(self._pinned, "sessions", None)
+        if pinned is None:
+            pinned = self._pinned.sessions = {}
+        return pinned
+
+    @contextlib.contextmanager
+    def pinned_session(self, connection_name: str) -> typing.Iterator[None]:
+        """Run every statement the calling thread sends to
+        ``connection_name`` on one session until the block exits.
+
+        Needed by statement sequences that depend on session state, such as
+        temporary tables, which pooled sessions would otherwise split.
+        """
+        pinned = self._pinned_sessions()
+        if connection_name in pinned:
+            yield
+            return
+        pool, session = self.checkout_session(connection_name)
+        pinned[connection_name] = (pool, session)
+        try:
+            yield
+        finally:
+            del pinned[connection_name]
+            self.checkin_session(pool, session)
+
+    @contextlib.contextmanager
+    def session_cursor(
+        self, connection_name: str
+    ) -> typing.Iterator[snowflake.connector.cursor.SnowflakeCursor]:
+        """Yield a cursor on one session of ``connection_name`` for a
+        sequence of statements that shares session state, such as a
+        temporary stage.
+
+        The cursor is tracked like ``execute_query``'s, so
+        ``cancel_pending_on_thread`` cancels the statement it is running. It
+        is closed and its session checked back in when the block exits.
+        """
+        pool, session = self.checkout_session(connection_name)
+        try:
+            cursor = session.cursor()
+            tid = self._register_cursor(cursor)
+            try:
+                yield cursor
+            finally:
+                self._unregister_cursor(tid, cursor)
+                cursor.close()
+        finally:
+            self.checkin_session(pool, session)
+
+    def _discard_session(
+        self,
+        connection_name: str,
+        pool: _SessionPool,
+        session: snowflake.connector.SnowflakeConnection,
+    ) -> None:
+        """Drop a checked-out session that stopped working instead of
+        returning it to its pool."""
+        with self._pool_condition:
+            if session in pool.sessions:
+                pool.sessions.remove(session)
+            self._pool_condition.notify()
+        self._close_session(session)
+        if session is self.opened_connections.get(connection_name):
+            self.reconnect(connection_name)
+
     def create_cursor(
         self, connection_name: str
     ) -> snowflake.connector.cursor.SnowflakeCursor:
@@ -216,24 +502,24 @@ class SFConnectionManager:
     def _apply_schema_if_changed(
         self,
         cursor: snowflake.connector.cursor.SnowflakeCursor,
-        connection_name: str,
+        session: snowflake.connector.SnowflakeConnection,
         schema_name: Optional[str],
     ) -> None:
         """Issue `USE SCHEMA` only when the target differs from the cached
-        active schema for this connection (A6).
+        active schema for this session (A6).
         """
         if not schema_name:
             return
-        active = self._active_schemas.get(connection_name)
+        active = self._active_schemas.get(session)
         if active == schema_name:
             return
         cursor.execute(f'USE SCHEMA {quote_identifier(schema_name)}')
-        self._active_schemas[connection_name] = schema_name
+        self._active_schemas[session] = schema_name
 
     def _apply_query_tag_if_changed(
         self,
         cursor: snowflake.connector.cursor.SnowflakeCursor,
-        connection_name: str,
+        session: snowflake.connector.SnowflakeConnection,
         op_tag: Optional[str],
     ) -> None:
         """Issue `ALTER SESSION SET QUERY_TAG` only when the tag changes (E3).
@@ -243,7 +529,7 @@ class SFConnectionManager:
         tag the previous query set on the session.
         """
         effective = op_tag or _BASE_QUERY_TAG
-        active = self._active_query_tags.get(connection_name)
+        active = self._active_query_tags.get(session)
         if active == effective:
             return
         # effective is either the base tag constant or a build_op_tag() JSON
@@ -251,7 +537,7 @@ class SFConnectionManager:
         # escape for a Snowflake string literal is the single quote.
         escaped = effective.replace("'", "''")
         cursor.execute(f"ALTER SESSION SET QUERY_TAG = '{escaped}'")
-        self._active_query_tags[connection_name] = effective
+        self._active_query_tags[session] = effective
 
     def _register_cursor(
         self, cursor: snowflake.connector.cursor.SnowflakeCursor
@@ -294,16 +580,50 @@ class SFConnectionManager:
 
         cursor.close = _close_and_unregister
 
+    def register_prefetcher(self, prefetcher: typing.Any) -> int:
+        """Track a batch prefetcher under the calling thread so
+        ``cancel_pending_on_thread`` can stop it. Returns the thread id to
+        pass back to ``unregister_prefetcher``.
+        """
+        tid = threading.get_ident()
+        with self._lock:
+            self._active_prefetchers[tid].append(prefetcher)
+        return tid
+
+    def unregister_prefetcher(self, tid: int, prefetcher: typing.Any) -> None:
+        with self._lock:
+            lst = self._active_prefetchers.get(tid)
+            if not lst:
+                return
+            try:
+                lst.remove(prefetcher)
+            except ValueError:
+                pass
+            if not lst:
+                self._active_prefetchers.pop(tid, None)
+
     def cancel_pending_on_thread(self, thread_id: int) -> int:
         """Cancel every Snowflake query currently executing on `thread_id`.
 
         Called from another thread (typically the main UI thread when the
-        user hits Cancel on a QgsTask running on a worker thread).
+        user hits Cancel on a QgsTask running on a worker thread). Batch
+        prefetchers owned by that thread are stopped first so no background
+        fetch keeps reading from a cancelled cursor.
 
         Returns the number of cursors whose `cancel()` was invoked.
         """
         with self._lock:
+            prefetchers = self._active_prefetchers.pop(thread_id, [])
             cursors = list(self._active_cursors.get(thread_id, ()))
+        for prefetcher in prefetchers:
+            try:
+                prefetcher.stop()
+            except Exception as e:
+                QgsMessageLog.logMessage(
+                    f"prefetcher.stop() failed: {e}",
+                    "Snowflake Plugin",
+                    Qgis.MessageLevel.Warning,
+                )
         cancelled = 0
         for cursor in cursors:
             try:
@@ -340,14 +660,19 @@ class SFConnectionManager:
         Raises:
             Exception: If an error occurs while executing the query.
         """
-        cursor = self.create_cursor(connection_name)
+        pool, session = self.checkout_session(connection_name)
         schema_name = None
         if context_information is not None:
             schema_name = context_information.get("schema_name")
+        try:
+            cursor = session.cursor()
+        except Exception:
+            self.checkin_session(pool, session)
+            raise
         tid = self._register_cursor(cursor)
         try:
-            self._apply_schema_if_changed(cursor, connection_name, schema_name)
-            self._apply_query_tag_if_changed(cursor, connection_name, op_tag)
+            self._apply_schema_if_changed(cursor, session, schema_name)
+            self._apply_query_tag_if_changed(cursor, session, op_tag)
             cursor.execute(query)
         except Exception as e:
             self._unregister_cursor(tid, cursor)
@@ -358,6 +683,10 @@ class SFConnectionManager:
                 Qgis.MessageLevel.Critical,
             )
             raise e
+        finally:
+            # The statement has run; fetching its results does not depend on
+            # the session's schema or tag, so the session can serve others.
+            self.checkin_session(pool, session)
         self._wire_close_to_unregister(cursor, tid)
         return cursor
 
@@ -394,21 +723,239 @@ class SFConnectionManager:
             Exception: Propagates any exception raised by the underlying
                 Snowflake connector during cursor creation or query execution.
         """
-        cursor = self.create_cursor(connection_name)
+        pool, session = self.checkout_session(connection_name)
         schema_name = None
         if context_information is not None:
             schema_name = context_information.get("schema_name")
+        try:
+            cursor = session.cursor()
+        except Exception:
+            self.checkin_session(pool, session)
+            raise
         tid = self._register_cursor(cursor)
         try:
-            self._apply_schema_if_changed(cursor, connection_name, schema_name)
-            self._apply_query_tag_if_changed(cursor, connection_name, op_tag)
+            self._apply_schema_if_changed(cursor, session, schema_name)
+            self._apply_query_tag_if_changed(cursor, session, op_tag)
             cursor.execute(query, params=params)
         except Exception as e:
             self._unregister_cursor(tid, cursor)
             raise e
+        finally:
+            self.checkin_session(pool, session)
+        self._wire_close_to_unregister(cursor, tid)
+        return cursor
+
+    def supports_bound_parameters(self, connection_name: str) -> bool:
+        """Whether ``execute_many`` can run on ``connection_name``.
+
+        The qmark paramstyle is fixed when a session opens, so ``execute_many``
+        needs a session of its own. SSO connections cannot open one without
+        another browser login.
+        """
+        with self._pool_condition:
+            pool = self._pools.get(connection_name)
+        if pool is None:
+            self.reconnect(connection_name)
+            with self._pool_condition:
+                pool = self._pools.get(connection_name)
+        return pool is not None and _opens_unattended(pool.conn_params)
+
+    def execute_many(
+        self,
+        connection_name: str,
+        query: str,
+        rows: typing.Sequence[typing.Sequence],
+        context_information: Dict[str, typing.Union[str, None]] = None,
+        op_tag: Optional[str] = None,
+    ) -> int:
+        """Run ``query`` (with ``?`` placeholders) once for every row of
+        ``rows`` through ``cursor.executemany``.
+
+        For ``INSERT`` statements the connector sends the rows as bound
+        arrays in a single request (staging them first when there are many),
+        so no SQL text grows with the row count. Returns the cursor's
+        ``rowcount``.
+        """
+        pool, session = self.checkout_session(connection_name, qmark=True)
+        schema_name = None
+        if context_information is not None:
+            schema_name = context_information.get("schema_name")
+        try:
+            cursor = session.cursor()
+            tid = self._register_cursor(cursor)
+            try:
+                self._apply_schema_if_changed(cursor, session, schema_name)
+                self._apply_query_tag_if_changed(cursor, session, op_tag)
+                cursor.executemany(query, rows)
+                return cursor.rowcount
+            finally:
+                self._unregister_cursor(tid, cursor)
+                cursor.close()
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"execute_many failed: {e}\n"
+                f"Query (first 2000 chars): {query[:2000]}",
+                "Snowflake Plugin",
+                Qgis.MessageLevel.Critical,
+            )
+            raise e
+        finally:
+            self.checkin_session(pool, session)
+
+    def execute_query_async(
+        self,
+        connection_name: str,
+        query: str,
+        context_information: Dict[str, typing.Union[str, None]] = None,
+        op_tag: Optional[str] = None,
+        is_canceled: Optional[typing.Callable[[], bool]] = None,
+        on_progress: Optional[typing.Callable[[str, float], None]] = None,
+        feedback: Optional[QgsFeedback] = None,
+    ) -> snowflake.connector.cursor.SnowflakeCursor:
+        """Submit ``query`` with ``execute_async`` and wait for it by
+        polling its status, instead of blocking in ``cursor.execute``.
+
+        A session is only held to submit the query, for each status check
+        and to open the results, so a long statement does not pin one of the
+        connection's sessions. When a status check fails (dropped session,
+        network error) the session is discarded, unless it is pinned, and the
+        next check runs on a new one: the query keeps running server-side and
+        is found again by its query id.
+
+        ``is_canceled`` (e.g. ``feedback.isCanceled``) is checked between
+        polls; it and ``cancel_pending_on_thread`` abort the query with
+        ``SYSTEM$CANCEL_QUERY``. ``on_progress`` receives the query status
+        name and the elapsed seconds after each check. A processing
+        ``feedback`` stands in for both: its Cancel button aborts the query
+        and its progress text shows the status.
+
+        Returns:
+            snowflake.connector.cursor.SnowflakeCursor: A cursor over the
+            query's results, as returned by ``execute_query``.
+        """
+        if feedback is not None:
+            is_canceled = is_canceled or feedback.isCanceled
+            on_progress = on_progress or _feedback_progress(feedback)
+        pool, session = self.checkout_session(connection_name)
+        schema_name = None
+        if context_information is not None:
+            schema_name = context_information.get("schema_name")
+        try:
+            cursor = session.cursor()
+            try:
+                self._apply_schema_if_changed(cursor, session, schema_name)
+                self._apply_query_tag_if_changed(cursor, session, op_tag)
+                cursor.execute_async(query)
+                sfqid = cursor.sfqid
+            finally:
+                cursor.close()
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"execute_query_async failed: {e}\n"
+                f"Query (first 2000 chars): {query[:2000]}",
+                "Snowflake Plugin",
+                Qgis.MessageLevel.Critical,
+            )
+            raise e
+        finally:
+            self.checkin_session(pool, session)
+
+        handle = _AsyncQuery(sfqid)
+        tid = self._register_cursor(handle)
+        try:
+            self._wait_for_query(connection_name, handle, is_canceled, on_progress)
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"execute_query_async failed: {e}\n"
+                f"Query id: {sfqid}\n"
+                f"Query (first 2000 chars): {query[:2000]}",
+                "Snowflake Plugin",
+                Qgis.MessageLevel.Critical,
+            )
+            raise e
+        finally:
+            self._unregister_cursor(tid, handle)
+
+        pool, session = self.checkout_session(connection_name)
+        try:
+            cursor = session.cursor()
+            tid = self._register_cursor(cursor)
+            try:
+                cursor.get_results_from_sfqid(sfqid)
+            except Exception:
+                self._unregister_cursor(tid, cursor)
+                raise
+        finally:
+            self.checkin_session(pool, session)
         self._wire_close_to_unregister(cursor, tid)
         return cursor
 
+    def _wait_for_query(
+        self,
+        connection_name: str,
+        handle: _AsyncQuery,
+        is_canceled: Optional[typing.Callable[[], bool]],
+        on_progress: Optional[typing.Callable[[str, float], None]],
+    ) -> None:
+        """Poll the status of ``handle``'s query until it is no longer
+        running; raise its error if it failed."""
+        started = time.monotonic()
+        delay = _ASYNC_POLL_MIN_SECONDS
+        failed_checks = 0
+        while True:
+            if handle.cancelled.is_set() or (is_canceled is not None and is_canceled()):
+                self._cancel_async_query(connection_name, handle.sfqid)
+                raise snowflake.connector.errors.ProgrammingError(
+                    msg=f"SQL execution canceled: {handle.sfqid}", errno=604
+                )
+            pool, session = self.checkout_session(connection_name)
+            try:
+                status = session.get_query_status(handle.sfqid)
+            except Exception as e:
+                failed_checks += 1
+                QgsMessageLog.logMessage(
+                    f"Status check of query {handle.sfqid} failed "
+                    f"({failed_checks}/{_ASYNC_STATUS_RETRIES}): {e}",
+                    "Snowflake Plugin",
+                    Qgis.MessageLevel.Warning,
+                )
+                if self._is_pinned(session):
+                    # The caller's open transaction lives on that session;
+                    # closing it is the caller's decision.
+                    self.checkin_session(pool, session)
+                else:
+                    self._discard_session(connection_name, pool, session)
+                if failed_checks >= _ASYNC_STATUS_RETRIES:
+                    raise e
+                handle.cancelled.wait(delay)
+                delay = min(delay * 2, _ASYNC_POLL_MAX_SECONDS)
+                continue
+            try:
+                if not session.is_still_running(status):
+                    if session.is_an_error(status):
+                        session.get_query_status_throw_if_error(handle.sfqid)
+                    return
+            finally:
+                self.checkin_session(pool, session)
+            failed_checks = 0
+            if on_progress is not None:
+                on_progress(status.name, time.monotonic() - started)
+            handle.cancelled.wait(delay)
+            delay = min(delay * 2, _ASYNC_POLL_MAX_SECONDS)
+
+    def _cancel_async_query(self, connection_name: str, sfqid: str) -> None:
+        try:
+            cursor = self.execute_query(
+                connection_name, f"SELECT SYSTEM$CANCEL_QUERY({quote_literal(sfqid)})"
+            )
+            cursor.close()
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"Cancelling query {sfqid} failed: {e}",
+                "Snowflake Plugin",
+                Qgis.MessageLevel.Warning,
+            )
+
     def reconnect(self, connection_name: str) -> None:
         """
         Reconnects to the specified Snowflake connection.
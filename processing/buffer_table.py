@@ -182,33 +182,38 @@ class BufferTableAlgorithm(QgsProcessingAlgorithm):
                 f"FROM {qs}.{qt}"
             ]
 
-        try:
-            for step_sql in steps:
-                feedback.pushInfo(f"Running buffer ({col_type}): {step_sql}")
-                mgr.execute_query(connection_name, step_sql, ctx)
-            count_cursor = mgr.execute_query(
-                connection_name,
-                f"SELECT COUNT(*) FROM {qs}.{qo}",  # nosec B608 - identifiers escaped via quote_identifier
-                ctx,
-            )
-            count_result = count_cursor.fetchone() if count_cursor else None
-            if count_cursor:
-                count_cursor.close()
-            row_count = count_result[0] if count_result else 0
-            summary = f"Buffer complete. Output table {output} has {row_count} rows."
-            feedback.pushInfo(summary)
-        except Exception as e:
-            summary = f"Error: {e}"
-            feedback.reportError(summary)
-        finally:
-            for qtmp in temp_tables:
-                try:
-                    mgr.execute_query(
-                        connection_name,
-                        f"DROP TABLE IF EXISTS {qs}.{qtmp}",  # nosec B608 - identifiers escaped via quote_identifier
-                        ctx,
-                    )
-                except Exception:
-                    pass
+        # Temporary tables only exist in the session that created them, so
+        # every step runs on one session of the connection's pool.
+        with mgr.pinned_session(connection_name):
+            try:
+                for step_sql in steps:
+                    feedback.pushInfo(f"Running buffer ({col_type}): {step_sql}")
+                    mgr.execute_query_async(
+                        connection_name, step_sql, ctx, feedback=feedback
+                    ).close()
+                count_cursor = mgr.execute_query(
+                    connection_name,
+                    f"SELECT COUNT(*) FROM {qs}.{qo}",  # nosec B608 - identifiers escaped via quote_identifier
+                    ctx,
+                )
+                count_result = count_cursor.fetchone() if count_cursor else None
+                if count_cursor:
+                    count_cursor.close()
+                row_count = count_result[0] if count_result else 0
+                summary = f"Buffer complete. Output table {output} has {row_count} rows."
+                feedback.pushInfo(summary)
+            except Exception as e:
+                summary = f"Error: {e}"
+                feedback.reportError(summary)
+            finally:
+                for qtmp in temp_tables:
+                    try:
+                        mgr.execute_query(
+                            connection_name,
+                            f"DROP TABLE IF EXISTS {qs}.{qtmp}",  # nosec B608 - identifiers escaped via quote_identifier
+                            ctx,
+                        )
+                    except Exception:
+                        pass
 
         return {self.OUTPUT: summary}
@@ -139,7 +139,9 @@ class H3IndexAlgorithm(QgsProcessingAlgorithm):
         feedback.pushInfo(f"Running H3 indexing at resolution {resolution}: {sql}")
 
         try:
-            mgr.execute_query(connection_name, sql, {"schema_name": schema})
+            mgr.execute_query_async(
+                connection_name, sql, {"schema_name": schema}, feedback=feedback
+            ).close()
             count_cursor = mgr.execute_query(
                 connection_name,
                 f"SELECT COUNT(*) FROM {qs}.{qo}",  # nosec B608 - identifiers escaped via quote_identifier
@@ -1,6 +1,6 @@
 """Import from Snowflake -- download a Snowflake table to a local vector layer."""
 
-import datetime
+import itertools
 import os
 from decimal import Decimal
 
@@ -13,6 +13,7 @@ from qgis.core import (
     QgsFields,
     QgsField,
     QgsFeature,
+    QgsFeatureSink,
     QgsGeometry,
     QgsWkbTypes,
     QgsCoordinateReferenceSystem,
@@ -22,6 +23,13 @@ from qgis.PyQt.QtGui import QIcon
 
 _IMAGES_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "ui", "images")
 
+# Rows pulled per fetchmany() call and handed to the sink per addFeatures().
+_FETCH_BATCH_ROWS = 10_000
+
+# Upper bound for the PARTITIONS parameter. Each partition is one query
+# executed on the connection's session pool and fetched on its own thread.
+_MAX_PARTITIONS = 16
+
 
 _GEO_TYPE_TO_WKB = {
     "Point": QgsWkbTypes.Point,
@@ -60,6 +68,73 @@ def _pick_wkb_type(geo_types):
     return QgsWkbTypes.GeometryCollection
 
 
+def _decimal_to_float(val):
+    # NUMBER columns with a scale come back as Decimal, integers as int.
+    return float(val) if isinstance(val, Decimal) else val
+
+
+def _to_qdatetime(val):
+    return QDateTime(
+        QDate(val.year, val.month, val.day),
+        QTime(val.hour, val.minute, val.second, val.microsecond // 1000),
+    )
+
+
+def _to_qdate(val):
+    return QDate(val.year, val.month, val.day)
+
+
+def _to_qtime(val):
+    return QTime(val.hour, val.minute, val.second, val.microsecond // 1000)
+
+
+# Snowflake NUMBER columns come back as Decimal, and TIMESTAMP/DATE/TIME
+# columns come back as Python datetime objects. The memory/OGR providers
+# cannot store either raw Python type into their target field (the whole
+# feature is silently rejected), so those columns are converted to the
+# matching Qt type. Every other DATA_TYPE is written as fetched.
+_COLUMN_CONVERTERS = {
+    "NUMBER": _decimal_to_float,
+    "DATE": _to_qdate,
+    "TIME": _to_qtime,
+    "TIMESTAMP_NTZ": _to_qdatetime,
+    "TIMESTAMP_LTZ": _to_qdatetime,
+    "TIMESTAMP_TZ": _to_qdatetime,
+}
+
+
+def _column_converters(col_types):
+    """Return ``(column index, converter)`` for the columns that need one."""
+    return [
+        (idx, _COLUMN_CONVERTERS[col_type])
+        for idx, col_type in enumerate(col_types)
+        if col_type in _COLUMN_CONVERTERS
+    ]
+
+
+def _rows_to_features(rows, fields, converters):
+    """Build features from a batch of ``(attribute, ..., wkb)`` rows.
+
+    The batch is transposed so each converter runs over a whole column;
+    columns without a converter are passed through untouched.
+    """
+    columns = list(zip(*rows))
+    for idx, converter in converters:
+        columns[idx] = [None if v is None else converter(v) for v in columns[idx]]
+    attribute_rows = (
+        zip(*columns[:-1]) if len(columns) > 1 else itertools.repeat((), len(rows))
+    )
+    features = []
+    for attributes, wkb in zip(attribute_rows, columns[-1]):
+        feat = QgsFeature(fields)
+        feat.setAttributes(list(attributes))
+        if wkb is not None:
+            geom = QgsGeometry()
+            geom.fromWkb(bytes(wkb) if not isinstance(wkb, bytes) else wkb)
+            feat.setGeometry(geom)
+        features.append(feat)
+    return features
+
 class ImportFromSnowflakeAlgorithm(QgsProcessingAlgorithm):
 
     CONNECTION = "CONNECTION"
@@ -68,6 +143,7 @@ class ImportFromSnowflakeAlgorithm(QgsProcessingAlgorithm):
     GEO_COLUMN = "GEO_COLUMN"
     WHERE_CLAUSE = "WHERE_CLAUSE"
     LIMIT = "LIMIT"
+    PARTITIONS = "PARTITIONS"
     OUTPUT = "OUTPUT"
 
     def name(self):
@@ -85,7 +161,9 @@ class ImportFromSnowflakeAlgorithm(QgsProcessingAlgorithm):
     def shortHelpString(self):
         return self.tr(
             "Downloads features from a Snowflake table into a local vector layer. "
-            "Supports optional WHERE filtering and row limit."
+            "Supports optional WHERE filtering and row limit. Without a row "
+            "limit, the table can be read as several hash partitions fetched "
+            "in parallel."
         )
 
     def icon(self):
@@ -119,12 +197,18 @@ class ImportFromSnowflakeAlgorithm(QgsProcessingAlgorithm):
             type=QgsProcessingParameterNumber.Integer,
             defaultValue=50000, minValue=0,
         ))
+        self.addParameter(QgsProcessingParameterNumber(
+            self.PARTITIONS, self.tr("Parallel partitions (unlimited imports only)"),
+            type=QgsProcessingParameterNumber.Integer,
+            defaultValue=1, minValue=1, maxValue=_MAX_PARTITIONS, optional=True,
+        ))
         self.addParameter(QgsProcessingParameterFeatureSink(
             self.OUTPUT, self.tr("Output layer"),
         ))
 
     def processAlgorithm(self, parameters, context, feedback):
         from ..helpers.data_base import (
+            get_declared_primary_key,
             get_geo_column_type,
             get_srid_from_table_geo_column,
             get_type_from_table_geo_column,
@@ -136,6 +220,7 @@ class ImportFromSnowflakeAlgorithm(QgsProcessingAlgorithm):
             predicate_has_statement_breakers,
         )
         from ..helpers.mappings import create_qgs_field
+        from ..helpers.partitioned_fetch import PartitionedFetcher, partition_queries
         from ..managers.sf_connection_manager import SFConnectionManager
 
         connection_name = self.parameterAsString(parameters, self.CONNECTION, context)
@@ -144,6 +229,7 @@ class ImportFromSnowflakeAlgorithm(QgsProcessingAlgorithm):
         geo_col = self.parameterAsString(parameters, self.GEO_COLUMN, context)
         where = self.parameterAsString(parameters, self.WHERE_CLAUSE, context)
         limit = self.parameterAsInt(parameters, self.LIMIT, context)
+        partitions = self.parameterAsInt(parameters, self.PARTITIONS, context) or 1
 
         auth = get_auth_information(connection_name)
         mgr = SFConnectionManager.get_instance()
@@ -206,12 +292,14 @@ class ImportFromSnowflakeAlgorithm(QgsProcessingAlgorithm):
         }
 
         col_names = []
+        col_types = []
         for col_name, col_type in col_rows:
             if col_name.upper() == geo_col.upper():
                 continue
             qt_type = type_map.get(col_type, QMetaType.Type.QString)
             fields.append(create_qgs_field(col_name, qt_type))
             col_names.append(col_name)
+            col_types.append(col_type)
 
         crs = QgsCoordinateReferenceSystem.fromEpsgId(int(srid))
         (sink, dest_id) = self.parameterAsSink(
@@ -236,47 +324,78 @@ class ImportFromSnowflakeAlgorithm(QgsProcessingAlgorithm):
         if limit > 0:
             sql += f" LIMIT {limit}"
 
-        feedback.pushInfo(f"Executing: {sql}")
-        row_cursor = mgr.execute_query(connection_name, sql, {"schema_name": schema})
-        rows = row_cursor.fetchall() if row_cursor else []
-        if row_cursor:
-            row_cursor.close()
+        if partitions > 1 and limit > 0:
+            # A LIMIT cannot be split across hash partitions.
+            feedback.pushInfo(
+                "Parallel partitions are only used without a row limit; "
+                "fetching with a single query."
+            )
+            partitions = 1
+
+        converters = _column_converters(col_types)
+        ctx = {"schema_name": schema}
+        if partitions > 1:
+            # Partition on the declared primary key. Without one, hash every
+            # fetched column (the WKB when there are none), so each row still
+            # lands in exactly one slice.
+            primary_key = get_declared_primary_key(ctx_info)
+            partition_key = (
+                quote_identifier(primary_key)
+                if primary_key in col_names
+                else select_cols or "_wkb"
+            )
+            queries = partition_queries(sql, partition_key, partitions)
+            feedback.pushInfo(f"Executing in {partitions} partitions: {queries[0]}")
+            fetcher = PartitionedFetcher(
+                mgr, connection_name, queries, _FETCH_BATCH_ROWS, ctx,
+                convert_batch=lambda rows: _rows_to_features(rows, fields, converters),
+            )
+            try:
+                imported = self._write_features(
+                    sink, fetcher.batches(), lambda: fetcher.row_count, feedback
+                )
+            finally:
+                fetcher.stop()
+        else:
+            feedback.pushInfo(f"Executing: {sql}")
+            row_cursor = mgr.execute_query(connection_name, sql, ctx)
+            imported = 0
+            if row_cursor:
+                try:
+                    # rowcount is known once the query has run; batches are
+                    # pulled with fetchmany() so memory stays flat for
+                    # unlimited imports.
+                    total = row_cursor.rowcount or 0
+                    batches = (
+                        _rows_to_features(rows, fields, converters)
+                        for rows in iter(
+                            lambda: row_cursor.fetchmany(_FETCH_BATCH_ROWS), []
+                        )
+                    )
+                    imported = self._write_features(
+                        sink, batches, lambda: total, feedback
+                    )
+                finally:
+                    row_cursor.close()
+
+        feedback.setProgress(100)
+        feedback.pushInfo(f"Imported {imported} features from {fq_table}")
+        return {self.OUTPUT: dest_id}
 
-        total = len(rows)
-        for i, row in enumerate(rows):
+    def _write_features(self, sink, batches, total, feedback):
+        """Write feature batches to ``sink``; ``total()`` is the expected row
+        count for progress (0 while unknown). Returns the features written."""
+        imported = 0
+        for features in batches:
             if feedback.isCanceled():
                 break
-
-            feat = QgsFeature(fields)
-            for j, val in enumerate(row[:-1]):
-                # Snowflake NUMBER columns come back as Decimal, and TIMESTAMP/
-                # DATE/TIME columns come back as Python datetime objects. The
-                # memory/OGR providers cannot store either raw Python type into
-                # their target field (the whole feature is silently rejected),
-                # so coerce them to the matching Qt type first.
-                if isinstance(val, Decimal):
-                    val = float(val)
-                elif isinstance(val, datetime.datetime):
-                    val = QDateTime(
-                        QDate(val.year, val.month, val.day),
-                        QTime(val.hour, val.minute, val.second,
-                              val.microsecond // 1000),
-                    )
-                elif isinstance(val, datetime.date):
-                    val = QDate(val.year, val.month, val.day)
-                elif isinstance(val, datetime.time):
-                    val = QTime(val.hour, val.minute, val.second,
-                                val.microsecond // 1000)
-                feat.setAttribute(j, val)
-
-            wkb = row[-1]
-            if wkb is not None:
-                geom = QgsGeometry()
-                geom.fromWkb(bytes(wkb) if not isinstance(wkb, bytes) else wkb)
-                feat.setGeometry(geom)
-
-            sink.addFeature(feat)
-            feedback.setProgress(int((i + 1) / total * 100) if total else 100)
-
-        feedback.pushInfo(f"Imported {total} features from {fq_table}")
-        return {self.OUTPUT: dest_id}
+            if not sink.addFeatures(features, QgsFeatureSink.FastInsert):
+                raise QgsProcessingException(
+                    self.tr("Could not write features to the output layer")
+                )
+            imported += len(features)
+            row_total = total()
+            feedback.setProgress(
+                min(100, int(imported / row_total * 100)) if row_total else 0
+            )
+        return imported
@@ -195,7 +195,9 @@ class SpatialJoinAlgorithm(QgsProcessingAlgorithm):
         feedback.pushInfo(f"Running spatial join: {sql}")
 
         try:
-            mgr.execute_query(connection_name, sql, ctx)
+            mgr.execute_query_async(
+                connection_name, sql, ctx, feedback=feedback
+            ).close()
             count_cursor = mgr.execute_query(
                 connection_name,
                 f"SELECT COUNT(*) FROM {qs}.{qo}",  # nosec B608 - identifiers escaped via quote_identifier
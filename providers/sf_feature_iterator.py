@@ -3,13 +3,21 @@ from __future__ import (
     annotations,  # used to manage type annotation for method that return Self in Python < 3.11
 )
 
-from typing import Any, Callable
+import importlib.util
+import itertools
+import math
+import weakref
+from typing import Any, Callable, Iterator, List, Optional, Tuple
 
 from qgis.PyQt.QtCore import QDate, QDateTime, QMetaType, QTime
 
 # PyQGIS
+from ..helpers.batch_reader import BatchPrefetcher, BatchReader
+from ..helpers.feature_query import layer_query, projected_field_names, select_list
+from ..helpers.feature_store import FeatureStore
 from ..helpers.limits import limit_size_for_type
 from ..helpers.sql import quote_identifier, quote_literal
+from ..helpers.tile_cache import TileCache, tile_id, tile_wkt, tiles_for_rect
 from ..helpers.expression_compiler import compile_expression_to_sql
 from ..managers.sf_connection_manager import build_op_tag
 from ..providers.sf_feature_source import SFFeatureSource
@@ -21,10 +29,37 @@ from qgis.core import (
     QgsFeatureRequest,
     QgsGeometry,
     QgsMessageLog,
+    QgsSimplifyMethod,
     Qgis,
 )
 from ..helpers.mappings import mapping_multi_single_to_geometry_type
 
+# The Snowflake connector only exposes its Arrow result batches
+# (cursor.fetch_arrow_batches) when pyarrow is installed; without it the
+# iterator keeps using the row-tuple fetchmany() path.
+_ARROW_FETCH_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+# Fetch the next batch on a background thread while the current one is turned
+# into features, so network round-trips overlap with decoding.
+_PREFETCH_BATCHES = True
+
+# Serve rect-filtered requests of primary-keyed layers through the shared
+# tile cache (helpers/tile_cache.py) so overlapping viewports reuse rows.
+_TILE_CACHE_ENABLED = True
+
+# Honour the render request's simplify method with a server-side ST_SIMPLIFY
+# (level of detail), so small-scale renders ship simplified geometries.
+_SERVER_SIDE_SIMPLIFY = True
+
+# Metres per degree of latitude, to turn a lon/lat tolerance into the metres
+# ST_SIMPLIFY expects for GEOGRAPHY.
+_METRES_PER_DEGREE = 111_320.0
+
+# Largest FilterFids request pushed down as WHERE pk IN (...). Bigger ones
+# (select-all in the attribute table, say) load the layer into the feature
+# cache and resolve the ids there, which keeps the SQL text bounded.
+_MAX_PUSHED_DOWN_FIDS = 10_000
+
 
 def _rect_is_valid_lonlat(rect) -> bool:
     """Return True when every corner of ``rect`` falls inside the WGS84
@@ -45,7 +80,9 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
         source: SFFeatureSource,
         request: QgsFeatureRequest,
     ):
-        self._cursor_batch_rows = []
+        self._rows: Optional[BatchReader] = None
+        self._prefetcher: Optional[BatchPrefetcher] = None
+        self._prefetcher_tid = None
         super().__init__(request)
         self._provider = source.get_provider()
         # Initialized unconditionally: nextFeatureFilterExpression() reads
@@ -60,6 +97,19 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
         # Initialized unconditionally: fetchFeature() reads self._target_fids
         # even when __init__ returns early (invalid provider / CRS exception).
         self._target_fids = None
+        # FilterFids too large to push down as an IN list on a layer that is
+        # not cached after all (load-all mode); fetchFeature() drops the rows
+        # of other fids.
+        self._unpushed_fids = None
+        # Cached rows matching the request's filter rect, looked up through
+        # the feature cache's spatial index on the first cached fetch.
+        self._candidate_rows: Optional[List[int]] = None
+        # Arrow fetch state (see _open_arrow_batches). None means the iterator
+        # streams row tuples through fetchmany().
+        self._arrow_batches = None
+        # Stitched rows of a tile-cached viewport request (see _read_tiles).
+        self._tile_rows: Optional[List[tuple]] = None
+        self._simplify_tolerance: Optional[float] = None
 
         self._request = request if request is not None else QgsFeatureRequest()
         self._transform = QgsCoordinateTransform()
@@ -85,12 +135,23 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
 
         if getattr(self._provider, "_load_all_rows", False):
             self._provider._features_loaded = False
-            self._provider._features = []
+            self._provider._features = FeatureStore()
+
+        # Feature ids are the primary key values when the provider has an
+        # integer, verified-unique key (uses_primary_key_fids); the attribute
+        # index of that key, else None. Otherwise they are the 0-based fetch
+        # order of the result set (f.setId(self._index)).
+        self._fid_attribute: Optional[int] = None
+        if self._provider.uses_primary_key_fids():
+            self._fid_attribute = self._provider.fields().indexOf(
+                self._provider.primary_key()
+            )
 
-        # FilterFid/FilterFids cannot be resolved in SQL: feature ids are the
-        # 0-based fetch order of the result set (f.setId(self._index)), not the
-        # primary key. Capture the requested fids and make sure the in-memory
-        # cache exists so fetchFeature() can resolve them locally.
+        # FilterFid/FilterFids: with primary-key fids they are pushed down as
+        # WHERE pk IN (...) below, up to _MAX_PUSHED_DOWN_FIDS of them.
+        # Fetch-order fids cannot be resolved in SQL: capture the requested
+        # fids and make sure the in-memory cache exists so fetchFeature() can
+        # resolve them locally. Larger key-fid requests take that path too.
         ftype = self._request.filterType()
         if ftype in (
             QgsFeatureRequest.FilterFid,
@@ -101,10 +162,18 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
                 if ftype == QgsFeatureRequest.FilterFid
                 else list(self._request.filterFids())
             )
-            if not self._provider._features_loaded:
+            if not self._provider._features_loaded and (
+                self._fid_attribute is None
+                or len(self._target_fids) > _MAX_PUSHED_DOWN_FIDS
+            ):
                 for _ in self._provider.getFeatures(QgsFeatureRequest()):
                     pass
 
+        if not self._provider._features_loaded and not getattr(
+            self._provider, "_load_all_rows", False
+        ):
+            self._provider.restore_cached_features()
+
         if not self._provider._features_loaded:
             geom_column = self._provider.get_geometry_column()
 
@@ -116,56 +185,48 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
                 QMetaType.Type.Double: float,
             }
 
-            self._attributes_converters = {}
-            for idx in range(len(self._provider.fields())):
-                self._attributes_converters[idx] = lambda x: x
-
-            # Check if field needs to be converted
-            self._attributes_need_conversion = False
+            # Converters keyed by attribute index, resolved once per query.
+            # Fields without an entry are passed through untouched.
+            self._attributes_converters: dict[int, Callable[[Any], Any]] = {}
             for field_type, converter in attributes_conversion_functions.items():
                 for index in self._provider.get_field_index_by_type(field_type):
-                    self._attributes_need_conversion = True
                     self._attributes_converters[index] = converter
 
             # Fields list that needs to be retrieved
             self._request_sub_attributes = (
                 self._request.flags() & QgsFeatureRequest.Flag.SubsetOfAttributes
             )
+            # The requested attributes are selected whatever the filters are:
+            # every predicate below runs in the inner query, where it sees all
+            # of the layer's columns (see helpers/feature_query.py).
+            list_field_names = projected_field_names(
+                self._provider.fields().names(),
+                (
+                    list(self._request.subsetOfAttributes())
+                    if self._request_sub_attributes
+                    else None
+                ),
+                self._provider.primary_key(),
+            )
+            self.index_geom_column = len(list_field_names)
+
+            # FilterFid/FilterFids only get here with primary-key fids (see the
+            # top of __init__). The predicate goes into the inner query, where
+            # the key column is not also selected a second time as the index.
+            filter_fid_clause = ""
             if (
-                self._request_sub_attributes
-                and not self._provider.subsetString()
-                and len(self._request.subsetOfAttributes()) > 0
+                self._target_fids is not None
+                and len(self._target_fids) > _MAX_PUSHED_DOWN_FIDS
             ):
-                idx_required = [idx for idx in self._request.subsetOfAttributes()]
-
-                # The primary key column must be added if it is not present in the field list.
-                if (
-                    self._provider.primary_key() != ""
-                    and self._provider.primary_key() not in idx_required
-                ):
-                    idx_required.append(self._provider.primary_key())
-
-                list_field_names = [
-                    self._provider.fields()[idx].name()
-                    for idx in idx_required
-                ]
-            else:
-                list_field_names = [
-                    field.name() for field in self._provider.fields()
-                ]
-
-            if len(list_field_names) > 0:
-                fields_name_for_query = ", ".join(quote_identifier(n) for n in list_field_names)
-            else:
-                fields_name_for_query = ""
-
-            if fields_name_for_query:
-                fields_name_for_query += ","
-            self.index_geom_column = len(list_field_names)
+                self._unpushed_fids = set(self._target_fids)
+            elif self._target_fids is not None:
+                fid_literals = ", ".join(str(int(fid)) for fid in self._target_fids)
+                filter_fid_clause = (
+                    f"{quote_identifier(self._provider.primary_key())} IN ({fid_literals})"
+                    if fid_literals
+                    else "FALSE"
+                )
 
-            # FilterFid/FilterFids are handled from the in-memory cache (see the
-            # top of __init__), never pushed down to SQL, because feature ids are
-            # fetch-order positions rather than primary-key values.
             where_clause_list = []
 
             self._expression = ""
@@ -177,7 +238,9 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
                 expression = self._request.filterExpression().expression()
                 if expression:
                     compiled = compile_expression_to_sql(
-                        expression, self._provider._fields
+                        expression,
+                        self._provider._fields,
+                        self._provider._expression_geometry(),
                     )
                     if compiled:
                         self._expression = compiled
@@ -237,8 +300,14 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
                             "Snowflake Plugin",
                             Qgis.MessageLevel.Warning,
                         )
-                if filter_geom_clause != "":
-                    filter_geom_clause = f"and {filter_geom_clause}"
+
+            self._simplify_tolerance = self._simplify_tolerance_for_request(
+                filter_rect
+            )
+
+            self._request_no_geometry = (
+                self._request.flags() & QgsFeatureRequest.Flag.NoGeometry
+            )
 
             # A query is only safe to cache into the provider-shared feature
             # list when it carried no per-request row filter. Otherwise a
@@ -246,21 +315,20 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
             # later full-extent request to that subset. subsetString() is a
             # stable provider-level filter (reloadData() clears the cache when
             # it changes), so it is intentionally not part of this check.
+            # Features fetched without geometry or transformed to another CRS
+            # are not the layer's features either; the disk cache would keep
+            # them across sessions.
             self._should_cache_features = (
                 not getattr(self._provider, "_load_all_rows", False)
+                and not self._request_sub_attributes
                 and self._target_fids is None
                 and self._expression == ""
                 and filter_geom_clause == ""
+                and self._simplify_tolerance is None
+                and not self._request_no_geometry
+                and not self._transform.isValid()
             )
 
-            # build the complete where clause
-            where_clause = ""
-            if where_clause_list:
-                where_clause = f"where {where_clause_list[0]}"
-                if len(where_clause_list) > 1:
-                    for clause in where_clause_list[1:]:
-                        where_clause += f" and {clause}"
-
             geom_query = f'ST_ASWKB({quoted_geom}), '
             if self._provider._geo_column_type == "TEXT":
                 geom_query = f'ST_ASWKB(H3_CELL_TO_BOUNDARY({quoted_geom})), {quoted_geom}, '
@@ -270,9 +338,14 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
                     f'H3_INT_TO_STRING({quoted_geom}), '
                 )
 
-            self._request_no_geometry = (
-                self._request.flags() & QgsFeatureRequest.Flag.NoGeometry
-            )
+            if self._simplify_tolerance is not None:
+                # The tolerance is part of the select list, so tile cache
+                # entries are kept per tolerance as well.
+                geom_query = (
+                    f"ST_ASWKB(ST_SIMPLIFY({quoted_geom}, "
+                    f"{self._simplify_tolerance!r}, TRUE)), "
+                )
+
             if self._request_no_geometry:
                 geom_query = ""
 
@@ -292,24 +365,65 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
             if self._provider._geo_column_type in ["NUMBER", "TEXT"]:
                 filter_geo_type = f'H3_IS_VALID_CELL({quoted_geom})'
 
-            base_query = (
-                "select * from ("  # nosec B608 - from_clause pre-quoted; fragments built from quoted identifiers and validated fragments
-                f"select {fields_name_for_query} "
-                f"{geom_query} {index} "
-                f"from {self._provider._from_clause} where {filter_geo_type} {filter_geom_clause}) "
-                f"{where_clause}"
+            fields_select = select_list(list_field_names, f"{geom_query}{index}")
+            # A7: for a limited layer let Snowflake's SAMPLE do the
+            # random-sample work on the already-filtered set instead of
+            # sorting the entire resultset with ORDER BY RANDOM().
+            self.final_query = layer_query(
+                fields_select,
+                self._provider._from_clause,
+                [filter_geo_type, filter_geom_clause, filter_fid_clause, *where_clause_list],
+                (
+                    limit_size_for_type(self._provider._geo_column_type)
+                    if self._provider._is_limited_unordered
+                    else None
+                ),
+            )
+
+            self._fetch_batch_size = (
+                50_000
+                if getattr(self._provider, "_load_all_rows", False)
+                else 5_000
             )
 
-            if self._provider._is_limited_unordered:
-                # A7: let Snowflake's TABLESAMPLE do the random-sample work
-                # on the already-filtered set instead of sorting the entire
-                # resultset with ORDER BY RANDOM().
-                sample_n = limit_size_for_type(self._provider._geo_column_type)
-                self.final_query = (
-                    f"select * from ({base_query}) SAMPLE ({sample_n} ROWS)"  # nosec B608 - base_query is built from quoted identifiers / validated fragments; sample_n is an int
+            # Viewport requests on a primary-keyed layer go through the tile
+            # cache: the pk lets rows of overlapping tiles be de-duplicated.
+            tiles = None
+            if (
+                _TILE_CACHE_ENABLED
+                and filter_geom_clause != ""
+                and self._expression == ""
+                and self._target_fids is None
+                and self._provider.primary_key() != ""
+                and not self._provider._is_limited_unordered
+                and not getattr(self._provider, "_load_all_rows", False)
+            ):
+                tiles = tiles_for_rect(
+                    filter_rect.xMinimum(),
+                    filter_rect.yMinimum(),
+                    filter_rect.xMaximum(),
+                    filter_rect.yMaximum(),
+                    clamp_lonlat=self._provider._geo_column_type != "GEOMETRY",
                 )
-            else:
-                self.final_query = base_query
+            if tiles is not None:
+                try:
+                    self._tile_rows = self._read_tiles(
+                        tiles, filter_rect, fields_select,
+                        [filter_geo_type, *where_clause_list], quoted_geom,
+                    )
+                except Exception as e:
+                    QgsMessageLog.logMessage(
+                        f"Tile cache lookup failed; querying the viewport directly: {e}",
+                        "Snowflake Plugin",
+                        Qgis.MessageLevel.Warning,
+                    )
+                    self._tile_rows = None
+            if self._tile_rows is not None:
+                self._result = None
+                self._attribute_plan = self._build_attribute_plan()
+                self._rows = self._create_tile_reader()
+                self._index = 0
+                return
 
             self._result = self._provider.connection_manager.execute_query(
                 connection_name=self._provider._connection_name,
@@ -326,13 +440,333 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
                 desc.name: idx
                 for idx, desc in enumerate(self._result.description)
             }
-            self._fetch_batch_size = (
-                50_000
-                if getattr(self._provider, "_load_all_rows", False)
-                else 5_000
-            )
+            self._attribute_plan = self._build_attribute_plan()
+            self._arrow_batches = self._open_arrow_batches()
+            self._rows = self._create_batch_reader()
         self._index = 0
 
+    def _simplify_tolerance_for_request(self, filter_rect) -> Optional[float]:
+        """``ST_SIMPLIFY`` tolerance for this request, or None for full detail.
+
+        QGIS passes a simplify method (tolerance in layer units, derived from
+        map units per pixel) only to providers advertising SimplifyGeometries
+        and only for renders; identify, selection and editing requests keep
+        full-resolution geometries. The tolerance is snapped down to a power
+        of two so nearby scales share cached tiles.
+        """
+        if (
+            not _SERVER_SIDE_SIMPLIFY
+            or self._provider._geo_column_type not in ("GEOGRAPHY", "GEOMETRY")
+        ):
+            return None
+        method = self._request.simplifyMethod()
+        if method.methodType() == QgsSimplifyMethod.NoSimplification:
+            return None
+        tolerance = method.tolerance()
+        if not tolerance or not math.isfinite(tolerance) or tolerance <= 0:
+            return None
+        if self._provider._geo_column_type == "GEOGRAPHY":
+            # Degrees -> metres, using the viewport latitude furthest from
+            # the equator so the tolerance errs on the fine side.
+            latitude = 0.0
+            if not filter_rect.isNull():
+                latitude = min(
+                    max(abs(filter_rect.yMinimum()), abs(filter_rect.yMaximum())),
+                    89.0,
+                )
+            tolerance *= _METRES_PER_DEGREE * math.cos(math.radians(latitude))
+        return 2.0 ** math.floor(math.log2(tolerance))
+
+    def _tile_intersects_clause(self, quoted_geom: str) -> str:
+        """``ST_INTERSECTS`` of the geometry column with the joined tile."""
+        geo_type = self._provider._geo_column_type
+        if geo_type == "GEOMETRY":
+            return f"ST_INTERSECTS({quoted_geom}, ST_GEOMETRYFROMWKT(sftiles.sftilewkt))"
+        if geo_type in ("NUMBER", "TEXT"):
+            return (
+                f"ST_INTERSECTS(H3_CELL_TO_BOUNDARY({quoted_geom}), "
+                "ST_GEOGRAPHYFROMWKT(sftiles.sftilewkt))"
+            )
+        return f"ST_INTERSECTS({quoted_geom}, ST_GEOGRAPHYFROMWKT(sftiles.sftilewkt))"
+
+    def _read_tiles(
+        self,
+        tiles: List[Tuple[int, int, int]],
+        filter_rect,
+        fields_select: str,
+        predicates: List[str],
+        quoted_geom: str,
+    ) -> List[tuple]:
+        """Return the viewport's rows, stitched from cached and fetched tiles.
+
+        Tiles missing from the cache are fetched together in one query that
+        joins the layer against a VALUES list of tile polygons; each row comes
+        back once per tile it intersects, tagged with the tile id. Rows that
+        span several tiles are de-duplicated on the primary key, and rows of
+        the tiles that fall outside ``filter_rect`` itself are dropped.
+        """
+        cache = TileCache()
+        subset = self._provider.subsetString() or ""
+        shape = (fields_select, tuple(predicates))
+        keys = {
+            tile: (self._provider.tile_cache_key(), subset, shape, tile)
+            for tile in tiles
+        }
+        entries = {tile: cache.get(key) for tile, key in keys.items()}
+        missing = [tile for tile, entry in entries.items() if entry is None]
+
+        if missing:
+            clamp = self._provider._geo_column_type != "GEOMETRY"
+            values = ", ".join(
+                f"({quote_literal(tile_id(tile))}, '{tile_wkt(tile, clamp)}')"
+                for tile in missing
+            )
+            query = layer_query(
+                f"{fields_select}, sftiles.sftilekey",
+                f"{self._provider._from_clause}, "  # nosec B608 - from_clause pre-quoted; tile ids quoted, tile WKT is numeric
+                f"(select column1 as sftilekey, column2 as sftilewkt from values {values}) sftiles",
+                [*predicates, self._tile_intersects_clause(quoted_geom)],
+            )
+            cursor = self._provider.connection_manager.execute_query(
+                connection_name=self._provider._connection_name,
+                query=query,
+                context_information=self._provider._context_information,
+                op_tag=build_op_tag(
+                    "layer-tiles",
+                    connection_name=self._provider._connection_name,
+                    schema=self._provider._schema_name,
+                    table=self._provider._table_name,
+                ),
+            )
+            try:
+                columns = [desc.name for desc in cursor.description]
+                rows_by_tile = {tile_id(tile): [] for tile in missing}
+                reader = BatchReader.from_cursor(cursor, self._fetch_batch_size)
+                row = reader.next_row()
+                while row is not None:
+                    rows_by_tile[row[-1]].append(row)
+                    row = reader.next_row()
+            finally:
+                try:
+                    cursor.close()
+                except Exception:
+                    pass
+            for tile in missing:
+                entries[tile] = cache.put(keys[tile], columns, rows_by_tile[tile_id(tile)])
+
+        columns = entries[tiles[0]].columns if tiles else ()
+        self._col_index_by_name = {name: idx for idx, name in enumerate(columns)}
+        pk_name = self._provider._fields[self._provider.primary_key()].name()
+        pk_idx = self._col_index_by_name.get(pk_name)
+        seen = set()
+        rows = []
+        for tile in tiles:
+            for row in entries[tile].rows:
+                key = row[pk_idx] if pk_idx is not None else row[:-1]
+                if key in seen:
+                    continue
+                seen.add(key)
+                if not self._request_no_geometry:
+                    geometry = QgsGeometry()
+                    geometry.fromWkb(row[self.index_geom_column])
+                    if not geometry.intersects(filter_rect):
+                        continue
+                rows.append(row)
+        return rows
+
+    def _create_tile_reader(self) -> BatchReader:
+        batches = iter((self._decode_row_batch(self._tile_rows),))
+        return BatchReader(lambda: next(batches, None))
+
+    def _build_attribute_plan(self) -> List[Tuple[int, int]]:
+        """Return ``(attribute index, result column index)`` pairs, resolved
+        once per query instead of once per row.
+
+        A requested attribute subset is selected in request order, otherwise
+        every field is matched by name (skipping a GEOGRAPHY/GEOMETRY column,
+        which is only fetched as WKB).
+        """
+        if (
+            self._request_sub_attributes
+            and len(self._request.subsetOfAttributes()) > 0
+        ):
+            subset = list(self._request.subsetOfAttributes())
+            plan = [(attr_idx, idx) for idx, attr_idx in enumerate(subset)]
+            if self._fid_attribute is not None and self._fid_attribute not in subset:
+                # The primary key is selected right after the requested
+                # attributes; it is needed for the feature ids.
+                plan.append((self._fid_attribute, len(subset)))
+            return plan
+        plan = []
+        for indx, field_name in enumerate(self._provider.fields().names()):
+            if (
+                field_name == self._provider._column_geom
+                and self._provider._geo_column_type not in ("NUMBER", "TEXT")
+            ):
+                continue
+            col_idx = self._col_index_by_name.get(field_name)
+            if col_idx is None:
+                continue
+            plan.append((indx, col_idx))
+        return plan
+
+    def _open_arrow_batches(self) -> Optional[Iterator[Any]]:
+        """Start the Arrow fetch path on the executed cursor, if possible.
+
+        The first batch is pulled eagerly so an unsupported result format
+        (e.g. a JSON-encoded result set) falls back to fetchmany() before any
+        row has been consumed. Returns None when the row-tuple path must be
+        used.
+        """
+        if not _ARROW_FETCH_AVAILABLE:
+            return None
+        fetch_arrow_batches = getattr(self._result, "fetch_arrow_batches", None)
+        if fetch_arrow_batches is None:
+            return None
+        try:
+            batches = iter(fetch_arrow_batches())
+            first_batch = next(batches, None)
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"Arrow batch fetch unavailable, using row fetch: {e}",
+                "Snowflake Plugin",
+                Qgis.MessageLevel.Info,
+            )
+            return None
+        if first_batch is None:
+            return iter(())
+        return itertools.chain((first_batch,), batches)
+
+    def _create_batch_reader(self) -> BatchReader:
+        """Return the record reader for the executed query, decoding Arrow
+        batches when the Arrow path is active and fetchmany() batches
+        otherwise.
+
+        With prefetching enabled the batches are fetched (and, for Arrow,
+        decoded) on a background thread one batch ahead of fetchFeature().
+        The prefetcher is registered with the connection manager under the
+        current thread so cancel_pending_on_thread() stops it as well.
+        """
+        if self._arrow_batches is not None:
+            # Reference the iterator weakly from the producer thread so an
+            # iterator abandoned without close() can still be collected (and
+            # its prefetcher stopped in __del__).
+            decode_next_arrow_batch = weakref.WeakMethod(
+                self._decode_next_arrow_batch
+            )
+
+            def fetch_batch():
+                decode = decode_next_arrow_batch()
+                return decode() if decode is not None else []
+        else:
+            result = self._result
+            batch_size = self._fetch_batch_size
+            decode_row_batch = weakref.WeakMethod(self._decode_row_batch)
+
+            def fetch_batch():
+                rows = result.fetchmany(batch_size)
+                decode = decode_row_batch()
+                return decode(rows) if decode is not None else []
+
+        if not _PREFETCH_BATCHES:
+            return BatchReader(fetch_batch)
+        self._prefetcher = BatchPrefetcher(fetch_batch)
+        self._prefetcher_tid = self._provider.connection_manager.register_prefetcher(
+            self._prefetcher
+        )
+        return BatchReader(self._prefetcher.next_batch)
+
+    def _stop_prefetcher(self, wait: bool = True) -> None:
+        """Stop the background fetch thread, if any, before the cursor it
+        reads from is closed or re-executed. ``wait=False`` does not join the
+        thread (see BatchPrefetcher.stop)."""
+        prefetcher = self._prefetcher
+        if prefetcher is None:
+            return
+        self._prefetcher = None
+        prefetcher.stop(wait)
+        self._provider.connection_manager.unregister_prefetcher(
+            self._prefetcher_tid, prefetcher
+        )
+
+    def _decode_next_arrow_batch(self) -> List[Tuple[Any, tuple]]:
+        """Decode the next Arrow batch column by column into
+        ``(wkb, attributes)`` records.
+
+        Each column is converted to Python values in one call, attribute
+        converters run over whole columns, and the per-feature records are
+        assembled with zip() so no per-cell Python loop is needed. Returns an
+        empty list once the result set is exhausted.
+        """
+        table = next(self._arrow_batches, None)
+        while table is not None and table.num_rows == 0:
+            table = next(self._arrow_batches, None)
+        if table is None:
+            return []
+
+        columns = [column.to_pylist() for column in table.columns]
+        return self._records_from_columns(columns, table.num_rows)
+
+    def _decode_row_batch(self, rows: Optional[List[tuple]]) -> List[Tuple[Any, tuple]]:
+        """Decode a batch of row tuples (fetchmany() or tile rows) into
+        ``(wkb, attributes)`` records.
+
+        The batch is transposed into columns so attribute conversion runs
+        column-wise, exactly as for Arrow batches.
+        """
+        if not rows:
+            return []
+        return self._records_from_columns(list(zip(*rows)), len(rows))
+
+    def _records_from_columns(
+        self, columns: List[Any], row_count: int
+    ) -> List[Tuple[Any, tuple]]:
+        """Assemble ``(wkb, attributes)`` records from result columns.
+
+        Only the columns with a converter are touched value by value; every
+        other column is passed through as is.
+        """
+        nulls = [None] * row_count
+        attribute_columns = [nulls] * len(self._provider.fields())
+        for attr_idx, col_idx in self._attribute_plan:
+            values = columns[col_idx]
+            converter = self._attributes_converters.get(attr_idx)
+            if converter is not None:
+                values = self._convert_column(values, converter)
+            attribute_columns[attr_idx] = values
+
+        geometries = (
+            nulls if self._request_no_geometry else columns[self.index_geom_column]
+        )
+        attribute_rows = (
+            zip(*attribute_columns)
+            if attribute_columns
+            else itertools.repeat((), row_count)
+        )
+        return list(zip(geometries, attribute_rows))
+
+    @staticmethod
+    def _convert_column(
+        values: List[Any], converter: Callable[[Any], Any]
+    ) -> List[Any]:
+        """Apply ``converter`` to the non-null ``values``; a value that cannot
+        be converted becomes NULL instead of failing the whole batch."""
+        try:
+            return [None if v is None else converter(v) for v in values]
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                f"Feature Iterator Error - Conversion issue: {str(e)}",
+                "Snowflake Plugin",
+                Qgis.MessageLevel.Warning,
+            )
+        converted = []
+        for value in values:
+            try:
+                converted.append(None if value is None else converter(value))
+            except Exception:
+                converted.append(None)
+        return converted
+
     def fetchFeature(self, f: QgsFeature) -> bool:
         """fetch next feature, return true on success
 
@@ -347,156 +781,102 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
                     f.setValid(False)
                     return False
 
-                features = self._provider._features
+                features: FeatureStore = self._provider._features
                 filter_rect = self._request.filterRect()
+                check_rect = bool(filter_rect) and not filter_rect.isNull()
 
-                # FilterFid/FilterFids: feature ids are fetch-order positions
-                # into the cached feature list, so resolve them directly. This
-                # path manages its own index and returns immediately (it must
-                # not fall through to the sequential increment below).
+                # FilterFid/FilterFids: resolve the requested ids through the
+                # cache's fid index. This path manages its own index and
+                # returns immediately (it must not fall through to the
+                # sequential increment below).
                 if self._target_fids is not None:
                     while self._index < len(self._target_fids):
                         fid = self._target_fids[self._index]
                         self._index += 1
-                        if fid < 0 or fid >= len(features):
+                        row = features.row_of(fid)
+                        if row is None:
                             continue
-                        local_feature: QgsFeature = features[fid]
-                        if (
-                            filter_rect
-                            and not filter_rect.isNull()
-                            and not local_feature.geometry().intersects(filter_rect)
-                        ):
+                        geometry = features.geometry_at(row)
+                        if check_rect and not geometry.intersects(filter_rect):
                             continue
-                        f.setFields(self._provider.fields())
-                        f.setGeometry(local_feature.geometry())
-                        f.setId(local_feature.id())
-                        f.setAttributes(local_feature.attributes())
-                        f.setValid(True)
+                        self._set_cached_feature(f, features, row, geometry)
                         return True
                     f.setValid(False)
                     return False
 
-                if self._index < 0 or self._index >= len(features):
+                # Rect filter: walk only the rows the cache's spatial index
+                # reports as bbox candidates (self._index is a position in
+                # that list), then apply the exact intersects test.
+                if check_rect:
+                    if self._candidate_rows is None:
+                        self._candidate_rows = features.candidate_rows(filter_rect)
+                    while self._index < len(self._candidate_rows):
+                        row = self._candidate_rows[self._index]
+                        self._index += 1
+                        geometry = features.geometry_at(row)
+                        if not geometry.intersects(filter_rect):
+                            continue
+                        self._set_cached_feature(f, features, row, geometry)
+                        return True
                     f.setValid(False)
                     return False
 
-                local_feature: QgsFeature = features[self._index]
+                if self._index < 0 or self._index >= len(features):
+                    f.setValid(False)
+                    return False
 
-                while (
-                    filter_rect
-                    and not filter_rect.isNull()
-                    and not local_feature.geometry().intersects(filter_rect)
-                ):
-                    self._index += 1
-                    if self._index >= len(features):
-                        f.setValid(False)
-                        return False
-                    local_feature = features[self._index]
+                self._set_cached_feature(
+                    f, features, self._index, features.geometry_at(self._index)
+                )
 
-                f.setFields(self._provider.fields())
-                f.setGeometry(local_feature.geometry())
-                f.setId(local_feature.id())
-                f.setAttributes(local_feature.attributes())
-                f.setValid(True)
+            elif self._rows is None:
+                # __init__ returned early (invalid provider / CRS failure) or
+                # the iterator was closed: there is no result set to read.
+                f.setValid(False)
+                return False
 
             else:
-                if not self._cursor_batch_rows:
-                    self._cursor_batch_rows = self._result.fetchmany(
-                        self._fetch_batch_size
+                next_record = self._rows.next_row()
+                while next_record is not None and self._unpushed_fids is not None:
+                    fid = (
+                        int(next_record[1][self._fid_attribute])
+                        if self._fid_attribute is not None
+                        else self._index
                     )
+                    if fid in self._unpushed_fids:
+                        break
+                    self._index += 1
+                    next_record = self._rows.next_row()
 
-                next_result = (
-                    self._cursor_batch_rows.pop(0) if self._cursor_batch_rows else None
-                )
-
-                if not next_result or not self._provider.isValid():
+                if next_record is None or not self._provider.isValid():
                     f.setValid(False)
                     if self._should_cache_features:
                         self._provider._features_loaded = True
+                        self._provider.save_cached_features()
                     return False
 
+                wkb, attributes = next_record
                 f.setFields(self._provider.fields())
 
                 if not self._request_no_geometry:
                     geometry = QgsGeometry()
-                    geometry.fromWkb(next_result[self.index_geom_column])
+                    geometry.fromWkb(wkb)
                     f.setGeometry(geometry)
                     self.geometryToDestinationCrs(f, self._transform)
 
-                # Feature ids are the 0-based iteration order of this result
-                # set, NOT the table primary key. QGIS selection/editing use
-                # these fids to index the provider's cached feature list; edits
-                # then map fid -> cached feature -> primary key for the DML.
-                f.setId(self._index)
-
-                col_index_by_name = self._col_index_by_name
-                if self._attributes_need_conversion:
-                    if (
-                        self._request_sub_attributes
-                        and len(self._request.subsetOfAttributes()) > 0
-                    ):
-                        for idx, attr_idx in enumerate(
-                            self._request.subsetOfAttributes()
-                        ):
-                            raw = next_result[idx]
-                            attribute = (
-                                None if raw is None
-                                else self._attributes_converters[idx](raw)
-                            )
-                            f.setAttribute(attr_idx, attribute)
-                    else:
-                        for indx, field_name in enumerate(
-                            self._provider.fields().names()
-                        ):
-                            try:
-                                if (
-                                    field_name == self._provider._column_geom
-                                    and self._provider._geo_column_type
-                                    not in ("NUMBER", "TEXT")
-                                ):
-                                    continue
-                                col_idx = col_index_by_name.get(field_name)
-                                if col_idx is None:
-                                    continue
-                                column_value = next_result[col_idx]
-                                converted_attribute = (
-                                    None if column_value is None
-                                    else self._attributes_converters[indx](column_value)
-                                )
-                                f.setAttribute(indx, converted_attribute)
-                            except Exception as e:
-                                QgsMessageLog.logMessage(
-                                    f"Feature Iterator Error - Conversion issue: {str(e)}",
-                                    "Snowflake Plugin",
-                                    Qgis.MessageLevel.Warning,
-                                )
-
+                # Feature ids are the primary key values, or else the 0-based
+                # iteration order of this result set. QGIS selection/editing
+                # use these fids to index the provider's cached feature list;
+                # edits then map fid -> cached feature -> primary key for the
+                # DML.
+                if self._fid_attribute is not None:
+                    f.setId(int(attributes[self._fid_attribute]))
                 else:
-                    if (
-                        self._request_sub_attributes
-                        and len(self._request.subsetOfAttributes()) > 0
-                    ):
-                        for idx, attr_idx in enumerate(
-                            self._request.subsetOfAttributes()
-                        ):
-                            f.setAttribute(attr_idx, next_result[idx])
-                    else:
-                        for indx, field_name in enumerate(
-                            self._provider.fields().names()
-                        ):
-                            if (
-                                field_name == self._provider._column_geom
-                                and self._provider._geo_column_type
-                                not in ("NUMBER", "TEXT")
-                            ):
-                                continue
-                            col_idx = col_index_by_name.get(field_name)
-                            if col_idx is None:
-                                continue
-                            f.setAttribute(indx, next_result[col_idx])
+                    f.setId(self._index)
+                f.setAttributes(list(attributes))
                 f.setValid(True)
                 if self._should_cache_features:
-                    self._provider._features.append(QgsFeature(f))
+                    self._provider._features.append(f)
 
             self._index += 1
         except Exception as e:
@@ -507,6 +887,16 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
             )
         return True
 
+    def _set_cached_feature(
+        self, f: QgsFeature, features: FeatureStore, row: int, geometry: QgsGeometry
+    ) -> None:
+        """Fill ``f`` from row ``row`` of the provider's feature cache."""
+        f.setFields(self._provider.fields())
+        f.setGeometry(geometry)
+        f.setId(features.fid_at(row))
+        f.setAttributes(features.attributes_at(row))
+        f.setValid(True)
+
     def nextFeatureFilterExpression(self, f: QgsFeature) -> bool:
         if not self._expression:
             return super().nextFeatureFilterExpression(f)
@@ -521,11 +911,11 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
     def __next__(self) -> QgsFeature:
         """Returns the next value till current is lower than high"""
         if self._provider._features_loaded:
-            if self._index < 0 or self._index > len(self._provider._features):
+            if self._index < 0 or self._index >= len(self._provider._features):
                 f = QgsFeature()
                 f.setValid(False)
                 return f
-            f = self._provider._features[self._index]
+            f = self._provider._features.feature_at(self._index)
             self._index += 1
             return f
         else:
@@ -537,19 +927,37 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
 
     def rewind(self) -> bool:
         """reset the iterator to the starting position"""
-        self._result = self._provider.connection_manager.execute_query(
-            connection_name=self._provider._connection_name,
-            query=self.final_query,
-            context_information=self._provider._context_information,
-        )
-        self._provider._features = []
+        self._stop_prefetcher()
+        if self._tile_rows is not None:
+            self._rows = self._create_tile_reader()
+        else:
+            self._result = self._provider.connection_manager.execute_query(
+                connection_name=self._provider._connection_name,
+                query=self.final_query,
+                context_information=self._provider._context_information,
+            )
+            self._arrow_batches = self._open_arrow_batches()
+            self._rows = self._create_batch_reader()
+        self._provider._features = FeatureStore()
         self._provider._features_loaded = False
+        self._candidate_rows = None
         self._index = 0
         return True
 
+    def __del__(self):
+        # An iterator dropped without close() must not leave its prefetch
+        # thread waiting on a batch nobody will take. The garbage collector
+        # may run this on the UI thread, so the thread is not joined: it
+        # exits on its own once its fetch in flight returns.
+        try:
+            self._stop_prefetcher(wait=False)
+        except Exception:
+            pass
+
     def close(self) -> bool:
         """end of iterating: free the resources / lock"""
         self._index = -1
+        self._stop_prefetcher()
         # SNOW-3712076: release the server-side cursor so an abandoned/cancelled
         # render does not leak an open SnowflakeCursor on the singleton
         # connection.
@@ -560,4 +968,7 @@ class SFFeatureIterator(QgsAbstractFeatureIterator):
             except Exception:
                 pass
             self._result = None
+        self._arrow_batches = None
+        self._rows = None
+        self._tile_rows = None
         return True
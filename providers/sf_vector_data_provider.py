@@ -8,6 +8,7 @@ from qgis.core import (
     QgsFeature,
     QgsFeatureIterator,
     QgsFeatureRequest,
+    QgsFeatureSource,
     QgsField,
     QgsFields,
     QgsMessageLog,
@@ -29,10 +30,10 @@ from ..helpers.data_base import (
     get_cheap_row_count,
     get_declared_primary_key,
     get_next_primary_key_value,
-    insert_table_feature,
+    get_table_last_altered,
+    insert_table_rows,
     limit_size_for_type,
-    update_table_attributes,
-    update_table_feature,
+    update_table_rows,
 )
 
 from .sf_feature_source import SFFeatureSource
@@ -41,9 +42,14 @@ from ..helpers.utils import (
     get_authentification_information,
     get_or_create_connection_authcfg,
     get_qsettings,
+    is_layer_disk_cache_enabled,
 )
 from ..managers.sf_connection_manager import SFConnectionManager, build_op_tag
 
+from ..helpers.disk_cache import layer_cache_path, load_feature_store, save_feature_store
+from ..helpers.feature_store import FeatureStore
+from ..helpers.metadata_cache import get_metadata_cache, metadata_key
+from ..helpers.tile_cache import TileCache
 from ..helpers.wrapper import parse_uri
 from ..helpers.sql import quote_identifier, quote_literal, qualified_table_name
 from ..helpers.expression_compiler import compile_expression_to_sql
@@ -55,6 +61,10 @@ from ..helpers.mappings import (
     mapping_snowflake_qgis_geometry,
 )
 
+# Largest selection server_side_select_parts() turns into a primary key IN
+# list; bigger selections are exported through the client instead.
+SERVER_SIDE_MAX_SELECTED = 10_000
+
 
 class SFVectorDataProvider(QgsVectorDataProvider):
     """The general VectorDataProvider, which can be extended based on column type"""
@@ -66,7 +76,7 @@ class SFVectorDataProvider(QgsVectorDataProvider):
         flags=QgsDataProvider.ReadFlags(),
     ):
         super().__init__(uri)
-        self._features = []
+        self._features = FeatureStore()
         self._features_loaded = False
         self._is_valid = False
         self._uri = uri
@@ -80,6 +90,13 @@ class SFVectorDataProvider(QgsVectorDataProvider):
         # SNOW-3712083: cache for the "is the URI-supplied primary_key actually
         # unique?" check (None = not yet computed).
         self._primary_key_is_valid = None
+        # Whether feature ids are the primary key values (see
+        # uses_primary_key_fids; None = not yet computed).
+        self._primary_key_fids = None
+        # On-disk layer cache: checked once per (re)load; the LAST_ALTERED
+        # stamp read then is the one recorded when the cache is written.
+        self._disk_cache_checked = False
+        self._disk_cache_last_altered = None
         try:
             (
                 self._connection_name,
@@ -243,10 +260,30 @@ class SFVectorDataProvider(QgsVectorDataProvider):
         self._primary_key_is_valid = result
         return result
 
+    def createSpatialIndex(self) -> bool:
+        """Index the cached features' bounding boxes.
+
+        Rect-filtered reads of a fully loaded layer walk the index candidates
+        instead of every cached feature. Until the layer is loaded there is
+        nothing to index; the cache builds the index on its first rect query.
+        """
+        if self._features_loaded:
+            self._features.build_spatial_index()
+        return True
+
+    def hasSpatialIndex(self) -> QgsFeatureSource.SpatialIndexPresence:
+        if self._features_loaded and self._features.has_spatial_index:
+            return QgsFeatureSource.SpatialIndexPresent
+        return QgsFeatureSource.SpatialIndexUnknown
+
     def capabilities(self) -> QgsVectorDataProvider.Capabilities:
         base_capabilities = (
             QgsVectorDataProvider.CreateSpatialIndex | QgsVectorDataProvider.SelectAtId
         )
+        # Renders then hand the provider a simplify method instead of
+        # simplifying locally; the iterator turns it into ST_SIMPLIFY.
+        if self._geo_column_type in ("GEOGRAPHY", "GEOMETRY"):
+            base_capabilities |= QgsVectorDataProvider.SimplifyGeometries
 
         # An empty string used as a primary key signifies the absence of a defined primary key.
         if (
@@ -298,6 +335,7 @@ class SFVectorDataProvider(QgsVectorDataProvider):
             | QgsVectorDataProvider.AddAttributes
             | QgsVectorDataProvider.DeleteAttributes
             | QgsVectorDataProvider.ChangeGeometries
+            | QgsVectorDataProvider.ChangeFeatures
         )
 
     def name(self) -> str:
@@ -353,6 +391,102 @@ class SFVectorDataProvider(QgsVectorDataProvider):
     def primary_key(self) -> str:
         return self._primary_key
 
+    def uses_primary_key_fids(self) -> bool:
+        """Whether feature ids are the values of the primary key.
+
+        That is the case for an integer primary key verified to be unique:
+        the ids then do not depend on the query a feature came from, so
+        FilterFid / FilterFids requests are answered with ``WHERE pk IN
+        (...)``. Other layers number their features in fetch order and
+        resolve ids through the full feature cache.
+        """
+        if self._primary_key_fids is None:
+            fields = self.fields()
+            field_index = fields.indexOf(self._primary_key) if self._primary_key else -1
+            self._primary_key_fids = bool(
+                field_index >= 0
+                and fields.field(field_index).type()
+                in (QMetaType.Type.Int, QMetaType.Type.LongLong)
+                and self._validate_primary_key()
+            )
+        return self._primary_key_fids
+
+    def server_side_select_parts(
+        self, primary_key_values: typing.Optional[typing.Sequence] = None
+    ) -> typing.Optional[typing.Tuple[str, str, typing.List[str]]]:
+        """Return ``(FROM clause, geometry expression, WHERE predicates)``
+        selecting the rows and geometries this layer shows (geometry-type
+        split, subset string), for statements that copy them on the warehouse
+        instead of through the feature iterator.
+
+        ``primary_key_values`` restricts the rows to a selection. None is
+        returned when that cannot be done safely: a row-capped preview (the
+        table holds more rows than the layer shows), no verified unique
+        primary key, or more than ``SERVER_SIDE_MAX_SELECTED`` values.
+        """
+        if self._is_limited_unordered:
+            return None
+        where_parts = self._layer_row_filters()
+        if self.subsetString():
+            where_parts.append(self.subsetString())
+        if primary_key_values is not None:
+            if (
+                not self._primary_key
+                or len(primary_key_values) > SERVER_SIDE_MAX_SELECTED
+                or not self._validate_primary_key()
+            ):
+                return None
+            literals = []
+            for value in primary_key_values:
+                value = self._unwrap_value(value)
+                if value is None:
+                    continue
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    literals.append(repr(value))
+                else:
+                    literals.append(quote_literal(str(value)))
+            if literals:
+                where_parts.append(
+                    f"{quote_identifier(self._primary_key)} IN ({', '.join(literals)})"  # nosec B608 - identifier escaped via quote_identifier; values are numeric reprs or quote_literal
+                )
+            else:
+                where_parts.append("FALSE")
+        return self._from_clause, self._layer_geometry_sql(), where_parts
+
+    def _layer_row_filters(self) -> typing.List[str]:
+        """Predicates (besides the subset string) the iterator applies."""
+        return []
+
+    def _layer_geometry_sql(self) -> str:
+        """SQL expression of the geometry the layer draws."""
+        return quote_identifier(self._column_geom)
+
+    def _expression_geometry(self) -> typing.Optional[typing.Tuple[str, int]]:
+        """The ``(quoted column, srid)`` filter expressions may reference as
+        ``$geometry``. Only planar GEOMETRY columns qualify: QGIS evaluates
+        spatial functions planimetrically, like Snowflake's GEOMETRY ST_*
+        functions but unlike its geodesic GEOGRAPHY ones."""
+        if self._geo_column_type != "GEOMETRY" or not self._column_geom:
+            return None
+        return quote_identifier(self._column_geom), self._srid
+
+    def _count_aggregate_sql(self) -> str:
+        """Aggregate giving featureCount() over rows that already passed the
+        layer's geometry filter, so extent() can fetch it in the same query.
+        The subset string is applied as COUNT_IF because the extent ignores it.
+        """
+        if self.subsetString():
+            return f"COUNT_IF({self.subsetString()})"  # nosec B608 - subsetString is compiler-validated & quoted in setSubsetString
+        return "COUNT(*)"
+
+    def _probe_metadata_through_extent(self) -> bool:
+        """Let extent() fetch the feature count as well when neither is known
+        yet; returns True when the count was set that way."""
+        if self._extent is not None or not self._is_valid or not self._column_geom:
+            return False
+        self.extent()
+        return self._feature_count is not None
+
     def fields(self) -> QgsFields:
         """Detects field name and type. Converts the type into a QVariant, and returns a
         QgsFields containing QgsFields.
@@ -390,14 +524,26 @@ class SFVectorDataProvider(QgsVectorDataProvider):
                         " ORDER BY ordinal_position"
                     )
 
-                    cur = self.connection_manager.execute_query(
-                        connection_name=self._connection_name,
-                        query=query,
-                        context_information=self._context_information,
+                    def load_columns():
+                        cur = self.connection_manager.execute_query(
+                            connection_name=self._connection_name,
+                            query=query,
+                            context_information=self._context_information,
+                        )
+                        rows = cur.fetchall()
+                        cur.close()
+                        return rows
+
+                    field_info = get_metadata_cache().get_or_load(
+                        metadata_key(
+                            "columns",
+                            self._connection_name,
+                            database_name,
+                            self._schema_name,
+                            self._table_name,
+                        ),
+                        load_columns,
                     )
-
-                    field_info = cur.fetchall()
-                    cur.close()
                     for row in field_info:
                         field_name, field_type, numeric_scale = row[0], row[1], row[2]
                         qgs_field = create_qgs_field(
@@ -542,14 +688,26 @@ class SFVectorDataProvider(QgsVectorDataProvider):
         query = (
             "SELECT table_name FROM information_schema.tables WHERE table_type = 'VIEW'"
         )
-        cur = self.connection_manager.execute_query(
-            connection_name=self._connection_name,
-            query=query,
-            context_information=self._context_information,
-        )
-        view_list = [elem[0] for elem in cur.fetchall()]
-        cur.close()
 
+        def load_views():
+            cur = self.connection_manager.execute_query(
+                connection_name=self._connection_name,
+                query=query,
+                context_information=self._context_information,
+            )
+            views = frozenset(elem[0] for elem in cur.fetchall())
+            cur.close()
+            return views
+
+        # One list per database; every layer of it shares the lookup.
+        view_list = get_metadata_cache().get_or_load(
+            metadata_key(
+                "views",
+                self._connection_name,
+                self._context_information.get("database_name"),
+            ),
+            load_views,
+        )
         return self._table_name in view_list
 
     def uniqueValues(self, fieldIndex: int, limit: int = -1) -> set:
@@ -597,7 +755,9 @@ class SFVectorDataProvider(QgsVectorDataProvider):
             # is compiled through the whitelist expression compiler rather than
             # trusted as raw SQL. Only a fully-compiled, quoted predicate is
             # stored; anything else is refused.
-            compiled = compile_expression_to_sql(subsetstring, self.fields())
+            compiled = compile_expression_to_sql(
+                subsetstring, self.fields(), self._expression_geometry()
+            )
             if not compiled:
                 QgsMessageLog.logMessage(
                     "Subset string could not be safely compiled to SQL; "
@@ -637,12 +797,86 @@ class SFVectorDataProvider(QgsVectorDataProvider):
 
         return fields_index
 
+    def tile_cache_key(self) -> tuple:
+        """Identifies this layer's rows in the shared TileCache."""
+        return (
+            self._connection_name,
+            getattr(self, "_from_clause", None),
+            self._column_geom,
+        )
+
+    def _disk_cache_key(self) -> typing.Optional[dict]:
+        """Identity of this layer's on-disk cache file, or None if the layer
+        cannot be disk-cached (disabled, SQL query layer, load-all mode)."""
+        if (
+            not is_layer_disk_cache_enabled()
+            or self._sql_query
+            or not self._table_name
+            or self._load_all_rows
+        ):
+            return None
+        return {
+            "connection": self._connection_name,
+            "table": [
+                self._context_information.get("database_name"),
+                self._schema_name,
+                self._table_name,
+            ],
+            "columns": [[field.name(), field.typeName()] for field in self.fields()],
+            "subset": self.subsetString() or "",
+            "uri": self._uri,
+            "fids": "primary_key" if self.uses_primary_key_fids() else "row",
+        }
+
+    def restore_cached_features(self) -> bool:
+        """Fill the feature cache from the on-disk layer cache if it is fresh.
+
+        Called by the feature iterator before it would query the table. Only
+        the first call after construction / reloadData() does any work.
+        """
+        if self._disk_cache_checked or self._features_loaded:
+            return False
+        self._disk_cache_checked = True
+        cache_key = self._disk_cache_key()
+        if cache_key is None:
+            return False
+        self._disk_cache_last_altered = get_table_last_altered(
+            self._context_information
+        )
+        store = load_feature_store(
+            layer_cache_path(cache_key), self._disk_cache_last_altered, self.fields()
+        )
+        if store is None:
+            return False
+        QgsMessageLog.logMessage(
+            f"Loaded {len(store)} features of {self._table_name} from the disk cache.",
+            "Snowflake Plugin",
+            Qgis.MessageLevel.Info,
+        )
+        self._features = store
+        self._features_loaded = True
+        return True
+
+    def save_cached_features(self) -> None:
+        """Write the just-completed full load to the on-disk layer cache."""
+        cache_key = self._disk_cache_key()
+        if cache_key is None or not self._disk_cache_last_altered:
+            return
+        save_feature_store(
+            layer_cache_path(cache_key),
+            cache_key,
+            self._disk_cache_last_altered,
+            self._features,
+        )
+
     def reloadData(self):
         """Reload data from the data source."""
-        self._features = []
+        self._features = FeatureStore()
         self._features_loaded = False
         self._feature_count = None
         self._extent = None
+        self._disk_cache_checked = False
+        TileCache().invalidate(self.tile_cache_key())
         self.connect_database()
         # Notify QGIS so the layer-level feature cache (QgsVectorLayerCache)
         # and the attribute table model refresh without requiring the user
@@ -665,35 +899,188 @@ class SFVectorDataProvider(QgsVectorDataProvider):
         """Populate the fid-indexed feature cache if it is empty.
 
         The edit methods map a QGIS feature id to its row via self._features,
-        which reloadData() clears after every commit. In the normal UI flow
-        QGIS re-reads features (repopulating the cache) before the next edit,
-        but consecutive programmatic edits can index an empty cache and crash.
-        A full getFeatures() pass rebuilds the cache with the same 0-based fids.
+        which reloadData() clears (on refresh, or after an edit the cache could
+        not take in place). In the normal UI flow QGIS re-reads features
+        (repopulating the cache) before the next edit, but consecutive
+        programmatic edits can index an empty cache and crash.
+        A full getFeatures() pass rebuilds the cache with the same fids.
+        With primary-key fids the fid is the key itself and no load is needed.
         """
-        if not self._features:
+        if not self._features and not self.uses_primary_key_fids():
             for _ in self.getFeatures():
                 pass
 
+    def _primary_key_value(self, fid: int) -> typing.Any:
+        """Primary key value of the feature ``fid``, or None when the feature
+        cache does not hold it. With primary-key fids that is ``fid``."""
+        if self.uses_primary_key_fids():
+            return fid
+        if fid not in self._features:
+            return None
+        return self._unwrap_value(self._features[fid].attribute(self.primary_key()))
+
+    def _edit_context(self) -> dict:
+        """Context information shared by every statement of an edit commit."""
+        context = dict(self._context_information)
+        context["table_name"] = self._table_name
+        context["primary_key_name"] = self.primary_key()
+        return context
+
+    def _update_features(
+        self,
+        attr_map: typing.Dict[int, typing.Dict[int, typing.Any]],
+        geometry_map: typing.Dict[int, QgsGeometry],
+    ) -> bool:
+        """Write changed attributes and geometries of one edit commit.
+
+        Rows are grouped by the set of columns they change, so the whole
+        commit becomes a few MERGE statements run in a single transaction
+        (see ``update_table_rows``) instead of one UPDATE per feature.
+        """
+        self._ensure_features_loaded()
+        all_ok = True
+        fields = self.fields()
+        rows_by_columns: typing.Dict[typing.Tuple[str, ...], typing.List[tuple]] = {}
+        for fid in dict.fromkeys([*attr_map, *geometry_map]):
+            pk_value = self._primary_key_value(fid)
+            if pk_value is None:
+                all_ok = False
+                continue
+            col_names = []
+            values = []
+            for field_idx, new_value in attr_map.get(fid, {}).items():
+                col_names.append(fields.field(field_idx).name())
+                values.append(self._unwrap_value(new_value))
+            geometry = geometry_map.get(fid)
+            if geometry is not None:
+                col_names.append(self._column_geom)
+                values.append(None if geometry.isNull() else geometry.asWkt())
+            if not col_names:
+                continue
+            rows_by_columns.setdefault(tuple(col_names), []).append((pk_value, *values))
+        if rows_by_columns:
+            err = update_table_rows(self._edit_context(), rows_by_columns)
+            if err:
+                self.pushError(err)
+                return False
+            self._update_cached_features(attr_map, geometry_map)
+        return all_ok
+
+    def _edit_applied_to_cache(
+        self, count_delta: int = 0, boxes: typing.Iterable[QgsRectangle] = ()
+    ) -> None:
+        """Bring the count, the extent and the tile cache in line with a
+        committed edit that was patched into the feature cache.
+
+        The extent only grows: a deleted or moved feature at the border
+        leaves it slightly larger than the data until the next reloadData().
+        """
+        if self._feature_count is not None and not self._is_limited_unordered:
+            self._feature_count = max(0, self._feature_count + count_delta)
+        if self._extent is not None:
+            for box in boxes:
+                if self._extent.isNull():
+                    self._extent = QgsRectangle(box)
+                else:
+                    self._extent.combineExtentWith(box)
+        TileCache().invalidate(self.tile_cache_key())
+        self.dataChanged.emit()
+
+    def _update_cached_features(
+        self,
+        attr_map: typing.Dict[int, typing.Dict[int, typing.Any]],
+        geometry_map: typing.Dict[int, QgsGeometry],
+    ) -> None:
+        """Patch committed attribute and geometry changes into the feature
+        cache, or reload the layer if it is not fully cached."""
+        if not self._features_loaded:
+            self.reloadData()
+            return
+        features = self._features
+        for fid, field_map in attr_map.items():
+            row = features.row_of(fid)
+            if row is not None:
+                for field_idx, new_value in field_map.items():
+                    features.set_attribute(row, field_idx, self._unwrap_value(new_value))
+        geometries = {}
+        boxes = []
+        for fid, geometry in geometry_map.items():
+            row = features.row_of(fid)
+            if row is None:
+                continue
+            if geometry.isNull():
+                geometries[row] = (None, None)
+                continue
+            box = geometry.boundingBox()
+            geometries[row] = (
+                bytes(geometry.asWkb()),
+                (box.xMinimum(), box.yMinimum(), box.xMaximum(), box.yMaximum()),
+            )
+            boxes.append(box)
+        features.set_geometries(geometries)
+        self._edit_applied_to_cache(boxes=boxes)
+
+    def _add_cached_features(self, flist: typing.List[QgsFeature]) -> None:
+        """Give inserted features their fids and append them to the feature
+        cache.
+
+        The new fids are the primary key values with primary-key fids, and
+        continue after the largest cached one otherwise. Without a fully
+        loaded cache, or when a row's primary key was left to the database
+        (the cached row could not be edited again), the layer is reloaded
+        instead.
+        """
+        pk_values = [
+            self._unwrap_value(feat.attribute(self._primary_key)) for feat in flist
+        ]
+        if not self._features_loaded or None in pk_values:
+            # Stamp the inserted features with the PK value as their fid so
+            # QGIS' edit buffer / attribute table correlates them with the
+            # rows that land in Snowflake after reloadData().
+            for feat, pk_val in zip(flist, pk_values):
+                if pk_val is not None:
+                    try:
+                        feat.setId(int(pk_val))
+                    except (ValueError, TypeError):
+                        pass
+            self.reloadData()
+            return
+        if self.uses_primary_key_fids():
+            fids = [int(pk_val) for pk_val in pk_values]
+        else:
+            first_fid = self._features.max_fid() + 1
+            fids = range(first_fid, first_fid + len(flist))
+        fields = self.fields()
+        boxes = []
+        for fid, feat in zip(fids, flist):
+            feat.setId(fid)
+            cached = QgsFeature(fields, fid)
+            cached.setAttributes(
+                [self._unwrap_value(feat.attribute(i)) for i in range(fields.count())]
+            )
+            if feat.hasGeometry():
+                cached.setGeometry(feat.geometry())
+                boxes.append(feat.geometry().boundingBox())
+            self._features.append(cached)
+        self._edit_applied_to_cache(count_delta=len(flist), boxes=boxes)
+
+    def _delete_cached_features(self, fids: typing.List[int]) -> None:
+        """Drop deleted features from the feature cache, or reload the layer
+        if it is not fully cached."""
+        if not self._features_loaded:
+            self.reloadData()
+            return
+        rows = [self._features.row_of(fid) for fid in fids]
+        self._features.delete_rows(row for row in rows if row is not None)
+        self._edit_applied_to_cache(count_delta=-len(fids))
+
     def changeGeometryValues(self, geometry_map: typing.Any) -> bool:
         if isinstance(geometry_map, dict) and geometry_map:
-            self._ensure_features_loaded()
-            all_ok = True
-            for f_key, geometry in geometry_map.items():
-                geometry: QgsGeometry
-                if f_key < 0 or f_key >= len(self._features):
-                    all_ok = False
-                    continue
-                feature: QgsFeature = self._features[f_key]
-                context = copy.deepcopy(self._context_information)
-                context["geometry_wkt"] = geometry.asWkt()
-                context["column_geom"] = self._column_geom
-                context["primary_key_value"] = feature.attribute(self.primary_key())
-                context["primary_key_name"] = self.primary_key()
-                context["table_name"] = self._table_name
-                if not update_table_feature(context):
-                    all_ok = False
-            self.reloadData()
-            return all_ok
+            try:
+                return self._update_features({}, geometry_map)
+            except Exception as e:
+                self.pushError(f"changeGeometryValues: {e}")
+                return False
         return False
 
     @staticmethod
@@ -707,68 +1094,45 @@ class SFVectorDataProvider(QgsVectorDataProvider):
         if not isinstance(attr_map, dict) or not attr_map:
             return False
         try:
-            self._ensure_features_loaded()
-            all_ok = True
-            fields = self.fields()
-            pk_name = self.primary_key()
-            for fid, field_map in attr_map.items():
-                if fid < 0 or fid >= len(self._features):
-                    all_ok = False
-                    continue
-                feature: QgsFeature = self._features[fid]
-                set_clauses = []
-                values = []
-                for field_idx, new_value in field_map.items():
-                    col_name = fields.field(field_idx).name()
-                    set_clauses.append(f"{quote_identifier(col_name)} = %s")
-                    values.append(self._unwrap_value(new_value))
-                pk_value = self._unwrap_value(feature.attribute(pk_name))
-                values.append(pk_value)
-                context = copy.deepcopy(self._context_information)
-                context["primary_key_name"] = pk_name
-                context["table_name"] = self._table_name
-                err = update_table_attributes(context, set_clauses, tuple(values))
-                if err:
-                    self.pushError(err)
-                    all_ok = False
-            if all_ok:
-                self.reloadData()
-            return all_ok
+            return self._update_features(attr_map, {})
         except Exception as e:
             self.pushError(f"changeAttributeValues: {e}")
             return False
 
+    def changeFeatures(
+        self,
+        attr_map: typing.Dict[int, typing.Dict[int, typing.Any]],
+        geometry_map: typing.Dict[int, QgsGeometry],
+    ) -> bool:
+        """Commit attribute and geometry changes together, so a feature whose
+        attributes and geometry both changed is written by one MERGE row."""
+        if not attr_map and not geometry_map:
+            return True
+        try:
+            return self._update_features(attr_map or {}, geometry_map or {})
+        except Exception as e:
+            self.pushError(f"changeFeatures: {e}")
+            return False
+
     def addFeatures(self, flist: typing.List[QgsFeature], flags=None) -> typing.Tuple[bool, typing.List[QgsFeature]]:
         if not flist:
             return False, []
         try:
             fields = self.fields()
-            all_ok = True
+            col_names = [self._column_geom]
+            col_names.extend(fields.field(i).name() for i in range(fields.count()))
+            rows = []
             for feat in flist:
-                col_names = [self._column_geom]
                 values = [feat.geometry().asWkt() if feat.hasGeometry() else None]
                 for i in range(fields.count()):
-                    col_names.append(fields.field(i).name())
                     values.append(self._unwrap_value(feat.attribute(i)))
-                context = copy.deepcopy(self._context_information)
-                context["table_name"] = self._table_name
-                err = insert_table_feature(context, col_names, tuple(values))
-                if err:
-                    self.pushError(err)
-                    all_ok = False
-                else:
-                    # Stamp the inserted feature with the PK value as its fid so
-                    # QGIS' edit buffer / attribute table correlates it with the
-                    # row that lands in Snowflake after reloadData().
-                    if self._primary_key:
-                        pk_val = self._unwrap_value(feat.attribute(self._primary_key))
-                        if pk_val is not None:
-                            try:
-                                feat.setId(int(pk_val))
-                            except (ValueError, TypeError):
-                                pass
-            self.reloadData()
-            return all_ok, flist
+                rows.append(tuple(values))
+            err = insert_table_rows(self._edit_context(), col_names, rows)
+            if err:
+                self.pushError(err)
+                return False, flist
+            self._add_cached_features(flist)
+            return True, flist
         except Exception as e:
             self.pushError(f"addFeatures: {e}")
             return False, []
@@ -778,26 +1142,25 @@ class SFVectorDataProvider(QgsVectorDataProvider):
             return False
         try:
             self._ensure_features_loaded()
+            deleted_fids = []
             pk_values = []
             for fid in fids:
-                if fid < 0 or fid >= len(self._features):
+                pk_value = self._primary_key_value(fid)
+                if pk_value is None:
                     self.pushError(
                         f"deleteFeatures: feature id {fid} is not in the current "
                         "feature cache; skipping."
                     )
                     continue
-                feature: QgsFeature = self._features[fid]
-                pk_values.append(self._unwrap_value(feature.attribute(self.primary_key())))
+                deleted_fids.append(fid)
+                pk_values.append(pk_value)
             if not pk_values:
                 return False
-            context = copy.deepcopy(self._context_information)
-            context["primary_key_name"] = self.primary_key()
-            context["table_name"] = self._table_name
-            err = delete_table_features(context, pk_values)
-            self.reloadData()
+            err = delete_table_features(self._edit_context(), pk_values)
             if err:
                 self.pushError(err)
                 return False
+            self._delete_cached_features(deleted_fids)
             return True
         except Exception as e:
             self.pushError(f"deleteFeatures: {e}")
@@ -819,10 +1182,7 @@ class SFVectorDataProvider(QgsVectorDataProvider):
         if self._fields:
             for field in attrs:
                 self._fields.append(QgsField(field))
-        for feat in self._features:
-            cur_attrs = feat.attributes()
-            cur_attrs.extend([None] * len(columns))
-            feat.setAttributes(cur_attrs)
+        self._features.add_attributes(len(columns), self.fields())
         return True
 
     def deleteAttributes(self, attrs: typing.List[int]) -> bool:
@@ -842,13 +1202,7 @@ class SFVectorDataProvider(QgsVectorDataProvider):
                 if i not in attrs:
                     new_fields.append(self._fields.field(i))
             self._fields = new_fields
-        indices_to_drop = sorted(attrs, reverse=True)
-        for feat in self._features:
-            cur_attrs = feat.attributes()
-            for idx in indices_to_drop:
-                if idx < len(cur_attrs):
-                    del cur_attrs[idx]
-            feat.setAttributes(cur_attrs)
+        self._features.delete_attributes(attrs, self.fields())
         return True
 
     def extent(self) -> QgsRectangle:
@@ -902,6 +1256,10 @@ class SFGeoVectorDataProvider(SFVectorDataProvider):
         in_list = ", ".join(quote_literal(t) for t in types)
         return f"ST_ASGEOJSON({qgeom}):type::string IN ({in_list})"  # nosec B608 - identifier escaped via quote_identifier; types escaped via quote_literal
 
+    def _layer_row_filters(self) -> typing.List[str]:
+        # The iterator's predicate; it also drops NULL geometries.
+        return [self._geometry_type_filter()]
+
     def featureCount(self) -> int:
         """returns the number of entities in the table"""
 
@@ -911,7 +1269,7 @@ class SFGeoVectorDataProvider(SFVectorDataProvider):
             else:
                 if self._is_limited_unordered:
                     self._feature_count = limit_size_for_type(self._geo_column_type)
-                else:
+                elif not self._probe_metadata_through_extent():
                     # The feature iterator always restricts rows to this layer's
                     # geometry type (which also drops NULL geometries), so COUNT
                     # must match. For a single-geometry-family layer every
@@ -958,8 +1316,14 @@ class SFGeoVectorDataProvider(SFVectorDataProvider):
                 where_clause = f"{qgeom} IS NOT NULL"
                 if not getattr(self, "_single_geom_layer", False):
                     where_clause += f" AND {self._geometry_type_filter()}"
+                # Same rows as featureCount(), so a still unknown count comes
+                # back with the extent instead of costing its own round-trip.
+                probe_count = (
+                    self._feature_count is None and not self._is_limited_unordered
+                )
+                count_sql = f"{self._count_aggregate_sql()}, " if probe_count else ""
                 query = (
-                    f'SELECT MIN(ST_XMIN({qgeom})), '  # nosec B608 - identifier escaped via quote_identifier; from_clause pre-quoted; geometry-type filter escaped in _geometry_type_filter
+                    f'SELECT {count_sql}MIN(ST_XMIN({qgeom})), '  # nosec B608 - identifier escaped via quote_identifier; from_clause pre-quoted; geometry-type filter escaped in _geometry_type_filter; count aggregate from _count_aggregate_sql
                     f'MIN(ST_YMIN({qgeom})), '
                     f'MAX(ST_XMAX({qgeom})), '
                     f'MAX(ST_YMAX({qgeom})) '
@@ -982,6 +1346,9 @@ class SFGeoVectorDataProvider(SFVectorDataProvider):
                 extent_bounds = cur.fetchone()
                 cur.close()
 
+                if probe_count:
+                    self._feature_count = extent_bounds[0]
+                    extent_bounds = extent_bounds[1:]
                 self._extent = QgsRectangle(*extent_bounds)
 
         return self._extent
@@ -1008,6 +1375,12 @@ class SFH3VectorDataProvider(SFVectorDataProvider):
 
         self._is_valid = cur.fetchone()[0]
 
+    def _layer_row_filters(self) -> typing.List[str]:
+        return [f"H3_IS_VALID_CELL({quote_identifier(self._column_geom)})"]
+
+    def _layer_geometry_sql(self) -> str:
+        return f"H3_CELL_TO_BOUNDARY({quote_identifier(self._column_geom)})"
+
     def featureCount(self) -> int:
         """returns the number of entities in the table"""
         if self._feature_count is None:
@@ -1017,6 +1390,8 @@ class SFH3VectorDataProvider(SFVectorDataProvider):
                 if self._is_limited_unordered:
                     self._feature_count = limit_size_for_type(self._geo_column_type)
                     return self._feature_count
+                if self._probe_metadata_through_extent():
+                    return self._feature_count
 
                 query = f"SELECT COUNT(*) FROM {self._from_clause}"  # nosec B608 - from_clause pre-quoted
                 query += f' WHERE H3_IS_VALID_CELL({quote_identifier(self._column_geom)})'  # nosec B608 - identifier escaped via quote_identifier
@@ -1047,8 +1422,12 @@ class SFH3VectorDataProvider(SFVectorDataProvider):
                 self._extent = QgsRectangle()
             else:
                 qgeom = quote_identifier(self._column_geom)
+                probe_count = (
+                    self._feature_count is None and not self._is_limited_unordered
+                )
+                count_sql = f"{self._count_aggregate_sql()}, " if probe_count else ""
                 query = (
-                    f'SELECT MIN(ST_XMIN(H3_CELL_TO_BOUNDARY({qgeom}))), '  # nosec B608 - identifier escaped via quote_identifier; from_clause pre-quoted
+                    f'SELECT {count_sql}MIN(ST_XMIN(H3_CELL_TO_BOUNDARY({qgeom}))), '  # nosec B608 - identifier escaped via quote_identifier; from_clause pre-quoted; count aggregate from _count_aggregate_sql
                     f'MIN(ST_YMIN(H3_CELL_TO_BOUNDARY({qgeom}))), '
                     f'MAX(ST_XMAX(H3_CELL_TO_BOUNDARY({qgeom}))), '
                     f'MAX(ST_YMAX(H3_CELL_TO_BOUNDARY({qgeom}))) '
@@ -1071,6 +1450,9 @@ class SFH3VectorDataProvider(SFVectorDataProvider):
                 extent_bounds = cur.fetchone()
                 cur.close()
 
+                if probe_count:
+                    self._feature_count = extent_bounds[0]
+                    extent_bounds = extent_bounds[1:]
                 self._extent = QgsRectangle(*extent_bounds)
 
         return self._extent
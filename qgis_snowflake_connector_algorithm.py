@@ -49,14 +49,25 @@ __copyright__ = "(C) 2024 by Snowflake"
 __revision__ = "$Format:%H$"
 
 import json
+import tempfile
 import typing
-from qgis.PyQt.QtCore import QCoreApplication, QByteArray, QVariant, QMetaType
+from qgis.PyQt.QtCore import (
+    QCoreApplication,
+    QByteArray,
+    QDate,
+    QDateTime,
+    QTime,
+    QVariant,
+    QMetaType,
+)
 from qgis.core import (
     Qgis,
     QgsMessageLog,
     QgsProcessing,
     QgsProcessingAlgorithm,
     QgsProcessingException,
+    QgsProcessingFeatureSourceDefinition,
+    QgsProcessingParameterBoolean,
     QgsProcessingParameterFeatureSource,
     QgsProcessingParameterString,
     QgsProcessingContext,
@@ -77,7 +88,9 @@ from .entities.sf_dynamic_connection_combo_box_widget import (
 )
 
 from .providers.sf_data_source_provider import SFDataProvider
+from .providers.sf_vector_data_provider import SERVER_SIDE_MAX_SELECTED
 
+from .helpers.bulk_load import StageFileWriter, load_staged_files
 from .helpers.utils import get_authentification_information, get_qsettings
 from .helpers.sql import (
     quote_identifier,
@@ -87,6 +100,10 @@ from .helpers.sql import (
 from .helpers.wrapper import parse_uri
 
 
+# Rows per executemany() call of the parameter-bound insert path. Large
+# batches are uploaded to a temporary bind stage by the connector.
+_BOUND_INSERT_BATCH_ROWS = 20_000
+
 SAME_TABLE_EXPORT_MESSAGE = (
     "Destination is the same Snowflake table as the input layer. "
     "Exporting would duplicate every row. To push edits, toggle Save Layer "
@@ -115,6 +132,31 @@ def _sql_literal_from_value(feat_val):
     return quote_literal(str(feat_val))
 
 
+def _plain_value_from_feature_value(feat_val, field_type):
+    """Plain Python value for an attribute in the bulk load files (None for
+    NULL), formatted like the literals of the VALUES path.
+    """
+    if isinstance(feat_val, QVariant):
+        if feat_val.isNull():
+            return None
+        feat_val = feat_val.value()
+    if feat_val is None:
+        return None
+    if field_type == QMetaType.Type.QString:
+        return str(feat_val)
+    if isinstance(feat_val, QDateTime):
+        return feat_val.toString("yyyy-MM-dd hh:mm:ss")
+    if isinstance(feat_val, QDate):
+        return feat_val.toString("yyyy-MM-dd")
+    if isinstance(feat_val, QTime):
+        return feat_val.toString("hh:mm:ss")
+    if isinstance(feat_val, bool):
+        return "TRUE" if feat_val else "FALSE"
+    if isinstance(feat_val, (int, float)):
+        return feat_val
+    return str(feat_val)
+
+
 class QGISSnowflakeConnectorAlgorithm(QgsProcessingAlgorithm):
     """
     This is an example algorithm that takes a vector layer and
@@ -139,6 +181,7 @@ class QGISSnowflakeConnectorAlgorithm(QgsProcessingAlgorithm):
     SECOND_COMBO = "SECOND_COMBO"
     CONNECTION_DYN_CB = "CONNECTION_DYN_CB"
     GEOMETRY_COLUMN = "GEOMETRY_COLUMN"
+    BULK_LOAD = "BULK_LOAD"
 
     def initAlgorithm(self, config):
         """
@@ -179,6 +222,18 @@ class QGISSnowflakeConnectorAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.BULK_LOAD,
+                self.tr(
+                    "Bulk load through a temporary stage (PUT + COPY INTO, "
+                    "faster for large layers)"
+                ),
+                defaultValue=False,
+                optional=True,
+            )
+        )
+
         self.connection_manager: SFConnectionManager = (
             SFConnectionManager.get_instance()
         )
@@ -299,9 +354,6 @@ class QGISSnowflakeConnectorAlgorithm(QgsProcessingAlgorithm):
                 Qgis.MessageLevel.Info,
             )
 
-        total = 100.0 / source.featureCount() if source.featureCount() else 0
-        features = source.getFeatures()
-
         if source.featureCount() == 0:
             feedback.setProgress(100)
             return {"Rows Inserted": 0}
@@ -316,6 +368,90 @@ class QGISSnowflakeConnectorAlgorithm(QgsProcessingAlgorithm):
         fq_table = qualified_table_name(
             selected_database, selected_schema, selected_table
         )
+
+        export_fields = self._export_fields(source, geom_column, is_snowflake_layer)
+        copied = self._server_side_copy(
+            parameters=parameters,
+            context=context,
+            source=source,
+            feedback=feedback,
+            export_fields=export_fields,
+            use_geometry_type=use_geometry_type,
+            source_srid=source_srid,
+            variant_columns=variant_columns,
+            connection_name=selected_connection,
+            fq_table=fq_table,
+            query_columns=query_columns,
+        )
+        if copied is not None:
+            return copied
+
+        if self.parameterAsBoolean(parameters, self.BULK_LOAD, context):
+            return self._bulk_load_features(
+                source=source,
+                feedback=feedback,
+                export_fields=export_fields,
+                use_geometry_type=use_geometry_type,
+                source_srid=source_srid,
+                variant_columns=variant_columns,
+                connection_name=selected_connection,
+                database_name=selected_database,
+                schema_name=selected_schema,
+                fq_table=fq_table,
+                query_columns=query_columns,
+            )
+
+        # Parameter binding is used for Snowflake layers and for exports that
+        # fit in one bound batch; it needs an extra session, which SSO
+        # connections cannot open without another browser login.
+        if (
+            is_snowflake_layer or source.featureCount() <= _BOUND_INSERT_BATCH_ROWS
+        ) and self.connection_manager.supports_bound_parameters(selected_connection):
+            inserted = self._bound_insert_features(
+                source=source,
+                feedback=feedback,
+                export_fields=export_fields,
+                use_geometry_type=use_geometry_type,
+                source_srid=source_srid,
+                variant_columns=variant_columns,
+                connection_name=selected_connection,
+                fq_table=fq_table,
+                query_columns=query_columns,
+            )
+            if inserted is not None:
+                return {"Rows Inserted": inserted}
+        return self._values_insert_features(
+            source=source,
+            feedback=feedback,
+            geom_column=geom_column,
+            is_snowflake_layer=is_snowflake_layer,
+            use_geometry_type=use_geometry_type,
+            source_srid=source_srid,
+            variant_columns=variant_columns,
+            connection_name=selected_connection,
+            fq_table=fq_table,
+            query_columns=query_columns,
+        )
+
+    def _values_insert_features(
+        self,
+        source,
+        feedback,
+        geom_column: str,
+        is_snowflake_layer: bool,
+        use_geometry_type: bool,
+        source_srid: int,
+        variant_columns: typing.Set[str],
+        connection_name: str,
+        fq_table: str,
+        query_columns: str,
+    ) -> typing.Dict[str, int]:
+        """Export ``source`` as ``INSERT ... SELECT ... FROM VALUES`` SQL
+        strings of 5,000 rows each.
+        """
+        total = 100.0 / source.featureCount() if source.featureCount() else 0
+        features = source.getFeatures()
+
         # Use SELECT over VALUES so VARIANT/OBJECT/ARRAY columns can be
         # converted via PARSE_JSON in the SELECT projection.
         tuple_column_count = 1 + len(source.fields())
@@ -349,7 +485,7 @@ class QGISSnowflakeConnectorAlgorithm(QgsProcessingAlgorithm):
         for current, feature in enumerate(features):
             if current != 0 and current % 5000 == 0:
                 cur = self.sf_data_provider.execute_query(
-                    query + query_values_alias, selected_connection
+                    query + query_values_alias, connection_name
                 )
                 cur.close()
                 query = query_base
@@ -428,7 +564,7 @@ class QGISSnowflakeConnectorAlgorithm(QgsProcessingAlgorithm):
 
         if not executed:
             cur = self.sf_data_provider.execute_query(
-                query + query_values_alias, selected_connection
+                query + query_values_alias, connection_name
             )
             cur.close()
 
@@ -441,6 +577,284 @@ class QGISSnowflakeConnectorAlgorithm(QgsProcessingAlgorithm):
         # return {self.OUTPUT: dest_id}
         return {"Rows Inserted": source.featureCount()}
 
+    @staticmethod
+    def _export_fields(
+        source, geom_column: str, is_snowflake_layer: bool
+    ) -> typing.List[typing.Tuple[str, int]]:
+        """``(name, type)`` of the attributes written after the geometry, in
+        ``query_columns`` order.
+        """
+        return [
+            (field.name(), field.subType() if is_snowflake_layer else field.type())
+            for field in source.fields()
+            if field.name().lower() != geom_column.lower()
+        ]
+
+    @staticmethod
+    def _export_row(feature, export_fields: typing.List[typing.Tuple[str, int]]) -> list:
+        """Hex WKB (None without a geometry) followed by the attribute values."""
+        hex_string = QByteArray(feature.geometry().asWkb()).toHex().data().decode()
+        row = [hex_string or None]
+        for field_name, field_type in export_fields:
+            row.append(
+                _plain_value_from_feature_value(
+                    feature.attribute(feature.fieldNameIndex(field_name)), field_type
+                )
+            )
+        return row
+
+    @staticmethod
+    def _export_projection(
+        placeholders: typing.List[str],
+        export_fields: typing.List[typing.Tuple[str, int]],
+        variant_columns: typing.Set[str],
+        use_geometry_type: bool,
+        source_srid: int,
+    ) -> typing.List[str]:
+        """SELECT projection over one placeholder per ``_export_row`` value,
+        converting the hex WKB and wrapping VARIANT columns in PARSE_JSON.
+        """
+        geom = placeholders[0]
+        if use_geometry_type:
+            projection = [
+                f"ST_SETSRID(ST_GEOMETRYFROMWKB(TO_BINARY({geom}, 'HEX')), {source_srid})"
+            ]
+        else:
+            projection = [f"ST_GEOGFROMWKB(TO_BINARY({geom}, 'HEX'))"]
+        for placeholder, (field_name, _field_type) in zip(
+            placeholders[1:], export_fields
+        ):
+            if field_name in variant_columns:
+                projection.append(f"PARSE_JSON({placeholder})")
+            else:
+                projection.append(placeholder)
+        return projection
+
+    def _bound_insert_features(
+        self,
+        source,
+        feedback,
+        export_fields: typing.List[typing.Tuple[str, int]],
+        use_geometry_type: bool,
+        source_srid: int,
+        variant_columns: typing.Set[str],
+        connection_name: str,
+        fq_table: str,
+        query_columns: str,
+    ) -> typing.Optional[int]:
+        """Export ``source`` through one prepared ``INSERT ... SELECT ?, ...``
+        run with ``executemany`` (server-side array binding) per batch.
+
+        Returns the number of rows inserted, or None when the first batch is
+        rejected, in which case nothing was written and the caller falls
+        back to the VALUES statements.
+        """
+        projection = self._export_projection(
+            ["?"] * (1 + len(export_fields)),
+            export_fields,
+            variant_columns,
+            use_geometry_type,
+            source_srid,
+        )
+        query = (
+            f"INSERT INTO {fq_table} ({query_columns}) "  # nosec B608 - fq_table built via qualified_table_name; query_columns built from quote_identifier; values bound as ? parameters
+            f"SELECT {','.join(projection)}"
+        )
+        total = 100.0 / source.featureCount() if source.featureCount() else 0
+        inserted = 0
+        batch = []
+        for current, feature in enumerate(source.getFeatures()):
+            if feedback.isCanceled():
+                break
+            batch.append(self._export_row(feature, export_fields))
+            if len(batch) == _BOUND_INSERT_BATCH_ROWS:
+                if not self._insert_bound_batch(
+                    connection_name, query, batch, inserted == 0
+                ):
+                    return None
+                inserted += len(batch)
+                batch = []
+            feedback.setProgress(int(current * total))
+        if batch:
+            if not self._insert_bound_batch(connection_name, query, batch, inserted == 0):
+                return None
+            inserted += len(batch)
+        return inserted
+
+    def _insert_bound_batch(
+        self, connection_name: str, query: str, rows: typing.List[list], first: bool
+    ) -> bool:
+        try:
+            self.connection_manager.execute_many(connection_name, query, rows)
+            return True
+        except Exception as e:
+            if not first:
+                raise
+            QgsMessageLog.logMessage(
+                f"Parameter-bound insert failed, falling back to VALUES statements: {e}",
+                "Snowflake Plugin",
+                Qgis.MessageLevel.Warning,
+            )
+            return False
+
+    def _server_side_copy(
+        self,
+        parameters,
+        context,
+        source,
+        feedback,
+        export_fields: typing.List[typing.Tuple[str, int]],
+        use_geometry_type: bool,
+        source_srid: int,
+        variant_columns: typing.Set[str],
+        connection_name: str,
+        fq_table: str,
+        query_columns: str,
+    ) -> typing.Optional[typing.Dict[str, int]]:
+        """Copy a Snowflake input layer with one ``INSERT INTO ... SELECT``
+        run on the warehouse, so its rows never pass through QGIS.
+
+        Applies the layer's subset string, geometry-type split and (through
+        the primary key) the selection. Returns None - export through the
+        client - when the input is not a Snowflake layer of the same
+        connection or its rows cannot be reproduced in SQL (uncommitted
+        edits, row-capped preview, feature limit, filter expression, virtual
+        fields, unkeyed or very large selection).
+        """
+        layer = self.parameterAsVectorLayer(parameters, self.INPUT, context)
+        if layer is None:
+            return None
+        # Added, changed and deleted features only exist in the layer's edit
+        # buffer; the table does not have them yet.
+        if layer.isEditable() and layer.isModified():
+            return None
+        provider = layer.dataProvider()
+        if (
+            provider is None
+            or provider.name() != "snowflakedb"
+            or not hasattr(provider, "server_side_select_parts")
+        ):
+            return None
+        try:
+            src_connection = parse_uri(provider.dataSourceUri())[0]
+        except Exception:
+            return None
+        if src_connection != connection_name:
+            return None
+        provider_fields = {field.name() for field in provider.fields()}
+        if any(name not in provider_fields for name, _type in export_fields):
+            return None
+
+        primary_key_values = None
+        definition = parameters.get(self.INPUT)
+        if isinstance(definition, QgsProcessingFeatureSourceDefinition):
+            if getattr(definition, "featureLimit", -1) not in (-1, None) or getattr(
+                definition, "filterExpression", ""
+            ):
+                return None
+            if definition.selectedFeaturesOnly:
+                pk_index = source.fields().lookupField(provider.primary_key() or "")
+                if pk_index < 0 or source.featureCount() > SERVER_SIDE_MAX_SELECTED:
+                    return None
+                primary_key_values = [
+                    feature.attribute(pk_index) for feature in source.getFeatures()
+                ]
+
+        parts = provider.server_side_select_parts(primary_key_values)
+        if parts is None:
+            return None
+        from_clause, geometry_sql, where_parts = parts
+        # Round-trip through WKB exactly like the client paths, which also
+        # converts GEOGRAPHY <-> GEOMETRY and H3 boundaries as needed.
+        projection = self._export_projection(
+            [f"HEX_ENCODE(ST_ASWKB({geometry_sql}))"],
+            [],
+            set(),
+            use_geometry_type,
+            source_srid,
+        )
+        for field_name, _field_type in export_fields:
+            column = quote_identifier(field_name)
+            if field_name in variant_columns:
+                # JSON text is parsed like the client paths' PARSE_JSON;
+                # anything else (including VARIANT values) is kept as is.
+                projection.append(
+                    f"COALESCE(TRY_PARSE_JSON(TO_VARCHAR({column})), TO_VARIANT({column}))"
+                )
+            else:
+                projection.append(column)
+        query = (
+            f"INSERT INTO {fq_table} ({query_columns}) "  # nosec B608 - fq_table built via qualified_table_name; columns via quote_identifier; from_clause/where_parts come from the provider (pre-quoted, subset compiler-validated)
+            f"SELECT {','.join(projection)} FROM {from_clause}"
+        )
+        if where_parts:
+            query += " WHERE " + " AND ".join(where_parts)
+
+        feedback.setProgressText(self.tr("Copying rows on the Snowflake warehouse"))
+        # A copy of millions of rows can run for minutes: submitted
+        # asynchronously, Cancel aborts it on the warehouse.
+        cur = self.connection_manager.execute_query_async(
+            connection_name, query, feedback=feedback
+        )
+        row = cur.fetchone()
+        cur.close()
+        feedback.setProgress(100)
+        return {"Rows Inserted": int(row[0]) if row else 0}
+
+    def _bulk_load_features(
+        self,
+        source,
+        feedback,
+        export_fields: typing.List[typing.Tuple[str, int]],
+        use_geometry_type: bool,
+        source_srid: int,
+        variant_columns: typing.Set[str],
+        connection_name: str,
+        database_name: str,
+        schema_name: str,
+        fq_table: str,
+        query_columns: str,
+    ) -> typing.Dict[str, int]:
+        """Export ``source`` via gzip CSV files, PUT and one COPY INTO.
+
+        The files hold the ``_export_row`` values; nothing is loaded if the
+        export is cancelled while they are being written.
+        """
+        select_projection = self._export_projection(
+            [f"${position}" for position in range(1, len(export_fields) + 2)],
+            export_fields,
+            variant_columns,
+            use_geometry_type,
+            source_srid,
+        )
+        total = 100.0 / source.featureCount() if source.featureCount() else 0
+        with tempfile.TemporaryDirectory(prefix="sf_export_") as directory:
+            feedback.setProgressText(self.tr("Writing features to bulk load files"))
+            with StageFileWriter(directory) as writer:
+                for current, feature in enumerate(source.getFeatures()):
+                    if feedback.isCanceled():
+                        return {"Rows Inserted": 0}
+                    writer.write_row(self._export_row(feature, export_fields))
+                    # Writing is the cheap half; leave the rest for the load.
+                    feedback.setProgress(int(current * total * 0.5))
+            if writer.row_count == 0:
+                feedback.setProgress(100)
+                return {"Rows Inserted": 0}
+
+            feedback.setProgressText(self.tr("Uploading and loading into Snowflake"))
+            rows_loaded = load_staged_files(
+                self.connection_manager,
+                connection_name,
+                database_name,
+                schema_name,
+                directory,
+                fq_table,
+                query_columns,
+                select_projection,
+            )
+        feedback.setProgress(100)
+        return {"Rows Inserted": rows_loaded}
+
     def get_field_type_from_code_type(self, code_type: int) -> str:
         """
         Get the field type from the code type.
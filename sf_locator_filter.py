@@ -38,6 +38,7 @@ class SFLocatorFilter(QgsLocatorFilter):
 
         try:
             from .helpers.utils import get_connection_child_groups, get_auth_information
+            from .helpers.metadata_cache import get_metadata_cache, metadata_key
             from .helpers.sql import quote_literal
             from .managers.sf_connection_manager import SFConnectionManager
 
@@ -60,9 +61,19 @@ class SFLocatorFilter(QgsLocatorFilter):
                         f"AND TABLE_SCHEMA != 'INFORMATION_SCHEMA' "
                         f"ORDER BY TABLE_NAME LIMIT 20"
                     )
-                    cursor = mgr.execute_query(conn_name, sql)
-                    rows = cursor.fetchall() if cursor else []
-                    cursor.close() if cursor else None
+
+                    def load_tables(sql=sql):
+                        cursor = mgr.execute_query(conn_name, sql)
+                        rows = cursor.fetchall() if cursor else []
+                        cursor.close() if cursor else None
+                        return rows
+
+                    # Typing extends the search string one letter at a
+                    # time; reopening the locator repeats the same ones.
+                    rows = get_metadata_cache().get_or_load(
+                        metadata_key("table_search", conn_name, None, None, None, string),
+                        load_tables,
+                    )
 
                     for schema_name, table_name in rows:
                         if feedback.isCanceled():
@@ -105,6 +116,7 @@ class SFLocatorFilter(QgsLocatorFilter):
             table = data["table"]
 
             from .helpers.utils import get_auth_information
+            from .helpers.metadata_cache import get_metadata_cache, metadata_key
             from .helpers.sql import quote_literal
             from .managers.sf_connection_manager import SFConnectionManager
             from .tasks.sf_convert_column_to_layer_task import SFConvertColumnToLayerTask
@@ -121,11 +133,19 @@ class SFLocatorFilter(QgsLocatorFilter):
                 f"AND DATA_TYPE IN ('GEOGRAPHY', 'GEOMETRY') "
                 f"ORDER BY ORDINAL_POSITION"
             )
-            cursor = mgr.execute_query(
-                conn_name, geo_query, {"schema_name": schema}
+
+            def load_geo_columns():
+                cursor = mgr.execute_query(
+                    conn_name, geo_query, {"schema_name": schema}
+                )
+                rows = cursor.fetchall() if cursor else []
+                cursor.close() if cursor else None
+                return rows
+
+            geo_rows = get_metadata_cache().get_or_load(
+                metadata_key("geo_column_names", conn_name, None, schema, table),
+                load_geo_columns,
             )
-            geo_rows = cursor.fetchall() if cursor else []
-            cursor.close() if cursor else None
 
             if not geo_rows:
                 QgsMessageLog.logMessage(
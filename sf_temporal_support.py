@@ -52,6 +52,7 @@ def configure_temporal_for_layer(layer):
         if not conn_name or not table:
             return
 
+        from .helpers.metadata_cache import get_metadata_cache, metadata_key
         from .helpers.sql import quote_literal
         from .helpers.utils import get_auth_information
         from .managers.sf_connection_manager import SFConnectionManager
@@ -69,10 +70,17 @@ def configure_temporal_for_layer(layer):
             f"AND DATA_TYPE IN ({types_in}) "
             f"ORDER BY ORDINAL_POSITION"
         )
-        cursor = mgr.execute_query(conn_name, sql, {"schema_name": schema})
-        rows = cursor.fetchall() if cursor else []
-        cursor.close() if cursor else None
-        timestamp_fields = [(r[0], r[1]) for r in rows]
+
+        def load_timestamp_columns():
+            cursor = mgr.execute_query(conn_name, sql, {"schema_name": schema})
+            rows = cursor.fetchall() if cursor else []
+            cursor.close() if cursor else None
+            return [(r[0], r[1]) for r in rows]
+
+        timestamp_fields = get_metadata_cache().get_or_load(
+            metadata_key("timestamp_columns", conn_name, None, schema, table),
+            load_timestamp_columns,
+        )
 
     except Exception as e:
         QgsMessageLog.logMessage(
@@ -59,6 +59,7 @@ class SFExecuteSQLQueryTask(QgsTask):
                 query=self.query,
                 context_information=self.context_information,
                 limit=self.limit,
+                is_canceled=self.isCanceled,
             )
 
             return True
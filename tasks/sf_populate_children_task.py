@@ -0,0 +1,68 @@
+import threading
+import typing
+
+from ..managers.sf_connection_manager import SFConnectionManager
+from qgis.core import QgsTask
+from qgis.PyQt.QtCore import pyqtSignal
+
+
+class SFPopulateChildrenTask(QgsTask):
+    """Runs the Snowflake metadata queries behind a browser node off the UI
+    thread. The results land in the metadata cache, from which the node then
+    builds its children on the main thread."""
+
+    on_handle_finished = pyqtSignal(str, str)
+
+    def __init__(
+        self, path: str, description: str, load: typing.Callable[[], object]
+    ) -> None:
+        """
+        Initializes a SFPopulateChildrenTask object.
+
+        Args:
+            path (str): The browser path of the node being populated.
+            description (str): The task description shown in the task manager.
+            load (Callable): Fetches (and caches) the node's metadata.
+        """
+        self.path = path
+        self._load = load
+        self._error = ""
+        self._run_thread_id: typing.Optional[int] = None
+        super().__init__(description, QgsTask.CanCancel)
+
+    def run(self) -> bool:
+        """
+        Fetches the node's metadata.
+
+        Returns:
+            bool: True if the metadata was fetched, False otherwise.
+        """
+        try:
+            self._run_thread_id = threading.get_ident()
+            self._load()
+            return not self.isCanceled()
+        except Exception as e:
+            if not self.isCanceled():
+                self._error = str(e)
+            return False
+
+    def cancel(self) -> None:
+        """Stop the metadata query when the node no longer needs it."""
+        if self._run_thread_id is not None:
+            SFConnectionManager.get_instance().cancel_pending_on_thread(
+                self._run_thread_id
+            )
+        super().cancel()
+
+    def finished(self, result: bool) -> None:
+        """
+        Callback function called when the task is finished.
+
+        Emits the node path and the error message (empty on success) unless
+        the task was cancelled.
+
+        Args:
+            result (bool): The result of the task.
+        """
+        if result or self._error:
+            self.on_handle_finished.emit(self.path, self._error)
@@ -0,0 +1,298 @@
+"""Micro-benchmark for the export algorithm's insert paths.
+
+Runs the real ``QGISSnowflakeConnectorAlgorithm`` insert methods
+(qgis_snowflake_connector_algorithm.py) against minimal stand-ins for the
+PyQGIS classes they touch and a connection manager / data provider that only
+record what would be sent, so the numbers measure the plugin's own client-side
+work:
+
+* "values": ``_values_insert_features`` - ``INSERT ... SELECT ... FROM VALUES``
+  SQL strings built by concatenating one literal per value, 5,000 rows each.
+* "bound":  ``_bound_insert_features`` - one prepared ``INSERT ... SELECT ?``
+  and plain Python rows handed to ``executemany`` in batches.
+
+Memory is the ``tracemalloc`` peak while exporting. Not part of the CI test
+run. Usage::
+
+    python test/benchmark_export.py [rows ...]
+"""
+
+import importlib.util
+import pathlib
+import struct
+import sys
+import time
+import tracemalloc
+import types
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+PACKAGE = "qgis_snowflake_connector_export_bench"
+DEFAULT_ROW_COUNTS = (20_000, 100_000)
+
+
+# --- Minimal PyQGIS stand-ins -------------------------------------------------
+
+
+class _Enum:
+    def __init__(self, **members):
+        self.__dict__.update(members)
+
+
+_TYPES = _Enum(QString=10, Int=2, Double=6, QDate=14, QTime=15, QDateTime=16, Bool=1)
+
+
+class _QByteArray:
+    def __init__(self, data=b""):
+        self._data = bytes(data)
+
+    def toHex(self):
+        return _QByteArray(self._data.hex().encode("ascii"))
+
+    def data(self):
+        return self._data
+
+
+class _QVariant:
+    def isNull(self):
+        return True
+
+
+class _Field:
+    def __init__(self, name, field_type):
+        self._name = name
+        self._type = field_type
+
+    def name(self):
+        return self._name
+
+    def type(self):
+        return self._type
+
+    def subType(self):
+        return self._type
+
+
+class _Geometry:
+    def __init__(self, wkb):
+        self._wkb = wkb
+
+    def asWkb(self):
+        return self._wkb
+
+
+class _Feature:
+    __slots__ = ("_geometry", "_attributes")
+
+    def __init__(self, wkb, attributes):
+        self._geometry = _Geometry(wkb)
+        self._attributes = attributes
+
+    def geometry(self):
+        return self._geometry
+
+    def fieldNameIndex(self, name):
+        return _FIELD_INDEX[name]
+
+    def attribute(self, index):
+        return self._attributes[index]
+
+
+_FIELDS = [
+    _Field("ID", _TYPES.Int),
+    _Field("NAME", _TYPES.QString),
+    _Field("VALUE", _TYPES.Double),
+    _Field("NOTE", _TYPES.QString),
+]
+_FIELD_INDEX = {field.name(): i for i, field in enumerate(_FIELDS)}
+
+
+class _Source:
+    def __init__(self, row_count):
+        self._row_count = row_count
+
+    def fields(self):
+        return _FIELDS
+
+    def featureCount(self):
+        return self._row_count
+
+    def getFeatures(self):
+        for i in range(self._row_count):
+            wkb = struct.pack("<BIdd", 1, 1, i * 0.001, -i * 0.001)
+            yield _Feature(wkb, [i, f"name {i}", i * 0.5, None if i % 3 else "it's"])
+
+
+class _Feedback:
+    def isCanceled(self):
+        return False
+
+    def setProgress(self, value):
+        pass
+
+    def setProgressText(self, text):
+        pass
+
+
+class _Recorder:
+    """Stands in for both the data provider and the connection manager."""
+
+    def __init__(self):
+        self.statements = 0
+        self.sql_chars = 0
+        self.bound_rows = 0
+
+    def execute_query(self, query, connection_name, context_information=None):
+        self.statements += 1
+        self.sql_chars += len(query)
+        return types.SimpleNamespace(close=lambda: None)
+
+    def execute_many(self, connection_name, query, rows, **kwargs):
+        self.statements += 1
+        self.sql_chars += len(query)
+        self.bound_rows += len(rows)
+        return len(rows)
+
+
+def _install_stubs():
+    qgis = types.ModuleType("qgis")
+    core = types.ModuleType("qgis.core")
+    for name in (
+        "QgsProcessing", "QgsProcessingFeatureSourceDefinition",
+        "QgsProcessingParameterBoolean",
+        "QgsProcessingParameterFeatureSource", "QgsProcessingParameterString",
+        "QgsProcessingContext", "QgsVectorLayer",
+    ):
+        setattr(core, name, type(name, (), {}))
+    core.QgsProcessingAlgorithm = type("QgsProcessingAlgorithm", (), {})
+    core.QgsProcessingException = type("QgsProcessingException", (Exception,), {})
+    core.QgsMessageLog = type(
+        "QgsMessageLog", (), {"logMessage": staticmethod(lambda *a, **k: None)}
+    )
+    core.Qgis = type("Qgis", (), {"MessageLevel": _Enum(Info=0, Warning=1, Critical=2)})
+    qgis.core = core
+    pyqt = types.ModuleType("qgis.PyQt")
+    qtcore = types.ModuleType("qgis.PyQt.QtCore")
+    qtcore.QCoreApplication = type(
+        "QCoreApplication", (), {"translate": staticmethod(lambda ctx, s: s)}
+    )
+    qtcore.QByteArray = _QByteArray
+    qtcore.QVariant = _QVariant
+    qtcore.QMetaType = type("QMetaType", (), {"Type": _TYPES})
+    for name in ("QDate", "QDateTime", "QTime"):
+        setattr(qtcore, name, type(name, (), {}))
+    pyqt.QtCore = qtcore
+    qgis.PyQt = pyqt
+    sys.modules.update({
+        "qgis": qgis,
+        "qgis.core": core,
+        "qgis.PyQt": pyqt,
+        "qgis.PyQt.QtCore": qtcore,
+    })
+
+    def package(name, path):
+        module = types.ModuleType(name)
+        module.__path__ = [str(path)]
+        sys.modules[name] = module
+
+    package(PACKAGE, ROOT)
+    for sub in ("helpers", "managers", "entities", "providers"):
+        package(f"{PACKAGE}.{sub}", ROOT / sub)
+
+    unused = lambda *args, **kwargs: None  # noqa: E731
+    stubs = {
+        "managers.sf_connection_manager": {
+            "SFConnectionManager": type("SFConnectionManager", (), {}),
+        },
+        "helpers.data_base": {
+            "create_schema": unused, "create_table": unused,
+            "get_count_schemas": unused, "get_count_tables": unused,
+        },
+        "entities.sf_dynamic_connection_combo_box_widget": {
+            "DynamicConnectionComboBoxWidget": type("Widget", (), {}),
+        },
+        "providers.sf_data_source_provider": {
+            "SFDataProvider": type("SFDataProvider", (), {}),
+        },
+        "providers.sf_vector_data_provider": {"SERVER_SIDE_MAX_SELECTED": 10_000},
+        "helpers.utils": {
+            "get_authentification_information": unused, "get_qsettings": unused,
+        },
+        "helpers.wrapper": {"parse_uri": unused},
+    }
+    for name, attributes in stubs.items():
+        module = types.ModuleType(f"{PACKAGE}.{name}")
+        module.__dict__.update(attributes)
+        sys.modules[module.__name__] = module
+
+
+def _load_algorithm_module():
+    name = f"{PACKAGE}.qgis_snowflake_connector_algorithm"
+    spec = importlib.util.spec_from_file_location(
+        name, ROOT / "qgis_snowflake_connector_algorithm.py"
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def _run(module, row_count, bound):
+    algorithm = module.QGISSnowflakeConnectorAlgorithm()
+    recorder = _Recorder()
+    algorithm.sf_data_provider = recorder
+    algorithm.connection_manager = recorder
+    source = _Source(row_count)
+    query_columns = '"GEOM","ID","NAME","VALUE","NOTE"'
+    tracemalloc.start()
+    start = time.perf_counter()
+    if bound:
+        algorithm._bound_insert_features(
+            source=source,
+            feedback=_Feedback(),
+            export_fields=algorithm._export_fields(source, "GEOM", False),
+            use_geometry_type=False,
+            source_srid=4326,
+            variant_columns=set(),
+            connection_name="bench",
+            fq_table="DB.S.T",
+            query_columns=query_columns,
+        )
+    else:
+        algorithm._values_insert_features(
+            source=source,
+            feedback=_Feedback(),
+            geom_column="GEOM",
+            is_snowflake_layer=False,
+            use_geometry_type=False,
+            source_srid=4326,
+            variant_columns=set(),
+            connection_name="bench",
+            fq_table="DB.S.T",
+            query_columns=query_columns,
+        )
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, recorder
+
+
+def _report(label, count, elapsed, peak, recorder):
+    print(
+        f"  {label:<7} {elapsed:8.3f}s  {count / elapsed:>11,.0f} rows/s  "
+        f"peak {peak / 1024 / 1024:7.1f} MiB  "
+        f"{recorder.statements:>4} statements, {recorder.sql_chars:>12,} SQL chars"
+    )
+
+
+def main(row_counts):
+    _install_stubs()
+    module = _load_algorithm_module()
+    for count in row_counts:
+        print(f"{count:,} features")
+        _report("values", count, *_run(module, count, bound=False))
+        _report("bound", count, *_run(module, count, bound=True))
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_ROW_COUNTS)
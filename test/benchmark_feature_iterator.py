@@ -0,0 +1,550 @@
+"""Micro-benchmarks for the feature iterators' fetch paths.
+
+Runs the real ``SFFeatureIterator`` (providers/sf_feature_iterator.py) and
+``BatchReader`` (helpers/batch_reader.py) against minimal stand-ins for the
+PyQGIS classes they touch and a mocked Snowflake cursor, so the numbers measure
+the plugin's own per-row Python work (fetch, decode, attribute conversion)
+rather than network or QGIS C++ time.
+
+Not part of the CI test run. Usage::
+
+    python test/benchmark_feature_iterator.py [rows ...]
+
+The Arrow path is only measured when ``pyarrow`` is installed. The
+"sync"/"prefetch" rows add a simulated round-trip per ``fetchmany()`` to show
+the effect of the background batch prefetcher on a high-latency link.
+
+The "cache" rows compare the memory held by the provider's feature cache as a
+list of ``QgsFeature`` copies against the columnar ``FeatureStore``, measured
+with ``tracemalloc``. tracemalloc only sees the Python heap, so with the real
+PyQGIS classes (whose geometry and attributes live in C++) the saving is
+larger than reported here.
+"""
+
+import importlib.util
+import pathlib
+import struct
+import sys
+import time
+import tracemalloc
+import types
+
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+PACKAGE = "qgis_snowflake_connector_bench"
+DEFAULT_ROW_COUNTS = (50_000, 500_000)
+SIMULATED_ROUND_TRIP_SECONDS = 0.05
+
+
+# --- Minimal PyQGIS stand-ins -------------------------------------------------
+
+
+class _Enum:
+    def __init__(self, **members):
+        self.__dict__.update(members)
+
+
+class _QgsFeatureRequest:
+    FilterNone, FilterFid, FilterExpression, FilterFids = range(4)
+    Flag = _Enum(NoGeometry=1, SubsetOfAttributes=2)
+
+    class _Crs:
+        def isValid(self):
+            return False
+
+    def destinationCrs(self):
+        return self._Crs()
+
+    def filterType(self):
+        return self.FilterNone
+
+    def flags(self):
+        return 0
+
+    def subsetOfAttributes(self):
+        return []
+
+    def filterRect(self):
+        return _QgsRectangle()
+
+    def simplifyMethod(self):
+        return _QgsSimplifyMethod()
+
+
+class _QgsSimplifyMethod:
+    NoSimplification, OptimizeForRendering = range(2)
+
+    def methodType(self):
+        return self.NoSimplification
+
+    def tolerance(self):
+        return 1.0
+
+
+class _QgsRectangle:
+    def __init__(self, xmin=0.0, ymin=0.0, xmax=0.0, ymax=0.0):
+        self._box = (xmin, ymin, xmax, ymax)
+
+    def isNull(self):
+        return True
+
+    def xMinimum(self):
+        return self._box[0]
+
+    def yMinimum(self):
+        return self._box[1]
+
+    def xMaximum(self):
+        return self._box[2]
+
+    def yMaximum(self):
+        return self._box[3]
+
+
+class _QgsAbstractFeatureIterator:
+    def __init__(self, request):
+        self._bench_request = request
+
+    def filterRectToSourceCrs(self, transform):
+        return _QgsRectangle()
+
+    def geometryToDestinationCrs(self, feature, transform):
+        return None
+
+    def nextFeature(self, feature):
+        return self.fetchFeature(feature)
+
+
+class _QgsFeature:
+    __slots__ = ("_attributes", "_fields", "_geometry", "_id", "_valid")
+
+    def __init__(self, other=None):
+        if isinstance(other, _QgsFeature):
+            self._attributes = list(other._attributes)
+            self._fields = other._fields
+            self._geometry = (
+                None if other._geometry is None else _QgsGeometry(other._geometry)
+            )
+            self._id = other._id
+            self._valid = other._valid
+        else:
+            self._attributes = []
+            self._fields = None
+            self._geometry = None
+            self._id = -1
+            self._valid = False
+
+    def setFields(self, fields):
+        self._fields = fields
+        self._attributes = [None] * len(fields)
+
+    def fields(self):
+        return self._fields
+
+    def id(self):
+        return self._id
+
+    def hasGeometry(self):
+        return self._geometry is not None
+
+    def geometry(self):
+        return self._geometry
+
+    def setGeometry(self, geometry):
+        self._geometry = geometry
+
+    def setId(self, fid):
+        self._id = fid
+
+    def setAttribute(self, idx, value):
+        self._attributes[idx] = value
+
+    def setAttributes(self, attributes):
+        self._attributes = attributes
+
+    def attributes(self):
+        return self._attributes
+
+    def setValid(self, valid):
+        self._valid = valid
+
+
+class _QgsGeometry:
+    __slots__ = ("_wkb",)
+
+    def __init__(self, other=None):
+        # Like QgsGeometry, a copy owns its own geometry buffer.
+        self._wkb = None if other is None else bytes(bytearray(other._wkb))
+
+    def fromWkb(self, wkb):
+        self._wkb = wkb
+
+    def asWkb(self):
+        return self._wkb
+
+    def boundingBox(self):
+        _, _, x, y = struct.unpack("<BIdd", self._wkb)
+        return _QgsRectangle(x, y, x, y)
+
+
+class _QgsMessageLog:
+    @staticmethod
+    def logMessage(*args, **kwargs):
+        return None
+
+
+def _install_stubs():
+    qgis = types.ModuleType("qgis")
+    core = types.ModuleType("qgis.core")
+    core.QgsAbstractFeatureIterator = _QgsAbstractFeatureIterator
+    core.QgsCoordinateTransform = type(
+        "QgsCoordinateTransform", (), {"isValid": lambda self: False}
+    )
+    core.QgsCsException = type("QgsCsException", (Exception,), {})
+    core.QgsFeature = _QgsFeature
+    core.QgsFeatureRequest = _QgsFeatureRequest
+    core.QgsFields = list
+    core.QgsGeometry = _QgsGeometry
+    core.QgsMessageLog = _QgsMessageLog
+    core.QgsRectangle = _QgsRectangle
+    core.QgsSimplifyMethod = _QgsSimplifyMethod
+    core.QgsSpatialIndex = type("QgsSpatialIndex", (), {})
+    core.Qgis = type(
+        "Qgis", (), {"MessageLevel": _Enum(Info=0, Warning=1, Critical=2)}
+    )
+    qgis.core = core
+    pyqt = types.ModuleType("qgis.PyQt")
+    qtcore = types.ModuleType("qgis.PyQt.QtCore")
+    qtcore.QMetaType = type(
+        "QMetaType", (), {"Type": _Enum(QDate=14, QTime=15, QDateTime=16, Double=6)}
+    )
+    qtcore.QDate = qtcore.QTime = qtcore.QDateTime = str
+    qtcore.QVariant = type("QVariant", (), {"isNull": lambda self: True})
+    pyqt.QtCore = qtcore
+    qgis.PyQt = pyqt
+    sys.modules.update({
+        "qgis": qgis,
+        "qgis.core": core,
+        "qgis.PyQt": pyqt,
+        "qgis.PyQt.QtCore": qtcore,
+    })
+
+    def package(name, path):
+        module = types.ModuleType(name)
+        module.__path__ = [str(path)]
+        sys.modules[name] = module
+        return module
+
+    package(PACKAGE, ROOT)
+    package(f"{PACKAGE}.helpers", ROOT / "helpers")
+    package(f"{PACKAGE}.providers", ROOT / "providers")
+    package(f"{PACKAGE}.managers", ROOT / "managers")
+
+    stubs = {
+        "helpers.expression_compiler": {
+            "compile_expression_to_sql": lambda expression, fields, geometry=None: None,
+        },
+        "helpers.mappings": {"mapping_multi_single_to_geometry_type": {}},
+        "managers.sf_connection_manager": {
+            "build_op_tag": lambda *args, **kwargs: "",
+        },
+        "providers.sf_feature_source": {
+            "SFFeatureSource": type("SFFeatureSource", (), {}),
+        },
+    }
+    for name, attributes in stubs.items():
+        module = types.ModuleType(f"{PACKAGE}.{name}")
+        module.__dict__.update(attributes)
+        sys.modules[module.__name__] = module
+
+
+def _load_module(relative_path):
+    name = f"{PACKAGE}." + relative_path[:-3].replace("/", ".")
+    spec = importlib.util.spec_from_file_location(name, ROOT / relative_path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# --- Mocked provider / cursor -------------------------------------------------
+
+
+class _Field:
+    def __init__(self, name, field_type):
+        self._name = name
+        self._type = field_type
+
+    def name(self):
+        return self._name
+
+    def type(self):
+        return self._type
+
+
+class _Fields(list):
+    def names(self):
+        return [field.name() for field in self]
+
+
+class _Description:
+    def __init__(self, name):
+        self.name = name
+
+
+# Layer layout: ID (int), NAME (text), VALUE (double) plus a WKB point.
+_FIELDS = _Fields([_Field("ID", 2), _Field("NAME", 10), _Field("VALUE", 6)])
+_COLUMN_NAMES = ["ID", "NAME", "VALUE", "ST_ASWKB(GEOM)", "SFINDEXSFROWNUMBERAUTO"]
+
+
+def _make_columns(row_count):
+    wkb = [struct.pack("<BIdd", 1, 1, i * 0.001, -i * 0.001) for i in range(row_count)]
+    return [
+        list(range(row_count)),
+        [f"name-{i}" for i in range(row_count)],
+        [i * 0.5 for i in range(row_count)],
+        wkb,
+        list(range(1, row_count + 1)),
+    ]
+
+
+class _RowCursor:
+    """fetchmany()-only cursor, i.e. the pre-Arrow code path."""
+
+    def __init__(self, columns):
+        self._rows = list(zip(*columns))
+        self._offset = 0
+        self.description = [_Description(name) for name in _COLUMN_NAMES]
+
+    def fetchmany(self, size):
+        rows = self._rows[self._offset:self._offset + size]
+        self._offset += size
+        return rows
+
+    def close(self):
+        return None
+
+
+class _SlowRowCursor(_RowCursor):
+    """fetchmany() cursor that pays a network round-trip per batch."""
+
+    def fetchmany(self, size):
+        time.sleep(SIMULATED_ROUND_TRIP_SECONDS)
+        return super().fetchmany(size)
+
+
+class _ArrowCursor(_RowCursor):
+    """Cursor that also serves the result as Arrow record batches."""
+
+    batch_size = 10_000
+
+    def __init__(self, columns):
+        super().__init__(columns)
+        import pyarrow
+
+        self._table = pyarrow.table(
+            {name: column for name, column in zip(_COLUMN_NAMES, columns)}
+        )
+
+    def fetch_arrow_batches(self):
+        for offset in range(0, self._table.num_rows, self.batch_size):
+            yield self._table.slice(offset, self.batch_size)
+
+
+class _ConnectionManager:
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute_query(self, **kwargs):
+        return self._cursor
+
+    def register_prefetcher(self, prefetcher):
+        return 0
+
+    def unregister_prefetcher(self, tid, prefetcher):
+        return None
+
+
+class _Provider:
+    _column_geom = "GEOM"
+    _geo_column_type = "GEOGRAPHY"
+    _geometry_type = "Point"
+    _from_clause = "BENCH_TABLE"
+    _connection_name = "bench"
+    _schema_name = "PUBLIC"
+    _table_name = "BENCH_TABLE"
+    _context_information = {}
+    _is_limited_unordered = False
+    _load_all_rows = False
+
+    def __init__(self, cursor, feature_store):
+        self.connection_manager = _ConnectionManager(cursor)
+        self._fields = _FIELDS
+        self._features = feature_store
+        self._features_loaded = False
+
+    def isValid(self):
+        return True
+
+    def fields(self):
+        return self._fields
+
+    def crs(self):
+        return None
+
+    def subsetString(self):
+        return None
+
+    def primary_key(self):
+        return ""
+
+    def uses_primary_key_fids(self):
+        return False
+
+    def get_geometry_column(self):
+        return self._column_geom
+
+    def restore_cached_features(self):
+        return False
+
+    def save_cached_features(self):
+        return None
+
+    def get_field_index_by_type(self, field_type):
+        return [i for i, field in enumerate(self._fields) if field.type() == field_type]
+
+
+class _Source:
+    def __init__(self, provider):
+        self._provider = provider
+
+    def get_provider(self):
+        return self._provider
+
+
+def _time_iteration(iterator_module, cursor):
+    provider = _Provider(cursor, iterator_module.FeatureStore())
+    start = time.perf_counter()
+    iterator = iterator_module.SFFeatureIterator(
+        _Source(provider), _QgsFeatureRequest()
+    )
+    feature = _QgsFeature()
+    count = 0
+    while iterator.fetchFeature(feature):
+        count += 1
+    elapsed = time.perf_counter() - start
+    return count, elapsed
+
+
+def _drain_with_pop(cursor, batch_size):
+    """The pre-BatchReader pattern: list.pop(0) from the front of each batch."""
+    batch_rows = []
+    count = 0
+    while True:
+        if not batch_rows:
+            batch_rows = cursor.fetchmany(batch_size)
+        row = batch_rows.pop(0) if batch_rows else None
+        if row is None:
+            return count
+        count += 1
+
+
+def _drain_with_reader(batch_reader_module, cursor, batch_size):
+    reader = batch_reader_module.BatchReader.from_cursor(cursor, batch_size)
+    count = 0
+    while reader.next_row() is not None:
+        count += 1
+    return count
+
+
+class _FeatureCopyList(list):
+    """The pre-FeatureStore cache: one full QgsFeature copy per row."""
+
+    def append(self, feature):
+        super().append(_QgsFeature(feature))
+
+
+def _cache_memory(iterator_module, columns, use_store):
+    """Bytes held by a fully populated provider feature cache (tracemalloc)."""
+    cursor = _RowCursor(columns)
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    cache = iterator_module.FeatureStore() if use_store else _FeatureCopyList()
+    provider = _Provider(cursor, cache)
+    iterator = iterator_module.SFFeatureIterator(
+        _Source(provider), _QgsFeatureRequest()
+    )
+    feature = _QgsFeature()
+    while iterator.fetchFeature(feature):
+        pass
+    iterator.close()
+    del iterator, feature, provider
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return held, len(cache)
+
+
+def _report_memory(label, held, count):
+    print(f"  {label:<12} {count:>9,d} rows  {held / 2 ** 20:7.1f} MiB  "
+          f"{held / max(count, 1):>9,.0f} B/row")
+
+
+def _time_call(function, *args):
+    start = time.perf_counter()
+    count = function(*args)
+    return count, time.perf_counter() - start
+
+
+def _report(label, count, elapsed):
+    print(f"  {label:<12} {count:>9,d} rows  {elapsed:7.3f} s  "
+          f"{count / elapsed:>12,.0f} rows/s")
+
+
+def main(row_counts):
+    _install_stubs()
+    iterator_module = _load_module("providers/sf_feature_iterator.py")
+    batch_reader_module = sys.modules[f"{PACKAGE}.helpers.batch_reader"]
+    arrow_available = importlib.util.find_spec("pyarrow") is not None
+
+    for row_count in row_counts:
+        columns = _make_columns(row_count)
+        print(f"{row_count:,d} rows")
+
+        for batch_size in (5_000, 50_000):
+            _report(
+                f"pop(0)/{batch_size // 1000}k",
+                *_time_call(_drain_with_pop, _RowCursor(columns), batch_size),
+            )
+            _report(
+                f"reader/{batch_size // 1000}k",
+                *_time_call(
+                    _drain_with_reader, batch_reader_module,
+                    _RowCursor(columns), batch_size,
+                ),
+            )
+
+        iterator_module._ARROW_FETCH_AVAILABLE = False
+        _report("tuple", *_time_iteration(iterator_module, _RowCursor(columns)))
+
+        if arrow_available:
+            iterator_module._ARROW_FETCH_AVAILABLE = True
+            _report("arrow", *_time_iteration(iterator_module, _ArrowCursor(columns)))
+        else:
+            print("  arrow        skipped (pyarrow is not installed)")
+
+        iterator_module._ARROW_FETCH_AVAILABLE = False
+        for label, prefetch in (("sync", False), ("prefetch", True)):
+            iterator_module._PREFETCH_BATCHES = prefetch
+            _report(label, *_time_iteration(iterator_module, _SlowRowCursor(columns)))
+        iterator_module._PREFETCH_BATCHES = True
+
+        list_bytes, list_rows = _cache_memory(iterator_module, columns, False)
+        store_bytes, store_rows = _cache_memory(iterator_module, columns, True)
+        _report_memory("cache/list", list_bytes, list_rows)
+        _report_memory("cache/store", store_bytes, store_rows)
+        print(f"  saved        {(list_bytes - store_bytes) / 2 ** 20:7.1f} MiB "
+              f"({1 - store_bytes / max(list_bytes, 1):.0%})")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_ROW_COUNTS)
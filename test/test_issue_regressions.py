@@ -102,6 +102,10 @@ class _FakeBinaryOperator:
     boMinus = 16
     boMul = 17
     boDiv = 18
+    boIntDiv = 19
+    boMod = 20
+    boPow = 21
+    boConcat = 22
 
     def __init__(self, op, left, right):
         self._op = op
@@ -157,10 +161,61 @@ class _FakeInOperator:
         return self._is_not
 
 
+class _FakeBetweenOperator:
+    def __init__(self, node, lower, higher, is_not=False):
+        self._node = node
+        self._lower = lower
+        self._higher = higher
+        self._is_not = is_not
+
+    def node(self):
+        return self._node
+
+    def lowerBound(self):
+        return self._lower
+
+    def higherBound(self):
+        return self._higher
+
+    def isNotBetween(self):
+        return self._is_not
+
+
+class _FakeFunctionDef:
+    def __init__(self, name):
+        self._name = name
+
+    def name(self):
+        return self._name
+
+
+# Function registry standing in for QgsExpression.Functions(); a node refers
+# to its function by index, as in PyQGIS.
+_FAKE_FUNCTIONS = []
+
+
+class _FakeFunction:
+    def __init__(self, name, *args):
+        if name not in _FAKE_FUNCTIONS:
+            _FAKE_FUNCTIONS.append(name)
+        self._index = _FAKE_FUNCTIONS.index(name)
+        self._args = _FakeNodeList(list(args)) if args else None
+
+    def fnIndex(self):
+        return self._index
+
+    def args(self):
+        return self._args
+
+
 class _FakeExpression:
     def __init__(self, text):
         self._text = text
 
+    @staticmethod
+    def Functions():
+        return [_FakeFunctionDef(name) for name in _FAKE_FUNCTIONS]
+
     def hasParserError(self):
         return False
 
@@ -169,18 +224,23 @@ class _FakeExpression:
 
 
 class _FakeField:
-    def __init__(self, name):
+    def __init__(self, name, type_name=""):
         self._name = name
+        self._type_name = type_name
 
     def name(self):
         return self._name
 
+    def typeName(self):
+        return self._type_name
+
 
 class _FakeFields:
     """Case-insensitive field lookup mirroring QgsFields."""
 
-    def __init__(self, names):
+    def __init__(self, names, type_names=None):
         self._names = list(names)
+        self._type_names = list(type_names or [""] * len(self._names))
 
     def lookupField(self, name):
         for idx, existing in enumerate(self._names):
@@ -189,7 +249,7 @@ class _FakeFields:
         return -1
 
     def at(self, idx):
-        return _FakeField(self._names[idx])
+        return _FakeField(self._names[idx], self._type_names[idx])
 
 
 class _FakeUnsupportedNode:
@@ -223,8 +283,10 @@ def _load_expression_compiler(testcase):
     qgis = types.ModuleType("qgis")
     core = types.ModuleType("qgis.core")
     core.QgsExpression = _FakeExpression
+    core.QgsExpressionNodeBetweenOperator = _FakeBetweenOperator
     core.QgsExpressionNodeBinaryOperator = _FakeBinaryOperator
     core.QgsExpressionNodeColumnRef = _FakeColumnRef
+    core.QgsExpressionNodeFunction = _FakeFunction
     core.QgsExpressionNodeInOperator = _FakeInOperator
     core.QgsExpressionNodeLiteral = _FakeLiteral
     core.QgsExpressionNodeUnaryOperator = _FakeUnaryOperator
@@ -348,18 +410,18 @@ class TestExpressionCompilerCompilation(unittest.TestCase):
 
     def test_unsupported_binary_operator_returns_none(self):
         node = _FakeBinaryOperator(
-            _FakeBinaryOperator.boPlus, _FakeColumnRef("POP"), _FakeLiteral(1)
+            _FakeBinaryOperator.boRegexp, _FakeColumnRef("NAME"), _FakeLiteral("^A")
         )
         self.assertIsNone(self._compile(node))
 
     def test_unsupported_node_type_returns_none(self):
         self.assertIsNone(self._compile(_FakeUnsupportedNode()))
 
-    def test_unary_minus_returns_none(self):
+    def test_unary_minus_compiles(self):
         node = _FakeUnaryOperator(
             _FakeUnaryOperator.uoMinus, _FakeLiteral(1)
         )
-        self.assertIsNone(self._compile(node))
+        self.assertEqual(self._compile(node), "(- 1)")
 
     def test_in_with_uncompilable_member_returns_none(self):
         node = _FakeInOperator(
@@ -795,7 +857,7 @@ class TestPhase3PredicateInjection(unittest.TestCase):
         idx = content.index("def setSubsetString(")
         next_def = content.index("\n    def ", idx + 1)
         body = content[idx:next_def]
-        self.assertIn("compile_expression_to_sql(subsetstring", body)
+        self.assertRegex(body, r"compile_expression_to_sql\(\s*subsetstring")
         self.assertNotIn("WHERE {subsetstring} LIMIT 0", body)
 
     def test_import_where_clause_is_guarded(self):
@@ -840,7 +902,7 @@ class TestPhase4ProjectFileTrust(unittest.TestCase):
             encoding="utf-8"
         )
         idx = content.index("def close(self)")
-        body = content[idx:idx + 500]
+        body = content[idx:idx + 600]
         self.assertIn("result.close()", body)
         self.assertIn("self._result = None", body)
 
@@ -1131,7 +1193,7 @@ class TestProviderLifecycle(unittest.TestCase):
         idx = content.index("def reloadData(self)")
         next_def = content.index("\n    def ", idx + 1)
         body = content[idx:next_def]
-        self.assertIn("self._features = []", body)
+        self.assertIn("self._features = FeatureStore()", body)
         self.assertIn("self._features_loaded = False", body)
         self.assertIn("self._feature_count = None", body)
         self.assertIn("self._extent = None", body)
@@ -1372,22 +1434,25 @@ class TestEditabilityCapabilities(unittest.TestCase):
         self.assertIn("ChangeGeometries", body)
 
     def test_change_geometry_values_propagates_failure(self):
-        """changeGeometryValues must propagate update_table_feature failure."""
+        """changeGeometryValues must propagate update_table_rows failure."""
         content = self._get_provider_content()
         idx = content.index("def changeGeometryValues(")
         next_def = content.index("\n    def ", idx + 1)
+        self.assertIn("self._update_features(", content[idx:next_def])
+        idx = content.index("def _update_features(")
+        next_def = content.index("\n    def ", idx + 1)
         body = content[idx:next_def]
-        self.assertIn("if not update_table_feature(context):", body)
+        self.assertIn("err = update_table_rows(", body)
         self.assertIn("all_ok = False", body)
         self.assertIn("return all_ok", body)
 
-    def test_update_table_feature_logs_on_failure(self):
-        """update_table_feature must log to QgsMessageLog on exception."""
+    def test_update_table_rows_logs_on_failure(self):
+        """update_table_rows must log to QgsMessageLog on exception."""
         content = (ROOT / "helpers" / "data_base.py").read_text(encoding="utf-8")
-        idx = content.index("def update_table_feature(")
+        idx = content.index("def update_table_rows(")
         body = content[idx:]
         self.assertIn("QgsMessageLog.logMessage(", body)
-        self.assertIn("update_table_feature failed", body)
+        self.assertIn("MERGE failed", body)
 
     def _decode_uri(self, uri):
         """Replicates the decodeUri regex from helpers/utils.py for CI testing."""
@@ -1603,18 +1668,18 @@ class TestEditingOperations(unittest.TestCase):
         next_def = content.find("\ndef ", idx + 1)
         return content[idx:next_def] if next_def != -1 else content[idx:]
 
-    def test_update_table_attributes_helper_exists(self):
-        """data_base.py must have update_table_attributes helper."""
+    def test_update_table_rows_helper_exists(self):
+        """data_base.py must have update_table_rows helper."""
         content = self._get_database_content()
-        body = self._get_func_body(content, "update_table_attributes")
-        self.assertIn("UPDATE", body)
-        self.assertIn("SET", body)
-        self.assertIn("WHERE", body)
+        body = self._get_func_body(content, "update_table_rows")
+        self.assertIn("MERGE INTO", body)
+        self.assertIn("UPDATE SET", body)
+        self.assertIn("ON t.", body)
 
-    def test_insert_table_feature_helper_exists(self):
-        """data_base.py must have insert_table_feature helper."""
+    def test_insert_table_rows_helper_exists(self):
+        """data_base.py must have insert_table_rows helper."""
         content = self._get_database_content()
-        body = self._get_func_body(content, "insert_table_feature")
+        body = self._get_func_body(content, "insert_table_rows")
         self.assertIn("INSERT INTO", body)
         self.assertIn("VALUES", body)
 
@@ -1629,8 +1694,8 @@ class TestEditingOperations(unittest.TestCase):
         """Provider must import all editing helpers."""
         content = self._get_provider_content()
         for helper in [
-            "update_table_attributes",
-            "insert_table_feature",
+            "update_table_rows",
+            "insert_table_rows",
             "delete_table_features",
             "alter_table_add_columns",
             "alter_table_drop_columns",
@@ -1654,8 +1719,8 @@ class TestEditingOperations(unittest.TestCase):
         """All DML helpers must log errors via QgsMessageLog."""
         content = self._get_database_content()
         for func in [
-            "update_table_attributes",
-            "insert_table_feature",
+            "update_table_rows",
+            "insert_table_rows",
             "delete_table_features",
             "alter_table_add_columns",
             "alter_table_drop_columns",
@@ -1667,18 +1732,25 @@ class TestEditingOperations(unittest.TestCase):
                           f"{func} must log errors")
 
     def test_editing_methods_call_reload_or_update_cache(self):
-        """Editing methods must call reloadData() to refresh the cache."""
+        """Editing methods must patch the feature cache (or reload it)."""
         content = self._get_provider_content()
-        for method in ["addFeatures", "deleteFeatures", "changeAttributeValues"]:
-            idx = content.index(f"def {method}(self")
+        for method, helper in [
+            ("addFeatures", "_add_cached_features"),
+            ("deleteFeatures", "_delete_cached_features"),
+            ("_update_features", "_update_cached_features"),
+        ]:
+            idx = content.index(f"def {method}(")
             next_def = content.index("\n    def ", idx + 1)
-            body = content[idx:next_def]
-            self.assertIn("reloadData()", body,
-                          f"{method} must call reloadData()")
-        idx = content.index("def changeAttributeValues(self")
+            self.assertIn(f"self.{helper}(", content[idx:next_def],
+                          f"{method} must update the feature cache")
+            idx = content.index(f"def {helper}(")
+            next_def = content.index("\n    def ", idx + 1)
+            self.assertIn("self.reloadData()", content[idx:next_def],
+                          f"{helper} must reload a partially cached layer")
+        idx = content.index("def _update_features(")
         next_def = content.index("\n    def ", idx + 1)
         body = content[idx:next_def]
-        self.assertIn("update_table_attributes", body,
+        self.assertIn("update_table_rows", body,
                       "changeAttributeValues must persist to Snowflake")
 
     def test_editing_methods_propagate_errors_via_push_error(self):
@@ -1736,13 +1808,16 @@ class TestEditingOperations(unittest.TestCase):
                       "reloadData must emit dataChanged to refresh QGIS caches")
 
     def test_add_features_sets_feature_id(self):
-        """addFeatures must stamp each inserted feature with its PK as fid."""
+        """addFeatures must stamp each inserted feature with its fid."""
         content = self._get_provider_content()
         idx = content.index("def addFeatures(self")
         next_def = content.index("\n    def ", idx + 1)
+        self.assertIn("self._add_cached_features(flist)", content[idx:next_def])
+        idx = content.index("def _add_cached_features(self")
+        next_def = content.index("\n    def ", idx + 1)
         body = content[idx:next_def]
         self.assertIn("feat.setId(", body,
-                      "addFeatures must assign fid from the PK value on success")
+                      "addFeatures must assign a fid on success")
 
     def test_default_value_clause_implemented_for_primary_key(self):
         """Provider must implement defaultValueClause() to advertise the auto-ID default."""
@@ -1790,7 +1865,8 @@ class TestGitHubIssuesFixes(unittest.TestCase):
     def test_non_geo_tables_support_added(self):
         """Browser should support showing non-geometry tables."""
         content = (ROOT / "entities" / "sf_data_item.py").read_text(encoding="utf-8")
-        self.assertIn("get_table_iterator", content)
+        # The schema's tables come from the catalog snapshot (no per-schema query).
+        self.assertIn("snapshot.table_names(self.clean_name)", content)
         self.assertIn("table_no_geom", content)
         self.assertIn("Tables (no geometry)", content)
 
@@ -1892,7 +1968,7 @@ class TestSpatialFilterPushdownGuard(unittest.TestCase):
         content = self._iterator_content()
         idx = content.index('_geo_column_type in ["NUMBER", "TEXT"]')
         next_block = content.index(
-            'if filter_geom_clause != ""', idx
+            "self._simplify_tolerance = self._simplify_tolerance_for_request(", idx
         )
         branch_body = content[idx:next_block]
         self.assertIn("_rect_is_valid_lonlat(filter_rect)", branch_body)
@@ -1931,14 +2007,15 @@ class TestSpatialFilterPushdownGuard(unittest.TestCase):
         for name in [
             "QgsAbstractFeatureIterator", "QgsCoordinateTransform",
             "QgsCsException", "QgsFeature", "QgsFeatureRequest",
-            "QgsGeometry", "QgsMessageLog", "Qgis",
+            "QgsFields", "QgsGeometry", "QgsMessageLog", "QgsRectangle",
+            "QgsSimplifyMethod", "QgsSpatialIndex", "Qgis",
         ]:
             setattr(qgis_core, name, type(name, (), {}))
         qgis_pkg = types.ModuleType("qgis")
         qgis_pkg.core = qgis_core
         qgis_pyqt = types.ModuleType("qgis.PyQt")
         qgis_pyqt_qtcore = types.ModuleType("qgis.PyQt.QtCore")
-        for name in ("QDate", "QDateTime", "QMetaType", "QTime"):
+        for name in ("QDate", "QDateTime", "QMetaType", "QTime", "QVariant"):
             setattr(qgis_pyqt_qtcore, name, type(name, (), {}))
         qgis_pyqt.QtCore = qgis_pyqt_qtcore
         sys.modules.setdefault("qgis", qgis_pkg)
@@ -1963,7 +2040,7 @@ class TestSpatialFilterPushdownGuard(unittest.TestCase):
             "qgis_snowflake_connector.helpers.expression_compiler"
         )
         helpers_expression_compiler.compile_expression_to_sql = (
-            lambda expr, fields: None
+            lambda expr, fields, geometry=None: None
         )
         helpers_mappings = types.ModuleType(
             "qgis_snowflake_connector.helpers.mappings"
@@ -2084,12 +2161,12 @@ class TestFeatureCachePoisoning(unittest.TestCase):
         content = self._iterator_content()
         self.assertIn(
             "if self._should_cache_features:\n"
-            "                    self._provider._features.append(QgsFeature(f))",
+            "                    self._provider._features.append(f)",
             content,
         )
         self.assertNotIn(
             'if not getattr(self._provider, "_load_all_rows", False):\n'
-            "                    self._provider._features.append(QgsFeature(f))",
+            "                    self._provider._features.append(f)",
             content,
         )
 
@@ -2265,14 +2342,13 @@ class TestEditCacheGuards(unittest.TestCase):
 
     def test_edit_methods_call_ensure_and_guard(self):
         content = self._provider()
-        # All three edit methods repopulate the cache before indexing it.
-        self.assertEqual(content.count("self._ensure_features_loaded()"), 3)
-        # changeGeometryValues bounds-checks the key it indexes.
-        self.assertIn("if f_key < 0 or f_key >= len(self._features):", content)
-        # deleteFeatures bounds-checks each fid too.
-        self.assertEqual(
-            content.count("if fid < 0 or fid >= len(self._features):"), 2
-        )
+        # The shared update path (attribute and geometry changes) and
+        # deleteFeatures repopulate the cache before indexing it.
+        self.assertEqual(content.count("self._ensure_features_loaded()"), 2)
+        # Both resolve fids through _primary_key_value, which checks the fid
+        # is cached unless it is the primary key itself.
+        self.assertEqual(content.count("if fid not in self._features:"), 1)
+        self.assertEqual(content.count("= self._primary_key_value(fid)"), 2)
 
 
 class TestProcessingConnectionReuse(unittest.TestCase):
@@ -2357,5 +2433,2920 @@ class TestImportDecimalCoercion(unittest.TestCase):
         self.assertIn("float(val)", flat)
 
 
+class TestArrowBatchFetch(unittest.TestCase):
+    """The layer iterator must prefer the connector's Arrow result batches
+    when pyarrow is available, decode them column-wise, and fall back to the
+    fetchmany() row-tuple path otherwise.
+    """
+
+    def _iterator_content(self):
+        return (ROOT / "providers" / "sf_feature_iterator.py").read_text(
+            encoding="utf-8"
+        )
+
+    def test_arrow_path_gated_on_pyarrow(self):
+        content = self._iterator_content()
+        self.assertIn('importlib.util.find_spec("pyarrow")', content)
+        self.assertIn("if not _ARROW_FETCH_AVAILABLE:", content)
+        self.assertIn('getattr(self._result, "fetch_arrow_batches", None)', content)
+
+    def test_arrow_path_falls_back_before_consuming_rows(self):
+        content = self._iterator_content()
+        idx = content.index("def _open_arrow_batches(")
+        body = content[idx:content.index("def _create_batch_reader(", idx)]
+        self.assertIn("first_batch = next(batches, None)", body)
+        self.assertIn("return None", body)
+        self.assertIn("itertools.chain((first_batch,), batches)", body)
+
+    def test_arrow_batches_decoded_column_wise(self):
+        content = self._iterator_content()
+        self.assertIn("column.to_pylist() for column in table.columns", content)
+        self.assertIn("zip(*attribute_columns)", content)
+        self.assertIn("f.setAttributes(list(attributes))", content)
+
+    def test_arrow_path_reopened_on_rewind_and_dropped_on_close(self):
+        content = self._iterator_content()
+        rewind = content[content.index("def rewind("):content.index("def close(")]
+        self.assertIn("self._arrow_batches = self._open_arrow_batches()", rewind)
+        close = content[content.index("def close("):]
+        self.assertIn("self._arrow_batches = None", close)
+
+
+class TestBatchReaderNoPopFront(unittest.TestCase):
+    """Regression: draining a 5,000-50,000 row batch with list.pop(0) is
+    quadratic. Both feature iterators must read batches through the shared
+    index-based BatchReader.
+    """
+
+    def _load_batch_reader(self):
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location(
+            "sfc_batch_reader_under_test", ROOT / "helpers" / "batch_reader.py"
+        )
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        return mod
+
+    def test_no_pop_front_in_iterators(self):
+        for path in (
+            ROOT / "providers" / "sf_feature_iterator.py",
+            ROOT / "entities" / "sf_feature_iterator.py",
+        ):
+            content = path.read_text(encoding="utf-8")
+            self.assertNotIn(".pop(0)", content, path.name)
+            self.assertIn("BatchReader", content, path.name)
+
+    def test_reader_walks_batches_in_order(self):
+        mod = self._load_batch_reader()
+
+        class _Cursor:
+            def __init__(self, rows):
+                self.rows = rows
+                self.calls = 0
+
+            def fetchmany(self, size):
+                self.calls += 1
+                batch, self.rows = self.rows[:size], self.rows[size:]
+                return batch
+
+        cursor = _Cursor([(i,) for i in range(7)])
+        reader = mod.BatchReader.from_cursor(cursor, 3)
+        rows = []
+        while True:
+            row = reader.next_row()
+            if row is None:
+                break
+            rows.append(row[0])
+        self.assertEqual(rows, list(range(7)))
+        # 3 + 3 + 1 rows, then one empty batch marks the end.
+        self.assertEqual(cursor.calls, 4)
+        # Once exhausted the cursor is not polled again.
+        self.assertIsNone(reader.next_row())
+        self.assertEqual(cursor.calls, 4)
+
+    def test_reader_treats_none_batch_as_end(self):
+        mod = self._load_batch_reader()
+        reader = mod.BatchReader(lambda: None)
+        self.assertIsNone(reader.next_row())
+
+
+class TestBatchPrefetcher(unittest.TestCase):
+    """The layer iterator fetches the next batch on a background thread; the
+    prefetcher must preserve order, surface fetch errors to the consumer and
+    be stopped by close()/rewind() and by cancel_pending_on_thread().
+    """
+
+    def _load_batch_reader(self):
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location(
+            "sfc_batch_prefetcher_under_test", ROOT / "helpers" / "batch_reader.py"
+        )
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        return mod
+
+    def test_prefetched_batches_keep_order(self):
+        mod = self._load_batch_reader()
+        batches = iter([[1, 2], [3], [4, 5, 6], []])
+        prefetcher = mod.BatchPrefetcher(lambda: next(batches))
+        reader = mod.BatchReader(prefetcher.next_batch)
+        rows = []
+        while True:
+            row = reader.next_row()
+            if row is None:
+                break
+            rows.append(row)
+        prefetcher.stop()
+        self.assertEqual(rows, [1, 2, 3, 4, 5, 6])
+
+    def test_fetch_error_reaches_consumer(self):
+        mod = self._load_batch_reader()
+
+        def fetch():
+            raise RuntimeError("network gone")
+
+        prefetcher = mod.BatchPrefetcher(fetch)
+        with self.assertRaises(RuntimeError):
+            prefetcher.next_batch()
+        self.assertEqual(prefetcher.next_batch(), ())
+
+    def test_thread_starts_after_the_first_batch(self):
+        import threading
+
+        mod = self._load_batch_reader()
+        fetched_on = []
+
+        def fetch():
+            fetched_on.append(threading.current_thread())
+            return [1] if len(fetched_on) < 3 else []
+
+        prefetcher = mod.BatchPrefetcher(fetch)
+        self.assertEqual(prefetcher.next_batch(), [1])
+        self.assertIsNone(prefetcher._thread.ident)
+        self.assertIs(fetched_on[0], threading.current_thread())
+        self.assertEqual(prefetcher.next_batch(), [1])
+        self.assertEqual(prefetcher.next_batch(), ())
+        prefetcher.stop()
+        self.assertIs(fetched_on[1], prefetcher._thread)
+
+        single = mod.BatchPrefetcher(lambda: [])
+        self.assertEqual(single.next_batch(), ())
+        self.assertEqual(single.next_batch(), ())
+        self.assertIsNone(single._thread.ident)
+
+    def test_stop_without_wait_does_not_join(self):
+        import threading
+        import time
+
+        mod = self._load_batch_reader()
+        release = threading.Event()
+        calls = []
+
+        def fetch():
+            calls.append(None)
+            if len(calls) > 1:
+                release.wait(5)
+            return [1]
+
+        prefetcher = mod.BatchPrefetcher(fetch)
+        prefetcher.next_batch()
+        prefetcher._thread.start()
+        while len(calls) < 2:
+            time.sleep(0.01)
+        started = time.monotonic()
+        prefetcher.stop(wait=False)
+        self.assertLess(time.monotonic() - started, 1.0)
+        self.assertTrue(prefetcher._thread.is_alive())
+        release.set()
+        prefetcher._thread.join(5)
+        self.assertFalse(prefetcher._thread.is_alive())
+        self.assertEqual(prefetcher.next_batch(), ())
+
+    def test_stop_ends_the_producer(self):
+        mod = self._load_batch_reader()
+        prefetcher = mod.BatchPrefetcher(lambda: [1])
+        prefetcher.stop()
+        self.assertFalse(prefetcher._thread.is_alive())
+        self.assertEqual(prefetcher.next_batch(), ())
+        prefetcher.stop()
+
+    def test_iterator_and_manager_stop_prefetchers(self):
+        iterator_src = (ROOT / "providers" / "sf_feature_iterator.py").read_text(
+            encoding="utf-8"
+        )
+        for method in ("def close(self)", "def rewind(self)"):
+            start = iterator_src.index(method)
+            self.assertIn("_stop_prefetcher()", iterator_src[start:start + 600], method)
+        # __del__ may run on the UI thread: it must not join the thread.
+        start = iterator_src.index("def __del__(self)")
+        self.assertIn(
+            "_stop_prefetcher(wait=False)", iterator_src[start:start + 600]
+        )
+
+        manager_src = (ROOT / "managers" / "sf_connection_manager.py").read_text(
+            encoding="utf-8"
+        )
+        start = manager_src.index("def cancel_pending_on_thread(")
+        end = manager_src.index("\n    def ", start + 1)
+        self.assertIn("_active_prefetchers", manager_src[start:end])
+        self.assertIn(".stop()", manager_src[start:end])
+
+
+class _FakeQgsRectangle:
+    def __init__(self, xmin=0.0, ymin=0.0, xmax=0.0, ymax=0.0):
+        self.box = (xmin, ymin, xmax, ymax)
+
+    def xMinimum(self):
+        return self.box[0]
+
+    def yMinimum(self):
+        return self.box[1]
+
+    def xMaximum(self):
+        return self.box[2]
+
+    def yMaximum(self):
+        return self.box[3]
+
+    def intersects(self, other):
+        a, b = self.box, other.box
+        return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+class _FakeQgsSpatialIndex:
+    """Brute-force stand-in with the QgsSpatialIndex calls FeatureStore uses."""
+
+    def __init__(self):
+        self.entries = []
+
+    def addFeature(self, fid, rect):
+        self.entries.append((fid, rect))
+        return True
+
+    def intersects(self, rect):
+        # Deliberately unordered: callers must not rely on index order.
+        return [fid for fid, box in reversed(self.entries) if box.intersects(rect)]
+
+
+class _FakeQgsGeometry:
+    def __init__(self, box=(0.0, 0.0, 0.0, 0.0)):
+        self._wkb = b""
+        self._box = box
+
+    def fromWkb(self, wkb):
+        self._wkb = bytes(wkb)
+
+    def asWkb(self):
+        return self._wkb
+
+    def boundingBox(self):
+        return _FakeQgsRectangle(*self._box)
+
+
+class _FakeQgsFeature:
+    def __init__(self, fid=-1, wkb=None, attributes=(), box=(0.0, 0.0, 0.0, 0.0)):
+        self._fields = None
+        self._id = fid
+        self._geometry = None
+        if wkb is not None:
+            self._geometry = _FakeQgsGeometry(box)
+            self._geometry.fromWkb(wkb)
+        self._attributes = list(attributes)
+        self._valid = False
+
+    def fields(self):
+        return self._fields
+
+    def setFields(self, fields):
+        self._fields = fields
+
+    def id(self):
+        return self._id
+
+    def setId(self, fid):
+        self._id = fid
+
+    def hasGeometry(self):
+        return self._geometry is not None
+
+    def geometry(self):
+        return self._geometry or _FakeQgsGeometry()
+
+    def setGeometry(self, geometry):
+        self._geometry = geometry
+
+    def attributes(self):
+        return self._attributes
+
+    def setAttributes(self, attributes):
+        self._attributes = list(attributes)
+
+    def setValid(self, valid):
+        self._valid = valid
+
+
+class _FakeQVariant:
+    def __init__(self, null=True):
+        self._null = null
+
+    def isNull(self):
+        return self._null
+
+
+def _load_feature_store(testcase):
+    """Load helpers/feature_store.py against stub QgsFeature/QgsGeometry."""
+    import sys
+    import types
+    import importlib.util
+
+    names = ("qgis", "qgis.core", "qgis.PyQt", "qgis.PyQt.QtCore")
+    saved = {n: sys.modules.get(n) for n in names}
+
+    def _restore():
+        for n, prev in saved.items():
+            if prev is None:
+                sys.modules.pop(n, None)
+            else:
+                sys.modules[n] = prev
+    testcase.addCleanup(_restore)
+
+    qgis = types.ModuleType("qgis")
+    core = types.ModuleType("qgis.core")
+    core.QgsFeature = _FakeQgsFeature
+    core.QgsFields = _FakeFields
+    core.QgsGeometry = _FakeQgsGeometry
+    core.QgsRectangle = _FakeQgsRectangle
+    core.QgsSpatialIndex = _FakeQgsSpatialIndex
+    qgis.core = core
+    pyqt = types.ModuleType("qgis.PyQt")
+    qtcore = types.ModuleType("qgis.PyQt.QtCore")
+    qtcore.QVariant = _FakeQVariant
+    pyqt.QtCore = qtcore
+    qgis.PyQt = pyqt
+    sys.modules["qgis"] = qgis
+    sys.modules["qgis.core"] = core
+    sys.modules["qgis.PyQt"] = pyqt
+    sys.modules["qgis.PyQt.QtCore"] = qtcore
+
+    spec = importlib.util.spec_from_file_location(
+        "sfc_feature_store_under_test", ROOT / "helpers" / "feature_store.py"
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class TestColumnarFeatureCache(unittest.TestCase):
+    """The provider caches a fully loaded layer in a columnar FeatureStore
+    (WKB blob + typed attribute columns) instead of one QgsFeature copy per
+    row; features are rebuilt on demand with the same ids and values.
+    """
+
+    def setUp(self):
+        self.mod = _load_feature_store(self)
+
+    def _store(self, features):
+        store = self.mod.FeatureStore()
+        for feature in features:
+            store.append(feature)
+        return store
+
+    def test_round_trip(self):
+        fields = _FakeFields(["ID", "NAME", "VALUE"])
+        source = _FakeQgsFeature(0, b"\x01point", [7, "a", 1.5])
+        source.setFields(fields)
+        store = self._store([
+            source,
+            _FakeQgsFeature(1, None, [8, None, _FakeQVariant()]),
+        ])
+        self.assertEqual(len(store), 2)
+        first = store[0]
+        self.assertEqual(first.id(), 0)
+        self.assertIs(first.fields(), fields)
+        self.assertEqual(first.geometry().asWkb(), b"\x01point")
+        self.assertEqual(first.attributes(), [7, "a", 1.5])
+        second = store.feature_at(1)
+        self.assertFalse(second.hasGeometry())
+        self.assertEqual(second.attributes(), [8, None, None])
+
+    def test_numeric_columns_are_typed_arrays(self):
+        from array import array
+
+        store = self._store(
+            _FakeQgsFeature(i, b"g", [i, i * 0.5, str(i)]) for i in range(3)
+        )
+        self.assertIsInstance(store._columns[0], array)
+        self.assertIsInstance(store._columns[1], array)
+        self.assertIsInstance(store._columns[2], list)
+
+    def test_mixed_or_oversized_values_demote_column(self):
+        store = self._store([
+            _FakeQgsFeature(0, None, [1, 1]),
+            _FakeQgsFeature(1, None, [None, 2 ** 70]),
+            _FakeQgsFeature(2, None, ["x", 3]),
+        ])
+        self.assertEqual(store.attributes_at(1), [None, 2 ** 70])
+        self.assertEqual(store.attributes_at(2), ["x", 3])
+        self.assertEqual(store.attributes_at(0), [1, 1])
+
+    def test_fid_index(self):
+        store = self._store(_FakeQgsFeature(i, None, [i]) for i in range(3))
+        self.assertIn(2, store)
+        self.assertNotIn(3, store)
+        self.assertNotIn(-1, store)
+        self.assertIsNone(store._row_by_fid)
+
+        store = self._store(_FakeQgsFeature(fid, None, [fid]) for fid in (10, 4, 99))
+        self.assertEqual(store.row_of(4), 1)
+        self.assertEqual(store[99].attributes(), [99])
+        self.assertNotIn(0, store)
+        with self.assertRaises(KeyError):
+            store[0]
+
+    def test_attribute_columns_added_and_dropped(self):
+        store = self._store(_FakeQgsFeature(i, None, [i, str(i)]) for i in range(2))
+        store.add_attributes(2, _FakeFields(["A", "B", "C", "D"]))
+        self.assertEqual(store.attributes_at(1), [1, "1", None, None])
+        store.delete_attributes([0, 2], _FakeFields(["B", "D"]))
+        self.assertEqual(store.attributes_at(1), ["1", None])
+
+    def test_provider_and_iterator_use_store(self):
+        provider = (ROOT / "providers" / "sf_vector_data_provider.py").read_text(
+            encoding="utf-8"
+        )
+        iterator = (ROOT / "providers" / "sf_feature_iterator.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertNotIn("self._features = []", provider)
+        self.assertNotIn("_features = []", iterator)
+        self.assertNotIn("QgsFeature(f)", iterator)
+        self.assertIn("self._features.add_attributes(", provider)
+        self.assertIn("self._features.delete_attributes(", provider)
+
+
+class TestCachedFeatureSpatialIndex(unittest.TestCase):
+    """Rect-filtered reads of a loaded layer must go through a spatial index
+    over the cached bounding boxes instead of testing every cached geometry.
+    """
+
+    def setUp(self):
+        self.mod = _load_feature_store(self)
+
+    def test_candidate_rows_in_row_order(self):
+        store = self.mod.FeatureStore()
+        for i in range(10):
+            store.append(_FakeQgsFeature(i, b"g", [i], box=(i, i, i + 0.5, i + 0.5)))
+        store.append(_FakeQgsFeature(10, None, [10]))
+        self.assertFalse(store.has_spatial_index)
+        rows = store.candidate_rows(_FakeQgsRectangle(2.2, 2.2, 5.1, 5.1))
+        self.assertEqual(rows, [2, 3, 4, 5])
+        self.assertTrue(store.has_spatial_index)
+        # Geometry-less rows are never candidates.
+        self.assertEqual(store.candidate_rows(_FakeQgsRectangle(-1, -1, 99, 99)),
+                         list(range(10)))
+
+    def test_append_invalidates_index(self):
+        store = self.mod.FeatureStore()
+        store.append(_FakeQgsFeature(0, b"g", [0], box=(0, 0, 1, 1)))
+        store.build_spatial_index()
+        store.append(_FakeQgsFeature(1, b"g", [1], box=(0, 0, 1, 1)))
+        self.assertFalse(store.has_spatial_index)
+        self.assertEqual(store.candidate_rows(_FakeQgsRectangle(0, 0, 1, 1)), [0, 1])
+
+    def test_iterator_walks_candidates(self):
+        content = (ROOT / "providers" / "sf_feature_iterator.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("features.candidate_rows(filter_rect)", content)
+        self.assertNotIn("local_feature.geometry().intersects", content)
+        provider = (ROOT / "providers" / "sf_vector_data_provider.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("def createSpatialIndex(self)", provider)
+        self.assertIn("self._features.build_spatial_index()", provider)
+
+
+class TestViewportTileCache(unittest.TestCase):
+    """Rect-filtered renders of primary-keyed layers are served from a shared
+    LRU tile cache; only tiles missing from it are queried, in one query.
+    """
+
+    def _load_tile_cache(self):
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location(
+            "sfc_tile_cache_under_test", ROOT / "helpers" / "tile_cache.py"
+        )
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        return mod
+
+    def test_viewport_snaps_to_shared_tiles(self):
+        mod = self._load_tile_cache()
+        tiles = mod.tiles_for_rect(0.05, 0.05, 2.0, 2.0)
+        self.assertEqual(len(tiles), 9)
+        self.assertEqual({tile[0] for tile in tiles}, {0})
+        # Panning by less than a tile at the same scale reuses those tiles.
+        panned = mod.tiles_for_rect(0.5, 0.5, 2.45, 2.45)
+        self.assertTrue(set(panned) <= set(tiles))
+        self.assertIsNone(mod.tiles_for_rect(1.0, 1.0, 1.0, 1.0))
+        self.assertEqual(mod.tile_bounds((1, -1, 2)), (-2.0, 4.0, 0.0, 6.0))
+
+    def test_lonlat_tiles_are_clamped(self):
+        mod = self._load_tile_cache()
+        tiles = mod.tiles_for_rect(100.0, 0.0, 179.0, 60.0, clamp_lonlat=True)
+        for tile in tiles:
+            xmin, ymin, xmax, ymax = mod.tile_bounds(tile, True)
+            self.assertTrue(-180.0 <= xmin < xmax <= 180.0)
+            self.assertTrue(-90.0 <= ymin < ymax <= 90.0)
+        self.assertIn("180.0", "".join(mod.tile_wkt(t, True) for t in tiles))
+
+    def test_lru_eviction_and_invalidation(self):
+        mod = self._load_tile_cache()
+        cache = mod.TileCache()
+        self.assertIs(cache, mod.TileCache())
+        cache.clear()
+        rows = [(i, "x" * 100) for i in range(10)]
+        one = cache.put(("a",), ["ID", "NAME"], rows).size
+        cache.max_bytes = one * 2
+        cache.put(("b",), ["ID", "NAME"], rows)
+        cache.get(("a",))
+        cache.put(("c",), ["ID", "NAME"], rows)
+        # "b" was least recently used.
+        self.assertIsNone(cache.get(("b",)))
+        self.assertIsNotNone(cache.get(("a",)))
+        self.assertLessEqual(cache.size, cache.max_bytes)
+        cache.invalidate("c")
+        self.assertIsNone(cache.get(("c",)))
+        self.assertEqual(len(cache), 1)
+
+    def test_iterator_and_provider_wiring(self):
+        iterator = (ROOT / "providers" / "sf_feature_iterator.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("def _read_tiles(", iterator)
+        self.assertIn("from values {values}) sftiles", iterator)
+        start = iterator.index("tiles = None")
+        gate = iterator[start:start + 500]
+        for condition in (
+            'filter_geom_clause != ""',
+            'self._expression == ""',
+            'self._provider.primary_key() != ""',
+            "not self._provider._is_limited_unordered",
+        ):
+            self.assertIn(condition, gate)
+        provider = (ROOT / "providers" / "sf_vector_data_provider.py").read_text(
+            encoding="utf-8"
+        )
+        idx = provider.index("def reloadData(self)")
+        body = provider[idx:provider.index("\n    def ", idx + 1)]
+        self.assertIn("TileCache().invalidate(self.tile_cache_key())", body)
+
+
+def _load_feature_iterator(testcase):
+    """Load providers/sf_feature_iterator.py under a throwaway package name
+    against stub qgis / plugin modules (restored on cleanup)."""
+    import sys
+    import types
+    import importlib.util
+
+    package = "sfc_iterator_under_test"
+    qgis_names = ("qgis", "qgis.core", "qgis.PyQt", "qgis.PyQt.QtCore")
+    saved = {n: sys.modules.get(n) for n in qgis_names}
+
+    def _restore():
+        for n, prev in saved.items():
+            if prev is None:
+                sys.modules.pop(n, None)
+            else:
+                sys.modules[n] = prev
+        for n in [n for n in sys.modules if n.split(".")[0] == package]:
+            sys.modules.pop(n, None)
+    testcase.addCleanup(_restore)
+
+    qgis = types.ModuleType("qgis")
+    core = types.ModuleType("qgis.core")
+    for name in (
+        "QgsAbstractFeatureIterator", "QgsCoordinateTransform", "QgsFeature",
+        "QgsFeatureRequest", "QgsFields", "QgsGeometry", "QgsMessageLog",
+        "QgsRectangle", "QgsSpatialIndex", "Qgis",
+    ):
+        setattr(core, name, type(name, (), {}))
+    core.QgsCsException = type("QgsCsException", (Exception,), {})
+    core.QgsSimplifyMethod = type(
+        "QgsSimplifyMethod", (),
+        {"NoSimplification": 0, "OptimizeForRendering": 1},
+    )
+    qgis.core = core
+    pyqt = types.ModuleType("qgis.PyQt")
+    qtcore = types.ModuleType("qgis.PyQt.QtCore")
+    for name in ("QDate", "QDateTime", "QMetaType", "QTime", "QVariant"):
+        setattr(qtcore, name, type(name, (), {}))
+    pyqt.QtCore = qtcore
+    qgis.PyQt = pyqt
+    sys.modules.update({
+        "qgis": qgis, "qgis.core": core,
+        "qgis.PyQt": pyqt, "qgis.PyQt.QtCore": qtcore,
+    })
+
+    def _module(name, path=None, **attributes):
+        mod = types.ModuleType(f"{package}.{name}" if name else package)
+        if path is not None:
+            mod.__path__ = [str(path)]
+        mod.__dict__.update(attributes)
+        sys.modules[mod.__name__] = mod
+        return mod
+
+    _module("", ROOT)
+    _module("helpers", ROOT / "helpers")
+    _module("providers", ROOT / "providers")
+    _module("managers", ROOT / "managers")
+    _module("helpers.expression_compiler",
+            compile_expression_to_sql=lambda expression, fields, geometry=None: None)
+    _module("helpers.mappings", mapping_multi_single_to_geometry_type={})
+    _module("managers.sf_connection_manager", build_op_tag=lambda *a, **k: "")
+    _module("providers.sf_feature_source",
+            SFFeatureSource=type("SFFeatureSource", (), {}))
+
+    spec = importlib.util.spec_from_file_location(
+        f"{package}.providers.sf_feature_iterator",
+        ROOT / "providers" / "sf_feature_iterator.py",
+    )
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class TestServerSideSimplify(unittest.TestCase):
+    """Renders that carry a simplify method select ST_SIMPLIFY(geom, tol)
+    with a power-of-two tolerance; other requests keep full detail and the
+    simplified result never fills the provider's full feature cache.
+    """
+
+    class _Method:
+        def __init__(self, method_type, tolerance):
+            self._type, self._tolerance = method_type, tolerance
+
+        def methodType(self):
+            return self._type
+
+        def tolerance(self):
+            return self._tolerance
+
+    class _Rect:
+        def __init__(self, ymin, ymax, null=False):
+            self._ymin, self._ymax, self._null = ymin, ymax, null
+
+        def isNull(self):
+            return self._null
+
+        def yMinimum(self):
+            return self._ymin
+
+        def yMaximum(self):
+            return self._ymax
+
+    def _tolerance(self, geo_type, method_type, tolerance, rect=None):
+        import types
+
+        mod = _load_feature_iterator(self)
+        request = types.SimpleNamespace(
+            simplifyMethod=lambda: self._Method(method_type, tolerance)
+        )
+        fake_self = types.SimpleNamespace(
+            _request=request,
+            _provider=types.SimpleNamespace(_geo_column_type=geo_type),
+        )
+        return mod.SFFeatureIterator._simplify_tolerance_for_request(
+            fake_self, rect or self._Rect(0.0, 0.0, null=True)
+        )
+
+    def test_no_simplification_keeps_full_detail(self):
+        self.assertIsNone(self._tolerance("GEOMETRY", 0, 10.0))
+        self.assertIsNone(self._tolerance("GEOMETRY", 1, 0.0))
+        self.assertIsNone(self._tolerance("NUMBER", 1, 10.0))
+
+    def test_geometry_tolerance_snaps_to_power_of_two(self):
+        self.assertEqual(self._tolerance("GEOMETRY", 1, 10.0), 8.0)
+        self.assertEqual(self._tolerance("GEOMETRY", 1, 0.3), 0.25)
+
+    def test_geography_tolerance_in_metres(self):
+        at_equator = self._tolerance("GEOGRAPHY", 1, 0.001)
+        self.assertEqual(at_equator, 64.0)  # 111.32 m -> 64
+        northern = self._tolerance("GEOGRAPHY", 1, 0.001, self._Rect(55.0, 70.0))
+        self.assertLess(northern, at_equator)
+
+    def test_query_and_cache_gate(self):
+        content = (ROOT / "providers" / "sf_feature_iterator.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("ST_ASWKB(ST_SIMPLIFY({quoted_geom}, ", content)
+        idx = content.index("self._should_cache_features = (")
+        self.assertIn("and self._simplify_tolerance is None", content[idx:idx + 400])
+        provider = (ROOT / "providers" / "sf_vector_data_provider.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("QgsVectorDataProvider.SimplifyGeometries", provider)
+
+
+class _FakeQDate:
+    def __init__(self, text):
+        self.text = text
+
+    def toString(self, fmt):
+        return self.text
+
+    @classmethod
+    def fromString(cls, text, fmt):
+        return cls(text)
+
+    def __eq__(self, other):
+        return type(other) is type(self) and other.text == self.text
+
+
+def _load_disk_cache(testcase, settings_dir):
+    """Load helpers/disk_cache.py (and the real feature_store.py it imports)
+    under a throwaway package against stub qgis modules."""
+    import sys
+    import types
+    import importlib.util
+
+    package = "sfc_disk_cache_under_test"
+    qgis_names = ("qgis", "qgis.core", "qgis.PyQt", "qgis.PyQt.QtCore")
+    saved = {n: sys.modules.get(n) for n in qgis_names}
+
+    def _restore():
+        for n, prev in saved.items():
+            if prev is None:
+                sys.modules.pop(n, None)
+            else:
+                sys.modules[n] = prev
+        for n in [n for n in sys.modules if n.split(".")[0] == package]:
+            sys.modules.pop(n, None)
+    testcase.addCleanup(_restore)
+
+    qgis = types.ModuleType("qgis")
+    core = types.ModuleType("qgis.core")
+    core.QgsApplication = type(
+        "QgsApplication", (), {"qgisSettingsDirPath": staticmethod(lambda: settings_dir)}
+    )
+    core.QgsFeature = _FakeQgsFeature
+    core.QgsFields = _FakeFields
+    core.QgsGeometry = _FakeQgsGeometry
+    core.QgsRectangle = _FakeQgsRectangle
+    core.QgsSpatialIndex = _FakeQgsSpatialIndex
+    core.QgsMessageLog = type(
+        "QgsMessageLog", (), {"logMessage": staticmethod(lambda *a, **k: None)}
+    )
+    core.Qgis = type("Qgis", (), {"MessageLevel": type("L", (), {"Warning": 1})})
+    qgis.core = core
+    pyqt = types.ModuleType("qgis.PyQt")
+    qtcore = types.ModuleType("qgis.PyQt.QtCore")
+    qtcore.QDate = _FakeQDate
+    qtcore.QDateTime = type("QDateTime", (_FakeQDate,), {})
+    qtcore.QTime = type("QTime", (_FakeQDate,), {})
+    qtcore.Qt = type(
+        "Qt", (), {"DateFormat": type("DateFormat", (), {"ISODate": 1, "ISODateWithMs": 9})}
+    )
+    qtcore.QVariant = _FakeQVariant
+    pyqt.QtCore = qtcore
+    qgis.PyQt = pyqt
+    sys.modules.update({
+        "qgis": qgis, "qgis.core": core,
+        "qgis.PyQt": pyqt, "qgis.PyQt.QtCore": qtcore,
+    })
+    helpers_pkg = types.ModuleType(f"{package}")
+    helpers_pkg.__path__ = [str(ROOT / "helpers")]
+    sys.modules[package] = helpers_pkg
+
+    spec = importlib.util.spec_from_file_location(
+        f"{package}.disk_cache", ROOT / "helpers" / "disk_cache.py"
+    )
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class TestLayerDiskCache(unittest.TestCase):
+    """Opt-in on-disk layer cache: a fully loaded layer is written to a
+    SQLite file and restored only while INFORMATION_SCHEMA LAST_ALTERED is
+    unchanged.
+    """
+
+    def setUp(self):
+        import tempfile
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.mod = _load_disk_cache(self, self.tmp.name)
+        self.key = {"connection": "c", "table": ["DB", "S", "T"], "subset": ""}
+        self.path = self.mod.layer_cache_path(self.key)
+
+    def _store(self):
+        store = self.mod.FeatureStore()
+        store.append(_FakeQgsFeature(
+            0, b"\x01wkb", [1, "a", 2.5, _FakeQDate("2024-01-02"), b"\x00\xff"],
+            box=(1, 2, 3, 4),
+        ))
+        store.append(_FakeQgsFeature(1, None, [2, None, None, None, None]))
+        return store
+
+    def test_round_trip_when_fresh(self):
+        self.assertTrue(self.mod.save_feature_store(
+            self.path, self.key, "2024-05-01T00:00:00", self._store()
+        ))
+        fields = _FakeFields(["ID", "NAME", "VALUE", "DAY", "RAW"])
+        restored = self.mod.load_feature_store(self.path, "2024-05-01T00:00:00", fields)
+        self.assertIsNotNone(restored)
+        self.assertEqual(len(restored), 2)
+        self.assertEqual(
+            restored.attributes_at(0),
+            [1, "a", 2.5, _FakeQDate("2024-01-02"), b"\x00\xff"],
+        )
+        self.assertEqual(restored.geometry_at(0).asWkb(), b"\x01wkb")
+        self.assertFalse(restored.feature_at(1).hasGeometry())
+        self.assertIs(restored.feature_at(0).fields(), fields)
+        # Bounding boxes are restored too, so the spatial index works.
+        self.assertEqual(restored.candidate_rows(_FakeQgsRectangle(0, 0, 5, 5)), [0])
+
+    def test_stale_or_unknown_stamp_discards_file(self):
+        import os
+
+        self.mod.save_feature_store(self.path, self.key, "old", self._store())
+        self.assertIsNone(self.mod.load_feature_store(self.path, "new", _FakeFields([])))
+        self.assertFalse(os.path.exists(self.path))
+        self.mod.save_feature_store(self.path, self.key, "old", self._store())
+        self.assertIsNone(self.mod.load_feature_store(self.path, None, _FakeFields([])))
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_key_selects_file(self):
+        other = dict(self.key, subset='"POP" > 5')
+        self.assertNotEqual(self.mod.layer_cache_path(other), self.path)
+        self.assertTrue(self.path.startswith(self.tmp.name))
+
+    def test_saving_replaces_other_files_of_the_table(self):
+        import os
+
+        old = self.mod.layer_cache_path(self.key)
+        other_table = dict(self.key, table=["DB", "S", "U"])
+        kept = self.mod.layer_cache_path(other_table)
+        self.mod.save_feature_store(old, self.key, "t", self._store())
+        self.mod.save_feature_store(kept, other_table, "t", self._store())
+        new_key = dict(self.key, subset='"POP" > 5')
+        new = self.mod.layer_cache_path(new_key)
+        self.mod.save_feature_store(new, new_key, "t", self._store())
+        self.assertFalse(os.path.exists(old))
+        self.assertTrue(os.path.exists(new))
+        self.assertTrue(os.path.exists(kept))
+
+    def test_least_recently_used_files_are_evicted_over_the_cap(self):
+        import os
+
+        paths = []
+        for i, name in enumerate(["A", "B", "C"]):
+            key = dict(self.key, table=["DB", "S", name])
+            paths.append(self.mod.layer_cache_path(key))
+            self.mod.save_feature_store(paths[-1], key, "t", self._store())
+            os.utime(paths[-1], (1000 + i, 1000 + i))
+        # Reading A makes B the least recently used file.
+        self.mod.load_feature_store(paths[0], "t", _FakeFields([]))
+        size = os.path.getsize(paths[0])
+        self.mod._MAX_CACHE_BYTES = 3 * size
+        key = dict(self.key, table=["DB", "S", "D"])
+        self.mod.save_feature_store(self.mod.layer_cache_path(key), key, "t", self._store())
+        self.assertEqual(
+            [os.path.exists(p) for p in paths], [True, False, True]
+        )
+
+    def test_clear_drops_only_the_refreshed_node(self):
+        import os
+
+        keys = [
+            {"connection": "c", "table": ["DB", "S", "T"]},
+            {"connection": "c", "table": ["DB", "S", "U"]},
+            {"connection": "c", "table": ["DB", "R", "T"]},
+            {"connection": "d", "table": ["DB", "S", "T"]},
+        ]
+        paths = [self.mod.layer_cache_path(k) for k in keys]
+        for path, key in zip(paths, keys):
+            self.mod.save_feature_store(path, key, "t", self._store())
+        self.mod.clear_layer_cache("c", schema_name="S", table_name="T")
+        self.assertEqual([os.path.exists(p) for p in paths], [False, True, True, True])
+        self.mod.clear_layer_cache("c", schema_name="S")
+        self.assertEqual([os.path.exists(p) for p in paths], [False, False, True, True])
+        self.mod.clear_layer_cache("c")
+        self.assertEqual([os.path.exists(p) for p in paths], [False, False, False, True])
+        self.mod.clear_layer_cache()
+        self.assertFalse(any(os.path.exists(p) for p in paths))
+
+    def test_provider_wiring(self):
+        data_item = (ROOT / "entities" / "sf_data_item.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn(
+            "clear_layer_cache(\n"
+            "            connection_name, schema_name=schema_name, table_name=table_name",
+            data_item,
+        )
+        provider = (ROOT / "providers" / "sf_vector_data_provider.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("def restore_cached_features(self)", provider)
+        self.assertIn("get_table_last_altered(", provider)
+        self.assertIn("is_layer_disk_cache_enabled()", provider)
+        iterator = (ROOT / "providers" / "sf_feature_iterator.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("self._provider.restore_cached_features()", iterator)
+        # Arrow and fetchmany() batches share one record-based fetch branch.
+        self.assertEqual(iterator.count("self._provider.save_cached_features()"), 1)
+        data_base = (ROOT / "helpers" / "data_base.py").read_text(encoding="utf-8")
+        self.assertIn("def get_table_last_altered(", data_base)
+
+
+def _load_benchmark_iterator(testcase):
+    """Load the real SFFeatureIterator against the PyQGIS stand-ins of
+    test/benchmark_feature_iterator.py; returns (benchmark, iterator module).
+    """
+    import sys
+    import importlib.util
+
+    qgis_names = ("qgis", "qgis.core", "qgis.PyQt", "qgis.PyQt.QtCore")
+    saved = {n: sys.modules.get(n) for n in qgis_names}
+    spec = importlib.util.spec_from_file_location(
+        "benchmark_feature_iterator_under_test",
+        ROOT / "test" / "benchmark_feature_iterator.py",
+    )
+    bench = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(bench)
+
+    def _restore():
+        for n, prev in saved.items():
+            if prev is None:
+                sys.modules.pop(n, None)
+            else:
+                sys.modules[n] = prev
+        for n in [n for n in sys.modules if n.split(".")[0] == bench.PACKAGE]:
+            sys.modules.pop(n, None)
+    testcase.addCleanup(_restore)
+
+    bench._install_stubs()
+    return bench, bench._load_module("providers/sf_feature_iterator.py")
+
+
+class TestDiskCacheKeepsOnlyFullLoads(unittest.TestCase):
+    """Loads without geometry (or in another CRS) never fill the feature
+    cache, so the disk cache cannot bring them back in a later session."""
+
+    def _open_layer(self, bench, iterator_module, disk):
+        class _Provider(bench._Provider):
+            def restore_cached_features(self):
+                if "store" not in disk:
+                    return False
+                self._features = disk["store"]
+                self._features_loaded = True
+                return True
+
+            def save_cached_features(self):
+                disk["store"] = self._features
+
+        columns = bench._make_columns(3)
+        return _Provider(bench._RowCursor(columns), iterator_module.FeatureStore())
+
+    def _fetch(self, bench, iterator_module, provider, request):
+        iterator = iterator_module.SFFeatureIterator(bench._Source(provider), request)
+        features = []
+        feature = iterator_module.QgsFeature()
+        while iterator.fetchFeature(feature):
+            features.append(iterator_module.QgsFeature(feature))
+        iterator.close()
+        return features
+
+    def test_no_geometry_load_then_reopen(self):
+        bench, iterator_module = _load_benchmark_iterator(self)
+        disk = {}
+
+        class _NoGeometryRequest(bench._QgsFeatureRequest):
+            def flags(self):
+                return self.Flag.NoGeometry
+
+        provider = self._open_layer(bench, iterator_module, disk)
+        self.assertEqual(
+            len(self._fetch(bench, iterator_module, provider, _NoGeometryRequest())), 3
+        )
+        self.assertFalse(provider._features_loaded)
+        self.assertNotIn("store", disk)
+
+        # Reopening the layer fetches the geometries instead of restoring an
+        # empty-geometry cache.
+        reopened = self._open_layer(bench, iterator_module, disk)
+        features = self._fetch(
+            bench, iterator_module, reopened, bench._QgsFeatureRequest()
+        )
+        self.assertEqual(len(features), 3)
+        self.assertTrue(all(feature.hasGeometry() for feature in features))
+        self.assertIn("store", disk)
+
+    def test_transformed_load_is_not_cached(self):
+        content = (ROOT / "providers" / "sf_feature_iterator.py").read_text(
+            encoding="utf-8"
+        )
+        idx = content.index("self._should_cache_features = (")
+        gate = content[idx:content.index("\n            )", idx)]
+        self.assertIn("and not self._request_no_geometry", gate)
+        self.assertIn("and not self._transform.isValid()", gate)
+
+
+class _FakeSnowflakeCursor:
+    def __init__(self, session):
+        self.session = session
+        self.queries = []
+
+    def execute(self, query, params=None):
+        self.queries.append(query)
+        self.session.executed.append(query)
+        if self.session.on_execute is not None and not query.startswith(("USE", "ALTER")):
+            self.session.on_execute(query)
+
+    def executemany(self, query, rows):
+        self.session.executed.append((query, list(rows)))
+        self.rowcount = len(rows)
+
+    def execute_async(self, query):
+        self.session.executed.append(query)
+        self.sfqid = f"q{len(_FakeSnowflakeSession.async_queries)}"
+        _FakeSnowflakeSession.async_queries[self.sfqid] = list(
+            _FakeSnowflakeSession.async_statuses
+        )
+
+    def get_results_from_sfqid(self, sfqid):
+        self.session.executed.append(("results", sfqid))
+        self.sfqid = sfqid
+
+    def close(self):
+        pass
+
+
+class _FakeQueryStatus:
+    def __init__(self, name):
+        self.name = name
+
+
+class _FakeSnowflakeSession:
+    # Status names each query submitted with execute_async goes through.
+    async_statuses = ["SUCCESS"]
+    async_queries = {}
+
+    def __init__(self, params, on_execute=None):
+        self.params = params
+        self.expired = False
+        self.closed = False
+        self.executed = []
+        self.on_execute = on_execute
+        self.failing_status_checks = 0
+
+    def cursor(self):
+        return _FakeSnowflakeCursor(self)
+
+    def get_query_status(self, sfqid):
+        if self.failing_status_checks:
+            self.failing_status_checks -= 1
+            raise OSError("Connection reset by peer")
+        statuses = _FakeSnowflakeSession.async_queries[sfqid]
+        return _FakeQueryStatus(statuses.pop(0) if len(statuses) > 1 else statuses[0])
+
+    def is_still_running(self, status):
+        return status.name in ("RUNNING", "QUEUED", "RESUMING_WAREHOUSE")
+
+    def is_an_error(self, status):
+        return status.name in ("FAILED_WITH_ERROR", "ABORTING")
+
+    def get_query_status_throw_if_error(self, sfqid):
+        raise RuntimeError(f"Query {sfqid} failed")
+
+    def close(self):
+        self.closed = True
+
+
+def _load_connection_manager(testcase, on_execute=None):
+    """Load managers/sf_connection_manager.py against stub snowflake / qgis
+    modules; returns (module, list of sessions opened so far)."""
+    import sys
+    import types
+    import importlib.util
+
+    package = "sfc_manager_under_test"
+    stub_names = ("snowflake", "snowflake.connector", "qgis", "qgis.core")
+    saved = {n: sys.modules.get(n) for n in stub_names}
+
+    def _restore():
+        for n, prev in saved.items():
+            if prev is None:
+                sys.modules.pop(n, None)
+            else:
+                sys.modules[n] = prev
+        for n in [n for n in sys.modules if n.split(".")[0] == package]:
+            sys.modules.pop(n, None)
+    testcase.addCleanup(_restore)
+
+    sessions = []
+
+    def _connect(**params):
+        session = _FakeSnowflakeSession(params, on_execute)
+        sessions.append(session)
+        return session
+
+    snowflake = types.ModuleType("snowflake")
+    connector = types.ModuleType("snowflake.connector")
+    connector.connect = _connect
+    connector.SnowflakeConnection = _FakeSnowflakeSession
+    connector.cursor = types.SimpleNamespace(SnowflakeCursor=_FakeSnowflakeCursor)
+    connector.errors = types.SimpleNamespace(
+        ProgrammingError=type(
+            "ProgrammingError",
+            (Exception,),
+            {"__init__": lambda self, msg=None, errno=None: Exception.__init__(self, msg)},
+        )
+    )
+    snowflake.connector = connector
+    qgis = types.ModuleType("qgis")
+    core = types.ModuleType("qgis.core")
+    core.QgsMessageLog = type(
+        "QgsMessageLog", (), {"logMessage": staticmethod(lambda *a, **k: None)}
+    )
+    core.QgsFeedback = type("QgsFeedback", (), {})
+    core.Qgis = type(
+        "Qgis", (), {"MessageLevel": type("L", (), {"Warning": 1, "Critical": 2})}
+    )
+    qgis.core = core
+    sys.modules.update({
+        "snowflake": snowflake, "snowflake.connector": connector,
+        "qgis": qgis, "qgis.core": core,
+    })
+    for name, path in (("", ROOT), ("helpers", ROOT / "helpers"),
+                       ("managers", ROOT / "managers")):
+        mod = types.ModuleType(f"{package}.{name}" if name else package)
+        mod.__path__ = [str(path)]
+        sys.modules[mod.__name__] = mod
+    utils = types.ModuleType(f"{package}.helpers.utils")
+    utils.get_auth_information = lambda name: testcase.auth
+    sys.modules[utils.__name__] = utils
+
+    for name in ("helpers.sql", "managers.sf_connection_manager"):
+        spec = importlib.util.spec_from_file_location(
+            f"{package}.{name}", ROOT / (name.replace(".", "/") + ".py")
+        )
+        mod = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = mod
+        spec.loader.exec_module(mod)
+    return mod, sessions
+
+
+class TestConnectionSessionPool(unittest.TestCase):
+    """Each connection name gets a bounded pool of Snowflake sessions, so
+    concurrent layer loads do not queue behind a single shared session.
+    """
+
+    auth = {
+        "username": "u", "account": "a", "warehouse": "w", "database": "d",
+        "connection_type": "Default Authentication", "password": "p",
+    }
+
+    def _manager(self, on_execute=None):
+        mod, sessions = _load_connection_manager(self, on_execute)
+        manager = object.__new__(mod.SFConnectionManager)
+        manager.__init__()
+        return mod, manager, sessions
+
+    def test_concurrent_queries_use_separate_sessions(self):
+        import threading
+
+        release = threading.Event()
+        running = []
+        lock = threading.Lock()
+
+        def _block(query):
+            with lock:
+                running.append(query)
+            release.wait(5)
+
+        mod, manager, sessions = self._manager(_block)
+        manager.connect("c", self.auth)
+        size = mod._MAX_SESSIONS_PER_CONNECTION
+        threads = [
+            threading.Thread(target=manager.execute_query, args=("c", f"SELECT {i}"))
+            for i in range(size + 1)
+        ]
+        for thread in threads:
+            thread.start()
+        for _ in range(100):
+            if len(running) == size:
+                break
+            threading.Event().wait(0.02)
+        # The pool is full: one statement waits for a session to come back.
+        self.assertEqual(len(running), size)
+        self.assertEqual(len(sessions), size)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        self.assertEqual(len(running), size + 1)
+        self.assertEqual(len(sessions), size)
+        self.assertEqual(len(manager._pools["c"].idle), size)
+
+    def test_schema_and_tag_tracked_per_session(self):
+        mod, manager, sessions = self._manager()
+        manager.connect("c", self.auth)
+        pool, first = manager.checkout_session("c")
+        _, second = manager.checkout_session("c")
+        manager.checkin_session(pool, second)
+        manager.execute_query("c", "SELECT 1", {"schema_name": "S"}, op_tag="t")
+        manager.execute_query("c", "SELECT 2", {"schema_name": "S"}, op_tag="t")
+        self.assertEqual(
+            second.executed,
+            ['USE SCHEMA S', "ALTER SESSION SET QUERY_TAG = 't'",
+             "SELECT 1", "SELECT 2"],
+        )
+        manager.checkin_session(pool, first)
+        # The primary session never switched schema, so it still needs one.
+        manager.execute_query("c", "SELECT 3", {"schema_name": "S"}, op_tag="t")
+        self.assertEqual(first.executed[0], 'USE SCHEMA S')
+
+    def test_sso_keeps_a_single_session(self):
+        mod, manager, sessions = self._manager()
+        manager.connect("c", dict(self.auth, connection_type="Single sign-on (SSO)"))
+        self.assertEqual(manager._pools["c"].max_size, 1)
+
+    def test_pinned_session_keeps_temporary_tables_together(self):
+        import threading
+
+        mod, manager, sessions = self._manager()
+        manager.connect("c", self.auth)
+        with manager.pinned_session("c"):
+            pool, pinned = manager._pinned_sessions()["c"]
+            manager.execute_query("c", "CREATE TEMPORARY TABLE t1 AS SELECT 1")
+            other = threading.Thread(
+                target=lambda: manager.execute_query("c", "SELECT 'other'")
+            )
+            other.start()
+            other.join()
+            manager.execute_query("c", "CREATE TABLE t2 AS SELECT * FROM t1")
+        self.assertIn("CREATE TEMPORARY TABLE t1 AS SELECT 1", pinned.executed)
+        self.assertIn("CREATE TABLE t2 AS SELECT * FROM t1", pinned.executed)
+        self.assertNotIn("SELECT 'other'", pinned.executed)
+        self.assertIn(pinned, pool.idle)
+        src = (ROOT / "processing" / "buffer_table.py").read_text(encoding="utf-8")
+        self.assertIn("with mgr.pinned_session(connection_name):", src)
+
+    def test_reconnect_closes_sessions_on_check_in(self):
+        mod, manager, sessions = self._manager()
+        manager.connect("c", self.auth)
+        pool, busy = manager.checkout_session("c")
+        _, idle = manager.checkout_session("c")
+        manager.checkin_session(pool, idle)
+        manager.connect("c", self.auth)
+        self.assertTrue(idle.closed)
+        self.assertFalse(busy.closed)
+        manager.checkin_session(pool, busy)
+        self.assertTrue(busy.closed)
+        self.assertIs(manager.get_connection("c"), sessions[-1])
+        manager.close_connection("c")
+        self.assertTrue(sessions[-1].closed)
+        self.assertIsNone(manager.get_connection("c"))
+
+
+def _load_bulk_load(testcase):
+    """Load helpers/bulk_load.py (and the real helpers/sql.py) under a
+    throwaway package name."""
+    import sys
+    import types
+    import importlib.util
+
+    package = "sfc_bulk_load_under_test"
+
+    def _restore():
+        for n in [n for n in sys.modules if n.split(".")[0] == package]:
+            sys.modules.pop(n, None)
+    testcase.addCleanup(_restore)
+
+    helpers_pkg = types.ModuleType(package)
+    helpers_pkg.__path__ = [str(ROOT / "helpers")]
+    sys.modules[package] = helpers_pkg
+    spec = importlib.util.spec_from_file_location(
+        f"{package}.bulk_load", ROOT / "helpers" / "bulk_load.py"
+    )
+    mod = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = mod
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class TestBulkExportViaStage(unittest.TestCase):
+    """Bulk export mode: features go to gzip CSV parts, one PUT to a
+    temporary stage and a single COPY INTO with WKB conversion.
+    """
+
+    def setUp(self):
+        import tempfile
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.mod = _load_bulk_load(self)
+
+    def test_writer_splits_parts_and_marks_nulls(self):
+        import csv
+        import gzip
+
+        with self.mod.StageFileWriter(self.tmp.name, rows_per_file=2) as writer:
+            writer.write_row(["0101", "a,b", 1])
+            writer.write_row([None, "", 2.5])
+            writer.write_row(["0102", 'say "hi"', None])
+        self.assertEqual(writer.row_count, 3)
+        self.assertEqual(len(writer.files), 2)
+        rows = []
+        for path in writer.files:
+            with gzip.open(path, "rt", encoding="utf-8", newline="") as f:
+                rows.extend(csv.reader(f))
+        self.assertEqual(
+            rows,
+            [["0101", "a,b", "1"], ["\\N", "", "2.5"], ["0102", 'say "hi"', "\\N"]],
+        )
+
+    def test_put_and_copy_run_on_one_session(self):
+        import contextlib
+
+        executed = []
+
+        class _Cursor:
+            description = [("file",), ("status",), ("rows_loaded",)]
+
+            def execute(self, query):
+                executed.append(query)
+
+            def fetchall(self):
+                return [("part_00000.csv.gz", "LOADED", 3), ("part_00001.csv.gz", "LOADED", 2)]
+
+            def close(self):
+                executed.append("<close>")
+
+        class _Manager:
+            @contextlib.contextmanager
+            def session_cursor(self, name):
+                executed.append(f"<checkout {name}>")
+                cursor = _Cursor()
+                try:
+                    yield cursor
+                finally:
+                    cursor.close()
+                    executed.append("<checkin>")
+
+        loaded = self.mod.load_staged_files(
+            _Manager(), "c", "DB", "S", self.tmp.name, "DB.S.T",
+            '"GEOM","NAME"', ["ST_GEOGFROMWKB(TO_BINARY($1, 'HEX'))", "$2"],
+        )
+        self.assertEqual(loaded, 5)
+        self.assertEqual(executed[0], "<checkout c>")
+        self.assertTrue(executed[1].startswith("CREATE TEMPORARY STAGE DB.S.QGIS_EXPORT_"))
+        stage = executed[1].split()[-1]
+        self.assertIn(f"@{stage}", executed[2])
+        self.assertTrue(executed[2].startswith("PUT 'file://"))
+        self.assertIn("part_*.csv.gz", executed[2])
+        self.assertTrue(executed[3].startswith('COPY INTO DB.S.T ("GEOM","NAME") FROM (SELECT '))
+        self.assertIn("ST_GEOGFROMWKB(TO_BINARY($1, 'HEX')),$2 FROM @", executed[3])
+        self.assertIn("NULL_IF = ('\\\\N')", executed[3])
+        self.assertEqual(executed[4], f"DROP STAGE IF EXISTS {stage}")
+        self.assertEqual(executed[5:], ["<close>", "<checkin>"])
+
+    def test_statements_are_cancellable_and_stage_dropped_on_failure(self):
+        import threading
+
+        tracked = []
+
+        def _on_execute(query):
+            tracked.append(
+                (query.split()[0], bool(manager._active_cursors.get(threading.get_ident())))
+            )
+            if query.startswith("COPY INTO"):
+                raise RuntimeError("cancelled")
+
+        mod, sessions = _load_connection_manager(self, _on_execute)
+        manager = object.__new__(mod.SFConnectionManager)
+        manager.__init__()
+        self.auth = TestConnectionSessionPool.auth
+        manager.connect("c", self.auth)
+        with self.assertRaises(RuntimeError):
+            self.mod.load_staged_files(
+                manager, "c", "DB", "S", self.tmp.name, "DB.S.T", '"A"', ["$1"],
+            )
+        self.assertEqual(
+            tracked,
+            [("CREATE", True), ("PUT", True), ("COPY", True), ("DROP", True)],
+        )
+        self.assertEqual(dict(manager._active_cursors), {})
+        self.assertEqual(len(sessions), 1)
+        # The session went back to the pool: the next checkout reuses it.
+        pool, session = manager.checkout_session("c")
+        self.assertIs(session, sessions[0])
+        manager.checkin_session(pool, session)
+
+    def test_algorithm_offers_bulk_load(self):
+        src = (ROOT / "qgis_snowflake_connector_algorithm.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn('BULK_LOAD = "BULK_LOAD"', src)
+        self.assertIn("parameterAsBoolean(parameters, self.BULK_LOAD, context)", src)
+        self.assertIn("load_staged_files(", src)
+        self.assertIn('[f"${position}" for position in range(', src)
+        self.assertIn("ST_GEOGFROMWKB(TO_BINARY({geom}, 'HEX'))", src)
+        self.assertIn("ST_GEOMETRYFROMWKB(TO_BINARY({geom}, 'HEX'))", src)
+
+
+class TestBoundExecuteManyExport(unittest.TestCase):
+    """The export runs one prepared INSERT ... SELECT with ? placeholders
+    through executemany on qmark-paramstyle sessions instead of growing a
+    VALUES string per value.
+    """
+
+    auth = TestConnectionSessionPool.auth
+
+    def test_execute_many_uses_qmark_session(self):
+        mod, sessions = _load_connection_manager(self)
+        manager = object.__new__(mod.SFConnectionManager)
+        manager.__init__()
+        manager.connect("c", self.auth)
+        query = 'INSERT INTO T ("G","A") SELECT ST_GEOGFROMWKB(TO_BINARY(?, \'HEX\')),?'
+        rows = [["0101", 1], [None, 2]]
+        self.assertEqual(manager.execute_many("c", query, rows), 2)
+        self.assertEqual(len(sessions), 2)
+        bound = sessions[1]
+        self.assertEqual(bound.params["paramstyle"], "qmark")
+        self.assertNotIn("paramstyle", sessions[0].params)
+        self.assertEqual(bound.executed, [(query, rows)])
+        # The bound session is reused and closed with the connection.
+        manager.execute_many("c", query, rows)
+        self.assertEqual(len(sessions), 2)
+        manager.close_connection("c")
+        self.assertTrue(bound.closed)
+
+    def test_sso_connection_does_not_open_a_bound_session(self):
+        mod, sessions = _load_connection_manager(self)
+        manager = object.__new__(mod.SFConnectionManager)
+        manager.__init__()
+        manager.connect(
+            "c", {**self.auth, "connection_type": "Single sign-on (SSO)"}
+        )
+        self.assertFalse(manager.supports_bound_parameters("c"))
+        with self.assertRaises(RuntimeError):
+            manager.execute_many("c", "INSERT INTO T SELECT ?", [[1]])
+        # No second externalbrowser login was started.
+        self.assertEqual(len(sessions), 1)
+        manager.connect("d", self.auth)
+        self.assertTrue(manager.supports_bound_parameters("d"))
+
+    def test_bound_insert_limited_to_scoped_exports(self):
+        src = (ROOT / "qgis_snowflake_connector_algorithm.py").read_text(
+            encoding="utf-8"
+        )
+        start = src.index("def processAlgorithm(")
+        end = src.index("\n    def ", start + 1)
+        body = src[start:end]
+        gate = body.index(
+            "is_snowflake_layer or source.featureCount() <= _BOUND_INSERT_BATCH_ROWS"
+        )
+        self.assertLess(
+            body.index(
+                "self.connection_manager.supports_bound_parameters(selected_connection)"
+            ),
+            body.index("self._bound_insert_features("),
+        )
+        self.assertLess(gate, body.index("self._bound_insert_features("))
+
+    def test_algorithm_prefers_bound_insert(self):
+        src = (ROOT / "qgis_snowflake_connector_algorithm.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("def _bound_insert_features(", src)
+        self.assertIn('["?"] * (1 + len(export_fields))', src)
+        self.assertIn("self.connection_manager.execute_many(", src)
+        # The VALUES string builder stays as the fallback.
+        start = src.index("def processAlgorithm(")
+        end = src.index("\n    def ", start + 1)
+        body = src[start:end]
+        self.assertLess(
+            body.index("self._bound_insert_features("),
+            body.index("self._values_insert_features("),
+        )
+
+
+class TestServerSideSnowflakeCopy(unittest.TestCase):
+    """Exporting a Snowflake layer to a table on the same connection runs one
+    INSERT INTO ... SELECT on the warehouse instead of streaming the rows
+    through QGIS.
+    """
+
+    def _algorithm(self):
+        return (ROOT / "qgis_snowflake_connector_algorithm.py").read_text(
+            encoding="utf-8"
+        )
+
+    def _provider(self):
+        return (ROOT / "providers" / "sf_vector_data_provider.py").read_text(
+            encoding="utf-8"
+        )
+
+    def test_server_side_copy_tried_before_client_paths(self):
+        src = self._algorithm()
+        start = src.index("def processAlgorithm(")
+        end = src.index("\n    def ", start + 1)
+        body = src[start:end]
+        self.assertLess(
+            body.index("self._server_side_copy("),
+            body.index("self._bound_insert_features("),
+        )
+        self.assertLess(
+            body.index("self._server_side_copy("),
+            body.index("self._bulk_load_features("),
+        )
+
+    def test_server_side_copy_requires_same_connection(self):
+        src = self._algorithm()
+        start = src.index("def _server_side_copy(")
+        end = src.index("\n    def ", start + 1)
+        body = src[start:end]
+        self.assertIn('provider.name() != "snowflakedb"', body)
+        self.assertIn("if src_connection != connection_name:", body)
+        self.assertIn("provider.server_side_select_parts(primary_key_values)", body)
+        self.assertIn("SERVER_SIDE_MAX_SELECTED", body)
+
+    def test_server_side_copy_skips_layers_with_pending_edits(self):
+        src = self._algorithm()
+        start = src.index("def _server_side_copy(")
+        end = src.index("\n    def ", start + 1)
+        body = src[start:end]
+        self.assertIn("if layer.isEditable() and layer.isModified():", body)
+        self.assertLess(
+            body.index("layer.isModified()"),
+            body.index("provider.server_side_select_parts("),
+        )
+
+    def test_server_side_copy_is_cancellable(self):
+        src = self._algorithm()
+        start = src.index("def _server_side_copy(")
+        end = src.index("\n    def ", start + 1)
+        body = src[start:end]
+        self.assertIn("self.connection_manager.execute_query_async(", body)
+        self.assertIn("feedback=feedback", body)
+        self.assertNotIn("self.sf_data_provider.execute_query(", body)
+
+    def test_provider_select_parts_refuses_row_capped_preview(self):
+        src = self._provider()
+        start = src.index("def server_side_select_parts(")
+        end = src.index("\n    def ", start + 1)
+        body = src[start:end]
+        self.assertIn("if self._is_limited_unordered:\n            return None", body)
+        self.assertLess(
+            body.index("self._is_limited_unordered"),
+            body.index("return self._from_clause"),
+        )
+
+    def test_provider_select_parts(self):
+        src = self._provider()
+        self.assertIn("SERVER_SIDE_MAX_SELECTED = 10_000", src)
+        self.assertIn("def server_side_select_parts(", src)
+        self.assertIn("return [self._geometry_type_filter()]", src)
+        self.assertIn(
+            'return [f"H3_IS_VALID_CELL({quote_identifier(self._column_geom)})"]', src
+        )
+        self.assertIn(
+            'return f"H3_CELL_TO_BOUNDARY({quote_identifier(self._column_geom)})"', src
+        )
+
+
+class TestStreamingImport(unittest.TestCase):
+    """Import from Snowflake streams fetchmany() batches into the sink
+    instead of holding the whole result from fetchall() in memory.
+    """
+
+    def _import(self):
+        return (ROOT / "processing" / "import_from_snowflake.py").read_text(
+            encoding="utf-8"
+        )
+
+    def test_rows_fetched_in_batches(self):
+        src = self._import()
+        start = src.index("def processAlgorithm(")
+        body = src[start:]
+        self.assertNotIn("row_cursor.fetchall()", body)
+        self.assertIn("row_cursor.fetchmany(_FETCH_BATCH_ROWS)", body)
+        self.assertIn("sink.addFeatures(features, QgsFeatureSink.FastInsert)", body)
+        self.assertIn("row_cursor.rowcount", body)
+
+    def test_value_conversion_kept(self):
+        src = self._import()
+        start = src.index("_COLUMN_CONVERTERS = {")
+        end = src.index("\n}", start)
+        body = src[start:end]
+        for conversion in ('"NUMBER": _decimal_to_float', '"DATE": _to_qdate',
+                           '"TIME": _to_qtime', '"TIMESTAMP_NTZ": _to_qdatetime'):
+            self.assertIn(conversion, body)
+
+
+class TestColumnWiseAttributeConversion(unittest.TestCase):
+    """Attribute converters are resolved once per query and applied column by
+    column to each batch, only for the columns that need one.
+    """
+
+    def test_iterator_converts_row_batches_column_wise(self):
+        content = (ROOT / "providers" / "sf_feature_iterator.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertNotIn("lambda x: x", content)
+        self.assertNotIn("_attributes_need_conversion", content)
+        self.assertIn("def _decode_row_batch(", content)
+        self.assertIn("list(zip(*rows))", content)
+        self.assertIn("converter = self._attributes_converters.get(attr_idx)", content)
+        # Tile rows go through the same decoding as fetchmany() batches.
+        self.assertIn("self._decode_row_batch(self._tile_rows)", content)
+
+    def test_import_uses_per_column_converters(self):
+        content = (ROOT / "processing" / "import_from_snowflake.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("def _column_converters(", content)
+        self.assertNotIn("def _qt_value(", content)
+
+
+class TestPartitionedImport(unittest.TestCase):
+    """Unlimited imports can be split into hash partitions that are executed
+    and fetched in parallel, each through the connection's session pool.
+    """
+
+    def _load_partitioned_fetch(self):
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location(
+            "sfc_partitioned_fetch_under_test", ROOT / "helpers" / "partitioned_fetch.py"
+        )
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        return mod
+
+    class _Cursor:
+        def __init__(self, rows):
+            self._rows = list(rows)
+            self.rowcount = len(self._rows)
+            self.closed = False
+
+        def fetchmany(self, size):
+            batch, self._rows = self._rows[:size], self._rows[size:]
+            return batch
+
+        def close(self):
+            self.closed = True
+
+    def test_partition_queries_wrap_the_query(self):
+        mod = self._load_partitioned_fetch()
+        queries = mod.partition_queries('SELECT "A" FROM T WHERE X OR Y', '"A"', 3)
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(
+            queries[2],
+            'SELECT * FROM (SELECT "A" FROM T WHERE X OR Y) '
+            'WHERE MOD(ABS(HASH("A")), 3) = 2',
+        )
+
+    def test_all_partitions_are_drained(self):
+        mod = self._load_partitioned_fetch()
+        cursors = {}
+        rows_by_query = {"q0": range(0, 25), "q1": range(25, 30), "q2": []}
+        cursor_cls = self._Cursor
+
+        class Manager:
+            def execute_query_async(
+                self, connection_name, query, context_information=None, is_canceled=None
+            ):
+                cursors[query] = cursor_cls(rows_by_query[query])
+                return cursors[query]
+
+        fetcher = mod.PartitionedFetcher(
+            Manager(), "c", ["q0", "q1", "q2"], 10,
+            convert_batch=lambda rows: [r * 2 for r in rows],
+        )
+        values = [v for batch in fetcher.batches() for v in batch]
+        fetcher.stop()
+        self.assertEqual(sorted(values), [r * 2 for r in range(30)])
+        self.assertEqual(fetcher.row_count, 30)
+        self.assertTrue(all(cursor.closed for cursor in cursors.values()))
+
+    def test_worker_error_reaches_consumer(self):
+        mod = self._load_partitioned_fetch()
+
+        class Manager:
+            def execute_query_async(
+                self, connection_name, query, context_information=None, is_canceled=None
+            ):
+                raise RuntimeError("warehouse suspended")
+
+        fetcher = mod.PartitionedFetcher(Manager(), "c", ["q0", "q1"], 10)
+        with self.assertRaises(RuntimeError):
+            list(fetcher.batches())
+
+    def test_stop_cancels_running_partitions(self):
+        import threading
+
+        mod = self._load_partitioned_fetch()
+        submitted = threading.Semaphore(0)
+        cancelled = []
+
+        class Manager:
+            def execute_query_async(
+                self, connection_name, query, context_information=None, is_canceled=None
+            ):
+                submitted.release()
+                # Polls like the connection manager until the fetch is stopped.
+                while not is_canceled():
+                    threading.Event().wait(0.01)
+                cancelled.append(query)
+                raise RuntimeError(f"SQL execution canceled: {query}")
+
+        fetcher = mod.PartitionedFetcher(Manager(), "c", ["q0", "q1", "q2"], 10)
+        for _ in range(3):
+            self.assertTrue(submitted.acquire(timeout=5))
+        fetcher.stop()
+        self.assertEqual(sorted(cancelled), ["q0", "q1", "q2"])
+        self.assertFalse(any(thread.is_alive() for thread in fetcher._threads))
+
+    def test_algorithm_only_partitions_unlimited_imports(self):
+        src = (ROOT / "processing" / "import_from_snowflake.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn('PARTITIONS = "PARTITIONS"', src)
+        self.assertIn("if partitions > 1 and limit > 0:", src)
+        # The declared key is hashed; every column only without one.
+        self.assertIn("primary_key = get_declared_primary_key(ctx_info)", src)
+        self.assertIn("if primary_key in col_names", src)
+        self.assertIn('else select_cols or "_wkb"', src)
+        self.assertIn("partition_queries(sql, partition_key, partitions)", src)
+        fetch_src = (ROOT / "helpers" / "partitioned_fetch.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("is_canceled=self._stop_event.is_set", fetch_src)
+
+
+class TestCountExtentSingleProbe(unittest.TestCase):
+    """Opening a layer fetches featureCount() and extent() with one aggregate
+    query: extent() adds the count to its MIN/MAX select list while the count
+    is unknown, and featureCount() goes through extent() when neither is
+    cached yet.
+    """
+
+    def _provider(self):
+        return (ROOT / "providers" / "sf_vector_data_provider.py").read_text(
+            encoding="utf-8"
+        )
+
+    def test_count_aggregate_honours_subset_string(self):
+        src = self._provider()
+        start = src.index("def _count_aggregate_sql(")
+        end = src.index("\n    def ", start + 1)
+        body = src[start:end]
+        self.assertIn('f"COUNT_IF({self.subsetString()})"', body)
+        self.assertIn('return "COUNT(*)"', body)
+
+    def test_extent_queries_fetch_count(self):
+        src = self._provider()
+        self.assertIn("f'SELECT {count_sql}MIN(ST_XMIN({qgeom})), '", src)
+        self.assertIn(
+            "f'SELECT {count_sql}MIN(ST_XMIN(H3_CELL_TO_BOUNDARY({qgeom}))), '", src
+        )
+        self.assertEqual(src.count("self._feature_count = extent_bounds[0]"), 2)
+
+    def test_feature_count_probes_through_extent(self):
+        src = self._provider()
+        self.assertEqual(src.count("self._probe_metadata_through_extent()"), 2)
+        start = src.index("def _probe_metadata_through_extent(")
+        end = src.index("\n    def ", start + 1)
+        self.assertIn("if self._extent is not None", src[start:end])
+
+
+class TestMetadataCache(unittest.TestCase):
+    """INFORMATION_SCHEMA lookups share a process-wide cache with a TTL that
+    the browser's Refresh action and column DDL invalidate.
+    """
+
+    def _load_metadata_cache(self):
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location(
+            "sfc_metadata_cache_under_test", ROOT / "helpers" / "metadata_cache.py"
+        )
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        return mod
+
+    def test_values_reused_until_ttl(self):
+        mod = self._load_metadata_cache()
+        now = [0.0]
+        cache = mod.MetadataCache(ttl_seconds=10, clock=lambda: now[0])
+        calls = []
+
+        def loader():
+            calls.append(1)
+            return len(calls)
+
+        key = mod.metadata_key("columns", "c", "db", "s", "t")
+        self.assertEqual(cache.get_or_load(key, loader), 1)
+        self.assertEqual(cache.get_or_load(key, loader), 1)
+        now[0] = 11.0
+        self.assertEqual(cache.get_or_load(key, loader), 2)
+
+    def test_keys_are_case_insensitive(self):
+        mod = self._load_metadata_cache()
+        self.assertEqual(
+            mod.metadata_key("columns", "c", "db", "public", "roads"),
+            mod.metadata_key("columns", "c", "DB", "PUBLIC", "ROADS"),
+        )
+
+    def test_failed_load_not_cached(self):
+        mod = self._load_metadata_cache()
+        cache = mod.MetadataCache()
+        key = mod.metadata_key("primary_key", "c", "db", "s", "t")
+
+        def failing():
+            raise RuntimeError("offline")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_load(key, failing)
+        self.assertEqual(cache.get_or_load(key, lambda: "ID"), "ID")
+
+    def test_invalidate_scopes(self):
+        mod = self._load_metadata_cache()
+        cache = mod.MetadataCache()
+        keys = {
+            "t1": mod.metadata_key("columns", "c", "db", "s", "t1"),
+            "t2": mod.metadata_key("columns", "c", "db", "s", "t2"),
+            "other_schema": mod.metadata_key("columns", "c", "db", "s2", "t1"),
+            "views": mod.metadata_key("views", "c", "db"),
+            "other_conn": mod.metadata_key("columns", "c2", "db", "s", "t1"),
+        }
+        for name, key in keys.items():
+            cache.get_or_load(key, lambda name=name: name)
+
+        def cached():
+            return {
+                name for name, key in keys.items()
+                if cache.get_or_load(key, lambda: None) == name
+            }
+
+        # A table refresh drops that table and lookups spanning it.
+        cache.invalidate("c", schema_name="s", table_name="t1")
+        self.assertEqual(cached(), {"t2", "other_schema", "other_conn"})
+        cache.invalidate("c")
+        self.assertEqual(cached(), {"other_conn"})
+        cache.clear()
+        self.assertEqual(cached(), set())
+
+    def test_call_sites_use_cache(self):
+        expectations = {
+            ("providers", "sf_vector_data_provider.py"): ['"columns"', '"views"'],
+            ("helpers", "data_base.py"): [
+                '"geo_columns"', '"srid"', '"geometry_types"', '"geo_column_type"',
+                '"primary_key"', "invalidate_table_metadata(context_information)",
+            ],
+            ("sf_temporal_support.py",): ['"timestamp_columns"'],
+            ("sf_locator_filter.py",): ['"table_search"', '"geo_column_names"'],
+        }
+        for parts, needles in expectations.items():
+            src = ROOT.joinpath(*parts).read_text(encoding="utf-8")
+            self.assertIn("get_metadata_cache()", src)
+            for needle in needles:
+                self.assertIn(needle, src)
+
+    def test_refresh_invalidates_cache(self):
+        src = (ROOT / "entities" / "sf_data_item.py").read_text(encoding="utf-8")
+        start = src.index("def on_refresh_action_triggered(")
+        body = src[start:src.index("\n    def ", start + 1)]
+        self.assertIn("get_metadata_cache().invalidate(", body)
+        self.assertLess(
+            body.index("get_metadata_cache().invalidate("),
+            body.index("self.refresh_internal()"),
+        )
+
+
+class TestBrowserCatalogSnapshot(unittest.TestCase):
+    """The browser tree is built from one catalog query per database instead
+    of a COLUMNS / TABLES query per expanded node."""
+
+    @staticmethod
+    def _load():
+        import importlib.util
+        import sys
+        import types
+
+        package = "sfc_catalog_under_test"
+        pkg = types.ModuleType(package)
+        pkg.__path__ = [str(ROOT / "helpers")]
+        sys.modules[package] = pkg
+        for name in ("sql", "catalog_snapshot"):
+            spec = importlib.util.spec_from_file_location(
+                f"{package}.{name}", ROOT / "helpers" / f"{name}.py"
+            )
+            mod = importlib.util.module_from_spec(spec)
+            sys.modules[spec.name] = mod
+            spec.loader.exec_module(mod)
+        return mod
+
+    def test_snapshot_serves_schemas_tables_and_columns(self):
+        mod = self._load()
+        snapshot = mod.CatalogSnapshot("DB", [
+            ("S2", "ROADS", "GEOM", "GEOMETRY", None, None),
+            ("S2", "ROADS", "ID", "NUMBER", 0, None),
+            ("S2", "CELLS", "CELL", "NUMBER", 0, "H3 res 8"),
+            ("S2", "CELLS", "AREA", "FLOAT", None, "h3 area"),
+            ("S1", "EMPTY", None, None, None, None),
+            ("S1", "PTS", "B", "TEXT", None, None),
+            ("S1", "PTS", "A", "GEOGRAPHY", None, None),
+        ])
+        self.assertEqual(snapshot.schema_names(), ["S1", "S2"])
+        self.assertEqual(snapshot.table_names("S1"), ["EMPTY", "PTS"])
+        self.assertEqual(snapshot.table_names("MISSING"), [])
+        self.assertEqual(snapshot.columns("S1", "EMPTY"), [])
+        self.assertEqual(
+            [c.column_name for c in snapshot.columns("S1", "PTS")], ["A", "B"]
+        )
+        geo, h3 = snapshot.geo_columns("S2")
+        self.assertEqual([(c.table_name, c.column_name) for c in geo], [("ROADS", "GEOM")])
+        self.assertEqual([(c.table_name, c.column_name) for c in h3], [("CELLS", "CELL")])
+
+    def test_catalog_query_covers_tables_and_columns(self):
+        query = self._load().catalog_query("my'db")
+        self.assertIn("FROM INFORMATION_SCHEMA.TABLES t", query)
+        self.assertIn("LEFT JOIN INFORMATION_SCHEMA.COLUMNS c", query)
+        self.assertIn("ILIKE 'my''db'", query)
+
+    def test_snapshot_is_cached_per_database(self):
+        src = (ROOT / "helpers" / "data_base.py").read_text(encoding="utf-8")
+        start = src.index("def get_catalog_snapshot(")
+        body = src[start:src.index("\ndef ", start + 1)]
+        self.assertIn('metadata_key("catalog", connection_name, database_name)', body)
+        # H3 candidates of a schema are checked with one batched query.
+        start = src.index("def get_schema_geo_columns(")
+        body = src[start:src.index("\ndef ", start + 1)]
+        self.assertIn("get_catalog_snapshot(connection_name)", body)
+        self.assertIn("_valid_h3_columns(", body)
+
+    def test_browser_nodes_use_snapshot(self):
+        src = (ROOT / "entities" / "sf_data_item.py").read_text(encoding="utf-8")
+        for method in ("create_default_item", "create_schema_item", "create_fields_item"):
+            start = src.index(f"def {method}(")
+            body = src[start:src.index("\n    def ", start + 1)]
+            self.assertIn("get_catalog_snapshot(self.connection_name)", body, method)
+        self.assertNotIn("get_table_iterator", src)
+        self.assertNotIn("get_column_iterator", src)
+
+
+class TestAsyncBrowserPopulation(unittest.TestCase):
+    """Connection and schema nodes fetch their metadata on a QgsTask and show
+    a placeholder instead of blocking the browser."""
+
+    def _item_source(self):
+        return (ROOT / "entities" / "sf_data_item.py").read_text(encoding="utf-8")
+
+    def _method(self, src, name):
+        start = src.index(f"def {name}(")
+        return src[start:src.index("\n    def ", start + 1)]
+
+    def test_placeholder_while_task_runs(self):
+        src = self._item_source()
+        self.assertIn('_BACKGROUND_ITEM_TYPES = ("connection", "schema")', src)
+        self.assertIn("elif self._populate_in_background(children):", src)
+        body = self._method(src, "_populate_in_background")
+        self.assertIn('"Loading..."', body)
+        self.assertIn("SFPopulateChildrenTask(", body)
+        self.assertIn("QgsApplication.taskManager().addTask(populate_task)", body)
+        # Cached metadata and off-main-thread calls are served directly.
+        self.assertIn("is_catalog_cached(", body)
+        self.assertIn("QThread.currentThread()", body)
+
+    def test_same_path_is_fetched_once(self):
+        body = self._method(self._item_source(), "_populate_in_background")
+        self.assertIn("if self.path() not in self._running_tasks:", body)
+        self.assertIn("self._running_tasks[self.path()] = populate_task", body)
+
+    def test_finished_task_refreshes_and_depopulate_cancels(self):
+        src = self._item_source()
+        body = self._method(src, "on_children_prefetched")
+        self.assertIn("self._running_tasks.pop(path, None)", body)
+        self.assertIn("self.refresh()", body)
+        body = self._method(src, "setState")
+        self.assertIn("Qgis.BrowserItemState.NotPopulated", body)
+        self.assertIn("populate_task.cancel()", body)
+        task = (ROOT / "tasks" / "sf_populate_children_task.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("cancel_pending_on_thread(", task)
+
+    def test_metadata_cache_contains(self):
+        import importlib.util
+
+        spec = importlib.util.spec_from_file_location(
+            "sfc_metadata_cache_contains", ROOT / "helpers" / "metadata_cache.py"
+        )
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        now = [0.0]
+        cache = mod.MetadataCache(ttl_seconds=10, clock=lambda: now[0])
+        key = mod.metadata_key("catalog", "c", "db")
+        self.assertFalse(cache.contains(key))
+        cache.get_or_load(key, lambda: "snapshot")
+        self.assertTrue(cache.contains(key))
+        now[0] = 11.0
+        self.assertFalse(cache.contains(key))
+
+
+class TestAsyncQueryExecution(unittest.TestCase):
+    """execute_query_async submits with execute_async and polls the query's
+    status, so long statements can be cancelled, report progress and survive
+    a dropped session."""
+
+    auth = TestConnectionSessionPool.auth
+
+    def _manager(self, statuses):
+        mod, sessions = _load_connection_manager(self)
+        mod._ASYNC_POLL_MIN_SECONDS = 0.001
+        mod._ASYNC_POLL_MAX_SECONDS = 0.001
+        manager = object.__new__(mod.SFConnectionManager)
+        manager.__init__()
+        manager.connect("c", self.auth)
+        _FakeSnowflakeSession.async_statuses = statuses
+        _FakeSnowflakeSession.async_queries = {}
+        self.addCleanup(setattr, _FakeSnowflakeSession, "async_statuses", ["SUCCESS"])
+        return mod, manager, sessions
+
+    def test_polls_until_done_and_survives_dropped_session(self):
+        mod, manager, sessions = self._manager(["RUNNING", "RUNNING", "SUCCESS"])
+        progress = []
+        sessions[0].failing_status_checks = 1
+
+        cursor = manager.execute_query_async(
+            "c", "CREATE TABLE t AS SELECT 1", {"schema_name": "S"},
+            on_progress=lambda status, elapsed: progress.append(status),
+        )
+
+        self.assertIn("CREATE TABLE t AS SELECT 1", sessions[0].executed)
+        # The session that failed the status check was dropped and the same
+        # query id picked up on a new one.
+        self.assertTrue(sessions[0].closed)
+        self.assertIn(("results", "q0"), sessions[1].executed)
+        self.assertEqual(cursor.sfqid, "q0")
+        self.assertEqual(progress, ["RUNNING", "RUNNING"])
+        cursor.close()
+        self.assertFalse(any(manager._active_cursors.values()))
+
+    def test_failed_status_check_keeps_pinned_session(self):
+        import threading
+
+        mod, manager, sessions = self._manager(["RUNNING", "SUCCESS"])
+        waits = []
+        sessions[0].failing_status_checks = 2
+
+        class _RecordingEvent(threading.Event):
+            def wait(self, timeout=None):
+                waits.append(timeout)
+                return super().wait(timeout)
+
+        class _RecordingQuery(mod._AsyncQuery):
+            def __init__(self, sfqid):
+                super().__init__(sfqid)
+                self.cancelled = _RecordingEvent()
+
+        mod._AsyncQuery = _RecordingQuery
+        with manager.pinned_session("c"):
+            cursor = manager.execute_query_async("c", "UPDATE t SET a = 1")
+            cursor.close()
+        # The transaction's session survived both failed checks, and each
+        # retry waited before asking again.
+        self.assertFalse(sessions[0].closed)
+        self.assertEqual(len(sessions), 1)
+        self.assertGreaterEqual(len(waits), 2)
+
+    def test_failed_status_checks_back_off(self):
+        src = (ROOT / "managers" / "sf_connection_manager.py").read_text(
+            encoding="utf-8"
+        )
+        start = src.index("def _wait_for_query(")
+        body = src[start:src.index("\n    def ", start + 1)]
+        failure = body[body.index("except Exception as e:"):body.index("continue")]
+        self.assertIn("if self._is_pinned(session):", failure)
+        self.assertIn("handle.cancelled.wait(delay)", failure)
+
+    def test_failed_query_raises(self):
+        mod, manager, sessions = self._manager(["RUNNING", "FAILED_WITH_ERROR"])
+        with self.assertRaises(RuntimeError):
+            manager.execute_query_async("c", "SELECT 1")
+
+    def test_cancel_aborts_query_server_side(self):
+        mod, manager, sessions = self._manager(["RUNNING"])
+        polls = []
+
+        with self.assertRaises(Exception) as raised:
+            manager.execute_query_async(
+                "c", "SELECT 1",
+                is_canceled=lambda: len(polls) >= 2,
+                on_progress=lambda status, elapsed: polls.append(status),
+            )
+        self.assertIn("canceled", str(raised.exception))
+        executed = [q for s in sessions for q in s.executed if isinstance(q, str)]
+        self.assertIn("SELECT SYSTEM$CANCEL_QUERY('q0')", executed)
+
+    def test_feedback_cancels_and_reports_progress(self):
+        mod, manager, sessions = self._manager(["RUNNING"])
+
+        class _Feedback:
+            texts = []
+
+            def isCanceled(self):
+                return len(self.texts) >= 2
+
+            def setProgressText(self, text):
+                self.texts.append(text)
+
+        feedback = _Feedback()
+        with self.assertRaises(Exception) as raised:
+            manager.execute_query_async("c", "SELECT 1", feedback=feedback)
+        self.assertIn("canceled", str(raised.exception))
+        self.assertRegex(feedback.texts[0], r"^Snowflake query running \(\d+ s\)$")
+        executed = [q for s in sessions for q in s.executed if isinstance(q, str)]
+        self.assertIn("SELECT SYSTEM$CANCEL_QUERY('q0')", executed)
+
+    def test_pinned_session_keeps_statements_together(self):
+        import threading
+
+        mod, manager, sessions = self._manager(["SUCCESS"])
+        with manager.pinned_session("c"):
+            pool, pinned = manager._pinned_sessions()["c"]
+            manager.execute_query("c", "CREATE TEMPORARY TABLE t1 AS SELECT 1")
+            other = threading.Thread(
+                target=lambda: manager.execute_query("c", "SELECT 'other'")
+            )
+            other.start()
+            other.join()
+            manager.execute_query_async("c", "CREATE TABLE t2 AS SELECT * FROM t1")
+        self.assertIn("CREATE TEMPORARY TABLE t1 AS SELECT 1", pinned.executed)
+        self.assertIn("CREATE TABLE t2 AS SELECT * FROM t1", pinned.executed)
+        self.assertNotIn("SELECT 'other'", pinned.executed)
+        self.assertIn(pinned, pool.idle)
+
+    def test_long_running_callers_use_async_api(self):
+        for parts in (
+            ("processing", "spatial_join.py"),
+            ("processing", "buffer_table.py"),
+            ("processing", "h3_index.py"),
+        ):
+            src = ROOT.joinpath(*parts).read_text(encoding="utf-8")
+            self.assertIn("mgr.execute_query_async(", src)
+            self.assertIn("feedback=feedback", src)
+            self.assertNotIn("setProgressText", src)
+        src = (ROOT / "processing" / "buffer_table.py").read_text(encoding="utf-8")
+        self.assertIn("with mgr.pinned_session(connection_name):", src)
+        src = (ROOT / "tasks" / "sf_execute_sql_query_task.py").read_text(encoding="utf-8")
+        self.assertIn("is_canceled=self.isCanceled", src)
+
+
+class TestBatchedEditCommits(unittest.TestCase):
+    """An edit commit is written with a few set-based statements in one
+    transaction instead of one UPDATE / INSERT round trip per feature."""
+
+    def _source(self, *parts):
+        return ROOT.joinpath(*parts).read_text(encoding="utf-8")
+
+    def _body(self, content, marker):
+        idx = content.index(marker)
+        next_def = content.find("\ndef ", idx + 1)
+        return content[idx:next_def] if next_def != -1 else content[idx:]
+
+    def test_statements_are_chunked_set_based_dml(self):
+        content = self._source("helpers", "data_base.py")
+        self.assertIn("_EDIT_BATCH_ROWS = ", content)
+        for func in ("update_table_rows", "insert_table_rows"):
+            body = self._body(content, f"def {func}(")
+            self.assertIn("range(0, len(rows), _EDIT_BATCH_ROWS)", body)
+            self.assertIn("_values_rows_sql(len(batch)", body)
+            self.assertIn("_execute_edit_transaction(", body)
+        self.assertIn(
+            "USING (SELECT * FROM VALUES", self._body(content, "def update_table_rows(")
+        )
+
+    def test_commit_runs_in_one_transaction_on_one_session(self):
+        body = self._body(
+            self._source("helpers", "data_base.py"), "def _execute_edit_transaction("
+        )
+        self.assertIn("with connection_manager.pinned_session(connection_name):", body)
+        for statement in ('run("BEGIN")', 'run("COMMIT")', 'run("ROLLBACK")'):
+            self.assertIn(statement, body)
+        self.assertLess(body.index('run("BEGIN")'), body.index("for sql, params in"))
+
+    def test_provider_groups_rows_and_builds_context_once(self):
+        content = self._source("providers", "sf_vector_data_provider.py")
+        idx = content.index("def _update_features(")
+        body = content[idx:content.index("\n    def ", idx + 1)]
+        self.assertIn("rows_by_columns.setdefault(tuple(col_names), [])", body)
+        self.assertEqual(body.count("update_table_rows("), 1)
+        for method in ("_update_features", "addFeatures", "deleteFeatures"):
+            idx = content.index(f"def {method}(")
+            body = content[idx:content.index("\n    def ", idx + 1)]
+            self.assertNotIn("copy.deepcopy", body)
+            self.assertIn("self._edit_context()", body)
+        self.assertIn("def changeFeatures(", content)
+        self.assertIn("QgsVectorDataProvider.ChangeFeatures", content)
+
+    def test_values_placeholders(self):
+        content = self._source("helpers", "data_base.py")
+        namespace = {}
+        exec(self._body(content, "def _values_rows_sql("), namespace)
+        self.assertEqual(
+            namespace["_values_rows_sql"](2, 3), "(%s, %s, %s), (%s, %s, %s)"
+        )
+
+
+class TestIncrementalEditCache(unittest.TestCase):
+    """A committed edit is patched into the provider's feature cache instead
+    of dropping it and downloading the whole layer again."""
+
+    def setUp(self):
+        self.mod = _load_feature_store(self)
+
+    def _store(self, count=5):
+        store = self.mod.FeatureStore()
+        for i in range(count):
+            wkb = None if i == 3 else b"g%d" % i
+            store.append(_FakeQgsFeature(i, wkb, [i, f"n{i}"], box=(i, i, i, i)))
+        return store
+
+    def test_set_attribute_keeps_typed_columns(self):
+        from array import array
+
+        store = self._store()
+        store.set_attribute(1, 0, 10)
+        store.set_attribute(2, 0, None)
+        store.set_attribute(4, 1, "renamed")
+        self.assertIsInstance(store._columns[0], array)
+        self.assertEqual(store.attributes_at(1), [10, "n1"])
+        self.assertEqual(store.attributes_at(2), [None, "n2"])
+        store.set_attribute(2, 0, 2)
+        self.assertEqual(store.attributes_at(2), [2, "n2"])
+        store.set_attribute(0, 0, "x")
+        self.assertEqual(store.attributes_at(0), ["x", "n0"])
+        self.assertEqual(store.attributes_at(4), [4, "renamed"])
+
+    def test_set_geometries_rewrites_blob_and_bounds(self):
+        store = self._store()
+        store.build_spatial_index()
+        store.set_geometries({
+            1: (b"longer-wkb", (9, 9, 10, 10)),
+            3: (b"new", (3, 3, 3, 3)),
+            4: (None, None),
+        })
+        self.assertFalse(store.has_spatial_index)
+        self.assertEqual(store.geometry_at(0).asWkb(), b"g0")
+        self.assertEqual(store.geometry_at(1).asWkb(), b"longer-wkb")
+        self.assertEqual(store.geometry_at(2).asWkb(), b"g2")
+        self.assertEqual(store.geometry_at(3).asWkb(), b"new")
+        self.assertFalse(store.feature_at(4).hasGeometry())
+        self.assertEqual(list(store._indexed_rows), [0, 1, 2, 3])
+        self.assertEqual(store.candidate_rows(_FakeQgsRectangle(8, 8, 11, 11)), [1])
+
+    def test_delete_rows_keeps_fids(self):
+        store = self._store()
+        store.delete_rows([1, 3])
+        self.assertEqual(len(store), 3)
+        self.assertEqual([store.fid_at(row) for row in range(3)], [0, 2, 4])
+        self.assertEqual(store[4].attributes(), [4, "n4"])
+        self.assertEqual(store[4].geometry().asWkb(), b"g4")
+        self.assertNotIn(1, store)
+        self.assertEqual(store.candidate_rows(_FakeQgsRectangle(-1, -1, 9, 9)), [0, 1, 2])
+        self.assertEqual(store.max_fid(), 4)
+        store.append(_FakeQgsFeature(5, None, [5, "n5"]))
+        self.assertEqual(store.row_of(5), 3)
+
+    def test_provider_does_not_reload_a_cached_layer(self):
+        content = (ROOT / "providers" / "sf_vector_data_provider.py").read_text(
+            encoding="utf-8"
+        )
+        for method in ("_update_features", "addFeatures", "deleteFeatures"):
+            idx = content.index(f"def {method}(")
+            body = content[idx:content.index("\n    def ", idx + 1)]
+            self.assertNotIn("reloadData()", body)
+        idx = content.index("def _edit_applied_to_cache(")
+        body = content[idx:content.index("\n    def ", idx + 1)]
+        self.assertIn("self._feature_count + count_delta", body)
+        self.assertIn("combineExtentWith(box)", body)
+        self.assertIn("TileCache().invalidate(", body)
+
+
+class TestPrimaryKeyFeatureIds(unittest.TestCase):
+    """Layers with an integer, verified-unique primary key use its values as
+    feature ids, so FilterFid / FilterFids become a WHERE pk IN (...) query
+    instead of a full load of the layer."""
+
+    def _source(self, *parts):
+        return ROOT.joinpath(*parts).read_text(encoding="utf-8")
+
+    def _method(self, content, name):
+        idx = content.index(f"def {name}(")
+        return content[idx:content.index("\n    def ", idx + 1)]
+
+    def test_provider_enables_mode_for_unique_integer_keys(self):
+        body = self._method(
+            self._source("providers", "sf_vector_data_provider.py"),
+            "uses_primary_key_fids",
+        )
+        self.assertIn("QMetaType.Type.Int, QMetaType.Type.LongLong", body)
+        self.assertIn("self._validate_primary_key()", body)
+
+    def test_fid_requests_are_pushed_down(self):
+        content = self._source("providers", "sf_feature_iterator.py")
+        self.assertIn(
+            "if not self._provider._features_loaded and (\n"
+            "                self._fid_attribute is None\n"
+            "                or len(self._target_fids) > _MAX_PUSHED_DOWN_FIDS",
+            content,
+        )
+        self.assertIn('IN ({fid_literals})"', content)
+        self.assertIn('str(int(fid)) for fid in self._target_fids', content)
+        # Inside the inner query, next to the geometry filter.
+        self.assertIn(
+            "[filter_geo_type, filter_geom_clause, filter_fid_clause, *where_clause_list]",
+            content,
+        )
+
+    def test_large_fid_requests_are_not_pushed_down(self):
+        bench, iterator_module = _load_benchmark_iterator(self)
+        iterator_module._MAX_PUSHED_DOWN_FIDS = 2
+        queries = []
+
+        class _KeyFields(bench._Fields):
+            def indexOf(self, name):
+                return self.names().index(name)
+
+            def __getitem__(self, key):
+                if isinstance(key, str):
+                    key = self.indexOf(key)
+                return super().__getitem__(key)
+
+        class _FidsRequest(bench._QgsFeatureRequest):
+            def filterType(self):
+                return self.FilterFids
+
+            def filterFids(self):
+                return [1, 3, 4]
+
+        def open_layer(load_all):
+            class _Provider(bench._Provider):
+                _load_all_rows = load_all
+
+                def primary_key(self):
+                    return "ID"
+
+                def uses_primary_key_fids(self):
+                    return True
+
+                def getFeatures(self, request):
+                    iterator = iterator_module.SFFeatureIterator(
+                        bench._Source(self), request
+                    )
+                    feature = iterator_module.QgsFeature()
+                    while iterator.fetchFeature(feature):
+                        yield feature
+
+            provider = _Provider(None, iterator_module.FeatureStore())
+            provider._fields = _KeyFields(provider._fields)
+            provider.connection_manager.execute_query = (
+                lambda **kwargs: queries.append(kwargs["query"])
+                or bench._RowCursor(bench._make_columns(6))
+            )
+            return provider
+
+        for load_all in (False, True):
+            with self.subTest(load_all=load_all):
+                queries.clear()
+                provider = open_layer(load_all)
+                iterator = iterator_module.SFFeatureIterator(
+                    bench._Source(provider), _FidsRequest()
+                )
+                feature = iterator_module.QgsFeature()
+                fids = []
+                while iterator.fetchFeature(feature):
+                    fids.append(feature.id())
+                self.assertEqual(fids, [1, 3, 4])
+                self.assertTrue(queries)
+                self.assertFalse(any(" IN (1" in query for query in queries))
+                # Cached layers resolve the ids from the one full load.
+                self.assertEqual(provider._features_loaded, not load_all)
+                self.assertEqual(len(queries), 1 if not load_all else 2)
+
+    def test_edits_address_rows_by_key_without_full_load(self):
+        content = self._source("providers", "sf_vector_data_provider.py")
+        ensure = self._method(content, "_ensure_features_loaded")
+        self.assertIn(
+            "if not self._features and not self.uses_primary_key_fids():", ensure
+        )
+        lookup = self._method(content, "_primary_key_value")
+        self.assertLess(
+            lookup.index("if self.uses_primary_key_fids():\n            return fid"),
+            lookup.index("if fid not in self._features:"),
+        )
+        for name in ("_update_features", "deleteFeatures"):
+            with self.subTest(method=name):
+                body = self._method(content, name)
+                self.assertIn("pk_value = self._primary_key_value(fid)", body)
+                self.assertNotIn("self._features[fid]", body)
+
+    def test_fids_come_from_the_key(self):
+        content = self._source("providers", "sf_feature_iterator.py")
+        self.assertIn("f.setId(int(attributes[self._fid_attribute]))", content)
+        plan = self._method(content, "_build_attribute_plan")
+        self.assertIn("plan.append((self._fid_attribute, len(subset)))", plan)
+
+    def test_inserted_features_and_disk_cache_follow_the_mode(self):
+        content = self._source("providers", "sf_vector_data_provider.py")
+        body = self._method(content, "_add_cached_features")
+        self.assertIn("fids = [int(pk_val) for pk_val in pk_values]", body)
+        body = self._method(content, "_disk_cache_key")
+        self.assertIn('"fids": "primary_key" if self.uses_primary_key_fids()', body)
+
+    def test_feature_store_indexes_key_fids(self):
+        store = _load_feature_store(self).FeatureStore()
+        for pk in (1001, 7, 42):
+            store.append(_FakeQgsFeature(pk, None, [pk]))
+        self.assertEqual(store.row_of(7), 1)
+        self.assertEqual(store[42].attributes(), [42])
+        self.assertIsNone(store.row_of(0))
+
+
+class TestAttributeProjectionPushdown(unittest.TestCase):
+    """Requested attributes are pushed into the SELECT list even when a subset
+    string (or filter expression) is active: every predicate runs in the
+    inner query against all of the layer's columns."""
+
+    FIELDS = ["ID", "NAME", "POP", "AREA"]
+    GEO_TYPE = "ST_ASGEOJSON(GEOM):type::string IN ('Point')"
+    RECT = "ST_INTERSECTS(GEOM, ST_GEOMETRYFROMWKT('POLYGON((0 0, 1 0, 1 1, 0 0))'))"
+    FIDS = "ID IN (3, 4)"
+    EXPRESSION = "POP > 10 OR AREA < 1"
+    SUBSET = "NAME = 'x'"
+
+    def _load(self):
+        import importlib.util
+        import sys
+        import types
+
+        package = "sfc_feature_query_under_test"
+        for name in [n for n in sys.modules if n.split(".")[0] == package]:
+            sys.modules.pop(name)
+        root = types.ModuleType(package)
+        root.__path__ = [str(ROOT)]
+        helpers = types.ModuleType(f"{package}.helpers")
+        helpers.__path__ = [str(ROOT / "helpers")]
+        sys.modules.update({package: root, f"{package}.helpers": helpers})
+        self.addCleanup(
+            lambda: [
+                sys.modules.pop(n)
+                for n in list(sys.modules)
+                if n.split(".")[0] == package
+            ]
+        )
+        spec = importlib.util.spec_from_file_location(
+            f"{package}.helpers.feature_query", ROOT / "helpers" / "feature_query.py"
+        )
+        mod = importlib.util.module_from_spec(spec)
+        sys.modules[spec.name] = mod
+        spec.loader.exec_module(mod)
+        return mod
+
+    # (primary key, index expression): an integer key used as the fids, a
+    # string key, and no key at all (rows numbered by ROW_NUMBER()).
+    KEYS = [
+        ("ID", "ID"),
+        ("NAME", "NAME"),
+        ("", "ROW_NUMBER() OVER (order by 1) as sfindexsfrownumberauto "),
+    ]
+
+    def _final_query(
+        self, mod, key, subset_of_attributes, rect, fids, expression, subset, sample
+    ):
+        primary_key, index = key
+        names = mod.projected_field_names(self.FIELDS, subset_of_attributes, primary_key)
+        select = mod.select_list(names, f"ST_ASWKB(GEOM), {index}")
+        predicates = [
+            self.GEO_TYPE,
+            self.RECT if rect else "",
+            self.FIDS if fids else "",
+            *([self.EXPRESSION] if expression else []),
+            *([self.SUBSET] if subset else []),
+        ]
+        return mod.layer_query(select, "DB.S.T", predicates, 500 if sample else None)
+
+    def test_final_query_for_every_filter_combination(self):
+        import itertools
+
+        mod = self._load()
+        for combination in itertools.product(
+            self.KEYS, (None, [2]), *[(False, True)] * 5
+        ):
+            key, attributes, rect, fids, expression, subset, sample = combination
+            if fids and key[0] != "ID":
+                # Only integer-key fids are pushed down as an IN list.
+                continue
+            with self.subTest(combination=combination):
+                query = self._final_query(mod, *combination)
+                if attributes:
+                    columns = "POP, " + (f"{key[0]}, " if key[0] else "")
+                else:
+                    columns = "ID, NAME, POP, AREA, "
+                inner = f"select {columns}ST_ASWKB(GEOM), {key[1]} from DB.S.T where "
+                expected = [f"({self.GEO_TYPE})"]
+                if rect:
+                    expected.append(f"({self.RECT})")
+                if fids:
+                    expected.append(f"({self.FIDS})")
+                if expression:
+                    expected.append(f"({self.EXPRESSION})")
+                if subset:
+                    expected.append(f"({self.SUBSET})")
+                inner += " and ".join(expected)
+                wanted = f"select * from ({inner})"
+                if sample:
+                    wanted = f"select * from ({wanted}) SAMPLE (500 ROWS)"
+                self.assertEqual(query, wanted)
+
+    def test_projection_keeps_primary_key_and_quotes_names(self):
+        mod = self._load()
+        self.assertEqual(
+            mod.projected_field_names(["a b", "C"], [1], "a b"), ["C", "a b"]
+        )
+        self.assertEqual(mod.projected_field_names(["A", "B"], [], "A"), ["A", "B"])
+        self.assertEqual(mod.projected_field_names(["A", "B"], [1], ""), ["B"])
+        # A requested primary key is not selected a second time.
+        self.assertEqual(
+            mod.projected_field_names(["A", "B", "C"], [2, 0], "A"), ["C", "A"]
+        )
+        self.assertEqual(mod.select_list(["a b", "C"], "X"), '"a b", C, X')
+        self.assertEqual(
+            mod.layer_query("A", "T", ["", ""]), "select * from (select A from T)"
+        )
+
+    def test_iterator_no_longer_gates_projection_on_subset_string(self):
+        content = (ROOT / "providers" / "sf_feature_iterator.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertNotIn("and not self._provider.subsetString()", content)
+        self.assertIn("list_field_names = projected_field_names(", content)
+        self.assertIn("self.final_query = layer_query(", content)
+        # A partial-attribute load must not become the layer's feature cache.
+        idx = content.index("self._should_cache_features = (")
+        self.assertIn("and not self._request_sub_attributes", content[idx:idx + 300])
+
+
+def _arith(op, left, right):
+    return _FakeBinaryOperator(getattr(_FakeBinaryOperator, op), left, right)
+
+
+class TestExpressionCompilerCoverage(unittest.TestCase):
+    """Arithmetic, BETWEEN and the function table compile to quoted Snowflake
+    SQL only where Snowflake evaluates them like QGIS."""
+
+    def setUp(self):
+        self.mod = _load_expression_compiler(self)
+        self.fields = _FakeFields(
+            ["POP", "AREA", "NAME", "TS", "Label"],
+            ["NUMBER", "FLOAT", "TEXT", "TIMESTAMP_NTZ", "VARIANT"],
+        )
+        self.geometry = ('"geom"', "4326")
+
+    def _compile(self, node, geometry=None):
+        return self.mod._compile_node(node, self.fields, geometry)
+
+    def test_division_guards_zero_divisor(self):
+        node = _arith(
+            "boGT",
+            _arith("boDiv", _FakeColumnRef("pop"), _FakeColumnRef("AREA")),
+            _FakeLiteral(10),
+        )
+        self.assertEqual(self._compile(node), "((POP / NULLIF(AREA, 0)) > 10)")
+
+    def test_arithmetic_operators(self):
+        pop, area = _FakeColumnRef("POP"), _FakeColumnRef("AREA")
+        expected = {
+            "boPlus": "(POP + AREA)",
+            "boMinus": "(POP - AREA)",
+            "boMul": "(POP * AREA)",
+            "boIntDiv": "FLOOR(POP / NULLIF(AREA, 0))",
+            "boMod": "MOD(POP, NULLIF(AREA, 0))",
+            "boPow": "POWER(POP, AREA)",
+        }
+        for op, sql in expected.items():
+            with self.subTest(op=op):
+                self.assertEqual(self._compile(_arith(op, pop, area)), sql)
+
+    def test_plus_of_strings_concatenates(self):
+        node = _arith("boPlus", _FakeColumnRef("NAME"), _FakeLiteral("x"))
+        self.assertEqual(self._compile(node), "(NAME || 'x')")
+
+    def test_arithmetic_on_mismatched_kinds_is_refused(self):
+        for node in (
+            _arith("boPlus", _FakeColumnRef("NAME"), _FakeLiteral(1)),
+            _arith("boMinus", _FakeColumnRef("NAME"), _FakeLiteral("a")),
+            _arith("boConcat", _FakeColumnRef("POP"), _FakeLiteral("x")),
+            _arith("boMul", _FakeColumnRef("Label"), _FakeLiteral(2)),
+            _FakeUnaryOperator(_FakeUnaryOperator.uoMinus, _FakeColumnRef("NAME")),
+        ):
+            with self.subTest(node=node):
+                self.assertIsNone(self._compile(node))
+
+    def test_between_compiles(self):
+        node = _FakeBetweenOperator(
+            _FakeColumnRef("POP"), _FakeLiteral(10), _FakeLiteral(20)
+        )
+        self.assertEqual(self._compile(node), "(POP BETWEEN 10 AND 20)")
+        node = _FakeBetweenOperator(
+            _FakeColumnRef("NAME"), _FakeLiteral("a"), _FakeLiteral("m"), True
+        )
+        self.assertEqual(self._compile(node), "(NAME NOT BETWEEN 'a' AND 'm')")
+
+    def test_string_and_math_functions(self):
+        name, pop = _FakeColumnRef("NAME"), _FakeColumnRef("POP")
+        cases = [
+            (_FakeFunction("upper", name), "UPPER(NAME)"),
+            (_FakeFunction("length", name), "LENGTH(NAME)"),
+            (_FakeFunction("strpos", name, _FakeLiteral("ce")), "POSITION('ce', NAME)"),
+            (_FakeFunction("round", pop, _FakeLiteral(2)), "ROUND(POP, 2)"),
+            (_FakeFunction("pi"), "PI()"),
+            # QGIS fills the omitted length with a NULL default.
+            (
+                _FakeFunction("substr", name, _FakeLiteral(2), _FakeLiteral(None)),
+                "SUBSTR(NAME, 2)",
+            ),
+        ]
+        for node, sql in cases:
+            with self.subTest(sql=sql):
+                self.assertEqual(self._compile(node), sql)
+
+    def test_function_arguments_are_quoted(self):
+        node = _FakeFunction(
+            "replace",
+            _FakeColumnRef("label"),
+            _FakeLiteral("x'); DROP TABLE t;--"),
+            _FakeLiteral(""),
+        )
+        # "Label" is a VARIANT column: not text, so replace() is refused.
+        self.assertIsNone(self._compile(node))
+        node = _FakeFunction(
+            "replace",
+            _FakeColumnRef("NAME"),
+            _FakeLiteral("x'); DROP TABLE t;--"),
+            _FakeLiteral(""),
+        )
+        self.assertEqual(
+            self._compile(node), "REPLACE(NAME, 'x''); DROP TABLE t;--', '')"
+        )
+
+    def test_unknown_or_mistyped_functions_are_refused(self):
+        for node in (
+            _FakeFunction("regexp_match", _FakeColumnRef("NAME"), _FakeLiteral("a")),
+            _FakeFunction("upper", _FakeColumnRef("POP")),
+            _FakeFunction("left", _FakeColumnRef("NAME")),
+            _FakeFunction("upper", _FakeUnsupportedNode()),
+        ):
+            with self.subTest(node=node):
+                self.assertIsNone(self._compile(node))
+
+    def test_date_arithmetic_with_intervals(self):
+        node = _arith(
+            "boPlus",
+            _FakeColumnRef("TS"),
+            _FakeFunction("to_interval", _FakeLiteral("1 week 2 hours")),
+        )
+        self.assertEqual(
+            self._compile(node), "(TS + INTERVAL '7 day, 2 hour')"
+        )
+        node = _arith("boMinus", _FakeColumnRef("TS"), _FakeLiteral("2 days"))
+        self.assertEqual(self._compile(node), "(TS - INTERVAL '2 day')")
+        node = _FakeFunction("year", _FakeColumnRef("TS"))
+        self.assertEqual(self._compile(node), "YEAR(TS)")
+
+    def test_now_is_evaluated_client_side(self):
+        # CURRENT_TIMESTAMP() is in the session time zone, now() in local time.
+        node = _arith(
+            "boGT",
+            _FakeColumnRef("TS"),
+            _arith("boMinus", _FakeFunction("now"), _FakeLiteral("2 days")),
+        )
+        self.assertIsNone(self._compile(node))
+
+    def test_trim_strips_all_whitespace(self):
+        node = _FakeFunction("trim", _FakeColumnRef("NAME"))
+        self.assertEqual(
+            self._compile(node), "TRIM(NAME, ' \\t\\n\\r\\f\\x0b')"
+        )
+
+    def test_calendar_and_malformed_intervals_are_refused(self):
+        for text in ("1 month", "2 years", "1.5 days", "2 days'; --"):
+            with self.subTest(text=text):
+                node = _arith(
+                    "boMinus",
+                    _FakeColumnRef("TS"),
+                    _FakeFunction("to_interval", _FakeLiteral(text)),
+                )
+                self.assertIsNone(self._compile(node))
+
+    def test_spatial_functions_on_planar_geometry(self):
+        node = _FakeFunction(
+            "intersects",
+            _FakeFunction("$geometry"),
+            _FakeFunction("geom_from_wkt", _FakeLiteral("POINT(1 2)")),
+        )
+        self.assertEqual(
+            self._compile(node, self.geometry),
+            "ST_INTERSECTS(\"geom\", ST_GEOMETRYFROMWKT('POINT(1 2)', 4326))",
+        )
+        node = _arith(
+            "boGT",
+            _FakeFunction("area", _FakeFunction("$geometry")),
+            _FakeLiteral(100),
+        )
+        self.assertEqual(
+            self._compile(node, self.geometry), '(ST_AREA("geom") > 100)'
+        )
+
+    def test_spatial_functions_need_planar_layer_geometry(self):
+        node = _FakeFunction(
+            "intersects",
+            _FakeFunction("$geometry"),
+            _FakeFunction("geom_from_wkt", _FakeLiteral("POINT(1 2)")),
+        )
+        self.assertIsNone(self._compile(node))
+        # $area follows the project's ellipsoid and units: never pushed down.
+        node = _arith("boGT", _FakeFunction("$area"), _FakeLiteral(100))
+        self.assertIsNone(self._compile(node, self.geometry))
+
+    def test_providers_pass_planar_geometry_only(self):
+        provider = (ROOT / "providers" / "sf_vector_data_provider.py").read_text(
+            encoding="utf-8"
+        )
+        idx = provider.index("def _expression_geometry(")
+        body = provider[idx:provider.index("\n    def ", idx + 1)]
+        self.assertIn('self._geo_column_type != "GEOMETRY"', body)
+        self.assertIn("self._expression_geometry()", provider)
+        iterator = (ROOT / "providers" / "sf_feature_iterator.py").read_text(
+            encoding="utf-8"
+        )
+        self.assertIn("self._provider._expression_geometry()", iterator)
+
+
+class TestExpressionCompilerConformance(unittest.TestCase):
+    """Compiled filters select the rows QGIS' own evaluation selects.
+
+    Each case lists the rows QGIS returns for the expression on the sample
+    layer below; the compiled SQL is run against the same rows in SQLite, with
+    the Snowflake functions SQLite lacks registered with Snowflake's
+    semantics. Numeric columns are REAL because SQLite divides integers
+    integrally, where QGIS and Snowflake do not.
+    """
+
+    ROWS = [
+        (1, 1000.0, 10.0, "Paris"),
+        (2, 50.0, 0.0, "lyon"),
+        (3, None, 5.0, "Nice"),
+        (4, 300.0, 2.0, None),
+        (5, 7.0, 4.0, "Saint-Denis"),
+    ]
+
+    def setUp(self):
+        import math
+        import sqlite3
+
+        self.mod = _load_expression_compiler(self)
+        self.fields = _FakeFields(
+            ["ID", "POP", "AREA", "NAME"], ["NUMBER", "FLOAT", "FLOAT", "TEXT"]
+        )
+        self.db = sqlite3.connect(":memory:")
+        self.addCleanup(self.db.close)
+
+        def null_safe(fn):
+            return lambda *args: None if None in args else fn(*args)
+
+        for name, arity, fn in (
+            ("MOD", 2, math.fmod),
+            ("POWER", 2, math.pow),
+            ("FLOOR", 1, math.floor),
+            ("CEIL", 1, math.ceil),
+            ("POSITION", 2, lambda needle, s: s.find(needle) + 1),
+        ):
+            self.db.create_function(name, arity, null_safe(fn))
+        # Snowflake's LIKE (like QGIS') is case-sensitive.
+        self.db.execute("PRAGMA case_sensitive_like = ON")
+        self.db.execute("CREATE TABLE sample (ID, POP REAL, AREA REAL, NAME TEXT)")
+        self.db.executemany("INSERT INTO sample VALUES (?, ?, ?, ?)", self.ROWS)
+
+    def _selected(self, node):
+        sql = self.mod._compile_node(node, self.fields)
+        self.assertIsNotNone(sql)
+        query = f"SELECT ID FROM sample WHERE {sql} ORDER BY ID"  # nosec B608 - test query
+        return {row[0] for row in self.db.execute(query)}
+
+    def test_compiled_filters_match_qgis(self):
+        pop, area, name = (
+            _FakeColumnRef("POP"),
+            _FakeColumnRef("AREA"),
+            _FakeColumnRef("NAME"),
+        )
+        lit = _FakeLiteral
+        cases = [
+            # '"POP" / "AREA" > 10': division by zero is NULL in QGIS.
+            (_arith("boGT", _arith("boDiv", pop, area), lit(10)), {1, 4}),
+            (_arith("boEQ", _FakeFunction("upper", name), lit("LYON")), {2}),
+            (_arith("boGT", _FakeFunction("length", name), lit(4)), {1, 5}),
+            (_FakeBetweenOperator(pop, lit(50), lit(300)), {2, 4}),
+            (_FakeBetweenOperator(pop, lit(50), lit(300), True), {1, 5}),
+            (_FakeInOperator(_FakeColumnRef("ID"), [lit(1), lit(3), lit(5)]), {1, 3, 5}),
+            (_arith("boEQ", _arith("boMod", pop, lit(2)), lit(0)), {1, 2, 4}),
+            (_arith("boEQ", _arith("boIntDiv", pop, area), lit(150)), {4}),
+            (
+                _arith(
+                    "boLT",
+                    _FakeUnaryOperator(_FakeUnaryOperator.uoMinus, pop),
+                    lit(-100),
+                ),
+                {1, 4},
+            ),
+            (_arith("boEQ", _arith("boConcat", name, lit("!")), lit("Nice!")), {3}),
+            (_arith("boEQ", _arith("boPlus", name, lit("x")), lit("lyonx")), {2}),
+            (
+                _arith(
+                    "boLT",
+                    _FakeFunction("abs", _arith("boMinus", pop, lit(100))),
+                    lit(60),
+                ),
+                {2},
+            ),
+            (
+                _arith(
+                    "boEQ",
+                    _FakeFunction("round", _arith("boDiv", pop, lit(3))),
+                    lit(17),
+                ),
+                {2},
+            ),
+            (
+                _arith(
+                    "boEQ",
+                    _FakeFunction("substr", name, lit(1), lit(2)),
+                    lit("Sa"),
+                ),
+                {5},
+            ),
+            (
+                _arith(
+                    "boEQ",
+                    _FakeFunction("substr", name, lit(2), lit(None)),
+                    lit("aris"),
+                ),
+                {1},
+            ),
+            (_arith("boEQ", _FakeFunction("strpos", name, lit("ce")), lit(3)), {3}),
+            (
+                _arith(
+                    "boEQ",
+                    _FakeFunction("replace", name, lit("-"), lit(" ")),
+                    lit("Saint Denis"),
+                ),
+                {5},
+            ),
+            (_arith("boGT", _arith("boPow", pop, lit(2)), lit(50000)), {1, 4}),
+            (
+                _arith(
+                    "boEQ",
+                    _FakeFunction("floor", _arith("boDiv", area, lit(3))),
+                    lit(1),
+                ),
+                {3, 5},
+            ),
+            (_arith("boLike", name, lit("N%")), {3}),
+            (_arith("boIs", name, lit(None)), {4}),
+            (
+                _FakeUnaryOperator(
+                    _FakeUnaryOperator.uoNot, _arith("boGT", pop, lit(100))
+                ),
+                {2, 5},
+            ),
+        ]
+        for node, expected in cases:
+            with self.subTest(sql=self.mod._compile_node(node, self.fields)):
+                self.assertEqual(self._selected(node), expected)
+
+
 if __name__ == "__main__":
     unittest.main()